@@ -1,6 +1,6 @@
 """Application configuration"""
 from pydantic_settings import BaseSettings
-from typing import Literal
+from typing import Any, Dict, Literal
 
 
 class Settings(BaseSettings):
@@ -18,6 +18,12 @@ class Settings(BaseSettings):
     openai_llm_model: str = "gpt-4.1-2025-04-14"
     is_use_llm_cache: bool = False
     llm_cache_path: str = ".cache/llm_cache.db"
+    is_use_embedding_cache: bool = True
+    embedding_cache_path: str = ".cache/embedding_cache.db"
+    embedding_cache_memory_items: int = 10000
+    embedding_batch_window_ms: float = 5.0
+    embedding_batch_max_items: int = 256
+    embedding_batch_max_tokens: int = 100000
     
     # Target Database
     target_db_type: Literal["postgresql", "mysql", "oracle"] = "postgresql"
@@ -27,6 +33,20 @@ class Settings(BaseSettings):
     target_db_user: str
     target_db_password: str
     target_db_schema: str = "public"
+    # `db` partition of this database's schema in Neo4j; empty searches the whole graph
+    target_db_neo4j_db: str = ""
+    # Additional databases selectable with AskRequest.db_key, as JSON:
+    # {"<key>": {<TargetDatabase fields that differ from the default database>}}
+    target_databases: Dict[str, Dict[str, Any]] = {}
+    
+    # Target Database Pool
+    target_db_pool_min_size: int = 2
+    target_db_pool_max_size: int = 10
+    target_db_pool_warmup: bool = True
+    target_db_pool_read_only: bool = True
+    target_db_pool_acquire_timeout_seconds: float = 10.0
+    target_db_pool_max_inactive_lifetime_seconds: float = 300.0
+    target_db_statement_cache_size: int = 100
     
     # API
     api_host: str = "0.0.0.0"
@@ -37,6 +57,44 @@ class Settings(BaseSettings):
     sql_timeout_seconds: int = 30
     sql_row_limit: int = 1000
     sql_max_rows: int = 100000
+    sql_max_result_bytes: int = 64 * 1024 * 1024
+    sql_stream_batch_size: int = 1000
+    # Server-side limits and cancellation of running queries
+    sql_idle_in_transaction_timeout_seconds: float = 30.0
+    sql_cancel_timeout_seconds: float = 5.0
+    sql_disconnect_poll_seconds: float = 0.5
+    admin_api_key: str = ""
+    # Concurrent statements per target database; waiting statements are served
+    # interactive (/ask) first, then agent (/react), then background (ingest/export)
+    is_use_db_scheduler: bool = True
+    db_max_concurrent_statements: int = 8
+    db_background_max_concurrent_statements: int = 2
+    db_scheduler_queue_timeout_seconds: float = 60.0
+    # Cost-based admission of generated SQL (planner estimates from EXPLAIN)
+    is_use_admission_control: bool = True
+    admission_queue_cost: float = 1_000_000.0
+    admission_sample_cost: float = 10_000_000.0
+    admission_reject_cost: float = 1_000_000_000.0
+    admission_max_rows: int = 50_000_000
+    admission_sample_percent: float = 1.0
+    admission_heavy_concurrency: int = 2
+    admission_queue_timeout_seconds: float = 30.0
+    admission_plan_timeout_seconds: float = 5.0
+    is_use_result_cache: bool = False
+    result_cache_max_bytes: int = 128 * 1024 * 1024
+    result_cache_ttl_seconds: float = 300.0
+    result_cache_compress: bool = True
+    result_cache_validation: Literal["stats", "ttl"] = "stats"
+    # Identical queries running at the same time share one execution
+    is_use_single_flight: bool = True
+    # /ask results browsed page by page through a cursor held between requests
+    is_use_result_sessions: bool = True
+    result_session_max_open: int = 4
+    result_session_idle_timeout_seconds: float = 120.0
+    result_session_max_page_size: int = 10000
+    export_timeout_seconds: int = 600
+    export_queue_max_chunks: int = 16
+    export_parquet_batch_rows: int = 50000
     max_join_depth: int = 10
     max_subquery_depth: int = 10
     
@@ -44,6 +102,18 @@ class Settings(BaseSettings):
     vector_top_k: int = 10
     max_fk_hops: int = 3
     embedding_dimension: int = 1536
+    schema_version_check_interval_seconds: float = 30.0
+    is_use_in_process_vector_index: bool = False
+    vector_index_snapshot_dir: str = ".cache/vector_index"
+    vector_index_dtype: Literal["float32", "float16"] = "float32"
+    is_use_join_graph: bool = True
+    is_use_lexical_search: bool = True
+    lexical_rrf_k: int = 60
+    is_use_subschema_cache: bool = False
+    subschema_cache_similarity_threshold: float = 0.97
+    subschema_cache_max_items: int = 1000
+    subschema_cache_ttl_seconds: float = 3600.0
+    table_importance_metric: Literal["degree", "pagerank"] = "degree"
     
     # Logging
     log_level: str = "INFO"
@@ -60,6 +130,17 @@ class Settings(BaseSettings):
     previous_reasoning_limit_steps: int = 15
     is_add_mocked_db_caution: bool = False
     explain_analysis_timeout_seconds: int = 10
+    value_sample_row_budget: int = 10000
+    value_sample_fallback_max_queries: int = 8
+    is_use_value_dictionary: bool = True
+    value_dictionary_path: str = ".cache/value_dictionary.db"
+    value_dictionary_max_values: int = 50000
+    value_dictionary_max_age_seconds: float = 86400.0
+    value_dictionary_memory_columns: int = 64
+    value_bloom_false_positive_rate: float = 0.001
+    value_bloom_max_values: int = 500000
+    value_hint_max_columns: int = 3
+    value_hint_limit: int = 10
     
     class Config:
         env_file = ".env"
@@ -0,0 +1,254 @@
+"""Cost-based admission of generated SQL, decided from the planner's estimates"""
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
+
+import sqlglot
+from sqlglot import exp
+
+from app.config import settings
+from app.react.utils.db_query_builder import get_query_builder
+
+
+ADMISSION_ADMIT = "admit"
+ADMISSION_QUEUE = "queue"
+ADMISSION_SAMPLE = "sample"
+ADMISSION_REJECT = "reject"
+
+
+class AdmissionRejectedError(Exception):
+    """Raised when a query is too expensive to run, or could not get a slot in time"""
+
+    def __init__(self, message: str, decision: "AdmissionDecision"):
+        super().__init__(message)
+        self.decision = decision
+
+
+@dataclass
+class AdmissionDecision:
+    action: str
+    # SQL to execute: the original statement, or its sampled rewrite
+    sql: str
+    estimated_cost: Optional[float] = None
+    estimated_rows: Optional[int] = None
+    reason: Optional[str] = None
+    sample_percent: Optional[float] = None
+    sampled_cost: Optional[float] = None
+    plan_ms: float = 0.0
+    queued_ms: Optional[float] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "action": self.action,
+            "estimated_cost": self.estimated_cost,
+            "estimated_rows": self.estimated_rows,
+            "reason": self.reason,
+            "sample_percent": self.sample_percent,
+            "sampled_cost": self.sampled_cost,
+            "executed_sql": self.sql if self.action == ADMISSION_SAMPLE else None,
+            "plan_ms": self.plan_ms,
+            "queued_ms": self.queued_ms,
+        }
+
+
+def _max_plan_rows(node: Any) -> int:
+    """
+    Largest row estimate of any plan node (intermediate results count, not just the output).
+
+    Nodes below a Limit report the rows they would produce if read to the end,
+    but execution stops at the limit, so a Limit counts with its own estimate;
+    work a Limit cannot cut short (a Sort reading its whole input) shows in the cost.
+    """
+    if isinstance(node, list):
+        return max((_max_plan_rows(child) for child in node), default=0)
+    if not isinstance(node, dict):
+        return 0
+    if "Plan" in node:
+        return _max_plan_rows(node["Plan"])
+    rows = int(node.get("Plan Rows") or 0)
+    if node.get("Node Type") == "Limit":
+        return rows
+    return max([rows] + [_max_plan_rows(child) for child in node.get("Plans", [])])
+
+
+def sample_sql(sql: str, percent: float) -> Optional[str]:
+    """
+    Rewrite a query so every base table is read through TABLESAMPLE SYSTEM (percent).
+    None when the query cannot be parsed or reads no tables.
+    """
+    try:
+        parsed = sqlglot.parse_one(sql, read="postgres")
+    except Exception:
+        return None
+    cte_names = {cte.alias_or_name for cte in parsed.find_all(exp.CTE)}
+    sampled = False
+    for table in parsed.find_all(exp.Table):
+        if not table.name or (not table.db and table.name in cte_names) or table.args.get("sample"):
+            continue
+        table.set(
+            "sample",
+            exp.TableSample(method=exp.var("SYSTEM"), percent=exp.Literal.number(percent)),
+        )
+        sampled = True
+    return parsed.sql(dialect="postgres") if sampled else None
+
+
+class AdmissionController:
+    """
+    Decides how a validated query may run from a plain EXPLAIN (no ANALYZE):
+
+    - estimated cost above reject_cost: rejected
+    - cost above sample_cost, or an intermediate result above max_rows:
+      downgraded to a sampled preview (TABLESAMPLE on every base table), or
+      rejected when even the sample is estimated above sample_cost
+    - cost above queue_cost: waits for one of a few heavy-query slots
+    - otherwise admitted as is
+    """
+
+    def __init__(
+        self,
+        queue_cost: float,
+        sample_cost: float,
+        reject_cost: float,
+        max_rows: int,
+        sample_percent: float,
+        heavy_concurrency: int,
+        queue_timeout: float,
+        plan_timeout: float,
+        dbms: Optional[str] = None,
+    ):
+        self.queue_cost = queue_cost
+        self.sample_cost = sample_cost
+        self.reject_cost = reject_cost
+        self.max_rows = max_rows
+        self.sample_percent = sample_percent
+        self.queue_timeout = queue_timeout
+        self.plan_timeout = plan_timeout
+        self.dbms = dbms or settings.target_db_type
+        self._heavy_slots = asyncio.Semaphore(max(1, heavy_concurrency))
+        self.decisions: Dict[str, int] = {
+            action: 0 for action in (ADMISSION_ADMIT, ADMISSION_QUEUE, ADMISSION_SAMPLE, ADMISSION_REJECT)
+        }
+        self.queue_timeouts = 0
+        self.plan_failures = 0
+        self.waiting = 0
+
+    async def _estimate(self, conn, sql: str) -> Tuple[float, int]:
+        builder = get_query_builder(self.dbms)
+        plan = await asyncio.wait_for(
+            builder.fetch_execution_plan(conn, sql, analyze=False, verbose=False),
+            timeout=self.plan_timeout,
+        )
+        return plan.total_cost, _max_plan_rows(plan.raw_plan)
+
+    async def decide(self, conn, sql: str) -> AdmissionDecision:
+        """Admission decision for a validated query (does not wait for a slot)"""
+        start = time.perf_counter()
+        try:
+            cost, rows = await self._estimate(conn, sql)
+        except Exception as e:
+            # Without a plan there is nothing to judge; execution reports real errors
+            self.plan_failures += 1
+            decision = AdmissionDecision(action=ADMISSION_ADMIT, sql=sql, reason=f"plan unavailable: {e}")
+        else:
+            decision = AdmissionDecision(action=ADMISSION_ADMIT, sql=sql, estimated_cost=cost, estimated_rows=rows)
+            if cost > self.reject_cost:
+                decision.action = ADMISSION_REJECT
+                decision.reason = f"estimated cost {cost:.0f} exceeds {self.reject_cost:.0f}"
+            elif cost > self.sample_cost or rows > self.max_rows:
+                await self._downgrade_to_sample(conn, decision)
+            elif cost > self.queue_cost:
+                decision.action = ADMISSION_QUEUE
+                decision.reason = f"estimated cost {cost:.0f} exceeds {self.queue_cost:.0f}"
+        decision.plan_ms = round((time.perf_counter() - start) * 1000, 2)
+        self.decisions[decision.action] += 1
+        return decision
+
+    async def _downgrade_to_sample(self, conn, decision: AdmissionDecision):
+        if decision.estimated_cost > self.sample_cost:
+            over = f"estimated cost {decision.estimated_cost:.0f} exceeds {self.sample_cost:.0f}"
+        else:
+            over = f"estimated {decision.estimated_rows} intermediate rows exceed {self.max_rows}"
+        decision.action = ADMISSION_REJECT
+        decision.reason = over
+        sampled = sample_sql(decision.sql, self.sample_percent)
+        if sampled is None:
+            return
+        try:
+            sampled_cost, sampled_rows = await self._estimate(conn, sampled)
+        except Exception:
+            # e.g. TABLESAMPLE on a view
+            self.plan_failures += 1
+            return
+        decision.sampled_cost = sampled_cost
+        if sampled_cost > self.sample_cost or sampled_rows > self.max_rows:
+            decision.reason = f"{over}, even with a {self.sample_percent}% sample"
+            return
+        decision.action = ADMISSION_SAMPLE
+        decision.sql = sampled
+        decision.sample_percent = self.sample_percent
+        decision.reason = f"{over}; running on a {self.sample_percent}% sample"
+
+    @asynccontextmanager
+    async def admitted(self, conn, sql: str) -> AsyncIterator[AdmissionDecision]:
+        """
+        Decide, then hold a heavy-query slot for queued queries while the block runs.
+        Execute decision.sql inside the block. Raises AdmissionRejectedError.
+        """
+        decision = await self.decide(conn, sql)
+        if decision.action == ADMISSION_REJECT:
+            raise AdmissionRejectedError(f"Query rejected by admission control: {decision.reason}", decision)
+        if decision.action != ADMISSION_QUEUE:
+            yield decision
+            return
+
+        start = time.perf_counter()
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._heavy_slots.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.queue_timeouts += 1
+            decision.queued_ms = round((time.perf_counter() - start) * 1000, 2)
+            raise AdmissionRejectedError(
+                f"Query queued for more than {self.queue_timeout} seconds behind other expensive queries",
+                decision,
+            )
+        finally:
+            self.waiting -= 1
+        decision.queued_ms = round((time.perf_counter() - start) * 1000, 2)
+        try:
+            yield decision
+        finally:
+            self._heavy_slots.release()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "decisions": dict(self.decisions),
+            "waiting": self.waiting,
+            "queue_timeouts": self.queue_timeouts,
+            "plan_failures": self.plan_failures,
+        }
+
+
+_admission_controller: Optional[AdmissionController] = None
+
+
+def get_admission_controller() -> Optional[AdmissionController]:
+    """Process-wide admission controller, or None when admission control is disabled"""
+    global _admission_controller
+    if not settings.is_use_admission_control:
+        return None
+    if _admission_controller is None:
+        _admission_controller = AdmissionController(
+            queue_cost=settings.admission_queue_cost,
+            sample_cost=settings.admission_sample_cost,
+            reject_cost=settings.admission_reject_cost,
+            max_rows=settings.admission_max_rows,
+            sample_percent=settings.admission_sample_percent,
+            heavy_concurrency=settings.admission_heavy_concurrency,
+            queue_timeout=settings.admission_queue_timeout_seconds,
+            plan_timeout=settings.admission_plan_timeout_seconds,
+        )
+    return _admission_controller
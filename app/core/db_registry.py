@@ -0,0 +1,116 @@
+"""Named target databases, each with its own connection settings, limits and Neo4j partition"""
+from dataclasses import dataclass, fields, replace
+from typing import Any, Dict, List, Optional
+
+from app.config import settings
+
+
+DEFAULT_DB_KEY = "default"
+
+
+class UnknownDatabaseError(Exception):
+    """Raised when a request names a database that is not registered"""
+    pass
+
+
+@dataclass(frozen=True)
+class TargetDatabase:
+    key: str
+    db_type: str
+    host: str
+    port: int
+    name: str
+    user: str
+    password: str
+    schema: str
+    # Value of the `db` property on this database's Table/Column nodes;
+    # None searches the whole graph (single-database deployments)
+    neo4j_db: Optional[str]
+    pool_min_size: int
+    pool_max_size: int
+    read_only: bool
+    sql_timeout_seconds: float
+    sql_max_rows: int
+    sql_max_result_bytes: int
+    max_concurrent_statements: int
+    background_max_concurrent_statements: int
+
+    def describe(self) -> Dict[str, Any]:
+        """Connection summary without credentials"""
+        return {
+            "key": self.key,
+            "db_type": self.db_type,
+            "host": self.host,
+            "port": self.port,
+            "name": self.name,
+            "schema": self.schema,
+            "neo4j_db": self.neo4j_db,
+        }
+
+
+def _default_database() -> TargetDatabase:
+    return TargetDatabase(
+        key=DEFAULT_DB_KEY,
+        db_type=settings.target_db_type,
+        host=settings.target_db_host,
+        port=settings.target_db_port,
+        name=settings.target_db_name,
+        user=settings.target_db_user,
+        password=settings.target_db_password,
+        schema=settings.target_db_schema,
+        neo4j_db=settings.target_db_neo4j_db or None,
+        pool_min_size=settings.target_db_pool_min_size,
+        pool_max_size=settings.target_db_pool_max_size,
+        read_only=settings.target_db_pool_read_only,
+        sql_timeout_seconds=settings.sql_timeout_seconds,
+        sql_max_rows=settings.sql_max_rows,
+        sql_max_result_bytes=settings.sql_max_result_bytes,
+        max_concurrent_statements=settings.db_max_concurrent_statements,
+        background_max_concurrent_statements=settings.db_background_max_concurrent_statements,
+    )
+
+
+def build_target_databases(extra: Dict[str, Dict[str, Any]]) -> Dict[str, TargetDatabase]:
+    """
+    The default database from the TARGET_DB_* settings plus the TARGET_DATABASES entries.
+
+    An entry only lists what differs from the default database, e.g.
+    {"sales": {"name": "sales", "neo4j_db": "sales"}} for another database
+    on the same server. neo4j_db defaults to the entry's key.
+    """
+    default = _default_database()
+    databases = {DEFAULT_DB_KEY: default}
+    known_fields = {f.name for f in fields(TargetDatabase)} - {"key"}
+    for key, overrides in extra.items():
+        unknown = set(overrides) - known_fields
+        if unknown:
+            raise ValueError(f"Unknown settings for target database '{key}': {', '.join(sorted(unknown))}")
+        if key == DEFAULT_DB_KEY:
+            databases[key] = replace(default, **overrides)
+            continue
+        databases[key] = replace(default, key=key, **{"neo4j_db": key, **overrides})
+    return databases
+
+
+_databases: Optional[Dict[str, TargetDatabase]] = None
+
+
+def _registry() -> Dict[str, TargetDatabase]:
+    global _databases
+    if _databases is None:
+        _databases = build_target_databases(settings.target_databases)
+    return _databases
+
+
+def get_target_database(key: Optional[str] = None) -> TargetDatabase:
+    """Registered database by key (the default database when key is empty)"""
+    database = _registry().get(key or DEFAULT_DB_KEY)
+    if database is None:
+        raise UnknownDatabaseError(
+            f"Unknown database '{key}'. Registered: {', '.join(sorted(_registry()))}"
+        )
+    return database
+
+
+def list_target_databases() -> List[TargetDatabase]:
+    return list(_registry().values())
@@ -0,0 +1,284 @@
+"""Per-database limit on concurrent statements, granted in priority order"""
+import asyncio
+import heapq
+import itertools
+import time
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple
+
+from app.config import settings
+
+
+# Lower value is served first
+PRIORITY_INTERACTIVE = 0
+PRIORITY_AGENT = 1
+PRIORITY_BACKGROUND = 2
+
+PRIORITY_NAMES = {
+    PRIORITY_INTERACTIVE: "interactive",
+    PRIORITY_AGENT: "agent",
+    PRIORITY_BACKGROUND: "background",
+}
+
+# Default priority of queries issued while serving a route (longest prefix wins)
+ROUTE_PRIORITIES = {
+    "/ask": PRIORITY_INTERACTIVE,
+    "/react": PRIORITY_AGENT,
+    "/ingest": PRIORITY_BACKGROUND,
+    "/vectorize": PRIORITY_BACKGROUND,
+    "/export": PRIORITY_BACKGROUND,
+}
+
+_priority: ContextVar[int] = ContextVar("db_query_priority", default=PRIORITY_AGENT)
+# Task holding a slot, so statements nested in a scheduled transaction pass straight through
+_slot_holder: ContextVar[Optional[asyncio.Task]] = ContextVar("db_slot_holder", default=None)
+
+
+class SchedulerTimeoutError(Exception):
+    """Raised when a statement waited too long for a free slot on its database"""
+    pass
+
+
+def route_priority(path: str) -> int:
+    matches = [prefix for prefix in ROUTE_PRIORITIES if path == prefix or path.startswith(prefix + "/")]
+    if not matches:
+        return PRIORITY_AGENT
+    return ROUTE_PRIORITIES[max(matches, key=len)]
+
+
+@contextmanager
+def priority_scope(priority: int) -> Iterator[None]:
+    """Run target database statements issued in this scope at the given priority"""
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def current_priority() -> int:
+    return _priority.get()
+
+
+class PriorityLimiter:
+    """
+    Counting semaphore whose waiters are served by priority, then arrival.
+
+    Background work may hold at most background_max_concurrent slots, so
+    long-running ingest or export statements cannot occupy every slot while
+    interactive queries wait (running statements are never preempted).
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_concurrent: int,
+        background_max_concurrent: int,
+        queue_timeout: float,
+    ):
+        self.name = name
+        self.max_concurrent = max(1, max_concurrent)
+        self.background_max_concurrent = max(1, min(background_max_concurrent, self.max_concurrent))
+        self.queue_timeout = queue_timeout
+        self._running: Dict[int, int] = {priority: 0 for priority in PRIORITY_NAMES}
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        self._acquired: Dict[int, int] = {priority: 0 for priority in PRIORITY_NAMES}
+        self._timeouts: Dict[int, int] = {priority: 0 for priority in PRIORITY_NAMES}
+        self._wait_total_ms: Dict[int, float] = {priority: 0.0 for priority in PRIORITY_NAMES}
+        self._wait_max_ms: Dict[int, float] = {priority: 0.0 for priority in PRIORITY_NAMES}
+
+    @property
+    def running(self) -> int:
+        return sum(self._running.values())
+
+    def _can_run(self, priority: int) -> bool:
+        if self.running >= self.max_concurrent:
+            return False
+        return priority != PRIORITY_BACKGROUND or self._running[priority] < self.background_max_concurrent
+
+    def _drop_abandoned(self):
+        while self._waiters and self._waiters[0][2].done():
+            heapq.heappop(self._waiters)
+
+    def _grant_waiters(self):
+        self._drop_abandoned()
+        while self._waiters:
+            priority, _, future = self._waiters[0]
+            if not self._can_run(priority):
+                # Waiters behind the head have the same or a lower priority
+                break
+            heapq.heappop(self._waiters)
+            self._running[priority] += 1
+            future.set_result(None)
+            self._drop_abandoned()
+
+    def _record_wait(self, priority: int, start: float):
+        wait_ms = (time.perf_counter() - start) * 1000
+        self._acquired[priority] += 1
+        self._wait_total_ms[priority] += wait_ms
+        self._wait_max_ms[priority] = max(self._wait_max_ms[priority], wait_ms)
+
+    async def acquire(self, priority: int):
+        start = time.perf_counter()
+        self._drop_abandoned()
+        no_one_ahead = not self._waiters or self._waiters[0][0] > priority
+        if no_one_ahead and self._can_run(priority):
+            self._running[priority] += 1
+            self._record_wait(priority, start)
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._sequence), future))
+        try:
+            await asyncio.wait_for(asyncio.shield(future), timeout=self.queue_timeout)
+        except BaseException as e:
+            if future.done() and not future.cancelled():
+                # Granted just as we gave up: hand the slot on
+                self.release(priority)
+            else:
+                future.cancel()
+            if isinstance(e, asyncio.TimeoutError):
+                self._timeouts[priority] += 1
+                raise SchedulerTimeoutError(
+                    f"No free slot on database '{self.name}' after {self.queue_timeout} seconds"
+                )
+            raise
+        self._record_wait(priority, start)
+
+    def release(self, priority: int):
+        self._running[priority] -= 1
+        self._grant_waiters()
+
+    @asynccontextmanager
+    async def slot(self, priority: Optional[int] = None) -> AsyncIterator[None]:
+        """Hold one slot for the block; re-entrant within the task that holds it"""
+        task = asyncio.current_task()
+        previous = _slot_holder.get()
+        if previous is task:
+            yield
+            return
+        priority = current_priority() if priority is None else priority
+        await self.acquire(priority)
+        _slot_holder.set(task)
+        try:
+            yield
+        finally:
+            _slot_holder.set(previous)
+            self.release(priority)
+
+    def stats(self) -> Dict[str, Any]:
+        queued: Dict[int, int] = {priority: 0 for priority in PRIORITY_NAMES}
+        for priority, _, future in self._waiters:
+            if not future.done():
+                queued[priority] += 1
+        return {
+            "max_concurrent": self.max_concurrent,
+            "running": self.running,
+            "queued": sum(queued.values()),
+            "priorities": {
+                name: {
+                    "running": self._running[priority],
+                    "queued": queued[priority],
+                    "acquired": self._acquired[priority],
+                    "timeouts": self._timeouts[priority],
+                    "wait_avg_ms": round(
+                        self._wait_total_ms[priority] / self._acquired[priority], 3
+                    ) if self._acquired[priority] else 0.0,
+                    "wait_max_ms": round(self._wait_max_ms[priority], 3),
+                }
+                for priority, name in PRIORITY_NAMES.items()
+            },
+        }
+
+
+class _ScheduledTransaction:
+    def __init__(self, limiter: PriorityLimiter, transaction):
+        self._limiter = limiter
+        self._transaction = transaction
+        self._slot = None
+
+    async def __aenter__(self):
+        self._slot = self._limiter.slot()
+        await self._slot.__aenter__()
+        try:
+            return await self._transaction.__aenter__()
+        except BaseException as e:
+            await self._slot.__aexit__(type(e), e, e.__traceback__)
+            raise
+
+    async def __aexit__(self, *exc):
+        try:
+            return await self._transaction.__aexit__(*exc)
+        finally:
+            await self._slot.__aexit__(*exc)
+
+
+class ScheduledConnection:
+    """
+    Connection proxy that takes a slot from its database's limiter for every
+    statement, and for the whole of a transaction (cursors included).
+    Everything else is passed to the wrapped asyncpg connection.
+    """
+
+    _STATEMENT_METHODS = frozenset({
+        "execute",
+        "executemany",
+        "fetch",
+        "fetchval",
+        "fetchrow",
+        "prepare",
+        "copy_from_query",
+        "copy_from_table",
+        "copy_to_table",
+        "copy_records_to_table",
+    })
+
+    def __init__(self, conn, limiter: PriorityLimiter):
+        self._conn = conn
+        self._limiter = limiter
+
+    @property
+    def raw_connection(self):
+        return self._conn
+
+    def transaction(self, *args, **kwargs):
+        return _ScheduledTransaction(self._limiter, self._conn.transaction(*args, **kwargs))
+
+    def __getattr__(self, name: str):
+        attribute = getattr(self._conn, name)
+        if name not in self._STATEMENT_METHODS:
+            return attribute
+
+        async def scheduled(*args, **kwargs):
+            async with self._limiter.slot():
+                return await attribute(*args, **kwargs)
+
+        return scheduled
+
+
+_limiters: Dict[str, PriorityLimiter] = {}
+
+
+def get_db_limiter(db_key: str = "default") -> Optional[PriorityLimiter]:
+    """Statement limiter for a target database, or None when scheduling is disabled"""
+    if not settings.is_use_db_scheduler:
+        return None
+    limiter = _limiters.get(db_key)
+    if limiter is None:
+        from app.core.db_registry import get_target_database
+
+        database = get_target_database(db_key)
+        limiter = PriorityLimiter(
+            name=db_key,
+            max_concurrent=database.max_concurrent_statements,
+            background_max_concurrent=database.background_max_concurrent_statements,
+            queue_timeout=settings.db_scheduler_queue_timeout_seconds,
+        )
+        _limiters[db_key] = limiter
+    return limiter
+
+
+def get_db_scheduler_stats() -> Dict[str, Any]:
+    return {db_key: limiter.stats() for db_key, limiter in _limiters.items()}
@@ -1,8 +1,10 @@
 """Embedding client for text vectorization"""
-from typing import List
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
 from openai import AsyncOpenAI
 
 from app.config import settings
+from app.core.embedding_cache import get_embedding_cache
 
 
 class EmbeddingClient:
@@ -11,18 +13,58 @@ class EmbeddingClient:
     def __init__(self, client: AsyncOpenAI):
         self.client = client
         self.model = settings.openai_embedding_model
+        self.cache = get_embedding_cache()
     
     async def embed_text(self, text: str) -> List[float]:
         """Generate embedding for a single text"""
-        response = await self.client.embeddings.create(
-            model=self.model,
-            input=text,
-            encoding_format="float"
-        )
-        return response.data[0].embedding
+        embeddings = await self.embed_batch([text])
+        return embeddings[0]
     
     async def embed_batch(self, texts: List[str]) -> List[List[float]]:
-        """Generate embeddings for multiple texts"""
+        """
+        Generate embeddings for multiple texts.
+        
+        Small batches are coalesced with concurrent callers by the process-wide
+        EmbeddingBatcher before being sent upstream.
+        """
+        if not texts:
+            return []
+        
+        batcher = get_embedding_batcher(self)
+        if batcher and len(texts) < batcher.max_items:
+            return await batcher.submit(texts)
+        return await self._embed_uncoalesced(texts)
+    
+    async def _embed_uncoalesced(self, texts: List[str]) -> List[List[float]]:
+        """Identical texts are embedded once, and only cache misses are sent upstream"""
+        if not texts:
+            return []
+        
+        keys = [
+            self.cache.make_key(self.model, settings.embedding_dimension, text)
+            if self.cache else text
+            for text in texts
+        ]
+        unique_texts: Dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            unique_texts.setdefault(key, text)
+        
+        vectors: Dict[str, List[float]] = {}
+        if self.cache:
+            vectors = await self.cache.get_many(unique_texts.keys())
+        
+        missing_keys = [key for key in unique_texts if key not in vectors]
+        if missing_keys:
+            computed = await self._create_embeddings([unique_texts[key] for key in missing_keys])
+            fresh = dict(zip(missing_keys, computed))
+            if self.cache:
+                await self.cache.put_many(fresh)
+            vectors.update(fresh)
+        
+        return [vectors[key] for key in keys]
+    
+    async def _create_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """Call the embeddings API for texts that are not cached"""
         response = await self.client.embeddings.create(
             model=self.model,
             input=texts,
@@ -48,3 +90,132 @@ class EmbeddingClient:
             parts.append(f"Description: {description}")
         return " | ".join(parts)
 
+
+def estimate_tokens(text: str) -> int:
+    """Cheap upper-bound token estimate used to cap batch size (UTF-8 bytes / 2)"""
+    return len(text.encode("utf-8")) // 2 + 1
+
+
+class EmbeddingBatcher:
+    """
+    Collects embedding requests arriving within a short window into one upstream batch.
+    
+    Each caller awaits its own future; a batch is flushed when the window elapses
+    or when adding another request would exceed the item or token cap.
+    """
+    
+    def __init__(
+        self,
+        embed_fn: Callable[[List[str]], Awaitable[List[List[float]]]],
+        *,
+        window_ms: float,
+        max_items: int,
+        max_tokens: int,
+    ):
+        self.embed_fn = embed_fn
+        self.window_seconds = window_ms / 1000
+        self.max_items = max(1, max_items)
+        self.max_tokens = max(1, max_tokens)
+        self._pending: List[Tuple[List[str], asyncio.Future]] = []
+        self._pending_items = 0
+        self._pending_tokens = 0
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._flush_tasks: Set[asyncio.Task] = set()
+        self.batches = 0
+        self.requests = 0
+        self.items = 0
+    
+    async def submit(self, texts: List[str]) -> List[List[float]]:
+        """Queue texts for the next batch and wait for their embeddings"""
+        loop = asyncio.get_running_loop()
+        tokens = sum(estimate_tokens(text) for text in texts)
+        if self._pending and (
+            self._pending_items + len(texts) > self.max_items
+            or self._pending_tokens + tokens > self.max_tokens
+        ):
+            self._flush()
+        
+        future: asyncio.Future = loop.create_future()
+        self._pending.append((texts, future))
+        self._pending_items += len(texts)
+        self._pending_tokens += tokens
+        self.requests += 1
+        
+        if self._pending_items >= self.max_items or self._pending_tokens >= self.max_tokens:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window_seconds, self._flush)
+        
+        return await future
+    
+    def _flush(self):
+        """Detach the pending requests and send them upstream in the background"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+        pending = self._pending
+        self._pending = []
+        self._pending_items = 0
+        self._pending_tokens = 0
+        task = asyncio.ensure_future(self._run_batch(pending))
+        self._flush_tasks.add(task)
+        task.add_done_callback(self._flush_tasks.discard)
+    
+    async def _run_batch(self, pending: List[Tuple[List[str], asyncio.Future]]):
+        texts = [text for request_texts, _ in pending for text in request_texts]
+        self.batches += 1
+        self.items += len(texts)
+        try:
+            vectors = await self.embed_fn(texts)
+        except Exception as exc:
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        
+        offset = 0
+        for request_texts, future in pending:
+            if not future.done():
+                future.set_result(vectors[offset:offset + len(request_texts)])
+            offset += len(request_texts)
+    
+    def stats(self) -> Dict[str, Any]:
+        """Batching counters"""
+        return {
+            "window_ms": round(self.window_seconds * 1000, 3),
+            "requests": self.requests,
+            "batches": self.batches,
+            "items": self.items,
+            "avg_batch_items": round(self.items / self.batches, 2) if self.batches else 0.0,
+        }
+
+
+_batchers: Dict[Tuple[int, str], Tuple[Any, EmbeddingBatcher]] = {}
+
+
+def get_embedding_batcher(embedding_client: EmbeddingClient) -> Optional[EmbeddingBatcher]:
+    """Process-wide batcher for an OpenAI client/model pair, or None when batching is disabled"""
+    if settings.embedding_batch_window_ms <= 0:
+        return None
+    key = (id(embedding_client.client), embedding_client.model)
+    entry = _batchers.get(key)
+    if entry is None or entry[0] is not embedding_client.client:
+        batcher = EmbeddingBatcher(
+            embedding_client._embed_uncoalesced,
+            window_ms=settings.embedding_batch_window_ms,
+            max_items=settings.embedding_batch_max_items,
+            max_tokens=settings.embedding_batch_max_tokens,
+        )
+        entry = (embedding_client.client, batcher)
+        _batchers[key] = entry
+    return entry[1]
+
+
+def get_embedding_batcher_stats() -> List[Dict[str, Any]]:
+    """Counters for every active batcher"""
+    return [
+        {"model": model, **batcher.stats()}
+        for (_, model), (_, batcher) in _batchers.items()
+    ]
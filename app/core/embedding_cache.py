@@ -0,0 +1,139 @@
+"""Two-tier content-addressed cache for text embeddings"""
+import asyncio
+import hashlib
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from app.config import settings
+
+
+class EmbeddingCache:
+    """In-memory LRU in front of a SQLite store keyed by (model, dimension, sha256(text))"""
+
+    def __init__(self, path: str, max_memory_items: int):
+        self.path = path
+        self.max_memory_items = max(0, max_memory_items)
+        self._memory: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._db_lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(model: str, dimension: int, text: str) -> str:
+        """Content address for a text embedded by a given model/dimension"""
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        return f"{model}:{dimension}:{digest}"
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._db is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)"
+            )
+            self._db.commit()
+        return self._db
+
+    def _remember(self, key: str, vector: List[float]):
+        if self.max_memory_items == 0:
+            return
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_items:
+            self._memory.popitem(last=False)
+
+    def _read_disk(self, keys: List[str]) -> Dict[str, List[float]]:
+        found: Dict[str, List[float]] = {}
+        with self._db_lock:
+            db = self._connect()
+            # Stay below SQLite's bound-parameter limit
+            for i in range(0, len(keys), 500):
+                chunk = keys[i:i + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = db.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})",
+                    chunk,
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = np.frombuffer(blob, dtype=np.float32).tolist()
+        return found
+
+    def _write_disk(self, items: Dict[str, List[float]]):
+        with self._db_lock:
+            db = self._connect()
+            db.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                [
+                    (key, np.asarray(vector, dtype=np.float32).tobytes())
+                    for key, vector in items.items()
+                ],
+            )
+            db.commit()
+
+    async def get_many(self, keys: Iterable[str]) -> Dict[str, List[float]]:
+        """Look up keys in memory first, then on disk; misses are simply absent"""
+        found: Dict[str, List[float]] = {}
+        disk_keys: List[str] = []
+        for key in keys:
+            vector = self._memory.get(key)
+            if vector is not None:
+                self._memory.move_to_end(key)
+                found[key] = vector
+                self.memory_hits += 1
+            else:
+                disk_keys.append(key)
+
+        if disk_keys:
+            disk_found = await asyncio.to_thread(self._read_disk, disk_keys)
+            for key, vector in disk_found.items():
+                self._remember(key, vector)
+                found[key] = vector
+            self.disk_hits += len(disk_found)
+            self.misses += len(disk_keys) - len(disk_found)
+
+        return found
+
+    async def put_many(self, items: Dict[str, List[float]]):
+        """Store freshly computed embeddings in both tiers"""
+        if not items:
+            return
+        for key, vector in items.items():
+            self._remember(key, vector)
+        await asyncio.to_thread(self._write_disk, items)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters"""
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "memory_items": len(self._memory),
+            "max_memory_items": self.max_memory_items,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.memory_hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+        }
+
+
+_embedding_cache: Optional[EmbeddingCache] = None
+
+
+def get_embedding_cache() -> Optional[EmbeddingCache]:
+    """Process-wide embedding cache, or None when caching is disabled"""
+    global _embedding_cache
+    if not settings.is_use_embedding_cache:
+        return None
+    if _embedding_cache is None:
+        _embedding_cache = EmbeddingCache(
+            path=settings.embedding_cache_path,
+            max_memory_items=settings.embedding_cache_memory_items,
+        )
+    return _embedding_cache
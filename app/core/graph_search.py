@@ -1,8 +1,20 @@
 """Neo4j graph search for schema retrieval"""
-from typing import List, Dict, Any, Tuple
-from dataclasses import dataclass
+import asyncio
+import time
+from typing import List, Dict, Any, Awaitable, Callable, Optional, Tuple
+from dataclasses import dataclass, field
 
 from app.config import settings
+from app.core.join_graph import JoinGraphIndex, get_join_graph_index
+from app.core.lexical_index import LexicalIndex, get_lexical_index, reciprocal_rank_fusion
+from app.core.schema_version import schema_version_tracker
+from app.core.subschema_cache import SubSchemaCache, get_subschema_cache
+from app.core.vector_index import InProcessVectorIndex, get_vector_index
+
+
+# Neo4j vector indexes cannot filter by db, so a filtered search asks for more
+# candidates than it returns
+DB_FILTER_OVERFETCH = 4
 
 
 @dataclass
@@ -12,8 +24,11 @@ class TableMatch:
     schema: str
     db: str
     description: str
+    # Cosine similarity of the vector match (0.0 for tables only found lexically)
     score: float
     columns: List[Dict[str, Any]] = None
+    # Reciprocal-rank score of the vector + lexical fusion; None when not fused
+    fused_score: Optional[float] = None
 
 
 @dataclass
@@ -23,8 +38,11 @@ class ColumnMatch:
     table_name: str
     dtype: str
     description: str
+    # Cosine similarity of the vector match (0.0 for columns only found lexically)
     score: float
     nullable: bool = True
+    # Reciprocal-rank score of the vector + lexical fusion; None when not fused
+    fused_score: Optional[float] = None
 
 
 @dataclass
@@ -34,33 +52,95 @@ class SubSchema:
     columns: List[ColumnMatch]
     fk_relationships: List[Dict[str, Any]]
     join_hints: List[str]
+    stage_timings: Dict[str, float] = field(default_factory=dict)
 
 
 class GraphSearcher:
     """Search Neo4j graph for relevant schema elements"""
     
-    def __init__(self, session):
+    def __init__(
+        self,
+        session,
+        vector_index: Optional[InProcessVectorIndex] = None,
+        session_factory: Optional[Callable[[], Awaitable[Any]]] = None,
+        join_graph_index: Optional[JoinGraphIndex] = None,
+        lexical_index: Optional[LexicalIndex] = None,
+        subschema_cache: Optional[SubSchemaCache] = None,
+        db: Optional[str] = None,
+    ):
         self.session = session
+        # Only Table/Column nodes with this `db` are searched (the whole graph when None)
+        self.db = db
         self.top_k = settings.vector_top_k
         self.max_hops = settings.max_fk_hops
+        self.vector_index = vector_index or get_vector_index()
+        self.join_graph_index = join_graph_index or get_join_graph_index()
+        self.lexical_index = lexical_index or get_lexical_index()
+        self.subschema_cache = subschema_cache or get_subschema_cache()
+        # Opens extra sessions so independent stages can run concurrently
+        self.session_factory = session_factory
+    
+    def _fetch_k(self, k: int) -> int:
+        return k if self.db is None else k * DB_FILTER_OVERFETCH
+    
+    async def _use_vector_index(self) -> bool:
+        """Whether vector queries can be answered by the in-process index"""
+        if self.vector_index is None:
+            return False
+        return await self.vector_index.ensure_fresh(self.session)
+    
+    async def _use_lexical_index(self, query_text: Optional[str]) -> bool:
+        """Whether lexical matches should be fused into the vector results"""
+        if self.lexical_index is None or not query_text:
+            return False
+        return await self.lexical_index.ensure_fresh(self.session)
+    
+    @staticmethod
+    def _fuse_records(
+        vector_records: List[Dict[str, Any]],
+        lexical_records: List[Dict[str, Any]],
+        key: Callable[[Dict[str, Any]], Any],
+        k: int
+    ) -> List[Dict[str, Any]]:
+        """
+        Records in fused rank order. "score" stays the cosine similarity (vector
+        records come first, so theirs is kept); lexical-only records get 0.0.
+        """
+        lexical_records = [{**r, "score": 0.0, "lexical_score": r["score"]} for r in lexical_records]
+        return reciprocal_rank_fusion(
+            [vector_records, lexical_records],
+            key=key,
+            k=k,
+            rrf_k=settings.lexical_rrf_k,
+        )
+    
+    @classmethod
+    def _fuse_table_records(
+        cls,
+        vector_records: List[Dict[str, Any]],
+        lexical_records: List[Dict[str, Any]],
+        k: int
+    ) -> List[Dict[str, Any]]:
+        return cls._fuse_records(vector_records, lexical_records, lambda r: (r["schema"], r["name"]), k)
     
-    async def search_tables(self, query_embedding: List[float], k: int = None) -> List[TableMatch]:
-        """Search for relevant tables using vector similarity"""
+    async def search_tables(
+        self,
+        query_embedding: List[float],
+        k: int = None,
+        query_text: Optional[str] = None
+    ) -> List[TableMatch]:
+        """Search for relevant tables using vector similarity, fused with lexical matches on query_text"""
         k = k or self.top_k
         
-        query = """
-        CALL db.index.vector.queryNodes('table_vec_index', $k, $embedding)
-        YIELD node, score
-        RETURN node.name AS name,
-               node.schema AS schema,
-               node.db AS db,
-               node.description AS description,
-               score
-        ORDER BY score DESC, node.schema ASC, node.name ASC
-        """
+        if await self._use_vector_index():
+            records = self.vector_index.query_tables(query_embedding, k, self.db)
+        else:
+            records = await self._query_table_vectors(query_embedding, k)
         
-        result = await self.session.run(query, k=k, embedding=query_embedding)
-        records = await result.data()
+        if await self._use_lexical_index(query_text):
+            records = self._fuse_table_records(
+                records, self.lexical_index.query_tables(query_text, k, self.db), k
+            )
         
         return [
             TableMatch(
@@ -68,30 +148,121 @@ class GraphSearcher:
                 schema=r["schema"],
                 db=r["db"],
                 description=r.get("description", ""),
-                score=r["score"]
+                score=r["score"],
+                fused_score=r.get("fused_score")
             )
             for r in records
         ]
     
-    async def search_columns(self, query_embedding: List[float], k: int = None) -> List[ColumnMatch]:
-        """Search for relevant columns using vector similarity"""
+    async def search_tables_batch(
+        self,
+        query_embeddings: List[List[float]],
+        k: int = None,
+        query_texts: Optional[List[str]] = None
+    ) -> List[List[TableMatch]]:
+        """Search tables for several embeddings in a single round trip"""
         k = k or self.top_k
+        if not query_embeddings:
+            return []
         
+        if await self._use_vector_index():
+            records_per_query = [
+                self.vector_index.query_tables(embedding, k, self.db)
+                for embedding in query_embeddings
+            ]
+        else:
+            query = """
+            UNWIND range(0, size($embeddings) - 1) AS idx
+            CALL {
+                WITH idx
+                CALL db.index.vector.queryNodes('table_vec_index', $fetch_k, $embeddings[idx])
+                YIELD node, score
+                WITH node, score
+                WHERE $db IS NULL OR node.db = $db
+                RETURN node, score
+                ORDER BY score DESC
+                LIMIT $k
+            }
+            RETURN idx,
+                   node.name AS name,
+                   node.schema AS schema,
+                   node.db AS db,
+                   node.description AS description,
+                   score
+            ORDER BY idx ASC, score DESC, schema ASC, name ASC
+            """
+            result = await self.session.run(
+                query, k=k, fetch_k=self._fetch_k(k), db=self.db, embeddings=query_embeddings
+            )
+            records = await result.data()
+            records_per_query = [[] for _ in query_embeddings]
+            for r in records:
+                records_per_query[r["idx"]].append(r)
+        
+        if query_texts:
+            # Decided per text: an empty text keeps its vector-only results
+            for idx, text in enumerate(query_texts[:len(records_per_query)]):
+                if await self._use_lexical_index(text):
+                    records_per_query[idx] = self._fuse_table_records(
+                        records_per_query[idx], self.lexical_index.query_tables(text, k, self.db), k
+                    )
+        
+        return [
+            [
+                TableMatch(
+                    name=r["name"],
+                    schema=r["schema"],
+                    db=r["db"],
+                    description=r.get("description", ""),
+                    score=r["score"],
+                    fused_score=r.get("fused_score")
+                )
+                for r in records
+            ]
+            for records in records_per_query
+        ]
+    
+    async def _query_table_vectors(self, query_embedding: List[float], k: int) -> List[Dict[str, Any]]:
+        """Query the Neo4j table vector index"""
         query = """
-        CALL db.index.vector.queryNodes('column_vec_index', $k, $embedding)
+        CALL db.index.vector.queryNodes('table_vec_index', $fetch_k, $embedding)
         YIELD node, score
-        MATCH (t:Table)-[:HAS_COLUMN]->(node)
+        WHERE $db IS NULL OR node.db = $db
         RETURN node.name AS name,
-               t.name AS table_name,
-               node.dtype AS dtype,
+               node.schema AS schema,
+               node.db AS db,
                node.description AS description,
-               node.nullable AS nullable,
                score
-        ORDER BY score DESC, t.name ASC, node.name ASC
+        ORDER BY score DESC, node.schema ASC, node.name ASC
+        LIMIT $k
         """
         
-        result = await self.session.run(query, k=k, embedding=query_embedding)
-        records = await result.data()
+        result = await self.session.run(
+            query, k=k, fetch_k=self._fetch_k(k), db=self.db, embedding=query_embedding
+        )
+        return await result.data()
+    
+    async def search_columns(
+        self,
+        query_embedding: List[float],
+        k: int = None,
+        query_text: Optional[str] = None
+    ) -> List[ColumnMatch]:
+        """Search for relevant columns using vector similarity, fused with lexical matches on query_text"""
+        k = k or self.top_k
+        
+        if await self._use_vector_index():
+            records = self.vector_index.query_columns(query_embedding, k, self.db)
+        else:
+            records = await self._query_column_vectors(query_embedding, k)
+        
+        if await self._use_lexical_index(query_text):
+            records = self._fuse_records(
+                records,
+                self.lexical_index.query_columns(query_text, k, self.db),
+                lambda r: (r["table_name"], r["name"]),
+                k,
+            )
         
         return [
             ColumnMatch(
@@ -100,11 +271,34 @@ class GraphSearcher:
                 dtype=r["dtype"],
                 description=r.get("description", ""),
                 nullable=r.get("nullable", True),
-                score=r["score"]
+                score=r["score"],
+                fused_score=r.get("fused_score")
             )
             for r in records
         ]
     
+    async def _query_column_vectors(self, query_embedding: List[float], k: int) -> List[Dict[str, Any]]:
+        """Query the Neo4j column vector index"""
+        query = """
+        CALL db.index.vector.queryNodes('column_vec_index', $fetch_k, $embedding)
+        YIELD node, score
+        MATCH (t:Table)-[:HAS_COLUMN]->(node)
+        WHERE $db IS NULL OR t.db = $db
+        RETURN node.name AS name,
+               t.name AS table_name,
+               node.dtype AS dtype,
+               node.description AS description,
+               node.nullable AS nullable,
+               score
+        ORDER BY score DESC, t.name ASC, node.name ASC
+        LIMIT $k
+        """
+        
+        result = await self.session.run(
+            query, k=k, fetch_k=self._fetch_k(k), db=self.db, embedding=query_embedding
+        )
+        return await result.data()
+    
     async def find_fk_paths(self, table_names: List[str]) -> List[Dict[str, Any]]:
         """Find foreign key relationships between tables"""
         if len(table_names) < 2:
@@ -113,6 +307,7 @@ class GraphSearcher:
         query = """
         MATCH (t1:Table)-[r:FK_TO_TABLE*..3]-(t2:Table)
         WHERE t1.name IN $tables AND t2.name IN $tables AND t1 <> t2
+          AND ($db IS NULL OR (t1.db = $db AND t2.db = $db))
         WITH t1, t2, r, size(r) AS path_length
         ORDER BY path_length
         RETURN DISTINCT t1.name AS from_table,
@@ -122,7 +317,7 @@ class GraphSearcher:
         LIMIT 20
         """
         
-        result = await self.session.run(query, tables=table_names)
+        result = await self.session.run(query, tables=table_names, db=self.db)
         records = await result.data()
         
         return records
@@ -131,7 +326,7 @@ class GraphSearcher:
         """Get all columns for specified tables"""
         query = """
         MATCH (t:Table)-[:HAS_COLUMN]->(c:Column)
-        WHERE t.name IN $tables
+        WHERE t.name IN $tables AND ($db IS NULL OR t.db = $db)
         RETURN t.name AS table_name,
                collect({
                    name: c.name,
@@ -141,7 +336,7 @@ class GraphSearcher:
                }) AS columns
         """
         
-        result = await self.session.run(query, tables=table_names)
+        result = await self.session.run(query, tables=table_names, db=self.db)
         records = await result.data()
         
         return {r["table_name"]: r["columns"] for r in records}
@@ -151,6 +346,7 @@ class GraphSearcher:
         query = """
         MATCH (t1:Table)-[:HAS_COLUMN]->(c1:Column)-[fk:FK_TO]->(c2:Column)<-[:HAS_COLUMN]-(t2:Table)
         WHERE t1.name IN $tables AND t2.name IN $tables
+          AND ($db IS NULL OR (t1.db = $db AND t2.db = $db))
         RETURN t1.name AS from_table,
                c1.name AS from_column,
                t2.name AS to_table,
@@ -158,24 +354,132 @@ class GraphSearcher:
                fk.constraint AS constraint_name
         """
         
-        result = await self.session.run(query, tables=table_names)
+        result = await self.session.run(query, tables=table_names, db=self.db)
         records = await result.data()
         
         return records
     
+    async def get_table_context(
+        self,
+        table_names: List[str]
+    ) -> Tuple[Dict[str, List[Dict[str, Any]]], List[Dict[str, Any]]]:
+        """Get columns and FK constraints for the given tables in a single query"""
+        query = """
+        CALL {
+            MATCH (t:Table)-[:HAS_COLUMN]->(c:Column)
+            WHERE t.name IN $tables AND ($db IS NULL OR t.db = $db)
+            WITH t.name AS table_name,
+                 collect({
+                     name: c.name,
+                     dtype: c.dtype,
+                     nullable: c.nullable,
+                     description: c.description
+                 }) AS columns
+            RETURN collect({table_name: table_name, columns: columns}) AS table_columns
+        }
+        CALL {
+            MATCH (t1:Table)-[:HAS_COLUMN]->(c1:Column)-[fk:FK_TO]->(c2:Column)<-[:HAS_COLUMN]-(t2:Table)
+            WHERE t1.name IN $tables AND t2.name IN $tables
+              AND ($db IS NULL OR (t1.db = $db AND t2.db = $db))
+            RETURN collect({
+                from_table: t1.name,
+                from_column: c1.name,
+                to_table: t2.name,
+                to_column: c2.name,
+                constraint_name: fk.constraint
+            }) AS fk_details
+        }
+        RETURN table_columns, fk_details
+        """
+        
+        result = await self.session.run(query, tables=table_names, db=self.db)
+        record = await result.single()
+        if record is None:
+            return {}, []
+        
+        table_columns = {
+            item["table_name"]: item["columns"] for item in record["table_columns"]
+        }
+        return table_columns, list(record["fk_details"])
+    
+    async def _timed_stage(
+        self,
+        stage: Callable[["GraphSearcher"], Awaitable[Any]]
+    ) -> Tuple[Any, float]:
+        """Run a retrieval stage, on its own session when a session factory is available"""
+        start = time.perf_counter()
+        if self.session_factory is None:
+            result = await stage(self)
+        else:
+            session = await self.session_factory()
+            try:
+                result = await stage(GraphSearcher(
+                    session,
+                    vector_index=self.vector_index,
+                    join_graph_index=self.join_graph_index,
+                    lexical_index=self.lexical_index,
+                    subschema_cache=self.subschema_cache,
+                    db=self.db,
+                ))
+            finally:
+                await session.close()
+        return result, (time.perf_counter() - start) * 1000
+    
     async def build_subschema(
         self,
         query_embedding: List[float],
         top_k_tables: int = None,
-        top_k_columns: int = None
+        top_k_columns: int = None,
+        query_text: Optional[str] = None
     ) -> SubSchema:
-        """Build a subschema from vector search and graph traversal"""
+        """Build a subschema from vector (and lexical, given query_text) search and graph traversal"""
         top_k_tables = top_k_tables or self.top_k
         top_k_columns = top_k_columns or self.top_k
+        if self.subschema_cache is None:
+            return await self._build_subschema(query_embedding, top_k_tables, top_k_columns, query_text)
         
-        # Search tables and columns
-        table_matches = await self.search_tables(query_embedding, k=top_k_tables)
-        column_matches = await self.search_columns(query_embedding, k=top_k_columns)
+        # Paraphrased questions land close to a cached embedding and reuse its subschema
+        lookup_start = time.perf_counter()
+        schema_version = await schema_version_tracker.current(self.session)
+        params = (top_k_tables, top_k_columns, self.db)
+        cached = self.subschema_cache.get(query_embedding, params, schema_version)
+        if cached is not None:
+            cached.stage_timings = {
+                "subschema_cache_lookup_ms": round((time.perf_counter() - lookup_start) * 1000, 2)
+            }
+            return cached
+        
+        subschema = await self._build_subschema(query_embedding, top_k_tables, top_k_columns, query_text)
+        self.subschema_cache.put(query_embedding, params, schema_version, subschema)
+        return subschema
+    
+    async def _build_subschema(
+        self,
+        query_embedding: List[float],
+        top_k_tables: int,
+        top_k_columns: int,
+        query_text: Optional[str]
+    ) -> SubSchema:
+        stage_timings: Dict[str, float] = {}
+        
+        # Search tables and columns (independent, so concurrent when sessions allow)
+        search_start = time.perf_counter()
+        table_stage = self._timed_stage(
+            lambda searcher: searcher.search_tables(query_embedding, k=top_k_tables, query_text=query_text)
+        )
+        column_stage = self._timed_stage(
+            lambda searcher: searcher.search_columns(query_embedding, k=top_k_columns, query_text=query_text)
+        )
+        if self.session_factory is not None:
+            (table_matches, tables_ms), (column_matches, columns_ms) = await asyncio.gather(
+                table_stage, column_stage
+            )
+        else:
+            table_matches, tables_ms = await table_stage
+            column_matches, columns_ms = await column_stage
+        stage_timings["table_vector_search_ms"] = tables_ms
+        stage_timings["column_vector_search_ms"] = columns_ms
+        stage_timings["vector_search_ms"] = (time.perf_counter() - search_start) * 1000
         
         # Collect unique tables from both searches
         table_names = list(set(
@@ -183,27 +487,46 @@ class GraphSearcher:
             [c.table_name for c in column_matches]
         ))
         
-        # Get all columns for matched tables
-        table_columns = await self.get_table_columns(table_names)
+        # Columns and FK constraints for matched tables
+        context_start = time.perf_counter()
+        join_graph = None
+        if self.join_graph_index is not None:
+            join_graph = await self.join_graph_index.ensure_fresh(self.session, self.db)
+        if join_graph is not None:
+            # Join paths come from the precomputed join graph; only columns need a query
+            table_columns = await self.get_table_columns(table_names)
+            stage_timings["table_context_ms"] = (time.perf_counter() - context_start) * 1000
+            join_start = time.perf_counter()
+            fk_details = join_graph.fk_details_between(table_names)
+            join_hints = join_graph.plan_joins(self._ordered_table_names(table_matches, column_matches)).join_hints()
+            stage_timings["join_planning_ms"] = (time.perf_counter() - join_start) * 1000
+        else:
+            table_columns, fk_details = await self.get_table_context(table_names)
+            stage_timings["table_context_ms"] = (time.perf_counter() - context_start) * 1000
+            join_hints = self._generate_join_hints(fk_details)
         
         # Add columns to table matches
         for table in table_matches:
             table.columns = table_columns.get(table.name, [])
         
-        # Find FK relationships
-        fk_paths = await self.find_fk_paths(table_names)
-        fk_details = await self.get_fk_details(table_names)
-        
-        # Generate join hints
-        join_hints = self._generate_join_hints(fk_details)
-        
         return SubSchema(
             tables=table_matches,
             columns=column_matches,
             fk_relationships=fk_details,
-            join_hints=join_hints
+            join_hints=join_hints,
+            stage_timings={name: round(ms, 2) for name, ms in stage_timings.items()}
         )
     
+    @staticmethod
+    def _ordered_table_names(
+        table_matches: List[TableMatch],
+        column_matches: List[ColumnMatch]
+    ) -> List[str]:
+        """Candidate tables in relevance order, so join trees are rooted at the best match"""
+        return list(dict.fromkeys(
+            [t.name for t in table_matches] + [c.table_name for c in column_matches]
+        ))
+    
     def _generate_join_hints(self, fk_details: List[Dict[str, Any]]) -> List[str]:
         """Generate human-readable join hints"""
         hints = []
@@ -0,0 +1,458 @@
+"""In-memory join graph over FK edges with precomputed shortest join paths"""
+import asyncio
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from app.config import settings
+from app.core.schema_version import schema_version_tracker
+
+
+TABLES_QUERY = """
+MATCH (t:Table)
+RETURN elementId(t) AS id,
+       t.name AS name,
+       t.schema AS schema,
+       t.db AS db,
+       t.description AS description,
+       COALESCE(t.comment, t.description, '설명 없음') AS display_description
+"""
+
+COLUMN_FK_QUERY = """
+MATCH (t1:Table)-[:HAS_COLUMN]->(c1:Column)-[fk:FK_TO]->(c2:Column)<-[:HAS_COLUMN]-(t2:Table)
+RETURN elementId(fk) AS id,
+       elementId(t1) AS from_id,
+       c1.name AS from_column,
+       c1.description AS from_column_description,
+       elementId(t2) AS to_id,
+       c2.name AS to_column,
+       c2.description AS to_column_description,
+       fk.constraint AS constraint_name
+"""
+
+TABLE_RELATIONSHIPS_QUERY = """
+MATCH (t1:Table)-[r]->(t2:Table)
+RETURN elementId(r) AS id,
+       type(r) AS type,
+       elementId(t1) AS from_id,
+       elementId(t2) AS to_id,
+       r.from_column AS from_column,
+       r.to_column AS to_column
+"""
+
+# Column FK paths reach the other table in three hops: Table-Column-Column-Table
+COLUMN_FK_PATH = "HAS_COLUMN → FK_TO → HAS_COLUMN"
+
+
+@dataclass(frozen=True)
+class JoinEdge:
+    """One joinable FK between two tables, with every column pair of the constraint"""
+    from_table: str
+    to_table: str
+    column_pairs: Tuple[Tuple[str, str], ...]
+    constraint_name: Optional[str] = None
+
+    def other(self, table_name: str) -> str:
+        return self.to_table if table_name == self.from_table else self.from_table
+
+    def condition(self) -> str:
+        return " AND ".join(
+            f"{self.from_table}.{from_column} = {self.to_table}.{to_column}"
+            for from_column, to_column in self.column_pairs
+        )
+
+
+@dataclass
+class JoinPlan:
+    """Minimal set of joins connecting the requested tables"""
+    edges: List[JoinEdge] = field(default_factory=list)
+    join_order: List[str] = field(default_factory=list)
+    bridge_tables: List[str] = field(default_factory=list)
+    unconnected_tables: List[str] = field(default_factory=list)
+
+    def join_hints(self) -> List[str]:
+        """Human-readable join hints, each joining the table newly reached by the tree"""
+        return [
+            f"JOIN {table_name} ON {edge.condition()}"
+            for table_name, edge in zip(self.join_order, self.edges)
+        ]
+
+
+class JoinGraph:
+    """
+    Table-level FK graph with all-pairs shortest join paths up to max_hops.
+
+    Also keeps the raw table/relationship adjacency so the ReAct relationship
+    output can be answered without traversing the schema graph per request.
+    """
+
+    def __init__(
+        self,
+        tables: List[Dict[str, Any]],
+        column_fks: List[Dict[str, Any]],
+        table_relationships: List[Dict[str, Any]],
+        max_hops: int,
+    ):
+        self.max_hops = max_hops
+        self.tables: Dict[str, Dict[str, Any]] = {t["id"]: t for t in tables}
+        self.table_ids_by_name: Dict[str, List[str]] = {}
+        for table in tables:
+            self.table_ids_by_name.setdefault(table["name"], []).append(table["id"])
+
+        self.column_fks = [
+            fk for fk in column_fks
+            if fk["from_id"] in self.tables and fk["to_id"] in self.tables
+        ]
+        self.table_relationships = [
+            r for r in table_relationships
+            if r["from_id"] in self.tables and r["to_id"] in self.tables
+        ]
+        # Node-level adjacency for relationship paths: id -> [(relationship id, type, neighbor id)]
+        self._relationship_adjacency: Dict[str, List[Tuple[str, str, str]]] = {}
+        for r in self.table_relationships:
+            self._relationship_adjacency.setdefault(r["from_id"], []).append((r["id"], r["type"], r["to_id"]))
+            if r["from_id"] != r["to_id"]:
+                self._relationship_adjacency.setdefault(r["to_id"], []).append((r["id"], r["type"], r["from_id"]))
+        self._column_fk_neighbors: Dict[str, Set[str]] = {}
+        for fk in self.column_fks:
+            self._column_fk_neighbors.setdefault(fk["from_id"], set()).add(fk["to_id"])
+            self._column_fk_neighbors.setdefault(fk["to_id"], set()).add(fk["from_id"])
+        self._any_relationships_cache: Dict[str, List[Dict[str, Any]]] = {}
+
+        self.edges = self._build_join_edges()
+        self._adjacency: Dict[str, List[Tuple[str, int]]] = {}
+        for index, edge in enumerate(self.edges):
+            self._adjacency.setdefault(edge.from_table, []).append((edge.to_table, index))
+            if edge.from_table != edge.to_table:
+                self._adjacency.setdefault(edge.to_table, []).append((edge.from_table, index))
+        for neighbors in self._adjacency.values():
+            neighbors.sort()
+        self._paths = {table: self._shortest_paths_from(table) for table in self._adjacency}
+
+    def _build_join_edges(self) -> List[JoinEdge]:
+        """Group column FK edges per constraint and add user-defined column relationships"""
+        grouped: Dict[Tuple, List[Tuple[str, str]]] = {}
+        for fk in sorted(self.column_fks, key=lambda f: (f["from_column"] or "", f["to_column"] or "")):
+            from_table = self.tables[fk["from_id"]]["name"]
+            to_table = self.tables[fk["to_id"]]["name"]
+            constraint_name = fk.get("constraint_name")
+            # Unnamed FK edges cannot be grouped safely, so each one stands alone
+            group_key = (from_table, to_table, constraint_name, None if constraint_name else fk["id"])
+            grouped.setdefault(group_key, []).append((fk["from_column"], fk["to_column"]))
+
+        edges: List[JoinEdge] = []
+        seen_pairs: Set[Tuple[str, str, str, str]] = set()
+        for (from_table, to_table, constraint_name, _), pairs in sorted(
+            grouped.items(), key=lambda item: (item[0][0], item[0][1], item[1])
+        ):
+            edges.append(JoinEdge(
+                from_table=from_table,
+                to_table=to_table,
+                column_pairs=tuple(pairs),
+                constraint_name=constraint_name,
+            ))
+            seen_pairs.update((from_table, fc, to_table, tc) for fc, tc in pairs)
+
+        # Relationships added through the schema editor carry their own column pair
+        for r in self.table_relationships:
+            if not r.get("from_column") or not r.get("to_column"):
+                continue
+            from_table = self.tables[r["from_id"]]["name"]
+            to_table = self.tables[r["to_id"]]["name"]
+            pair_key = (from_table, r["from_column"], to_table, r["to_column"])
+            if pair_key in seen_pairs:
+                continue
+            seen_pairs.add(pair_key)
+            edges.append(JoinEdge(
+                from_table=from_table,
+                to_table=to_table,
+                column_pairs=((r["from_column"], r["to_column"]),),
+            ))
+        return edges
+
+    def _shortest_paths_from(self, source: str) -> Dict[str, Tuple[int, ...]]:
+        """BFS shortest join paths (as edge indices) from one table, bounded by max_hops"""
+        paths: Dict[str, Tuple[int, ...]] = {source: ()}
+        queue = deque([source])
+        while queue:
+            table = queue.popleft()
+            path = paths[table]
+            if len(path) >= self.max_hops:
+                continue
+            for neighbor, edge_index in self._adjacency.get(table, []):
+                if neighbor not in paths:
+                    paths[neighbor] = path + (edge_index,)
+                    queue.append(neighbor)
+        return paths
+
+    def shortest_path(self, from_table: str, to_table: str) -> Optional[List[JoinEdge]]:
+        """Shortest join path between two tables, or None beyond max_hops"""
+        path = self._paths.get(from_table, {}).get(to_table)
+        if path is None:
+            return None
+        return [self.edges[index] for index in path]
+
+    def plan_joins(self, table_names: List[str]) -> JoinPlan:
+        """
+        Cheapest join tree connecting the given tables (Steiner-tree approximation).
+
+        Builds a minimum spanning tree over the precomputed shortest paths between
+        the requested tables, expands it into FK edges, then drops redundant edges
+        and bridge tables that do not lead to a requested table.
+        """
+        terminals = list(dict.fromkeys(table_names))
+        positions = {name: position for position, name in enumerate(terminals)}
+        plan = JoinPlan()
+
+        # Prim over the metric closure; unreachable tables start a new tree
+        visited: Set[str] = set()
+        edge_indices: Set[int] = set()
+        for root in terminals:
+            if root in visited:
+                continue
+            visited.add(root)
+            tree = [root]
+            while True:
+                best = None
+                for in_tree in tree:
+                    reachable = self._paths.get(in_tree, {})
+                    for candidate in terminals:
+                        if candidate in visited or candidate not in reachable:
+                            continue
+                        cost = (len(reachable[candidate]), positions[candidate])
+                        if best is None or cost < best[0]:
+                            best = (cost, candidate, reachable[candidate])
+                if best is None:
+                    break
+                _, candidate, path = best
+                visited.add(candidate)
+                tree.append(candidate)
+                edge_indices.update(path)
+            if len(tree) == 1 and len(terminals) > 1:
+                plan.unconnected_tables.append(root)
+
+        tree_edges = self._prune_tree(terminals, edge_indices)
+
+        # Order joins breadth-first from the first requested table of each tree
+        adjacency: Dict[str, List[Tuple[str, int]]] = {}
+        for index in sorted(tree_edges):
+            edge = self.edges[index]
+            adjacency.setdefault(edge.from_table, []).append((edge.to_table, index))
+            adjacency.setdefault(edge.to_table, []).append((edge.from_table, index))
+        reached: Set[str] = set()
+        for root in terminals:
+            if root in reached or root not in adjacency:
+                continue
+            reached.add(root)
+            queue = deque([root])
+            while queue:
+                table = queue.popleft()
+                for neighbor, index in sorted(adjacency[table]):
+                    if neighbor in reached:
+                        continue
+                    reached.add(neighbor)
+                    queue.append(neighbor)
+                    plan.join_order.append(neighbor)
+                    plan.edges.append(self.edges[index])
+
+        terminal_set = set(terminals)
+        plan.bridge_tables = sorted(reached - terminal_set)
+        return plan
+
+    def _prune_tree(self, terminals: List[str], edge_indices: Set[int]) -> Set[int]:
+        """Reduce the expanded edge set to a spanning tree without non-requested leaves"""
+        # Spanning tree of the union of shortest paths (paths may share or cross tables)
+        adjacency: Dict[str, List[Tuple[str, int]]] = {}
+        for index in sorted(edge_indices):
+            edge = self.edges[index]
+            adjacency.setdefault(edge.from_table, []).append((edge.to_table, index))
+            adjacency.setdefault(edge.to_table, []).append((edge.from_table, index))
+        tree_edges: Set[int] = set()
+        reached: Set[str] = set()
+        for root in terminals:
+            if root in reached or root not in adjacency:
+                continue
+            reached.add(root)
+            queue = deque([root])
+            while queue:
+                table = queue.popleft()
+                for neighbor, index in adjacency[table]:
+                    if neighbor not in reached:
+                        reached.add(neighbor)
+                        tree_edges.add(index)
+                        queue.append(neighbor)
+
+        terminal_set = set(terminals)
+        while True:
+            degree: Dict[str, int] = {}
+            for index in tree_edges:
+                edge = self.edges[index]
+                degree[edge.from_table] = degree.get(edge.from_table, 0) + 1
+                degree[edge.to_table] = degree.get(edge.to_table, 0) + 1
+            leaves = {table for table, count in degree.items() if count == 1 and table not in terminal_set}
+            if not leaves:
+                return tree_edges
+            tree_edges = {
+                index for index in tree_edges
+                if self.edges[index].from_table not in leaves and self.edges[index].to_table not in leaves
+            }
+
+    def fk_details_between(self, table_names: List[str]) -> List[Dict[str, Any]]:
+        """Direct FK column pairs whose both ends are among the given tables"""
+        names = set(table_names)
+        details = []
+        for edge in self.edges:
+            if edge.from_table in names and edge.to_table in names:
+                for from_column, to_column in edge.column_pairs:
+                    details.append({
+                        "from_table": edge.from_table,
+                        "from_column": from_column,
+                        "to_table": edge.to_table,
+                        "to_column": to_column,
+                        "constraint_name": edge.constraint_name,
+                    })
+        return details
+
+    def fk_relationships(self, table_name: str, limit: int) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """Outgoing and incoming column FK relationships of a table, each capped at limit"""
+        ids = set(self.table_ids_by_name.get(table_name, []))
+        forward, reverse = set(), set()
+        for fk in self.column_fks:
+            if fk["from_id"] in ids:
+                related = self.tables[fk["to_id"]]
+                forward.add((
+                    related["name"], related.get("schema"), related.get("description"), "foreign_key",
+                    fk["from_column"], fk.get("from_column_description"),
+                    fk["to_column"], fk.get("to_column_description"),
+                ))
+            if fk["to_id"] in ids:
+                related = self.tables[fk["from_id"]]
+                reverse.add((
+                    related["name"], related.get("schema"), related.get("description"), "referenced_by",
+                    fk["to_column"], fk.get("to_column_description"),
+                    fk["from_column"], fk.get("from_column_description"),
+                ))
+
+        def _as_records(rows) -> List[Dict[str, Any]]:
+            ordered = sorted(rows, key=lambda row: (row[0] or "", row[4] or "", row[6] or ""))
+            return [
+                {
+                    "related_table": row[0],
+                    "related_table_schema": row[1],
+                    "related_table_description": row[2],
+                    "relation_type": row[3],
+                    "from_column": row[4],
+                    "from_column_description": row[5],
+                    "to_column": row[6],
+                    "to_column_description": row[7],
+                }
+                for row in ordered[:limit]
+            ]
+
+        return _as_records(forward), _as_records(reverse)
+
+    def any_relationships(self, table_name: str) -> List[Dict[str, Any]]:
+        """Tables reachable within three relationships, with the relationship type paths used"""
+        cached = self._any_relationships_cache.get(table_name)
+        if cached is not None:
+            return cached
+
+        paths_by_table: Dict[str, Set[str]] = {}
+        start_ids = self.table_ids_by_name.get(table_name, [])
+        for start_id in start_ids:
+            for column_neighbor in self._column_fk_neighbors.get(start_id, ()):
+                if column_neighbor != start_id:
+                    paths_by_table.setdefault(column_neighbor, set()).add(COLUMN_FK_PATH)
+            self._walk_relationships(start_id, start_id, (), frozenset(), paths_by_table)
+
+        start_set = set(start_ids)
+        records = [
+            {
+                "related_table": self.tables[table_id]["name"],
+                "related_table_schema": self.tables[table_id].get("schema"),
+                "related_table_description": self.tables[table_id].get("display_description"),
+                "relationship_paths": sorted(paths),
+            }
+            for table_id, paths in paths_by_table.items()
+            if table_id not in start_set
+        ]
+        records.sort(key=lambda r: (r["related_table"] or "", r["related_table_schema"] or ""))
+        records = records[:100]
+        self._any_relationships_cache[table_name] = records
+        return records
+
+    def _walk_relationships(
+        self,
+        start_id: str,
+        table_id: str,
+        types: Tuple[str, ...],
+        used: frozenset,
+        paths_by_table: Dict[str, Set[str]],
+    ):
+        """Enumerate relationship paths of up to three hops, never reusing a relationship"""
+        if len(types) >= 3:
+            return
+        for relationship_id, relationship_type, neighbor in self._relationship_adjacency.get(table_id, []):
+            if relationship_id in used:
+                continue
+            path_types = types + (relationship_type,)
+            if neighbor != start_id:
+                paths_by_table.setdefault(neighbor, set()).add(" → ".join(path_types))
+            self._walk_relationships(start_id, neighbor, path_types, used | {relationship_id}, paths_by_table)
+
+
+class JoinGraphIndex:
+    """Holds the join graph for the current schema version, rebuilding it when the schema changes"""
+
+    def __init__(self, max_hops: int):
+        self.max_hops = max_hops
+        self.version: Optional[str] = None
+        self.graph: Optional[JoinGraph] = None
+        # Per-database graphs of the current version, built on first use from the same records
+        self._db_graphs: Dict[str, JoinGraph] = {}
+        self._records: Optional[Tuple[List[Dict[str, Any]], List[Dict[str, Any]], List[Dict[str, Any]]]] = None
+        self._lock = asyncio.Lock()
+
+    async def ensure_fresh(self, session, db: Optional[str] = None) -> Optional[JoinGraph]:
+        """Join graph for the current schema version (only the tables of db when given)"""
+        version = await schema_version_tracker.current(session)
+        if self.version != version or self.graph is None:
+            async with self._lock:
+                if self.version != version or self.graph is None:
+                    self._records = await self._fetch(session)
+                    self.graph = JoinGraph(*self._records, self.max_hops)
+                    self._db_graphs = {}
+                    self.version = version
+        if db is None:
+            return self.graph
+        graph = self._db_graphs.get(db)
+        if graph is None:
+            tables, column_fks, table_relationships = self._records
+            # JoinGraph drops edges whose ends are not among its tables
+            graph = JoinGraph(
+                [t for t in tables if t.get("db") == db], column_fks, table_relationships, self.max_hops
+            )
+            self._db_graphs[db] = graph
+        return graph
+
+    async def _fetch(self, session):
+        result = await session.run(TABLES_QUERY)
+        tables = await result.data()
+        result = await session.run(COLUMN_FK_QUERY)
+        column_fks = await result.data()
+        result = await session.run(TABLE_RELATIONSHIPS_QUERY)
+        table_relationships = await result.data()
+        return tables, column_fks, table_relationships
+
+
+_join_graph_index: Optional[JoinGraphIndex] = None
+
+
+def get_join_graph_index() -> Optional[JoinGraphIndex]:
+    """Process-wide join graph index, or None when the join graph is disabled"""
+    global _join_graph_index
+    if not settings.is_use_join_graph:
+        return None
+    if _join_graph_index is None:
+        _join_graph_index = JoinGraphIndex(max_hops=settings.max_fk_hops)
+    return _join_graph_index
@@ -0,0 +1,215 @@
+"""In-process character n-gram index over table/column names and descriptions"""
+import asyncio
+import heapq
+import math
+import re
+import unicodedata
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.config import settings
+from app.core.schema_version import schema_version_tracker
+
+
+TABLE_DOCUMENTS_QUERY = """
+MATCH (t:Table)
+RETURN t.name AS name,
+       t.schema AS schema,
+       t.db AS db,
+       t.description AS description
+"""
+
+COLUMN_DOCUMENTS_QUERY = """
+MATCH (t:Table)-[:HAS_COLUMN]->(c:Column)
+RETURN c.name AS name,
+       t.name AS table_name,
+       t.schema AS table_schema,
+       t.db AS db,
+       c.dtype AS dtype,
+       c.description AS description,
+       c.nullable AS nullable
+"""
+
+NGRAM_SIZES = (2, 3)
+NAME_WEIGHT = 2.0
+DESCRIPTION_WEIGHT = 1.0
+# Whole-word matches count more than the fragments they are made of
+WORD_WEIGHT = 3.0
+
+_WORD_PATTERN = re.compile(r"\w+")
+
+
+def _words(text: str) -> List[str]:
+    """Lowercased words, with snake_case identifiers also split into their parts"""
+    words = []
+    for word in _WORD_PATTERN.findall(unicodedata.normalize("NFKC", text).lower()):
+        words.append(word)
+        if "_" in word:
+            words.extend(part for part in word.split("_") if part)
+    return words
+
+
+def extract_terms(text: Optional[str]) -> Dict[str, float]:
+    """Index terms of a text: whole words plus character n-grams of each word"""
+    terms: Dict[str, float] = {}
+    if not text:
+        return terms
+    for word in _words(text):
+        terms[f"w:{word}"] = WORD_WEIGHT
+        for n in NGRAM_SIZES:
+            for i in range(len(word) - n + 1):
+                terms.setdefault(word[i:i + n], 1.0)
+    return terms
+
+
+class InvertedIndex:
+    """Term -> postings index scoring documents by idf-weighted term overlap"""
+
+    def __init__(self, documents: List[Dict[str, Any]], name_field: str = "name"):
+        self.documents = documents
+        self.postings: Dict[str, List[tuple]] = {}
+        self._norms: List[float] = []
+        for doc_id, document in enumerate(documents):
+            weights: Dict[str, float] = {}
+            for term, weight in extract_terms(document.get("description")).items():
+                weights[term] = weight * DESCRIPTION_WEIGHT
+            for term, weight in extract_terms(document.get(name_field)).items():
+                weights[term] = max(weights.get(term, 0.0), weight * NAME_WEIGHT)
+            for term, weight in weights.items():
+                self.postings.setdefault(term, []).append((doc_id, weight))
+            self._norms.append(math.sqrt(len(weights)) or 1.0)
+        total = len(documents)
+        self._idf = {
+            term: math.log(1.0 + total / len(postings))
+            for term, postings in self.postings.items()
+        }
+
+    def search(self, text: str, k: int) -> List[tuple]:
+        """(document, score) pairs for the k best matching documents"""
+        if k <= 0:
+            return []
+        scores: Dict[int, float] = {}
+        for term, weight in extract_terms(text).items():
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = self._idf[term] * weight
+            for doc_id, doc_weight in postings:
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * doc_weight
+        best = heapq.nlargest(
+            k,
+            ((score / self._norms[doc_id], doc_id) for doc_id, score in scores.items()),
+        )
+        return [(self.documents[doc_id], score) for score, doc_id in best]
+
+
+def _group_by_db(documents: List[Dict[str, Any]]) -> Dict[Optional[str], List[Dict[str, Any]]]:
+    groups: Dict[Optional[str], List[Dict[str, Any]]] = {}
+    for document in documents:
+        groups.setdefault(document.get("db"), []).append(document)
+    return groups
+
+
+class LexicalIndex:
+    """Lexical table/column index for the current schema version, also split per database"""
+
+    def __init__(self):
+        self.version: Optional[str] = None
+        self.tables: Optional[InvertedIndex] = None
+        self.columns: Optional[InvertedIndex] = None
+        # db -> (tables, columns); term statistics are per database
+        self.by_db: Dict[Optional[str], Tuple[InvertedIndex, InvertedIndex]] = {}
+        self._lock = asyncio.Lock()
+
+    @property
+    def is_ready(self) -> bool:
+        return self.tables is not None and self.columns is not None
+
+    async def ensure_fresh(self, session) -> bool:
+        """Rebuild the index if the schema graph changed; returns whether the index is usable"""
+        version = await schema_version_tracker.current(session)
+        if self.version == version and self.is_ready:
+            return True
+        async with self._lock:
+            if self.version != version or not self.is_ready:
+                result = await session.run(TABLE_DOCUMENTS_QUERY)
+                table_documents = await result.data()
+                result = await session.run(COLUMN_DOCUMENTS_QUERY)
+                column_documents = await result.data()
+                self.tables = InvertedIndex(table_documents)
+                self.columns = InvertedIndex(column_documents)
+                self.by_db = self._build_per_db(table_documents, column_documents)
+                self.version = version
+        return self.is_ready
+
+    def _build_per_db(
+        self,
+        table_documents: List[Dict[str, Any]],
+        column_documents: List[Dict[str, Any]],
+    ) -> Dict[Optional[str], Tuple[InvertedIndex, InvertedIndex]]:
+        table_groups = _group_by_db(table_documents)
+        column_groups = _group_by_db(column_documents)
+        dbs = set(table_groups) | set(column_groups)
+        if len(dbs) <= 1:
+            # A single database: the global index already is its index
+            return {db: (self.tables, self.columns) for db in dbs}
+        return {
+            db: (InvertedIndex(table_groups.get(db, [])), InvertedIndex(column_groups.get(db, [])))
+            for db in dbs
+        }
+
+    def _indexes(self, db: Optional[str]) -> Optional[Tuple[InvertedIndex, InvertedIndex]]:
+        if db is None:
+            return self.tables, self.columns
+        return self.by_db.get(db)
+
+    def query_tables(self, text: str, k: int, db: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Top-k table records (of one database when db is given), shaped like the vector search results"""
+        indexes = self._indexes(db)
+        if indexes is None:
+            return []
+        return [{**document, "score": score} for document, score in indexes[0].search(text, k)]
+
+    def query_columns(self, text: str, k: int, db: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Top-k column records (of one database when db is given), shaped like the vector search results"""
+        indexes = self._indexes(db)
+        if indexes is None:
+            return []
+        return [{**document, "score": score} for document, score in indexes[1].search(text, k)]
+
+
+def reciprocal_rank_fusion(
+    ranked_lists: List[List[Dict[str, Any]]],
+    key: Any,
+    k: int,
+    rrf_k: int,
+) -> List[Dict[str, Any]]:
+    """
+    Fuse ranked record lists by reciprocal rank.
+
+    Each record keeps the fields of the first list it appears in; the fused
+    score goes in "fused_score", normalized so a record ranked first in every
+    list scores 1.0.
+    """
+    fused: Dict[Any, Dict[str, Any]] = {}
+    scores: Dict[Any, float] = {}
+    for records in ranked_lists:
+        for rank, record in enumerate(records):
+            record_key = key(record)
+            fused.setdefault(record_key, record)
+            scores[record_key] = scores.get(record_key, 0.0) + 1.0 / (rrf_k + rank + 1)
+    max_score = len(ranked_lists) / (rrf_k + 1) if ranked_lists else 1.0
+    ordered = sorted(fused, key=lambda record_key: -scores[record_key])[:k]
+    return [{**fused[record_key], "fused_score": scores[record_key] / max_score} for record_key in ordered]
+
+
+_lexical_index: Optional[LexicalIndex] = None
+
+
+def get_lexical_index() -> Optional[LexicalIndex]:
+    """Process-wide lexical index, or None when lexical search is disabled"""
+    global _lexical_index
+    if not settings.is_use_lexical_search:
+        return None
+    if _lexical_index is None:
+        _lexical_index = LexicalIndex()
+    return _lexical_index
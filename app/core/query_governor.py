@@ -0,0 +1,291 @@
+"""Server-side time limits, in-flight tracking and cancellation of target database queries"""
+import asyncio
+import time
+import uuid
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from functools import partial
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterator, List, Optional, TypeVar
+
+from app.config import settings
+from app.core.db_registry import DEFAULT_DB_KEY
+
+
+T = TypeVar("T")
+
+# Applied with is_local=true, so both limits end with the surrounding transaction
+SET_TIMEOUTS_QUERY = (
+    "SELECT set_config('statement_timeout', $1, true), "
+    "set_config('idle_in_transaction_session_timeout', $2, true)"
+)
+CANCEL_BACKEND_QUERY = "SELECT pg_cancel_backend($1)"
+TERMINATE_BACKEND_QUERY = "SELECT pg_terminate_backend($1)"
+
+SQL_PREVIEW_CHARS = 500
+
+_request_label: ContextVar[Optional[str]] = ContextVar("query_request_label", default=None)
+_request_id: ContextVar[Optional[str]] = ContextVar("query_request_id", default=None)
+
+
+class ClientDisconnectedError(Exception):
+    """Raised when the HTTP client went away while its query was running"""
+    pass
+
+
+@contextmanager
+def query_scope(label: str, request_id: Optional[str] = None) -> Iterator[str]:
+    """Attribute queries started inside this scope (and tasks it spawns) to one request"""
+    request_id = request_id or uuid.uuid4().hex[:12]
+    label_token = _request_label.set(label)
+    id_token = _request_id.set(request_id)
+    try:
+        yield request_id
+    finally:
+        _request_label.reset(label_token)
+        _request_id.reset(id_token)
+
+
+@dataclass
+class InFlightQuery:
+    query_id: str
+    backend_pid: Optional[int]
+    sql: str
+    request_id: Optional[str]
+    request_label: Optional[str]
+    timeout_seconds: float
+    db_key: str = DEFAULT_DB_KEY
+    started_at: float = field(default_factory=time.time)
+    started_monotonic: float = field(default_factory=time.monotonic)
+    cancel_requested: bool = False
+    # Called after a kill, for queries that outlive a single statement (result sessions)
+    on_kill: Optional[Callable[[], Awaitable[None]]] = field(default=None, repr=False)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "query_id": self.query_id,
+            "backend_pid": self.backend_pid,
+            "request_id": self.request_id,
+            "request": self.request_label,
+            "db_key": self.db_key,
+            "sql": self.sql[:SQL_PREVIEW_CHARS],
+            "started_at": self.started_at,
+            "elapsed_seconds": round(time.monotonic() - self.started_monotonic, 3),
+            "timeout_seconds": self.timeout_seconds,
+            "state": "cancelling" if self.cancel_requested else "running",
+        }
+
+
+class QueryGovernor:
+    """
+    Registry of queries currently running on the target database.
+
+    Every tracked query gets statement_timeout and idle_in_transaction_session_timeout
+    for its own transaction, so PostgreSQL stops it even when the application
+    cannot. A query abandoned by its caller (client disconnect, task cancellation)
+    has its backend cancelled before the connection is handed back to the pool.
+    """
+
+    def __init__(self, connection_source: Optional[Callable[[], Any]] = None):
+        # Where cancel requests get a connection; a busy backend cannot cancel itself
+        self.connection_source = connection_source
+        self._queries: Dict[str, InFlightQuery] = {}
+        self.started = 0
+        self.finished = 0
+        self.cancelled = 0
+        self.killed = 0
+        self.cancel_failures = 0
+
+    def _connection_source(self, db_key: str = DEFAULT_DB_KEY):
+        if self.connection_source is not None:
+            return self.connection_source
+        from app.deps import target_db_pools
+
+        # Cancel through the query's own database
+        pool = target_db_pools.get(db_key)
+        # Cancelling must not queue behind the queries it is meant to stop
+        if not pool.has_spare_connection():
+            return None
+        return partial(pool.acquire, scheduled=False)
+
+    @staticmethod
+    async def apply_timeouts(conn, timeout: float):
+        """Limit the current transaction on the server side (call inside the transaction)"""
+        await conn.execute(
+            SET_TIMEOUTS_QUERY,
+            str(max(1, int(timeout * 1000))),
+            str(max(1, int(settings.sql_idle_in_transaction_timeout_seconds * 1000))),
+        )
+
+    @asynccontextmanager
+    async def track(
+        self,
+        conn,
+        sql: str,
+        timeout: float,
+        db_key: str = DEFAULT_DB_KEY,
+    ) -> AsyncIterator[InFlightQuery]:
+        """
+        Register a query for the duration of the block and apply server-side limits.
+        Must be entered inside the query's transaction.
+        """
+        await self.apply_timeouts(conn, timeout)
+        entry = self.register(conn, sql, timeout, db_key=db_key)
+        try:
+            yield entry
+        except asyncio.CancelledError:
+            # The connection is still ours here, so its pid cannot belong to another query yet
+            self.cancelled += 1
+            entry.cancel_requested = True
+            await asyncio.shield(self._cancel_backend(entry.backend_pid, db_key=entry.db_key))
+            raise
+        finally:
+            self.unregister(entry)
+
+    def register(
+        self,
+        conn,
+        sql: str,
+        timeout: float,
+        db_key: str = DEFAULT_DB_KEY,
+        on_kill: Optional[Callable[[], Awaitable[None]]] = None,
+    ) -> InFlightQuery:
+        """
+        Register a query whose lifetime the caller manages; unregister it before
+        its connection goes back to the pool. Server-side limits are up to the caller.
+        """
+        get_server_pid = getattr(conn, "get_server_pid", None)
+        entry = InFlightQuery(
+            query_id=uuid.uuid4().hex,
+            backend_pid=get_server_pid() if get_server_pid else None,
+            sql=sql,
+            request_id=_request_id.get(),
+            request_label=_request_label.get(),
+            timeout_seconds=timeout,
+            db_key=db_key,
+            on_kill=on_kill,
+        )
+        self._queries[entry.query_id] = entry
+        self.started += 1
+        return entry
+
+    def unregister(self, entry: InFlightQuery):
+        if self._queries.pop(entry.query_id, None) is not None:
+            self.finished += 1
+
+    async def _cancel_backend(
+        self,
+        backend_pid: Optional[int],
+        terminate: bool = False,
+        db_key: str = DEFAULT_DB_KEY,
+        still_running: Optional[Callable[[], bool]] = None,
+    ) -> Optional[bool]:
+        """
+        Send the cancel (or terminate) request for a backend. With still_running,
+        the query is checked right before sending and None is returned when it has
+        ended: its pooled connection, and with it the pid, may already serve another query.
+        """
+        source = self._connection_source(db_key)
+        if backend_pid is None or source is None:
+            self.cancel_failures += 1
+            return False
+        query = TERMINATE_BACKEND_QUERY if terminate else CANCEL_BACKEND_QUERY
+        try:
+            async with source() as conn:
+                if still_running is not None and not still_running():
+                    return None
+                return bool(await conn.fetchval(query, backend_pid, timeout=settings.sql_cancel_timeout_seconds))
+        except Exception as e:
+            self.cancel_failures += 1
+            print(f"⚠️  Failed to cancel backend {backend_pid}: {e}")
+            return False
+
+    def list(self) -> List[Dict[str, Any]]:
+        """In-flight queries, longest running first"""
+        entries = sorted(self._queries.values(), key=lambda entry: entry.started_monotonic)
+        return [entry.to_dict() for entry in entries]
+
+    async def kill(self, query_id: str, terminate: bool = False) -> Optional[bool]:
+        """
+        Cancel (or terminate the session of) a tracked query.
+        None when the query is not in flight (any more).
+        """
+        entry = self._queries.get(query_id)
+        if entry is None:
+            return None
+        entry.cancel_requested = True
+        killed = await self._cancel_backend(
+            entry.backend_pid,
+            terminate=terminate,
+            db_key=entry.db_key,
+            still_running=lambda: self._queries.get(query_id) is entry,
+        )
+        if killed:
+            self.killed += 1
+            if entry.on_kill is not None:
+                await entry.on_kill()
+        return killed
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "in_flight": len(self._queries),
+            "started": self.started,
+            "finished": self.finished,
+            "cancelled": self.cancelled,
+            "killed": self.killed,
+            "cancel_failures": self.cancel_failures,
+        }
+
+
+query_governor = QueryGovernor()
+
+
+async def run_until_disconnected(
+    request,
+    awaitable: Awaitable[T],
+    poll_interval: Optional[float] = None,
+) -> T:
+    """
+    Await a coroutine while watching the HTTP connection; when the client
+    disconnects the coroutine is cancelled (and with it any tracked query).
+    """
+    task = asyncio.ensure_future(awaitable)
+    interval = poll_interval or settings.sql_disconnect_poll_seconds
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=interval)
+            if done:
+                return task.result()
+            if await request.is_disconnected():
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+                raise ClientDisconnectedError("Client disconnected before the query finished")
+    finally:
+        if not task.done():
+            task.cancel()
+
+
+async def iterate_until_disconnected(
+    request,
+    iterator: AsyncIterator[T],
+    poll_interval: Optional[float] = None,
+) -> AsyncIterator[T]:
+    """Like run_until_disconnected, for each step of an async iterator"""
+
+    async def next_item() -> T:
+        return await iterator.__anext__()
+
+    try:
+        while True:
+            try:
+                item = await run_until_disconnected(request, next_item(), poll_interval)
+            except StopAsyncIteration:
+                return
+            yield item
+    finally:
+        aclose = getattr(iterator, "aclose", None)
+        if aclose is not None:
+            await aclose()
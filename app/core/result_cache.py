@@ -0,0 +1,237 @@
+"""Query result cache keyed by canonical SQL and per-table data versions"""
+import pickle
+import time
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+import sqlglot
+from sqlglot import exp
+from sqlglot.optimizer.normalize_identifiers import normalize_identifiers
+
+from app.config import settings
+
+
+# relfilenode changes on TRUNCATE / VACUUM FULL, which the tuple counters miss
+TABLE_VERSIONS_QUERY = """
+SELECT req.ord,
+       c.relfilenode,
+       s.n_tup_ins,
+       s.n_tup_upd,
+       s.n_tup_del
+FROM unnest($1::text[]) WITH ORDINALITY AS req(qualified_name, ord)
+LEFT JOIN pg_class c ON c.oid = to_regclass(req.qualified_name)
+LEFT JOIN pg_stat_user_tables s ON s.relid = c.oid
+"""
+
+VALIDATION_STATS = "stats"
+VALIDATION_TTL = "ttl"
+
+
+# Functions whose result changes between executions of the same query
+VOLATILE_EXPRESSIONS = (
+    exp.CurrentTimestamp,
+    exp.CurrentDate,
+    exp.CurrentTime,
+    exp.CurrentDatetime,
+    exp.Localtime,
+    exp.Localtimestamp,
+    exp.Rand,
+    exp.Uuid,
+)
+VOLATILE_FUNCTION_NAMES = {
+    "clock_timestamp",
+    "statement_timestamp",
+    "transaction_timestamp",
+    "timeofday",
+    "random_normal",
+    "setseed",
+    "nextval",
+    "currval",
+    "lastval",
+    "setval",
+    "uuid_generate_v1",
+    "uuid_generate_v4",
+    "txid_current",
+    "pg_current_xact_id",
+}
+# Date/time input strings resolved when the query runs ('now'::timestamp)
+VOLATILE_DATETIME_LITERALS = {"now", "today", "tomorrow", "yesterday"}
+
+
+def _quote(identifier: str) -> str:
+    return '"' + identifier.replace('"', '""') + '"'
+
+
+def _is_volatile(parsed: exp.Expression) -> bool:
+    for node in parsed.find_all(exp.Func, exp.Literal):
+        if isinstance(node, VOLATILE_EXPRESSIONS):
+            return True
+        if isinstance(node, exp.Anonymous) and node.name.lower() in VOLATILE_FUNCTION_NAMES:
+            return True
+        if isinstance(node, exp.Literal) and node.is_string and node.name.strip().lower() in VOLATILE_DATETIME_LITERALS:
+            return True
+    return False
+
+
+def analyze_sql(sql: str) -> Tuple[str, List[str], bool]:
+    """
+    Canonical text of a query, the qualified names of the tables it reads and
+    whether its result may differ between runs on unchanged data.
+
+    Unquoted identifiers are folded the way PostgreSQL folds them, so queries
+    differing only in case or whitespace share a cache entry. Queries calling
+    time, random or sequence functions are volatile, and so are queries that
+    cannot be parsed since they cannot be checked.
+    """
+    try:
+        parsed = normalize_identifiers(sqlglot.parse_one(sql, read="postgres"), dialect="postgres")
+    except Exception:
+        return " ".join(sql.split()), [], True
+    canonical = parsed.sql(dialect="postgres", normalize_functions="upper")
+    cte_names = {cte.alias_or_name for cte in parsed.find_all(exp.CTE)}
+    tables = []
+    for table in parsed.find_all(exp.Table):
+        if not table.name or (not table.db and table.name in cte_names):
+            continue
+        qualified = ".".join(_quote(part) for part in (table.db, table.name) if part)
+        tables.append(qualified)
+    return canonical, sorted(set(tables)), _is_volatile(parsed)
+
+
+async def fetch_table_versions(conn, tables: List[str]) -> Optional[Tuple[str, ...]]:
+    """
+    Data-version token per table from pg_stat_user_tables modification counters.
+    None when any table has no statistics (views, foreign tables, unknown names);
+    such results are then only kept for the TTL.
+    """
+    if not tables:
+        return ()
+    rows = await conn.fetch(TABLE_VERSIONS_QUERY, tables)
+    by_ord = {row["ord"]: row for row in rows}
+    tokens = []
+    for ord_ in range(1, len(tables) + 1):
+        row = by_ord.get(ord_)
+        if row is None or row["relfilenode"] is None or row["n_tup_ins"] is None:
+            return None
+        tokens.append(f"{row['relfilenode']}:{row['n_tup_ins']}:{row['n_tup_upd']}:{row['n_tup_del']}")
+    return tuple(tokens)
+
+
+@dataclass
+class _CacheEntry:
+    payload: bytes
+    versions: Optional[Tuple[str, ...]]
+    created_at: float
+
+
+class ResultCache:
+    """
+    Byte-bounded LRU of serialized query results.
+
+    An entry is served while it is younger than the TTL and, when it was stored
+    with table versions, while those versions are unchanged.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int,
+        ttl_seconds: float,
+        compress: bool = True,
+        validation: str = VALIDATION_STATS,
+    ):
+        self.max_bytes = max(0, max_bytes)
+        self.ttl_seconds = ttl_seconds
+        self.compress = compress
+        self.validation = validation
+        self._entries: "OrderedDict[Tuple, _CacheEntry]" = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.expirations = 0
+
+    def _encode(self, result: Dict[str, Any]) -> bytes:
+        payload = pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL)
+        return zlib.compress(payload, 1) if self.compress else payload
+
+    def _decode(self, payload: bytes) -> Dict[str, Any]:
+        return pickle.loads(zlib.decompress(payload) if self.compress else payload)
+
+    def _remove(self, key: Tuple):
+        entry = self._entries.pop(key)
+        self.bytes -= len(entry.payload)
+
+    def get(self, key: Tuple, versions: Optional[Tuple[str, ...]]) -> Optional[Tuple[Dict[str, Any], float]]:
+        """(fresh copy of the cached result, age in seconds), or None"""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        age = time.monotonic() - entry.created_at
+        if age > self.ttl_seconds:
+            self._remove(key)
+            self.expirations += 1
+            self.misses += 1
+            return None
+        if self.validation == VALIDATION_STATS and entry.versions is not None and entry.versions != versions:
+            self._remove(key)
+            self.invalidations += 1
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return self._decode(entry.payload), age
+
+    def put(self, key: Tuple, versions: Optional[Tuple[str, ...]], result: Dict[str, Any]):
+        payload = self._encode(result)
+        # A single result larger than a quarter of the budget would flush everything else
+        if len(payload) > self.max_bytes // 4:
+            return
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = _CacheEntry(payload=payload, versions=versions, created_at=time.monotonic())
+        self.bytes += len(payload)
+        while self.bytes > self.max_bytes and self._entries:
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+    def clear(self):
+        self._entries.clear()
+        self.bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss, eviction and size counters"""
+        lookups = self.hits + self.misses
+        return {
+            "items": len(self._entries),
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "validation": self.validation,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "expirations": self.expirations,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+_result_cache: Optional[ResultCache] = None
+
+
+def get_result_cache() -> Optional[ResultCache]:
+    """Process-wide result cache, or None when the cache is disabled"""
+    global _result_cache
+    if not settings.is_use_result_cache:
+        return None
+    if _result_cache is None:
+        _result_cache = ResultCache(
+            max_bytes=settings.result_cache_max_bytes,
+            ttl_seconds=settings.result_cache_ttl_seconds,
+            compress=settings.result_cache_compress,
+            validation=settings.result_cache_validation,
+        )
+    return _result_cache
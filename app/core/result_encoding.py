@@ -0,0 +1,170 @@
+"""Columnar encodings of query results (typed columnar JSON and Arrow IPC)"""
+import importlib.util
+import json
+from typing import Any, Callable, Dict, List, Optional
+
+
+RESULT_FORMAT_ROWS = "rows"
+RESULT_FORMAT_COLUMNAR = "columnar"
+RESULT_FORMAT_ARROW = "arrow"
+
+ARROW_STREAM_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+COLUMNAR_JSON_MEDIA_TYPE = "application/vnd.text2sql.columnar+json"
+
+# Schema metadata key carrying the non-tabular part of a response in Arrow IPC
+ARROW_METADATA_KEY = b"text2sql"
+
+
+class ResultEncodingUnavailableError(Exception):
+    """Raised when an encoding needs an optional dependency that is missing"""
+    pass
+
+
+def _iso(value: Any) -> str:
+    return value.isoformat()
+
+
+def _text(value: Any) -> str:
+    return str(value)
+
+
+def _hex(value: Any) -> str:
+    return bytes(value).hex()
+
+
+# PostgreSQL type name (resolved by asyncpg from the column's type OID)
+# -> (logical type reported to clients, converter or None when already JSON-safe)
+_TYPE_ENCODINGS: Dict[str, tuple] = {
+    "bool": ("bool", None),
+    "int2": ("int", None),
+    "int4": ("int", None),
+    "int8": ("int", None),
+    "oid": ("int", None),
+    "float4": ("float", None),
+    "float8": ("float", None),
+    "text": ("string", None),
+    "varchar": ("string", None),
+    "bpchar": ("string", None),
+    "name": ("string", None),
+    "char": ("string", None),
+    "json": ("json", None),
+    "jsonb": ("json", None),
+    # Decimal is sent as text so no precision is lost
+    "numeric": ("decimal", _text),
+    "money": ("decimal", _text),
+    "date": ("date", _iso),
+    "timestamp": ("timestamp", _iso),
+    "timestamptz": ("timestamptz", _iso),
+    "time": ("time", _iso),
+    "timetz": ("time", _iso),
+    "interval": ("interval", _text),
+    "uuid": ("uuid", _text),
+    "bytea": ("bytes", _hex),
+}
+
+
+def column_encoding(type_name: str) -> tuple:
+    """(logical type, converter) for a PostgreSQL type name; unknown types are sent as text"""
+    return _TYPE_ENCODINGS.get(type_name, ("string", _text))
+
+
+class ColumnarResultBuilder:
+    """
+    Accumulates streamed row batches into one typed array per column.
+
+    Conversion is chosen once per column from its type, so columns that are
+    already JSON-safe (ints, floats, text) are copied without touching each cell.
+    """
+
+    def __init__(self, columns: List[str], column_types: List[str]):
+        self.columns = columns
+        encodings = [column_encoding(type_name) for type_name in column_types]
+        self.logical_types = [logical_type for logical_type, _ in encodings]
+        self._converters: List[Optional[Callable[[Any], Any]]] = [
+            converter for _, converter in encodings
+        ]
+        self.values: List[List[Any]] = [[] for _ in columns]
+
+    def add_batch(self, rows: List[List[Any]]):
+        if not rows:
+            return
+        for index, column_values in enumerate(zip(*rows)):
+            converter = self._converters[index]
+            if converter is None:
+                self.values[index].extend(column_values)
+            else:
+                self.values[index].extend(
+                    None if value is None else converter(value) for value in column_values
+                )
+
+    def to_dict(self, row_count: int, execution_time_ms: float) -> Dict[str, Any]:
+        return {
+            "format": RESULT_FORMAT_COLUMNAR,
+            "columns": self.columns,
+            "column_types": self.logical_types,
+            "values": self.values,
+            "row_count": row_count,
+            "execution_time_ms": execution_time_ms,
+        }
+
+
+def columnar_sample_rows(table: Dict[str, Any], limit: int) -> List[List[Any]]:
+    """First rows of a columnar result in row-major form (for chart recommendation)"""
+    return [list(row) for row in zip(*(values[:limit] for values in table["values"]))]
+
+
+def negotiate_result_format(requested: Optional[str], accept: Optional[str]) -> str:
+    """Explicit request flag wins; otherwise the Accept header decides; rows by default"""
+    if requested:
+        return requested
+    accept = (accept or "").lower()
+    if ARROW_STREAM_MEDIA_TYPE in accept:
+        return RESULT_FORMAT_ARROW
+    if COLUMNAR_JSON_MEDIA_TYPE in accept:
+        return RESULT_FORMAT_COLUMNAR
+    return RESULT_FORMAT_ROWS
+
+
+def ensure_arrow_available():
+    """Fail early, before any work is done, when Arrow output cannot be produced"""
+    if importlib.util.find_spec("pyarrow") is None:
+        raise ResultEncodingUnavailableError("Arrow encoding requires the 'pyarrow' package")
+
+
+def encode_arrow_ipc(table: Dict[str, Any], metadata: Dict[str, Any]) -> bytes:
+    """
+    Arrow IPC stream of a columnar result. The rest of the response (SQL,
+    charts, provenance, ...) travels as JSON in the schema metadata.
+    Requires the optional pyarrow package (the "arrow" extra).
+    """
+    try:
+        import pyarrow as pa
+    except ImportError:
+        raise ResultEncodingUnavailableError("Arrow encoding requires the 'pyarrow' package")
+
+    arrow_types = {
+        "bool": pa.bool_(),
+        "int": pa.int64(),
+        "float": pa.float64(),
+    }
+    arrays = [
+        pa.array(values, type=arrow_types.get(logical_type, pa.string()))
+        for values, logical_type in zip(table["values"], table["column_types"])
+    ]
+    fields = [
+        pa.field(name, array.type, metadata={b"logical_type": logical_type.encode()})
+        for name, array, logical_type in zip(table["columns"], arrays, table["column_types"])
+    ]
+    response_metadata = {
+        **metadata,
+        "row_count": table["row_count"],
+        "execution_time_ms": table["execution_time_ms"],
+    }
+    schema = pa.schema(
+        fields,
+        metadata={ARROW_METADATA_KEY: json.dumps(response_metadata, default=str).encode()},
+    )
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, schema) as writer:
+        writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+    return sink.getvalue().to_pybytes()
@@ -0,0 +1,338 @@
+"""Result sessions: large query results browsed page by page through a held server-side cursor"""
+import asyncio
+import secrets
+import time
+from contextlib import AsyncExitStack, nullcontext
+from dataclasses import dataclass, field
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import asyncpg
+
+from app.config import settings
+from app.core.db_registry import DEFAULT_DB_KEY
+from app.core.db_scheduler import PriorityLimiter
+from app.core.query_governor import SET_TIMEOUTS_QUERY, query_governor
+from app.core.sql_exec import SQLExecutionError, format_value
+
+
+class ResultSessionExpiredError(Exception):
+    """Raised for a continuation token whose session was closed, reaped or never existed"""
+    pass
+
+
+class ResultSessionLimitError(Exception):
+    """Raised when the maximum number of open result sessions is reached"""
+    pass
+
+
+class ResultSessionConflictError(Exception):
+    """Raised for a continuation token that does not point at the session's next page"""
+    pass
+
+
+@dataclass
+class ResultSession:
+    session_id: str
+    db_key: str
+    sql: str
+    max_rows: int
+    fetch_timeout: float
+    # Connection, transaction and cursor; None once closed
+    stack: Optional[AsyncExitStack]
+    cursor: Any = None
+    limiter: Optional[PriorityLimiter] = None
+    columns: List[str] = field(default_factory=list)
+    column_types: List[str] = field(default_factory=list)
+    # Rows served so far; the next page starts here
+    offset: int = 0
+    # One row read ahead, so a page knows whether another one follows
+    lookahead: List[List[Any]] = field(default_factory=list)
+    exhausted: bool = False
+    truncated: bool = False
+    created_at: float = field(default_factory=time.monotonic)
+    last_used: float = field(default_factory=time.monotonic)
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+    @property
+    def has_more(self) -> bool:
+        return not self.exhausted or bool(self.lookahead)
+
+    @property
+    def token(self) -> str:
+        """Continuation token of the next page"""
+        return f"{self.session_id}.{self.offset}"
+
+
+def parse_token(token: str) -> Tuple[str, int]:
+    session_id, _, offset = token.rpartition(".")
+    if not session_id or not offset.isdigit():
+        raise ResultSessionExpiredError("Malformed continuation token")
+    return session_id, int(offset)
+
+
+class ResultSessionManager:
+    """
+    Keeps a bounded number of result sessions open between page requests.
+
+    A session holds one pooled connection in a read-only transaction with a
+    cursor over the query, so each page is read where the previous one
+    stopped and only one page is in memory at a time. Sessions idle for
+    longer than idle_timeout are closed by a reaper; PostgreSQL's
+    idle_in_transaction_session_timeout backs this up should the process
+    stall. A page is fetched under the database's statement limiter, but an
+    idle session does not hold a slot. Open sessions are listed by the query
+    governor, and killing one there also closes the session.
+    """
+
+    def __init__(self, max_open: int, idle_timeout: float, max_page_size: int):
+        self.max_open = max_open
+        self.idle_timeout = idle_timeout
+        self.max_page_size = max_page_size
+        self._sessions: Dict[str, ResultSession] = {}
+        self._reaper: Optional[asyncio.Task] = None
+        self.opened = 0
+        self.reaped = 0
+        self.rejected = 0
+        self.pages = 0
+
+    def page_size(self, requested: Optional[int]) -> int:
+        return max(1, min(requested or settings.sql_row_limit, self.max_page_size))
+
+    async def open(
+        self,
+        connection_source: Callable[[], Any],
+        sql: str,
+        *,
+        page_size: Optional[int] = None,
+        db_key: str = DEFAULT_DB_KEY,
+        limiter: Optional[PriorityLimiter] = None,
+        max_rows: Optional[int] = None,
+        timeout: Optional[float] = None,
+    ) -> Tuple[ResultSession, Dict[str, Any]]:
+        """
+        Open a cursor over sql and read its first page.
+
+        connection_source must hand out unscheduled connections; the session
+        takes a slot from limiter only while it reads. The session is closed
+        right away when the first page is the last one.
+        """
+        if len(self._sessions) >= self.max_open:
+            self.rejected += 1
+            raise ResultSessionLimitError(
+                f"Too many open result sessions (max: {self.max_open})"
+            )
+        session = ResultSession(
+            session_id=secrets.token_urlsafe(16),
+            db_key=db_key,
+            sql=sql,
+            max_rows=max_rows or settings.sql_max_rows,
+            fetch_timeout=timeout or settings.sql_timeout_seconds,
+            stack=AsyncExitStack(),
+            limiter=limiter,
+        )
+        # Counts against the cap while the cursor is being opened
+        self._sessions[session.session_id] = session
+        try:
+            async with session.lock:
+                await self._start(session, connection_source)
+                page = await self._read_page(session, self.page_size(page_size))
+        except BaseException:
+            await self._close(session)
+            raise
+        self.opened += 1
+        self._ensure_reaper()
+        if not session.has_more:
+            await self._close(session)
+        return session, page
+
+    async def _start(self, session: ResultSession, connection_source: Callable[[], Any]):
+        conn = await session.stack.enter_async_context(connection_source())
+        transaction = conn.transaction(readonly=True)
+        await transaction.start()
+        # Rolled back before the connection goes back to the pool
+        session.stack.push_async_callback(transaction.rollback)
+        try:
+            async with self._slot(session):
+                await conn.execute(
+                    SET_TIMEOUTS_QUERY,
+                    str(max(1, int(session.fetch_timeout * 1000))),
+                    # The reaper normally gets there first
+                    str(max(1, int((self.idle_timeout + settings.sql_idle_in_transaction_timeout_seconds) * 1000))),
+                )
+                entry = query_governor.register(
+                    conn,
+                    session.sql,
+                    session.fetch_timeout,
+                    db_key=session.db_key,
+                    on_kill=partial(self._close_locked, session),
+                )
+                # Unwinds before the rollback, so the pid is never listed once the connection is back in the pool
+                session.stack.callback(query_governor.unregister, entry)
+                statement = await conn.prepare(session.sql, timeout=session.fetch_timeout)
+                session.cursor = await statement.cursor()
+        except asyncio.TimeoutError:
+            raise SQLExecutionError(
+                f"Query execution timeout after {session.fetch_timeout} seconds (max_sql_seconds limit exceeded)"
+            )
+        except asyncpg.PostgresError as e:
+            raise SQLExecutionError(f"Database error: {str(e)}")
+        attributes = statement.get_attributes()
+        session.columns = [attribute.name for attribute in attributes]
+        session.column_types = [attribute.type.name for attribute in attributes]
+
+    @staticmethod
+    def _slot(session: ResultSession):
+        return session.limiter.slot() if session.limiter else nullcontext()
+
+    async def _read_page(self, session: ResultSession, page_size: int) -> Dict[str, Any]:
+        start = time.monotonic()
+        page_size = min(page_size, session.max_rows - session.offset)
+        rows = session.lookahead
+        session.lookahead = []
+        wanted = page_size + 1 - len(rows)
+        if wanted > 0 and not session.exhausted:
+            try:
+                async with self._slot(session):
+                    records = await session.cursor.fetch(wanted, timeout=session.fetch_timeout)
+            except asyncio.TimeoutError:
+                raise SQLExecutionError(
+                    f"Page fetch timeout after {session.fetch_timeout} seconds (max_sql_seconds limit exceeded)"
+                )
+            except asyncpg.PostgresError as e:
+                raise SQLExecutionError(f"Database error: {str(e)}")
+            if len(records) < wanted:
+                session.exhausted = True
+            rows = rows + [[format_value(value) for value in record.values()] for record in records]
+        rows, session.lookahead = rows[:page_size], rows[page_size:]
+        page_offset = session.offset
+        session.offset += len(rows)
+        if session.offset >= session.max_rows and session.lookahead:
+            # Browsing stops at max_rows, like a single result would
+            session.truncated = True
+            session.exhausted = True
+            session.lookahead = []
+        session.last_used = time.monotonic()
+        self.pages += 1
+        return {
+            "columns": session.columns,
+            "rows": rows,
+            "row_count": len(rows),
+            "offset": page_offset,
+            "execution_time_ms": round((time.monotonic() - start) * 1000, 2),
+        }
+
+    async def next_page(self, token: str, page_size: Optional[int] = None) -> Tuple[ResultSession, Dict[str, Any]]:
+        """Read the page a continuation token points at"""
+        session_id, offset = parse_token(token)
+        session = self._sessions.get(session_id)
+        if session is None:
+            raise ResultSessionExpiredError(
+                "Result session expired or closed; run the question again"
+            )
+        async with session.lock:
+            if session_id not in self._sessions:
+                raise ResultSessionExpiredError("Result session was closed while waiting")
+            if offset != session.offset:
+                # Cursors only move forward; a retried page cannot be read again
+                raise ResultSessionConflictError(
+                    f"Continuation token is for row {offset}, but the session is at row {session.offset}"
+                )
+            try:
+                page = await self._read_page(session, self.page_size(page_size))
+            except BaseException:
+                # A failed or cancelled fetch leaves the cursor in an unknown position
+                await self._close(session)
+                raise
+        if not session.has_more:
+            await self._close(session)
+        return session, page
+
+    async def close(self, token: str) -> bool:
+        """Close a session early; False when it is already gone"""
+        session_id, _ = parse_token(token)
+        session = self._sessions.get(session_id)
+        if session is None:
+            return False
+        return await self._close_locked(session)
+
+    async def _close_locked(self, session: ResultSession) -> bool:
+        """Close a session once no page is being read from it; False when it is already gone"""
+        async with session.lock:
+            if session.session_id not in self._sessions:
+                return False
+            await self._close(session)
+            return True
+
+    async def _close(self, session: ResultSession):
+        self._sessions.pop(session.session_id, None)
+        stack, session.stack = session.stack, None
+        if stack is None:
+            return
+        try:
+            await stack.aclose()
+        except Exception as e:
+            print(f"⚠️  Failed to close result session {session.session_id}: {e}")
+
+    def _ensure_reaper(self):
+        if self._reaper is None or self._reaper.done():
+            self._reaper = asyncio.create_task(self._reap_forever())
+
+    async def _reap_forever(self):
+        while self._sessions:
+            await asyncio.sleep(max(0.01, self.idle_timeout / 2))
+            await self.reap()
+
+    async def reap(self) -> int:
+        """Close sessions idle for longer than idle_timeout (sessions reading a page are skipped)"""
+        reaped = 0
+        for session in list(self._sessions.values()):
+            # Checked per session: closing earlier ones yields, and a page request may come in meanwhile
+            if session.lock.locked() or time.monotonic() - session.last_used <= self.idle_timeout:
+                continue
+            reaped += await self._close_locked(session)
+        self.reaped += reaped
+        return reaped
+
+    async def close_all(self):
+        for session in list(self._sessions.values()):
+            await self._close(session)
+        if self._reaper is not None:
+            self._reaper.cancel()
+
+    def continuation(self, session: ResultSession) -> Dict[str, Any]:
+        """Continuation block returned with a page"""
+        return {
+            "token": session.token if session.has_more else None,
+            "next_offset": session.offset,
+            "has_more": session.has_more,
+            "truncated": session.truncated,
+            "expires_in_seconds": self.idle_timeout if session.has_more else None,
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "open": len(self._sessions),
+            "max_open": self.max_open,
+            "opened": self.opened,
+            "pages": self.pages,
+            "reaped": self.reaped,
+            "rejected": self.rejected,
+        }
+
+
+_result_session_manager: Optional[ResultSessionManager] = None
+
+
+def get_result_session_manager() -> Optional[ResultSessionManager]:
+    """Process-wide result session manager, or None when result sessions are disabled"""
+    global _result_session_manager
+    if not settings.is_use_result_sessions:
+        return None
+    if _result_session_manager is None:
+        _result_session_manager = ResultSessionManager(
+            max_open=settings.result_session_max_open,
+            idle_timeout=settings.result_session_idle_timeout_seconds,
+            max_page_size=settings.result_session_max_page_size,
+        )
+    return _result_session_manager
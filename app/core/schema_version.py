@@ -0,0 +1,89 @@
+"""Schema graph version tracking for in-process schema caches"""
+import asyncio
+import time
+from typing import Optional
+
+from app.config import settings
+
+
+SCHEMA_VERSION_QUERY = """
+OPTIONAL MATCH (v:SchemaVersion {key: 'schema'})
+WITH coalesce(v.version, 0) AS version
+CALL {
+    MATCH (t:Table)
+    RETURN count(t) AS table_count, toString(max(t.updated_at)) AS table_updated_at
+}
+CALL {
+    MATCH (c:Column)
+    RETURN count(c) AS column_count, toString(max(c.updated_at)) AS column_updated_at
+}
+CALL {
+    MATCH ()-[r:FK_TO_TABLE]->()
+    RETURN count(r) AS relationship_count
+}
+RETURN version, table_count, table_updated_at, column_count, column_updated_at, relationship_count
+"""
+
+
+async def fetch_schema_version(session) -> str:
+    """
+    Return a token that changes whenever the schema graph changes.
+
+    Combines the explicit SchemaVersion counter (bumped by API mutations) with
+    node/edge counts and last-update timestamps so out-of-band loads are noticed too.
+    """
+    result = await session.run(SCHEMA_VERSION_QUERY)
+    record = await result.single()
+    if record is None:
+        return "empty"
+    return ":".join(
+        str(record.get(key) or "")
+        for key in (
+            "version",
+            "table_count",
+            "table_updated_at",
+            "column_count",
+            "column_updated_at",
+            "relationship_count",
+        )
+    )
+
+
+async def bump_schema_version(session):
+    """Record a schema change so every process refreshes its schema caches"""
+    query = """
+    MERGE (v:SchemaVersion {key: 'schema'})
+    SET v.version = coalesce(v.version, 0) + 1,
+        v.updated_at = datetime()
+    """
+    result = await session.run(query)
+    await result.consume()
+    schema_version_tracker.invalidate()
+
+
+class SchemaVersionTracker:
+    """Caches the schema version token, re-reading it at most once per check interval"""
+
+    def __init__(self):
+        self._version: Optional[str] = None
+        self._checked_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def current(self, session) -> str:
+        """Current schema version token"""
+        async with self._lock:
+            now = time.monotonic()
+            if (
+                self._version is None
+                or now - self._checked_at >= settings.schema_version_check_interval_seconds
+            ):
+                self._version = await fetch_schema_version(session)
+                self._checked_at = now
+            return self._version
+
+    def invalidate(self):
+        """Force the next current() call to re-read the version"""
+        self._version = None
+
+
+schema_version_tracker = SchemaVersionTracker()
@@ -1,9 +1,19 @@
 """SQL execution with safety and timeout"""
 import asyncio
-from typing import List, Dict, Any, Optional
+import time
+from dataclasses import dataclass
+from typing import AsyncIterator, Awaitable, Callable, List, Dict, Any, Optional, Tuple
 import asyncpg
 
 from app.config import settings
+from app.core.db_registry import DEFAULT_DB_KEY, TargetDatabase
+from app.core.query_governor import query_governor
+from app.core.result_cache import VALIDATION_STATS, analyze_sql, fetch_table_versions, get_result_cache
+from app.core.result_encoding import ColumnarResultBuilder
+
+
+TRUNCATED_MAX_ROWS = "max_rows"
+TRUNCATED_MAX_BYTES = "max_bytes"
 
 
 class SQLExecutionError(Exception):
@@ -11,12 +21,233 @@ class SQLExecutionError(Exception):
     pass
 
 
+def format_value(value: Any) -> Any:
+    """JSON-safe form of a single result value"""
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return str(value)
+
+
+def _estimate_value_bytes(value: Any) -> int:
+    if value is None:
+        return 0
+    if isinstance(value, (str, bytes)):
+        return len(value)
+    if isinstance(value, (int, float, bool)):
+        return 8
+    return len(str(value))
+
+
+class QueryStream:
+    """
+    Result of a streamed query, consumed batch by batch.
+
+    Iterating runs the query in a read-only transaction through a server-side
+    cursor and yields lists of rows; only the current batch is held in memory.
+    Fetching stops once max_rows or max_bytes is reached, in which case
+    `truncated` names the limit that was hit. The query is tracked by the
+    query governor, which also makes PostgreSQL enforce the timeout.
+    Consumers that stop early should close the iterator (contextlib.aclosing)
+    so the transaction ends promptly.
+    """
+
+    def __init__(
+        self,
+        conn: asyncpg.Connection,
+        sql: str,
+        *,
+        timeout: float,
+        max_rows: int,
+        max_bytes: int,
+        batch_size: int,
+        json_safe: bool,
+        db_key: str = DEFAULT_DB_KEY,
+    ):
+        self.conn = conn
+        self.sql = sql
+        self.timeout = timeout
+        self.max_rows = max_rows
+        self.max_bytes = max_bytes
+        self.batch_size = max(1, batch_size)
+        self.json_safe = json_safe
+        self.db_key = db_key
+        self.columns: List[str] = []
+        self.column_types: List[str] = []
+        self.row_count = 0
+        self.byte_count = 0
+        self.truncated: Optional[str] = None
+        self.execution_time_ms = 0.0
+
+    def _remaining(self, deadline: float) -> float:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise asyncio.TimeoutError()
+        return remaining
+
+    async def __aiter__(self) -> AsyncIterator[List[List[Any]]]:
+        start = time.monotonic()
+        deadline = start + self.timeout
+        async with self.conn.transaction(readonly=True):
+            async with query_governor.track(self.conn, self.sql, self.timeout, self.db_key):
+                statement = await self.conn.prepare(self.sql, timeout=self._remaining(deadline))
+                attributes = statement.get_attributes()
+                self.columns = [attribute.name for attribute in attributes]
+                self.column_types = [attribute.type.name for attribute in attributes]
+                cursor = await statement.cursor()
+                while self.truncated is None:
+                    # Never ask for more rows than the row cap still allows (+1 to detect overflow)
+                    fetch_size = min(self.batch_size, self.max_rows - self.row_count + 1)
+                    records = await cursor.fetch(fetch_size, timeout=self._remaining(deadline))
+                    batch: List[List[Any]] = []
+                    for record in records:
+                        if self.row_count >= self.max_rows:
+                            self.truncated = TRUNCATED_MAX_ROWS
+                            break
+                        if self.json_safe:
+                            row = [format_value(value) for value in record.values()]
+                        else:
+                            row = list(record.values())
+                        row_bytes = sum(_estimate_value_bytes(value) for value in row)
+                        if self.byte_count + row_bytes > self.max_bytes:
+                            self.truncated = TRUNCATED_MAX_BYTES
+                            break
+                        self.byte_count += row_bytes
+                        self.row_count += 1
+                        batch.append(row)
+                    self.execution_time_ms = round((time.monotonic() - start) * 1000, 2)
+                    if batch:
+                        yield batch
+                    if len(records) < fetch_size:
+                        break
+
+
+@dataclass
+class _Flight:
+    task: asyncio.Task
+    waiters: int = 0
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent executions of the same query into one in-flight task.
+
+    The task runs on the first caller's connection, so no extra connection is
+    taken. Every caller waits on the shared task with its own timeout. A caller
+    that times out or is cancelled only stops waiting; the query is cancelled
+    once the last waiting caller has left. The first caller does not return
+    before the task has ended, since its connection goes back to the pool then.
+    """
+
+    def __init__(self):
+        self._flights: Dict[Tuple, _Flight] = {}
+        self.leaders = 0
+        self.joined = 0
+        self.abandoned = 0
+
+    def _forget(self, key: Tuple, flight: _Flight):
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+        if not flight.task.cancelled():
+            # Mark the exception as retrieved even when nobody is left to await it
+            flight.task.exception()
+
+    async def run(
+        self,
+        key: Tuple,
+        start: Callable[[], Awaitable[Dict[str, Any]]],
+        timeout: float,
+    ) -> Dict[str, Any]:
+        """
+        Run start() or join the flight already running under key.
+
+        start is only called for the first caller and may use that caller's
+        connection. Include the timeout in key so every waiter of a flight
+        has the limit the query runs under.
+        """
+        flight = self._flights.get(key)
+        leader = flight is None
+        if leader:
+            flight = _Flight(task=asyncio.create_task(start()))
+            self._flights[key] = flight
+            flight.task.add_done_callback(lambda _task, key=key, flight=flight: self._forget(key, flight))
+            self.leaders += 1
+        else:
+            self.joined += 1
+        
+        flight.waiters += 1
+        try:
+            result = await asyncio.wait_for(asyncio.shield(flight.task), timeout)
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                # Later callers must start afresh rather than join a cancelled query
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+                flight.task.cancel()
+                self.abandoned += 1
+            if leader and not flight.task.done():
+                # The query holds the leader's connection until it ends or the others leave
+                await asyncio.wait([flight.task])
+        # Waiters share rows but each gets its own top-level dict
+        return dict(result)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "in_flight": len(self._flights),
+            "leaders": self.leaders,
+            "joined": self.joined,
+            "abandoned": self.abandoned,
+        }
+
+
+single_flight = SingleFlight()
+
+
 class SQLExecutor:
     """Execute SQL queries with safety constraints"""
     
-    def __init__(self):
-        self.timeout = settings.sql_timeout_seconds
-        self.max_rows = settings.sql_max_rows
+    def __init__(self, database: Optional[TargetDatabase] = None):
+        # Limits of the database the queries run on (the default database's settings when None)
+        self.database = database
+        self.db_key = database.key if database else DEFAULT_DB_KEY
+        self.timeout = database.sql_timeout_seconds if database else settings.sql_timeout_seconds
+        self.max_rows = database.sql_max_rows if database else settings.sql_max_rows
+        self.max_bytes = database.sql_max_result_bytes if database else settings.sql_max_result_bytes
+        self.batch_size = settings.sql_stream_batch_size
+    
+    def stream_query(
+        self,
+        conn: asyncpg.Connection,
+        sql: str,
+        *,
+        timeout: Optional[float] = None,
+        max_rows: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        json_safe: bool = False,
+    ) -> QueryStream:
+        """
+        Stream a query's rows in batches (see QueryStream).
+        
+        Args:
+            conn: asyncpg connection.
+            sql: SQL query to execute.
+            timeout: Optional timeout in seconds for the whole stream (defaults to instance timeout).
+            max_rows: Stop after this many rows (defaults to SQL_MAX_ROWS).
+            max_bytes: Stop once the estimated result size reaches this (defaults to SQL_MAX_RESULT_BYTES).
+            batch_size: Rows fetched per cursor round trip.
+            json_safe: Convert values to JSON-safe types while streaming.
+        """
+        return QueryStream(
+            conn,
+            sql,
+            timeout=timeout if timeout is not None else self.timeout,
+            max_rows=max_rows if max_rows is not None else self.max_rows,
+            max_bytes=max_bytes if max_bytes is not None else self.max_bytes,
+            batch_size=batch_size or self.batch_size,
+            json_safe=json_safe,
+            db_key=self.db_key,
+        )
     
     async def execute_query(
         self,
@@ -24,14 +255,30 @@ class SQLExecutor:
         sql: str,
         *,
         timeout: Optional[float] = None,
+        json_safe: bool = False,
+        columnar: bool = False,
+        use_cache: bool = True,
     ) -> Dict[str, Any]:
         """
         Execute SQL query and return results with metadata.
         
+        Rows are streamed through a cursor, so a result over the row or byte
+        limit fails as soon as the limit is crossed instead of after loading it.
+        
+        With IS_USE_SINGLE_FLIGHT, concurrent calls for the same canonical SQL
+        share one execution, which runs on the first caller's (the leader's)
+        connection under its timeout; each caller still stops waiting after
+        its own.
+        
         Args:
             conn: asyncpg connection.
             sql: SQL query to execute.
             timeout: Optional timeout in seconds (defaults to instance timeout).
+            json_safe: Return JSON-safe values (as format_results_for_json would).
+            columnar: Return typed per-column arrays (see ColumnarResultBuilder)
+                instead of rows; values are JSON-safe.
+            use_cache: Serve and store the result in the result cache when it is enabled.
+                Results then also carry "cached" and "cache_age_seconds".
         
         Returns:
             {
@@ -40,45 +287,108 @@ class SQLExecutor:
                 "row_count": int,
                 "execution_time_ms": float
             }
+            or, with columnar=True,
+            {
+                "format": "columnar",
+                "columns": List[str],
+                "column_types": List[str],
+                "values": List[List[Any]],
+                "row_count": int,
+                "execution_time_ms": float
+            }
         """
-        import time
-        start_time = time.time()
-        effective_timeout = timeout if timeout is not None else self.timeout
+        cache = get_result_cache() if use_cache else None
+        cache_key = None
+        versions = None
+        if cache is not None or settings.is_use_single_flight:
+            canonical_sql, tables, volatile = analyze_sql(sql)
+            cache_key = (self.db_key, canonical_sql, json_safe, columnar, self.max_rows, self.max_bytes)
+            if volatile:
+                # now(), random(), nextval() ... give a different result on every run
+                cache = None
+        if cache is not None:
+            if cache.validation == VALIDATION_STATS:
+                try:
+                    versions = await fetch_table_versions(conn, tables)
+                except Exception:
+                    versions = None
+            cached = cache.get(cache_key, versions)
+            if cached is not None:
+                result, age = cached
+                return {**result, "cached": True, "cache_age_seconds": round(age, 3)}
         
-        try:
-            # Execute with timeout
-            rows = await asyncio.wait_for(
-                conn.fetch(sql),
-                timeout=effective_timeout
-            )
+        if not settings.is_use_single_flight:
+            result = await self._run_query(conn, sql, timeout, json_safe, columnar)
+        else:
+            effective_timeout = timeout if timeout is not None else self.timeout
             
-            execution_time_ms = (time.time() - start_time) * 1000
+            async def run_shared():
+                return await self._run_query(conn, sql, timeout, json_safe, columnar)
             
-            # Check row count limit
-            if len(rows) > self.max_rows:
+            try:
+                result = await single_flight.run(cache_key + (effective_timeout,), run_shared, effective_timeout)
+            except asyncio.TimeoutError:
                 raise SQLExecutionError(
-                    f"Query returned too many rows: {len(rows)} (max: {self.max_rows})"
+                    f"Query execution timeout after {effective_timeout} seconds (max_sql_seconds limit exceeded)"
                 )
-            
-            # Extract columns and data
-            columns = list(rows[0].keys()) if rows else []
-            data = [list(row.values()) for row in rows]
-            
-            return {
-                "columns": columns,
-                "rows": data,
-                "row_count": len(rows),
-                "execution_time_ms": round(execution_time_ms, 2)
-            }
+        
+        if cache is not None:
+            cache.put(cache_key, versions, result)
+            result = {**result, "cached": False, "cache_age_seconds": None}
+        return result
+    
+    async def _run_query(
+        self,
+        conn: asyncpg.Connection,
+        sql: str,
+        timeout: Optional[float],
+        json_safe: bool,
+        columnar: bool,
+    ) -> Dict[str, Any]:
+        """Stream a query to completion and assemble its result (no caching or sharing)"""
+        stream = self.stream_query(conn, sql, timeout=timeout, json_safe=json_safe and not columnar)
+        
+        try:
+            data: List[List[Any]] = []
+            builder: Optional[ColumnarResultBuilder] = None
+            async for batch in stream:
+                if not columnar:
+                    data.extend(batch)
+                    continue
+                if builder is None:
+                    builder = ColumnarResultBuilder(stream.columns, stream.column_types)
+                builder.add_batch(batch)
             
         except asyncio.TimeoutError:
             raise SQLExecutionError(
-                f"Query execution timeout after {effective_timeout} seconds (max_sql_seconds limit exceeded)"
+                f"Query execution timeout after {stream.timeout} seconds (max_sql_seconds limit exceeded)"
             )
         except asyncpg.PostgresError as e:
             raise SQLExecutionError(f"Database error: {str(e)}")
         except Exception as e:
             raise SQLExecutionError(f"Execution failed: {str(e)}")
+        
+        if stream.truncated == TRUNCATED_MAX_ROWS:
+            raise SQLExecutionError(
+                f"Query returned too many rows (max: {stream.max_rows})"
+            )
+        if stream.truncated == TRUNCATED_MAX_BYTES:
+            raise SQLExecutionError(
+                f"Query result too large: more than {stream.max_bytes} bytes after {stream.row_count} rows"
+            )
+        
+        if columnar:
+            if builder is None:
+                builder = ColumnarResultBuilder(stream.columns, stream.column_types)
+            result = builder.to_dict(stream.row_count, stream.execution_time_ms)
+        else:
+            result = {
+                "columns": stream.columns,
+                "rows": data,
+                "row_count": stream.row_count,
+                "execution_time_ms": stream.execution_time_ms
+            }
+        return result
     
     async def execute_ddl(
         self,
@@ -121,18 +431,7 @@ class SQLExecutor:
     def format_results_for_json(results: Dict[str, Any]) -> Dict[str, Any]:
         """Format results for JSON serialization"""
         # Convert any non-serializable types
-        formatted_rows = []
-        for row in results["rows"]:
-            formatted_row = []
-            for value in row:
-                if value is None:
-                    formatted_row.append(None)
-                elif isinstance(value, (str, int, float, bool)):
-                    formatted_row.append(value)
-                else:
-                    # Convert other types to string
-                    formatted_row.append(str(value))
-            formatted_rows.append(formatted_row)
+        formatted_rows = [[format_value(value) for value in row] for row in results["rows"]]
         
         return {
             **results,
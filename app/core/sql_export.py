@@ -0,0 +1,240 @@
+"""Streaming result export (CSV via COPY TO STDOUT, Parquet via cursor batches)"""
+import asyncio
+import importlib.util
+import sys
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+from app.config import settings
+from app.core.query_governor import query_governor
+from app.core.sql_exec import SQLExecutor
+
+
+EXPORT_FORMAT_CSV = "csv"
+EXPORT_FORMAT_PARQUET = "parquet"
+
+EXPORT_MEDIA_TYPES = {
+    EXPORT_FORMAT_CSV: "text/csv",
+    EXPORT_FORMAT_PARQUET: "application/vnd.apache.parquet",
+}
+
+Sink = Callable[[bytes], Awaitable[None]]
+
+
+class ExportUnavailableError(Exception):
+    """Raised when an export format needs an optional dependency that is missing"""
+    pass
+
+
+def _strip_statement(sql: str) -> str:
+    # COPY ( ... ) does not accept a statement terminator inside the parentheses
+    return sql.strip().rstrip(";").strip()
+
+
+async def bounded_stream(
+    produce: Callable[[Sink], Awaitable[None]],
+    max_chunks: int,
+) -> AsyncIterator[bytes]:
+    """
+    Run produce(sink) in a task and yield the chunks it passes to sink.
+
+    The queue between the two holds at most max_chunks chunks, so a slow client
+    suspends the producer (and with it the reads from PostgreSQL) instead of
+    letting the result pile up in memory. Closing the iterator cancels the producer.
+    """
+    queue: asyncio.Queue = asyncio.Queue(maxsize=max(1, max_chunks))
+    done = object()
+
+    async def run():
+        try:
+            await produce(queue.put)
+        except Exception as e:
+            await queue.put(e)
+        else:
+            await queue.put(done)
+
+    task = asyncio.create_task(run())
+    try:
+        while True:
+            item = await queue.get()
+            if item is done:
+                break
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        if not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+
+class CSVExporter:
+    """CSV with a header row, written by PostgreSQL itself through COPY TO STDOUT"""
+
+    def __init__(self, timeout: Optional[float] = None):
+        self.timeout = timeout or settings.export_timeout_seconds
+
+    async def produce(self, conn, sql: str, sink: Sink) -> Dict[str, Any]:
+        start = time.perf_counter()
+        written = 0
+
+        async def count_and_forward(chunk: bytes):
+            nonlocal written
+            written += len(chunk)
+            await sink(chunk)
+
+        async with conn.transaction(readonly=True):
+            async with query_governor.track(conn, sql, self.timeout):
+                status = await conn.copy_from_query(
+                    _strip_statement(sql),
+                    output=count_and_forward,
+                    format="csv",
+                    header=True,
+                    timeout=self.timeout,
+                )
+        # COPY reports "COPY <rows>"
+        rows = int(status.split()[-1]) if status and status.split()[-1].isdigit() else None
+        return {
+            "format": EXPORT_FORMAT_CSV,
+            "rows": rows,
+            "bytes": written,
+            "elapsed_ms": round((time.perf_counter() - start) * 1000, 2),
+        }
+
+
+# PostgreSQL type name -> pyarrow type factory name; anything else is exported as text
+_ARROW_TYPES = {
+    "bool": "bool_",
+    "int2": "int16",
+    "int4": "int32",
+    "int8": "int64",
+    "float4": "float32",
+    "float8": "float64",
+    "date": "date32",
+}
+
+
+class _ParquetSink:
+    """Write-only file object collecting the bytes ParquetWriter emits between drains"""
+
+    def __init__(self):
+        self.chunks: List[bytes] = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        chunk = bytes(data)
+        self.chunks.append(chunk)
+        self.position += len(chunk)
+        return len(chunk)
+
+    def tell(self) -> int:
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+class ParquetExporter:
+    """
+    Parquet written one row group per cursor batch.
+
+    Only the current batch and its encoded row group are held in memory.
+    Requires the optional pyarrow package (the "arrow" extra).
+    """
+
+    def __init__(self, timeout: Optional[float] = None, batch_rows: Optional[int] = None):
+        if importlib.util.find_spec("pyarrow") is None:
+            raise ExportUnavailableError("Parquet export requires the 'pyarrow' package")
+        self.timeout = timeout or settings.export_timeout_seconds
+        self.batch_rows = batch_rows or settings.export_parquet_batch_rows
+
+    @staticmethod
+    def _arrow_schema(columns: List[str], column_types: List[str]):
+        import pyarrow as pa
+
+        fields = []
+        for name, type_name in zip(columns, column_types):
+            if type_name == "timestamp":
+                arrow_type = pa.timestamp("us")
+            elif type_name == "timestamptz":
+                arrow_type = pa.timestamp("us", tz="UTC")
+            elif type_name in _ARROW_TYPES:
+                arrow_type = getattr(pa, _ARROW_TYPES[type_name])()
+            else:
+                arrow_type = pa.string()
+            fields.append(pa.field(name, arrow_type))
+        return pa.schema(fields)
+
+    async def produce(self, conn, sql: str, sink: Sink) -> Dict[str, Any]:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        start = time.perf_counter()
+        written = 0
+        stream = SQLExecutor().stream_query(
+            conn,
+            sql,
+            timeout=self.timeout,
+            max_rows=sys.maxsize,
+            max_bytes=sys.maxsize,
+            batch_size=self.batch_rows,
+        )
+        file_sink = _ParquetSink()
+        writer = None
+        schema = None
+        text_columns: List[int] = []
+
+        async for batch in stream:
+            if writer is None:
+                schema = self._arrow_schema(stream.columns, stream.column_types)
+                text_columns = [
+                    i for i, field in enumerate(schema)
+                    if pa.types.is_string(field.type)
+                ]
+                writer = pq.ParquetWriter(file_sink, schema)
+            for row in batch:
+                for i in text_columns:
+                    if row[i] is not None and not isinstance(row[i], str):
+                        row[i] = str(row[i])
+            arrays = [
+                pa.array([row[i] for row in batch], type=field.type)
+                for i, field in enumerate(schema)
+            ]
+            writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+            chunk = file_sink.drain()
+            written += len(chunk)
+            await sink(chunk)
+
+        if writer is None:
+            # Empty result: still emit a valid file with the statement's columns
+            schema = self._arrow_schema(stream.columns, stream.column_types)
+            writer = pq.ParquetWriter(file_sink, schema)
+        writer.close()
+        chunk = file_sink.drain()
+        written += len(chunk)
+        await sink(chunk)
+        return {
+            "format": EXPORT_FORMAT_PARQUET,
+            "rows": stream.row_count,
+            "bytes": written,
+            "elapsed_ms": round((time.perf_counter() - start) * 1000, 2),
+        }
+
+
+def get_exporter(export_format: str):
+    """Exporter for a format name (raises ExportUnavailableError if it cannot run here)"""
+    if export_format == EXPORT_FORMAT_PARQUET:
+        return ParquetExporter()
+    return CSVExporter()
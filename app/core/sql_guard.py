@@ -1,6 +1,6 @@
 """SQL validation and security guards"""
 import re
-from typing import List, Tuple
+from typing import List, Optional, Tuple
 import sqlglot
 from sqlglot import exp
 
@@ -32,14 +32,21 @@ class SQLValidationError(Exception):
 class SQLGuard:
     """SQL validation and security guard"""
     
-    def __init__(self):
-        self.max_limit = settings.sql_row_limit
+    def __init__(self, max_limit: Optional[int] = None):
+        self.max_limit = max_limit or settings.sql_row_limit
         self.max_join_depth = settings.max_join_depth
         self.max_subquery_depth = settings.max_subquery_depth
     
-    def validate(self, sql: str, allowed_tables: List[str] = None) -> Tuple[str, bool]:
+    def validate(
+        self,
+        sql: str,
+        allowed_tables: List[str] = None,
+        enforce_limit: bool = True
+    ) -> Tuple[str, bool]:
         """
         Validate SQL for safety and policy compliance.
+        With enforce_limit=False the LIMIT clause is left as written (used by
+        exports, which stream the full result instead of loading it).
         Returns: (cleaned_sql, is_valid)
         Raises: SQLValidationError if validation fails
         """
@@ -72,6 +79,8 @@ class SQLGuard:
             self._check_allowed_tables(parsed, allowed_tables)
         
         # Ensure LIMIT clause
+        if not enforce_limit:
+            return sql, True
         sql_with_limit = self._ensure_limit(sql, parsed)
         
         return sql_with_limit, True
@@ -0,0 +1,138 @@
+"""Semantic cache of retrieved subschemas keyed by question embedding"""
+import copy
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.config import settings
+
+
+@dataclass
+class _CacheEntry:
+    embedding: np.ndarray
+    params: Tuple
+    subschema: Any
+    created_at: float
+
+
+class SubSchemaCache:
+    """
+    LRU/TTL cache returning a stored SubSchema for any question whose embedding
+    is within the cosine similarity threshold of a cached one.
+
+    Entries belong to one schema version; a different version clears the cache.
+    """
+
+    def __init__(self, max_items: int, ttl_seconds: float, similarity_threshold: float):
+        self.max_items = max(0, max_items)
+        self.ttl_seconds = ttl_seconds
+        self.similarity_threshold = similarity_threshold
+        self.schema_version: Optional[str] = None
+        self._entries: "OrderedDict[int, _CacheEntry]" = OrderedDict()
+        self._next_id = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def _normalize(embedding: List[float]) -> Optional[np.ndarray]:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = float(np.linalg.norm(vector))
+        if norm == 0.0:
+            return None
+        return vector / norm
+
+    def _sync_version(self, schema_version: str):
+        if self.schema_version != schema_version:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self.schema_version = schema_version
+
+    def _expire(self, now: float):
+        expired = [
+            entry_id for entry_id, entry in self._entries.items()
+            if now - entry.created_at > self.ttl_seconds
+        ]
+        for entry_id in expired:
+            del self._entries[entry_id]
+        self.expirations += len(expired)
+
+    def get(self, embedding: List[float], params: Tuple, schema_version: str) -> Optional[Any]:
+        """Copy of the closest cached subschema above the similarity threshold, or None"""
+        self._sync_version(schema_version)
+        self._expire(time.monotonic())
+        query = self._normalize(embedding)
+
+        best_id, best_similarity = None, self.similarity_threshold
+        if query is not None:
+            for entry_id, entry in self._entries.items():
+                if entry.params != params or entry.embedding.shape != query.shape:
+                    continue
+                similarity = float(entry.embedding @ query)
+                if similarity >= best_similarity:
+                    best_id, best_similarity = entry_id, similarity
+
+        if best_id is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(best_id)
+        return copy.deepcopy(self._entries[best_id].subschema)
+
+    def put(self, embedding: List[float], params: Tuple, schema_version: str, subschema: Any):
+        """Store a copy of a freshly built subschema"""
+        query = self._normalize(embedding)
+        if query is None or self.max_items == 0:
+            return
+        self._sync_version(schema_version)
+        self._entries[self._next_id] = _CacheEntry(
+            embedding=query,
+            params=params,
+            subschema=copy.deepcopy(subschema),
+            created_at=time.monotonic(),
+        )
+        self._next_id += 1
+        while len(self._entries) > self.max_items:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss and eviction counters"""
+        lookups = self.hits + self.misses
+        return {
+            "items": len(self._entries),
+            "max_items": self.max_items,
+            "similarity_threshold": self.similarity_threshold,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+_subschema_cache: Optional[SubSchemaCache] = None
+
+
+def get_subschema_cache() -> Optional[SubSchemaCache]:
+    """Process-wide subschema cache, or None when the cache is disabled"""
+    global _subschema_cache
+    if not settings.is_use_subschema_cache:
+        return None
+    if _subschema_cache is None:
+        _subschema_cache = SubSchemaCache(
+            max_items=settings.subschema_cache_max_items,
+            ttl_seconds=settings.subschema_cache_ttl_seconds,
+            similarity_threshold=settings.subschema_cache_similarity_threshold,
+        )
+    return _subschema_cache
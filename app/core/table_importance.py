@@ -0,0 +1,145 @@
+"""Table importance scores materialised once per schema version"""
+import asyncio
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.config import settings
+from app.core.schema_version import schema_version_tracker
+
+
+TABLE_DEGREE_QUERY = """
+MATCH (t:Table)
+OPTIONAL MATCH (t)-[r]-()
+WITH t, count(r) AS degree
+RETURN elementId(t) AS id,
+       t.db AS db,
+       t.name AS table_name,
+       t.schema AS schema,
+       t.description AS description,
+       degree
+"""
+
+FK_TABLE_EDGES_QUERY = """
+MATCH (t1:Table)-[:FK_TO_TABLE]->(t2:Table)
+RETURN elementId(t1) AS from_id, elementId(t2) AS to_id
+"""
+
+# (db, schema, table name), the identity of a Table node
+TableKey = Tuple[Optional[str], Optional[str], str]
+
+WRITE_IMPORTANCE_QUERY = """
+UNWIND $rows AS row
+MATCH (t:Table)
+WHERE elementId(t) = row.id
+SET t.importance_score = row.importance_score,
+    t.degree = row.degree,
+    t.fk_pagerank = row.fk_pagerank
+"""
+
+
+def compute_fk_pagerank(
+    node_ids: List[str],
+    edges: List[Tuple[str, str]],
+    damping: float = 0.85,
+    max_iterations: int = 100,
+    tolerance: float = 1e-8,
+) -> Dict[str, float]:
+    """PageRank over FK edges (referencing -> referenced), so widely referenced tables rank high"""
+    if not node_ids:
+        return {}
+    count = len(node_ids)
+    out_edges: Dict[str, List[str]] = {node_id: [] for node_id in node_ids}
+    for from_id, to_id in edges:
+        if from_id in out_edges and to_id in out_edges:
+            out_edges[from_id].append(to_id)
+
+    ranks = {node_id: 1.0 / count for node_id in node_ids}
+    for _ in range(max_iterations):
+        # Rank of tables without outgoing FKs is spread evenly over all tables
+        dangling = sum(ranks[node_id] for node_id, targets in out_edges.items() if not targets)
+        base = (1.0 - damping) / count + damping * dangling / count
+        next_ranks = {node_id: base for node_id in node_ids}
+        for node_id, targets in out_edges.items():
+            if targets:
+                share = damping * ranks[node_id] / len(targets)
+                for target in targets:
+                    next_ranks[target] += share
+        delta = sum(abs(next_ranks[node_id] - ranks[node_id]) for node_id in node_ids)
+        ranks = next_ranks
+        if delta < tolerance:
+            break
+    return ranks
+
+
+class TableImportanceStore:
+    """
+    In-process table importance map, recomputed only when the schema changes.
+
+    The search path only reads the graph. refresh(), run at ingest time and
+    from the schema admin endpoint, also writes the scores back to the Table
+    nodes (importance_score, degree, fk_pagerank) for graph queries and tools.
+    """
+
+    def __init__(self, metric: str = "degree"):
+        self.metric = metric
+        self.version: Optional[str] = None
+        self.scores: Dict[TableKey, Dict[str, Any]] = {}
+        self._lock = asyncio.Lock()
+
+    async def get_scores(self, session) -> Dict[TableKey, Dict[str, Any]]:
+        """Importance map keyed by (db, schema, table name) for the current schema version (read-only)"""
+        version = await schema_version_tracker.current(session)
+        if self.version != version:
+            async with self._lock:
+                if self.version != version:
+                    await self._refresh(session, version, persist=False)
+        return self.scores
+
+    async def refresh(self, session) -> Dict[TableKey, Dict[str, Any]]:
+        """Recompute and persist importance scores now"""
+        version = await schema_version_tracker.current(session)
+        async with self._lock:
+            await self._refresh(session, version, persist=True)
+        return self.scores
+
+    async def _refresh(self, session, version: str, persist: bool):
+        result = await session.run(TABLE_DEGREE_QUERY)
+        tables = await result.data()
+        result = await session.run(FK_TABLE_EDGES_QUERY)
+        edges = [(r["from_id"], r["to_id"]) for r in await result.data()]
+        pagerank = compute_fk_pagerank([t["id"] for t in tables], edges)
+
+        rows = []
+        for table in tables:
+            fk_pagerank = pagerank.get(table["id"], 0.0)
+            rows.append({
+                "id": table["id"],
+                "db": table.get("db"),
+                "table_name": table["table_name"],
+                "schema": table.get("schema"),
+                "description": table.get("description"),
+                "degree": table.get("degree", 0) or 0,
+                "fk_pagerank": fk_pagerank,
+                "importance_score": fk_pagerank if self.metric == "pagerank" else table.get("degree", 0) or 0,
+            })
+        if rows and persist:
+            result = await session.run(WRITE_IMPORTANCE_QUERY, rows=rows)
+            await result.consume()
+
+        rows.sort(key=lambda row: row["importance_score"], reverse=True)
+        scores: Dict[TableKey, Dict[str, Any]] = {}
+        for row in rows:
+            # Keyed like the Table node: the same name may exist in other schemas and databases
+            scores[(row["db"], row["schema"], row["table_name"])] = {
+                "db": row["db"],
+                "schema": row["schema"],
+                "table_name": row["table_name"],
+                "description": row["description"],
+                "importance_score": row["importance_score"],
+                "degree": row["degree"],
+                "fk_pagerank": row["fk_pagerank"],
+            }
+        self.scores, self.version = scores, version
+        print(f"✓ Table importance refreshed: {len(scores)} tables ({self.metric})")
+
+
+table_importance_store = TableImportanceStore(metric=settings.table_importance_metric)
@@ -0,0 +1,84 @@
+"""Bloom filters of normalised column values for reverse value -> column lookups"""
+import hashlib
+import math
+import re
+import struct
+import unicodedata
+from typing import List, Optional, Tuple
+
+
+_HEADER = struct.Struct("<QI")
+_QUOTED_PATTERN = re.compile(r"""['"“”‘’]([^'"“”‘’]{1,100})['"“”‘’]""")
+_TOKEN_PATTERN = re.compile(r"\w[\w\-./]*")
+
+
+def normalize_value(value) -> str:
+    """Case-folded NFKC text with collapsed whitespace, shared by profiling and lookups"""
+    return " ".join(unicodedata.normalize("NFKC", str(value)).casefold().split())
+
+
+def value_hashes(normalized: str) -> Tuple[int, int]:
+    """Two independent 64-bit hashes used for double hashing"""
+    digest = hashlib.blake2b(normalized.encode("utf-8"), digest_size=16).digest()
+    return int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little") | 1
+
+
+class BloomFilter:
+    """Bit array with k probe positions per value (Kirsch-Mitzenmacher double hashing)"""
+
+    __slots__ = ("num_bits", "num_hashes", "bits")
+
+    def __init__(self, num_bits: int, num_hashes: int, bits: Optional[bytearray] = None):
+        self.num_bits = max(8, num_bits)
+        self.num_hashes = max(1, num_hashes)
+        self.bits = bits if bits is not None else bytearray((self.num_bits + 7) // 8)
+
+    @classmethod
+    def for_capacity(cls, capacity: int, false_positive_rate: float) -> "BloomFilter":
+        """Filter sized for capacity values at the given false positive rate"""
+        capacity = max(1, capacity)
+        num_bits = math.ceil(-capacity * math.log(false_positive_rate) / (math.log(2) ** 2))
+        num_hashes = round(num_bits / capacity * math.log(2))
+        return cls(num_bits, num_hashes)
+
+    def _positions(self, hashes: Tuple[int, int]):
+        h1, h2 = hashes
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def add_hashes(self, hashes: Tuple[int, int]):
+        for position in self._positions(hashes):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def might_contain_hashes(self, hashes: Tuple[int, int]) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(hashes))
+
+    def add(self, value):
+        self.add_hashes(value_hashes(normalize_value(value)))
+
+    def __contains__(self, value) -> bool:
+        return self.might_contain_hashes(value_hashes(normalize_value(value)))
+
+    def to_bytes(self) -> bytes:
+        return _HEADER.pack(self.num_bits, self.num_hashes) + bytes(self.bits)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "BloomFilter":
+        num_bits, num_hashes = _HEADER.unpack_from(data)
+        return cls(num_bits, num_hashes, bytearray(data[_HEADER.size:]))
+
+
+def extract_literals(text: str, max_words: int = 3) -> List[str]:
+    """
+    Candidate literals of a question: quoted strings first, then runs of up to
+    max_words consecutive tokens, longest first.
+    """
+    literals: List[str] = [match.strip() for match in _QUOTED_PATTERN.findall(text or "")]
+    tokens = _TOKEN_PATTERN.findall(text or "")
+    for size in range(max_words, 0, -1):
+        for i in range(len(tokens) - size + 1):
+            literals.append(" ".join(tokens[i:i + size]))
+    return [
+        literal for literal in dict.fromkeys(literals)
+        if len(normalize_value(literal)) >= 2
+    ]
@@ -0,0 +1,483 @@
+"""Per-column dictionary of distinct values for in-memory keyword matching"""
+import asyncio
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from app.config import settings
+from app.core.db_registry import DEFAULT_DB_KEY
+from app.core.value_bloom import BloomFilter, extract_literals, normalize_value, value_hashes
+
+
+# Column types whose values are worth keeping in the dictionary
+PROFILED_DATA_TYPES = {
+    "text",
+    "character varying",
+    "character",
+    "citext",
+    "USER-DEFINED",
+}
+
+TEXT_COLUMNS_QUERY = """
+SELECT table_schema, table_name, column_name, data_type
+FROM information_schema.columns
+WHERE table_schema = $1
+  AND ($2::text[] IS NULL OR table_name = ANY($2::text[]))
+ORDER BY table_name, ordinal_position
+"""
+
+NGRAM_SIZE = 3
+
+
+def _quote(identifier: str) -> str:
+    return '"' + identifier.replace('"', '""') + '"'
+
+
+def _like_segments(keyword: str) -> Optional[List[str]]:
+    """
+    Literal runs of an ILIKE '%keyword%' pattern, or None when keyword has no wildcard.
+
+    '%' and '_' are wildcards and a backslash escapes the next character, exactly as
+    the database treats the keyword; a wildcard is returned as its own segment.
+    """
+    if "%" not in keyword and "_" not in keyword and "\\" not in keyword:
+        return None
+    segments: List[str] = []
+    literal: List[str] = []
+    chars = iter(keyword)
+    for char in chars:
+        if char == "\\":
+            literal.append(next(chars, ""))
+        elif char in "%_":
+            if literal:
+                segments.append("".join(literal))
+                literal = []
+            segments.append(char)
+        else:
+            literal.append(char)
+    if literal:
+        segments.append("".join(literal))
+    return segments
+
+
+# (db_key, schema, table, column)
+ColumnKey = Tuple[str, str, str, str]
+
+
+def _column_key(db_key: str, schema: Optional[str], table: str, column: str) -> ColumnKey:
+    return (db_key, (schema or "").lower(), table.lower(), column.lower())
+
+
+@dataclass
+class ColumnValueIndex:
+    """Distinct values of one column with a trigram index for substring lookups"""
+    values: List[str]
+    frequencies: List[int]
+    complete: bool
+    profiled_at: float
+    _lowered: List[str] = field(default_factory=list, repr=False)
+    _postings: Dict[str, Set[int]] = field(default_factory=dict, repr=False)
+
+    def __post_init__(self):
+        self._lowered = [value.lower() for value in self.values]
+        for value_id, value in enumerate(self._lowered):
+            for i in range(len(value) - NGRAM_SIZE + 1):
+                self._postings.setdefault(value[i:i + NGRAM_SIZE], set()).add(value_id)
+
+    def find(self, keyword: str) -> List[int]:
+        """Ids of values matching ILIKE '%keyword%', most frequent first"""
+        needle = keyword.lower()
+        segments = _like_segments(needle)
+        if segments is None:
+            literals = [needle]
+            matcher = lambda value: needle in value
+        else:
+            literals = [segment for segment in segments if segment not in ("%", "_")]
+            pattern = re.compile("".join(
+                ".*" if segment == "%" else "." if segment == "_" else re.escape(segment)
+                for segment in segments
+            ), re.DOTALL)
+            matcher = lambda value: pattern.search(value) is not None
+        grams = {
+            literal[i:i + NGRAM_SIZE]
+            for literal in literals
+            for i in range(len(literal) - NGRAM_SIZE + 1)
+        }
+        if not grams:
+            candidates = range(len(self._lowered))
+        else:
+            postings = sorted((self._postings.get(gram, set()) for gram in grams), key=len)
+            if not postings[0]:
+                return []
+            candidates = set.intersection(*postings)
+        matches = [value_id for value_id in candidates if matcher(self._lowered[value_id])]
+        matches.sort(key=lambda value_id: (-self.frequencies[value_id], self.values[value_id]))
+        return matches
+
+    def find_progressive(self, keyword: str) -> Tuple[str, List[str]]:
+        """
+        Same keyword sequence as the database search: trim from the end, then from the start.
+        Returns the first effective keyword with matches and the matching values.
+        """
+        tried: Set[str] = set()
+        candidates: List[str] = []
+        suffix_keyword = keyword
+        while True:
+            candidates.append(suffix_keyword)
+            if not suffix_keyword:
+                break
+            suffix_keyword = suffix_keyword[:-1]
+        prefix_keyword = keyword
+        while prefix_keyword:
+            prefix_keyword = prefix_keyword[1:]
+            candidates.append(prefix_keyword)
+
+        for candidate in candidates:
+            if candidate in tried:
+                continue
+            tried.add(candidate)
+            matches = self.find(candidate)
+            if matches:
+                return candidate, [self.values[value_id] for value_id in matches]
+        return "", []
+
+
+class ValueDictionary:
+    """
+    SQLite-backed store of (value, frequency) per profiled column, loaded into
+    an in-memory trigram index on first use. Columns are kept per registered
+    target database (db_key).
+    """
+
+    def __init__(self, path: str, max_memory_columns: int, max_age_seconds: float):
+        self.path = path
+        self.max_memory_columns = max(1, max_memory_columns)
+        self.max_age_seconds = max_age_seconds
+        self._memory: "OrderedDict[ColumnKey, Optional[ColumnValueIndex]]" = OrderedDict()
+        self._db_lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self._blooms: Optional[List[Tuple[ColumnKey, float, BloomFilter]]] = None
+        self.job: Dict[str, Any] = {"status": "idle"}
+        self.hits = 0
+        self.fallbacks = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._db is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            columns = [row[1] for row in self._db.execute("PRAGMA table_info(profiled_columns)")]
+            if columns and "db_key" not in columns:
+                # Profiles from before columns were kept per database are dropped and re-profiled
+                self._db.executescript(
+                    """
+                    DROP TABLE profiled_columns;
+                    DROP TABLE IF EXISTS column_values;
+                    DROP TABLE IF EXISTS column_blooms;
+                    """
+                )
+            self._db.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS profiled_columns (
+                    id INTEGER PRIMARY KEY,
+                    db_key TEXT NOT NULL,
+                    schema_name TEXT NOT NULL,
+                    table_name TEXT NOT NULL,
+                    column_name TEXT NOT NULL,
+                    complete INTEGER NOT NULL,
+                    profiled_at REAL NOT NULL,
+                    UNIQUE (db_key, schema_name, table_name, column_name)
+                );
+                CREATE TABLE IF NOT EXISTS column_values (
+                    column_id INTEGER NOT NULL,
+                    value TEXT NOT NULL,
+                    frequency INTEGER NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS column_values_column_idx ON column_values (column_id);
+                CREATE TABLE IF NOT EXISTS column_blooms (
+                    column_id INTEGER PRIMARY KEY,
+                    filter BLOB NOT NULL
+                );
+                """
+            )
+            self._db.commit()
+        return self._db
+
+    def _read_column(self, key: ColumnKey) -> Optional[ColumnValueIndex]:
+        db_key, schema, table, column = key
+        with self._db_lock:
+            db = self._connect()
+            if schema:
+                rows = db.execute(
+                    "SELECT id, complete, profiled_at FROM profiled_columns "
+                    "WHERE db_key = ? AND schema_name = ? AND table_name = ? AND column_name = ?",
+                    key,
+                ).fetchall()
+            else:
+                rows = db.execute(
+                    "SELECT id, complete, profiled_at FROM profiled_columns "
+                    "WHERE db_key = ? AND table_name = ? AND column_name = ?",
+                    (db_key, table, column),
+                ).fetchall()
+            # Without a schema the column must be unambiguous
+            if len(rows) != 1:
+                return None
+            column_id, complete, profiled_at = rows[0]
+            value_rows = db.execute(
+                "SELECT value, frequency FROM column_values WHERE column_id = ?",
+                (column_id,),
+            ).fetchall()
+        return ColumnValueIndex(
+            values=[value for value, _ in value_rows],
+            frequencies=[frequency for _, frequency in value_rows],
+            complete=bool(complete),
+            profiled_at=profiled_at,
+        )
+
+    def _read_blooms(self) -> List[Tuple[ColumnKey, float, BloomFilter]]:
+        with self._db_lock:
+            db = self._connect()
+            rows = db.execute(
+                "SELECT p.db_key, p.schema_name, p.table_name, p.column_name, p.profiled_at, b.filter "
+                "FROM column_blooms b JOIN profiled_columns p ON p.id = b.column_id"
+            ).fetchall()
+        return [
+            ((db_key, schema, table, column), profiled_at, BloomFilter.from_bytes(data))
+            for db_key, schema, table, column, profiled_at, data in rows
+        ]
+
+    def _write_column(
+        self,
+        key: ColumnKey,
+        values: List[Tuple[str, int]],
+        complete: bool,
+        bloom: Optional[BloomFilter] = None,
+    ):
+        with self._db_lock:
+            db = self._connect()
+            for table_name in ("column_values", "column_blooms"):
+                db.execute(
+                    f"DELETE FROM {table_name} WHERE column_id IN ("
+                    "SELECT id FROM profiled_columns "
+                    "WHERE db_key = ? AND schema_name = ? AND table_name = ? AND column_name = ?)",
+                    key,
+                )
+            db.execute(
+                "INSERT OR REPLACE INTO profiled_columns "
+                "(db_key, schema_name, table_name, column_name, complete, profiled_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (*key, int(complete), time.time()),
+            )
+            column_id = db.execute(
+                "SELECT id FROM profiled_columns "
+                "WHERE db_key = ? AND schema_name = ? AND table_name = ? AND column_name = ?",
+                key,
+            ).fetchone()[0]
+            db.executemany(
+                "INSERT INTO column_values (column_id, value, frequency) VALUES (?, ?, ?)",
+                [(column_id, value, frequency) for value, frequency in values],
+            )
+            if bloom is not None:
+                db.execute(
+                    "INSERT INTO column_blooms (column_id, filter) VALUES (?, ?)",
+                    (column_id, bloom.to_bytes()),
+                )
+            db.commit()
+
+    async def get_column(
+        self,
+        schema: Optional[str],
+        table: str,
+        column: str,
+        db_key: str = DEFAULT_DB_KEY,
+    ) -> Optional[ColumnValueIndex]:
+        """
+        In-memory index for a column, or None when the column has no usable
+        dictionary (never profiled, truncated, or older than the max age).
+        """
+        if not os.path.exists(self.path):
+            return None
+        key = _column_key(db_key, schema, table, column)
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            index = self._memory[key]
+        else:
+            index = await asyncio.to_thread(self._read_column, key)
+            self._memory[key] = index
+            while len(self._memory) > self.max_memory_columns:
+                self._memory.popitem(last=False)
+        if index is None or not index.complete:
+            return None
+        if time.time() - index.profiled_at > self.max_age_seconds:
+            return None
+        return index
+
+    async def profile_column(
+        self,
+        conn,
+        schema: str,
+        table: str,
+        column: str,
+        max_values: int,
+        db_key: str = DEFAULT_DB_KEY,
+    ) -> bool:
+        """Capture distinct values and frequencies of one column; returns whether it was complete"""
+        query = (
+            f"SELECT {_quote(column)}::text AS value, count(*) AS frequency "
+            f"FROM {_quote(schema)}.{_quote(table)} "
+            f"WHERE {_quote(column)} IS NOT NULL "
+            f"GROUP BY 1 ORDER BY 2 DESC, 1 "
+            f"LIMIT {max_values + 1}"
+        )
+        rows = await conn.fetch(query)
+        # More distinct values than we keep means matches could be missed, so the
+        # column is stored but marked incomplete and searched in the database.
+        complete = len(rows) <= max_values
+        values = [(row["value"], row["frequency"]) for row in rows[:max_values]]
+        if complete:
+            bloom = BloomFilter.for_capacity(len(values), settings.value_bloom_false_positive_rate)
+            for value, _ in values:
+                bloom.add(value)
+        else:
+            bloom = await self._stream_bloom(conn, schema, table, column)
+        key = _column_key(db_key, schema, table, column)
+        await asyncio.to_thread(self._write_column, key, values, complete, bloom)
+        self._memory.pop(key, None)
+        self._blooms = None
+        return complete
+
+    async def _stream_bloom(self, conn, schema: str, table: str, column: str) -> Optional[BloomFilter]:
+        """
+        Bloom filter over every distinct value of a column too large for the dictionary.
+        Columns above the configured cap get no filter rather than one with false negatives.
+        """
+        max_values = settings.value_bloom_max_values
+        bloom = BloomFilter.for_capacity(max_values, settings.value_bloom_false_positive_rate)
+        query = (
+            f"SELECT DISTINCT {_quote(column)}::text AS value "
+            f"FROM {_quote(schema)}.{_quote(table)} "
+            f"WHERE {_quote(column)} IS NOT NULL"
+        )
+        count = 0
+        async with conn.transaction():
+            async for row in conn.cursor(query, prefetch=10000):
+                count += 1
+                if count > max_values:
+                    return None
+                bloom.add(row["value"])
+        return bloom
+
+    async def columns_for_value(self, literal: str, db_key: str = DEFAULT_DB_KEY) -> List[Tuple[str, str, str]]:
+        """(schema, table, column) of profiled columns of db_key that may contain literal as a whole value"""
+        if not os.path.exists(self.path):
+            return []
+        if self._blooms is None:
+            self._blooms = await asyncio.to_thread(self._read_blooms)
+        normalized = normalize_value(literal)
+        if not normalized:
+            return []
+        hashes = value_hashes(normalized)
+        now = time.time()
+        return [
+            key[1:] for key, profiled_at, bloom in self._blooms
+            if key[0] == db_key
+            and now - profiled_at <= self.max_age_seconds
+            and bloom.might_contain_hashes(hashes)
+        ]
+
+    async def profile_schema(
+        self,
+        conn,
+        schema: str,
+        tables: Optional[List[str]] = None,
+        max_values: Optional[int] = None,
+        db_key: str = DEFAULT_DB_KEY,
+    ) -> Dict[str, Any]:
+        """Profile every text-like column of a schema of db_key (optionally limited to some tables)"""
+        max_values = max_values or settings.value_dictionary_max_values
+        rows = await conn.fetch(TEXT_COLUMNS_QUERY, schema, tables)
+        columns = [row for row in rows if row["data_type"] in PROFILED_DATA_TYPES]
+
+        self.job = {
+            "status": "running",
+            "db_key": db_key,
+            "schema": schema,
+            "columns_total": len(columns),
+            "columns_profiled": 0,
+            "columns_incomplete": 0,
+            "columns_failed": 0,
+            "started_at": time.time(),
+        }
+        for row in columns:
+            try:
+                complete = await self.profile_column(
+                    conn, row["table_schema"], row["table_name"], row["column_name"], max_values, db_key
+                )
+            except Exception as e:
+                self.job["columns_failed"] += 1
+                print(f"Value dictionary profiling failed for {row['table_name']}.{row['column_name']}: {e}")
+                continue
+            self.job["columns_profiled"] += 1
+            if not complete:
+                self.job["columns_incomplete"] += 1
+        self.job["status"] = "completed"
+        self.job["finished_at"] = time.time()
+        return self.job
+
+    async def value_hints(
+        self,
+        text: str,
+        max_columns: int,
+        limit: int,
+        db_key: str = DEFAULT_DB_KEY,
+    ) -> List[Tuple[str, List[Tuple[str, str, str]]]]:
+        """
+        Literals of a question with the columns that may hold them. Literals that
+        fit more than max_columns columns are too ambiguous to be useful and dropped;
+        words inside an already matched longer literal are skipped.
+        """
+        hints: List[Tuple[str, List[Tuple[str, str, str]]]] = []
+        matched: List[str] = []
+        for literal in extract_literals(text):
+            if len(hints) >= limit:
+                break
+            normalized = normalize_value(literal)
+            if any(normalized in longer for longer in matched):
+                continue
+            columns = await self.columns_for_value(literal, db_key)
+            if columns and len(columns) <= max_columns:
+                hints.append((literal, columns))
+                matched.append(normalized)
+        return hints
+
+    def stats(self) -> Dict[str, Any]:
+        """Lookup counters and profiling job state"""
+        return {
+            "memory_columns": len(self._memory),
+            "bloom_columns": len(self._blooms) if self._blooms is not None else None,
+            "hits": self.hits,
+            "fallbacks": self.fallbacks,
+            "job": self.job,
+        }
+
+
+_value_dictionary: Optional[ValueDictionary] = None
+
+
+def get_value_dictionary() -> Optional[ValueDictionary]:
+    """Process-wide value dictionary, or None when it is disabled"""
+    global _value_dictionary
+    if not settings.is_use_value_dictionary:
+        return None
+    if _value_dictionary is None:
+        _value_dictionary = ValueDictionary(
+            path=settings.value_dictionary_path,
+            max_memory_columns=settings.value_dictionary_memory_columns,
+            max_age_seconds=settings.value_dictionary_max_age_seconds,
+        )
+    return _value_dictionary
@@ -0,0 +1,272 @@
+"""In-process vector index over Table/Column embeddings"""
+import asyncio
+import contextlib
+import json
+import os
+import tempfile
+from dataclasses import dataclass, field
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.config import settings
+from app.core.schema_version import schema_version_tracker
+
+
+TABLE_VECTORS_QUERY = """
+MATCH (t:Table)
+WHERE t.vector IS NOT NULL AND size(t.vector) > 0
+RETURN t.name AS name,
+       t.schema AS schema,
+       t.db AS db,
+       t.description AS description,
+       t.vector AS vector
+"""
+
+COLUMN_VECTORS_QUERY = """
+MATCH (t:Table)-[:HAS_COLUMN]->(c:Column)
+WHERE c.vector IS NOT NULL AND size(c.vector) > 0
+RETURN c.name AS name,
+       t.name AS table_name,
+       t.schema AS table_schema,
+       t.db AS db,
+       c.dtype AS dtype,
+       c.description AS description,
+       c.nullable AS nullable,
+       c.vector AS vector
+"""
+
+# Rows are stored grouped by database; snapshots with another layout are rebuilt
+SNAPSHOT_LAYOUT = "grouped_by_db"
+
+
+def _db_order(record: Dict[str, Any]) -> Tuple[bool, str]:
+    db = record.get("db")
+    return db is not None, db or ""
+
+
+def _db_ranges(metadata: List[Dict[str, Any]]) -> Dict[Optional[str], Tuple[int, int]]:
+    """[start, end) row range of each database in metadata grouped by db"""
+    ranges: Dict[Optional[str], Tuple[int, int]] = {}
+    start = 0
+    for row in range(1, len(metadata) + 1):
+        if row == len(metadata) or metadata[row].get("db") != metadata[start].get("db"):
+            ranges[metadata[start].get("db")] = (start, row)
+            start = row
+    return ranges
+
+
+@dataclass
+class VectorPartition:
+    """Row-normalized embedding matrix plus the metadata of each row (grouped by db)"""
+    matrix: np.ndarray
+    metadata: List[Dict[str, Any]] = field(default_factory=list)
+    db_ranges: Dict[Optional[str], Tuple[int, int]] = field(init=False)
+
+    def __post_init__(self):
+        self.db_ranges = _db_ranges(self.metadata)
+
+    def top_k(self, query_embedding: List[float], k: int, db: Optional[str] = None) -> List[tuple]:
+        """
+        Return (row, score) pairs for the k most similar rows, scored like Neo4j cosine.
+        With db, only that database's contiguous rows are scored.
+        """
+        if k <= 0 or not self.metadata:
+            return []
+        start, end = (0, len(self.metadata)) if db is None else self.db_ranges.get(db, (0, 0))
+        if start == end:
+            return []
+        query = np.asarray(query_embedding, dtype=np.float32)
+        norm = float(np.linalg.norm(query))
+        if norm == 0.0 or query.shape[0] != self.matrix.shape[1]:
+            return []
+        cosine = self.matrix[start:end] @ (query / norm)
+        k = min(k, cosine.shape[0])
+        candidates = np.argpartition(-cosine, k - 1)[:k]
+        # Neo4j reports cosine similarity normalized to [0, 1]
+        return [(start + int(row), (1.0 + float(cosine[row])) / 2.0) for row in candidates]
+
+
+def _normalize_rows(vectors: List[List[float]], dimension: int, dtype: str) -> np.ndarray:
+    matrix = np.asarray(vectors, dtype=np.float32).reshape(len(vectors), dimension)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0.0] = 1.0
+    return np.ascontiguousarray(matrix / norms, dtype=dtype)
+
+
+class InProcessVectorIndex:
+    """
+    Answers top-k cosine queries for tables and columns from a local matrix.
+
+    Vectors are loaded from Neo4j once per schema version and persisted as a
+    snapshot that later processes memory-map instead of reloading from the graph.
+    """
+
+    def __init__(self, snapshot_dir: str, dtype: str = "float32"):
+        self.snapshot_dir = snapshot_dir
+        self.dtype = dtype
+        self.version: Optional[str] = None
+        self.tables: Optional[VectorPartition] = None
+        self.columns: Optional[VectorPartition] = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def is_ready(self) -> bool:
+        return self.tables is not None and self.columns is not None
+
+    async def ensure_fresh(self, session) -> bool:
+        """Reload the index if the schema graph changed; returns whether the index is usable"""
+        version = await schema_version_tracker.current(session)
+        if self.version == version and self.is_ready:
+            return True
+        async with self._lock:
+            if self.version == version and self.is_ready:
+                return True
+            if not await asyncio.to_thread(self._load_snapshot, version):
+                await self._rebuild(session, version)
+        return self.is_ready
+
+    async def _rebuild(self, session, version: str):
+        result = await session.run(TABLE_VECTORS_QUERY)
+        table_records = await result.data()
+        result = await session.run(COLUMN_VECTORS_QUERY)
+        column_records = await result.data()
+
+        dimension = settings.embedding_dimension
+        table_records = sorted(
+            (r for r in table_records if len(r["vector"]) == dimension), key=_db_order
+        )
+        column_records = sorted(
+            (r for r in column_records if len(r["vector"]) == dimension), key=_db_order
+        )
+
+        tables = VectorPartition(
+            matrix=_normalize_rows([r.pop("vector") for r in table_records], dimension, self.dtype),
+            metadata=table_records,
+        )
+        columns = VectorPartition(
+            matrix=_normalize_rows([r.pop("vector") for r in column_records], dimension, self.dtype),
+            metadata=column_records,
+        )
+        self.tables, self.columns, self.version = tables, columns, version
+        try:
+            await asyncio.to_thread(self._write_snapshot, version, tables, columns)
+        except OSError as e:
+            print(f"Vector index snapshot warning: {e}")
+
+    def _snapshot_path(self, name: str) -> str:
+        return os.path.join(self.snapshot_dir, name)
+
+    def _write_temp(self, prefix: str, suffix: str, write: Callable[[Any], None], mode: str = "wb") -> str:
+        """Write to a new uniquely named file in the snapshot directory and return its path"""
+        encoding = None if "b" in mode else "utf-8"
+        with tempfile.NamedTemporaryFile(
+            mode, dir=self.snapshot_dir, prefix=prefix, suffix=suffix, delete=False, encoding=encoding
+        ) as f:
+            try:
+                write(f)
+            except BaseException:
+                f.close()
+                os.unlink(f.name)
+                raise
+        return f.name
+
+    def _write_snapshot(self, version: str, tables: VectorPartition, columns: VectorPartition):
+        """
+        Arrays go to files unique to this snapshot and meta.json, replaced last,
+        names them, so concurrent writers never publish each other's arrays.
+        """
+        os.makedirs(self.snapshot_dir, exist_ok=True)
+        files = {
+            name: os.path.basename(self._write_temp(f"{name}-", ".npy", partial(np.save, arr=partition.matrix)))
+            for name, partition in (("tables", tables), ("columns", columns))
+        }
+        meta = {
+            "version": version,
+            "dtype": self.dtype,
+            "dimension": settings.embedding_dimension,
+            "layout": SNAPSHOT_LAYOUT,
+            "files": files,
+            "tables": tables.metadata,
+            "columns": columns.metadata,
+        }
+        previous = self._read_meta()
+        tmp_path = self._write_temp(
+            "meta-", ".json.tmp", lambda f: json.dump(meta, f, ensure_ascii=False), mode="w"
+        )
+        # meta.json is replaced last so a snapshot is only trusted once complete
+        os.replace(tmp_path, self._snapshot_path("meta.json"))
+        for name in (previous or {}).get("files", {}).values():
+            if name not in files.values():
+                with contextlib.suppress(OSError):
+                    os.unlink(self._snapshot_path(name))
+
+    def _read_meta(self) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._snapshot_path("meta.json"), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _load_snapshot(self, version: str) -> bool:
+        meta = self._read_meta()
+        if (
+            meta is None
+            or not isinstance(meta.get("files"), dict)
+            or 
+            meta.get("version") != version
+            or meta.get("dtype") != self.dtype
+            or meta.get("dimension") != settings.embedding_dimension
+            or meta.get("layout") != SNAPSHOT_LAYOUT
+        ):
+            return False
+        try:
+            tables = VectorPartition(
+                matrix=np.load(self._snapshot_path(meta["files"]["tables"]), mmap_mode="r"),
+                metadata=meta["tables"],
+            )
+            columns = VectorPartition(
+                matrix=np.load(self._snapshot_path(meta["files"]["columns"]), mmap_mode="r"),
+                metadata=meta["columns"],
+            )
+        except (KeyError, OSError, ValueError):
+            return False
+        if tables.matrix.shape[0] != len(tables.metadata) or columns.matrix.shape[0] != len(columns.metadata):
+            return False
+        self.tables, self.columns, self.version = tables, columns, version
+        return True
+
+    def query_tables(self, query_embedding: List[float], k: int, db: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Top-k table records (of one database when db is given), shaped and ordered like the table_vec_index query"""
+        records = [
+            {**self.tables.metadata[row], "score": score}
+            for row, score in self.tables.top_k(query_embedding, k, db)
+        ]
+        records.sort(key=lambda r: (-r["score"], r["schema"] or "", r["name"] or ""))
+        return records
+
+    def query_columns(self, query_embedding: List[float], k: int, db: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Top-k column records (of one database when db is given), shaped and ordered like the column_vec_index query"""
+        records = [
+            {**self.columns.metadata[row], "score": score}
+            for row, score in self.columns.top_k(query_embedding, k, db)
+        ]
+        records.sort(key=lambda r: (-r["score"], r["table_name"] or "", r["name"] or ""))
+        return records
+
+
+_vector_index: Optional[InProcessVectorIndex] = None
+
+
+def get_vector_index() -> Optional[InProcessVectorIndex]:
+    """Process-wide vector index, or None when the in-process index is disabled"""
+    global _vector_index
+    if not settings.is_use_in_process_vector_index:
+        return None
+    if _vector_index is None:
+        _vector_index = InProcessVectorIndex(
+            snapshot_dir=settings.vector_index_snapshot_dir,
+            dtype=settings.vector_index_dtype,
+        )
+    return _vector_index
@@ -1,6 +1,9 @@
 """Dependency injection for FastAPI"""
+import asyncio
 import os
-from typing import AsyncGenerator
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncGenerator, Dict
 from neo4j import AsyncGraphDatabase, AsyncDriver
 import asyncpg
 from openai import AsyncOpenAI
@@ -9,6 +12,8 @@ from langchain_core.globals import set_llm_cache
 
 
 from app.config import settings
+from app.core.db_registry import DEFAULT_DB_KEY, TargetDatabase, get_target_database
+from app.core.db_scheduler import ScheduledConnection, get_db_limiter
 
 
 def init_cache():
@@ -48,8 +53,158 @@ class Neo4jConnection:
         return self.driver.session(database=settings.neo4j_database)
 
 
+class TargetDBPool:
+    """Connection pool manager for one registered target database"""
+    
+    def __init__(self, db_key: str = DEFAULT_DB_KEY):
+        self.db_key = db_key
+        self.pool: asyncpg.Pool | None = None
+        self._lock = asyncio.Lock()
+        self._acquire_count = 0
+        self._acquire_timeouts = 0
+        self._acquire_wait_total_ms = 0.0
+        self._acquire_wait_max_ms = 0.0
+    
+    @property
+    def database(self) -> TargetDatabase:
+        return get_target_database(self.db_key)
+    
+    async def connect(self):
+        """Create the pool and warm up its minimum connections"""
+        database = self.database
+        async with self._lock:
+            if self.pool:
+                return
+            self.pool = await asyncpg.create_pool(
+                host=database.host,
+                port=database.port,
+                database=database.name,
+                user=database.user,
+                password=database.password,
+                min_size=database.pool_min_size,
+                max_size=database.pool_max_size,
+                max_inactive_connection_lifetime=settings.target_db_pool_max_inactive_lifetime_seconds,
+                statement_cache_size=settings.target_db_statement_cache_size,
+                server_settings=self.server_settings(database),
+            )
+        if settings.target_db_pool_warmup:
+            await self.warmup()
+    
+    async def close(self):
+        """Close all pooled connections"""
+        if self.pool:
+            await self.pool.close()
+            self.pool = None
+    
+    @staticmethod
+    def server_settings(database: TargetDatabase) -> Dict[str, str]:
+        """
+        Session defaults sent in the connection startup packet. Unlike settings made
+        with set_config(), they survive the RESET ALL the pool runs on every release.
+        """
+        server_settings = {"search_path": database.schema}
+        if database.read_only:
+            server_settings["default_transaction_read_only"] = "on"
+        return server_settings
+    
+    async def warmup(self):
+        """Check out min_size connections at once so they are open before traffic arrives"""
+        if not self.pool:
+            return
+        connections = await asyncio.gather(
+            *(self.pool.acquire() for _ in range(self.database.pool_min_size))
+        )
+        try:
+            await asyncio.gather(*(conn.fetchval("SELECT 1") for conn in connections))
+        finally:
+            for conn in connections:
+                await self.pool.release(conn)
+    
+    @asynccontextmanager
+    async def acquire(self, scheduled: bool = True) -> AsyncGenerator[asyncpg.Connection, None]:
+        """
+        Acquire a pooled connection, recording how long the caller waited.
+        
+        Statements on a scheduled connection go through the database's priority
+        limiter; unscheduled connections are for work that must not queue
+        behind user queries (health checks, cancelling runaway queries).
+        """
+        if not self.pool:
+            await self.connect()
+        wait_start = time.perf_counter()
+        try:
+            conn = await self.pool.acquire(
+                timeout=settings.target_db_pool_acquire_timeout_seconds
+            )
+        except asyncio.TimeoutError:
+            self._acquire_timeouts += 1
+            raise
+        wait_ms = (time.perf_counter() - wait_start) * 1000
+        self._acquire_count += 1
+        self._acquire_wait_total_ms += wait_ms
+        self._acquire_wait_max_ms = max(self._acquire_wait_max_ms, wait_ms)
+        limiter = get_db_limiter(self.db_key) if scheduled else None
+        try:
+            yield ScheduledConnection(conn, limiter) if limiter else conn
+        finally:
+            await self.pool.release(conn)
+    
+    def has_spare_connection(self) -> bool:
+        """True when acquire() can return without waiting for a release"""
+        if not self.pool:
+            return False
+        return self.pool.get_idle_size() > 0 or self.pool.get_size() < self.database.pool_max_size
+    
+    async def health_check(self) -> bool:
+        """Round-trip a trivial query through the pool"""
+        async with self.acquire(scheduled=False) as conn:
+            return await conn.fetchval("SELECT 1") == 1
+    
+    def stats(self) -> Dict[str, Any]:
+        """Pool size and acquire-wait metrics"""
+        avg_wait_ms = (
+            self._acquire_wait_total_ms / self._acquire_count
+            if self._acquire_count else 0.0
+        )
+        return {
+            "size": self.pool.get_size() if self.pool else 0,
+            "idle": self.pool.get_idle_size() if self.pool else 0,
+            "min_size": self.database.pool_min_size,
+            "max_size": self.database.pool_max_size,
+            "acquire_count": self._acquire_count,
+            "acquire_timeouts": self._acquire_timeouts,
+            "acquire_wait_avg_ms": round(avg_wait_ms, 3),
+            "acquire_wait_max_ms": round(self._acquire_wait_max_ms, 3),
+        }
+
+
+class TargetDBPools:
+    """One lazily created pool per registered target database"""
+    
+    def __init__(self):
+        self._pools: Dict[str, TargetDBPool] = {}
+    
+    def get(self, db_key: str | None = None) -> TargetDBPool:
+        """Pool of a registered database (raises UnknownDatabaseError)"""
+        database = get_target_database(db_key)
+        pool = self._pools.get(database.key)
+        if pool is None:
+            pool = TargetDBPool(database.key)
+            self._pools[database.key] = pool
+        return pool
+    
+    async def close(self):
+        for pool in self._pools.values():
+            await pool.close()
+    
+    def stats(self) -> Dict[str, Any]:
+        return {db_key: pool.stats() for db_key, pool in self._pools.items()}
+
+
 # Global instances
 neo4j_conn = Neo4jConnection()
+target_db_pools = TargetDBPools()
+target_db_pool = target_db_pools.get(DEFAULT_DB_KEY)
 openai_client = AsyncOpenAI(api_key=settings.openai_api_key)
 
 
@@ -63,18 +218,9 @@ async def get_neo4j_session():
 
 
 async def get_db_connection() -> AsyncGenerator[asyncpg.Connection, None]:
-    """FastAPI dependency for target database connection"""
-    conn = await asyncpg.connect(
-        host=settings.target_db_host,
-        port=settings.target_db_port,
-        database=settings.target_db_name,
-        user=settings.target_db_user,
-        password=settings.target_db_password,
-    )
-    try:
+    """FastAPI dependency for a pooled target database connection"""
+    async with target_db_pool.acquire() as conn:
         yield conn
-    finally:
-        await conn.close()
 
 
 async def get_openai_client():
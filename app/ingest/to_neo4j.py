@@ -29,6 +29,11 @@ class Neo4jSchemaLoader:
         
         return bool(value)
     
+    @staticmethod
+    def _column_fqn(db_name: str, schema: str, table_name: str, column_name: str) -> str:
+        """Column key: db.schema.table.column in lowercase, so equal names in other databases stay apart"""
+        return f"{db_name}.{schema}.{table_name}.{column_name}".lower()
+    
     async def setup_constraints_and_indexes(self):
         """Create Neo4j constraints and vector indexes"""
         queries = [
@@ -127,15 +132,14 @@ class Neo4jSchemaLoader:
         
         # Load columns
         for col, embedding in zip(columns, all_embeddings):
-            # fqn = f"{db_name}.{col['schema']}.{col['table_name']}.{col['name']}"
-            # Standardize FQN: schema.table.column in lowercase (no db prefix)
-            fqn = f"{col['schema']}.{col['table_name']}.{col['name']}".lower()
+            fqn = self._column_fqn(db_name, col["schema"], col["table_name"], col["name"])
             nullable = self._normalize_nullable(col.get("nullable"))
             
             query = """
             MATCH (t:Table {db: $db, schema: $schema, name: $table_name})
             MERGE (c:Column {fqn: $fqn})
-            SET c.vector = $vector,
+            SET c.db = $db,
+                c.vector = $vector,
                 c.name = $column_name,
                 c.dtype = $dtype,
                 c.description = $description,
@@ -163,11 +167,8 @@ class Neo4jSchemaLoader:
     async def load_foreign_keys(self, foreign_keys: List[Dict[str, Any]], db_name: str = "postgres"):
         """Load foreign key relationships"""
         for fk in foreign_keys:
-            # from_fqn = f"{db_name}.{fk['from_schema']}.{fk['from_table']}.{fk['from_column']}"
-            # to_fqn = f"{db_name}.{fk['to_schema']}.{fk['to_table']}.{fk['to_column']}"
-            # Use standardized FQN (no db prefix, lowercase)
-            from_fqn = f"{fk['from_schema']}.{fk['from_table']}.{fk['from_column']}".lower()
-            to_fqn = f"{fk['to_schema']}.{fk['to_table']}.{fk['to_column']}".lower()
+            from_fqn = self._column_fqn(db_name, fk["from_schema"], fk["from_table"], fk["from_column"])
+            to_fqn = self._column_fqn(db_name, fk["to_schema"], fk["to_table"], fk["to_column"])
             
             # Column-to-column FK
             query = """
@@ -209,9 +210,7 @@ class Neo4jSchemaLoader:
     async def load_primary_keys(self, primary_keys: List[Dict[str, Any]], db_name: str = "postgres"):
         """Mark primary key columns"""
         for pk in primary_keys:
-            # fqn = f"{db_name}.{pk['schema']}.{pk['table_name']}.{pk['column_name']}"
-            # Use standardized FQN (no db prefix, lowercase)
-            fqn = f"{pk['schema']}.{pk['table_name']}.{pk['column_name']}".lower()
+            fqn = self._column_fqn(db_name, pk["schema"], pk["table_name"], pk["column_name"])
             
             query = """
             MATCH (c:Column {fqn: $fqn})
@@ -228,11 +227,16 @@ class Neo4jSchemaLoader:
         print(f"Marked {len(primary_keys)} primary key columns")
     
     async def clear_schema(self, db_name: str = "postgres"):
-        """Clear existing schema data for a database"""
+        """Clear existing schema data for a database, leaving other databases' nodes alone"""
+        # Columns loaded before they carried a db are reached through this db's tables
         query = """
-        MATCH (n)
-        WHERE (n:Table OR n:Column) AND (n.db = $db OR n.db IS NULL)
-        DETACH DELETE n
+        MATCH (t:Table {db: $db})
+        OPTIONAL MATCH (t)-[:HAS_COLUMN]->(legacy:Column)
+        WHERE legacy.db IS NULL
+        DETACH DELETE legacy, t
+        WITH count(*) AS cleared
+        MATCH (c:Column {db: $db})
+        DETACH DELETE c
         """
         
         result = await self.session.run(query, db=db_name)
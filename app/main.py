@@ -1,11 +1,21 @@
 """FastAPI main application"""
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 
 from app.config import settings
-from app.deps import neo4j_conn
-from app.routers import ask, meta, feedback, ingest, react, vectorize
+from app.deps import neo4j_conn, target_db_pool, target_db_pools
+from app.core.admission import get_admission_controller
+from app.core.db_scheduler import get_db_scheduler_stats, priority_scope, route_priority
+from app.core.embedding import get_embedding_batcher_stats
+from app.core.embedding_cache import get_embedding_cache
+from app.core.query_governor import query_governor, query_scope
+from app.core.result_cache import get_result_cache
+from app.core.result_session import get_result_session_manager
+from app.core.sql_exec import single_flight
+from app.core.subschema_cache import get_subschema_cache
+from app.core.value_dictionary import get_value_dictionary
+from app.routers import ask, meta, feedback, ingest, react, vectorize, export, admin
 
 
 @asynccontextmanager
@@ -16,6 +26,18 @@ async def lifespan(app: FastAPI):
     await neo4j_conn.connect()
     print(f"✓ Connected to Neo4j at {settings.neo4j_uri}")
     print(f"✓ Target database: {settings.target_db_type}://{settings.target_db_host}:{settings.target_db_port}/{settings.target_db_name}")
+    try:
+        await target_db_pool.connect()
+        print(
+            f"✓ Target DB pool ready "
+            f"(min={settings.target_db_pool_min_size}, max={settings.target_db_pool_max_size})"
+        )
+    except Exception as e:
+        # Pool is created lazily on first request if the database is not reachable yet
+        print(f"⚠️  Target DB pool not initialized: {e}")
+    if settings.target_databases:
+        # Pools of the other registered databases open on first use
+        print(f"✓ Additional target databases: {', '.join(sorted(settings.target_databases))}")
     print(f"✓ Using LLM: {settings.openai_llm_model}")
     
     yield
@@ -24,6 +46,12 @@ async def lifespan(app: FastAPI):
     print("🛑 Shutting down...")
     await neo4j_conn.close()
     print("✓ Neo4j connection closed")
+    result_sessions = get_result_session_manager()
+    if result_sessions is not None:
+        # Sessions hold pooled connections open
+        await result_sessions.close_all()
+    await target_db_pools.close()
+    print("✓ Target DB pools closed")
 
 
 app = FastAPI(
@@ -58,6 +86,13 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def attribute_queries(request: Request, call_next):
+    """Tag database queries started while serving a request (shown by /admin/queries) and set their priority"""
+    with query_scope(f"{request.method} {request.url.path}"), priority_scope(route_priority(request.url.path)):
+        return await call_next(request)
+
+
 # Include routers
 app.include_router(ask.router)
 app.include_router(meta.router)
@@ -65,6 +100,8 @@ app.include_router(feedback.router)
 app.include_router(ingest.router)
 app.include_router(react.router)
 app.include_router(vectorize.router)
+app.include_router(export.router)
+app.include_router(admin.router)
 
 # Import and include schema editing router
 from app.routers import schema_edit
@@ -92,9 +129,12 @@ async def health_check():
         await result.single()
         await session.close()
         
+        target_db_status = "connected" if await target_db_pool.health_check() else "unhealthy"
+        
         return {
             "status": "healthy",
             "neo4j": "connected",
+            "target_db": target_db_status,
             "config": {
                 "llm_model": settings.openai_llm_model,
                 "embedding_model": settings.openai_embedding_model,
@@ -108,6 +148,31 @@ async def health_check():
         }
 
 
+@app.get("/metrics")
+async def metrics():
+    """Runtime metrics for connection pools and caches"""
+    embedding_cache = get_embedding_cache()
+    subschema_cache = get_subschema_cache()
+    value_dictionary = get_value_dictionary()
+    result_cache = get_result_cache()
+    admission_controller = get_admission_controller()
+    result_sessions = get_result_session_manager()
+    return {
+        "target_db_pool": target_db_pool.stats(),
+        "target_db_pools": target_db_pools.stats(),
+        "embedding_cache": embedding_cache.stats() if embedding_cache else None,
+        "embedding_batchers": get_embedding_batcher_stats(),
+        "subschema_cache": subschema_cache.stats() if subschema_cache else None,
+        "value_dictionary": value_dictionary.stats() if value_dictionary else None,
+        "result_cache": result_cache.stats() if result_cache else None,
+        "single_flight": single_flight.stats() if settings.is_use_single_flight else None,
+        "query_governor": query_governor.stats(),
+        "result_sessions": result_sessions.stats() if result_sessions else None,
+        "admission": admission_controller.stats() if admission_controller else None,
+        "db_scheduler": get_db_scheduler_stats() if settings.is_use_db_scheduler else None,
+    }
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
@@ -395,10 +395,14 @@ class ReactAgent:
         tool_name: str,
         parameters_el: ET.Element,
     ) -> Dict[str, Any]:
-        if tool_name in {"search_tables", "get_table_schema"}:
+        if tool_name in {"search_tables", "get_table_schema", "find_value_columns"}:
             text = (parameters_el.text or "").strip()
             keywords = self._parse_list_literal(text)
-            key = "keywords" if tool_name == "search_tables" else "table_names"
+            key = {
+                "search_tables": "keywords",
+                "get_table_schema": "table_names",
+                "find_value_columns": "values",
+            }[tool_name]
             return {key: keywords}
 
         if tool_name == "search_column_values":
@@ -5,6 +5,7 @@ from . import (
     search_tables as search_tables_tool,
     get_table_schema as get_table_schema_tool,
     search_column_values as search_column_values_tool,
+    find_value_columns as find_value_columns_tool,
     execute_sql_preview as execute_sql_preview_tool,
     explain as explain_tool,
 )
@@ -18,6 +19,7 @@ TOOL_HANDLERS = {
     "search_tables": search_tables_tool.execute,
     "get_table_schema": get_table_schema_tool.execute,
     "search_column_values": search_column_values_tool.execute,
+    "find_value_columns": find_value_columns_tool.execute,
     "execute_sql_preview": execute_sql_preview_tool.execute,
     "explain": explain_tool.execute,
 }
@@ -60,6 +62,10 @@ async def execute_tool(
             schema_name,
         )
 
+    if tool_name == "find_value_columns":
+        values: List[str] = parameters.get("values", [])
+        return await handler(context, values)
+
     if tool_name == "execute_sql_preview":
         sql_text = parameters.get("sql")
         if not sql_text:
@@ -12,11 +12,14 @@ class ToolContext:
     공용 툴 실행 컨텍스트.
 
     비동기 Neo4j 세션, 대상 DB 커넥션, OpenAI 클라이언트를 한 번에 전달한다.
+    neo4j_db 는 대상 DB 의 스키마 그래프 파티션 (Table/Column 노드의 db) 으로,
+    None 이면 모든 파티션을 검색한다.
     """
 
     neo4j_session: AsyncSession
     db_conn: asyncpg.Connection
     openai_client: AsyncOpenAI
+    neo4j_db: Optional[str] = None
 
     table_top_k: int = 20
     table_relation_limit: int = 20
@@ -54,6 +57,7 @@ class ToolContext:
             neo4j_session=self.neo4j_session,
             db_conn=self.db_conn,
             openai_client=self.openai_client,
+            neo4j_db=self.neo4j_db,
             table_top_k=table_top_k or self.table_top_k,
             table_relation_limit=table_relation_limit or self.table_relation_limit,
             column_relation_limit=column_relation_limit or self.column_relation_limit,
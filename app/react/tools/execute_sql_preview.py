@@ -1,5 +1,7 @@
+from contextlib import AsyncExitStack
 from typing import List
 
+from app.core.admission import ADMISSION_SAMPLE, AdmissionRejectedError, get_admission_controller
 from app.core.sql_exec import SQLExecutor, SQLExecutionError
 from app.core.sql_guard import SQLGuard, SQLValidationError
 from app.react.tools.context import ToolContext
@@ -22,11 +24,25 @@ async def execute(
 
     try:
         validated_sql, _ = guard.validate(sql)
-        results = await executor.execute_query(
-            context.db_conn, 
-            validated_sql,
-            timeout=float(context.max_sql_seconds),
-        )
+        admission_controller = get_admission_controller()
+        async with AsyncExitStack() as stack:
+            executed_sql = validated_sql
+            if admission_controller is not None:
+                admission = await stack.enter_async_context(
+                    admission_controller.admitted(context.db_conn, validated_sql)
+                )
+                executed_sql = admission.sql
+                if admission.action == ADMISSION_SAMPLE:
+                    # 표본 실행임을 알려 행 수/값을 전체 결과로 오해하지 않게 한다
+                    result_parts.append(
+                        f'<admission action="sample" sample_percent="{admission.sample_percent}">'
+                        f"{admission.reason}</admission>"
+                    )
+            results = await executor.execute_query(
+                context.db_conn, 
+                executed_sql,
+                timeout=float(context.max_sql_seconds),
+            )
 
         columns = results.get("columns", [])
         rows = results.get("rows", [])
@@ -50,6 +66,12 @@ async def execute(
         result_parts.append("</preview>")
     except (SQLValidationError, SQLExecutionError) as exc:
         result_parts.append(f"<error>{str(exc)}</error>")
+    except AdmissionRejectedError as exc:
+        # 예상 비용을 알려 에이전트가 더 가벼운 SQL 로 다시 시도하게 한다
+        result_parts.append(
+            f'<error estimated_cost="{exc.decision.estimated_cost}" '
+            f'estimated_rows="{exc.decision.estimated_rows}">{str(exc)}</error>'
+        )
     except Exception as exc:
         result_parts.append(f"<error>Unexpected error: {str(exc)}</error>")
 
@@ -0,0 +1,36 @@
+from typing import List
+
+from app.core.value_dictionary import get_value_dictionary
+from app.react.tools.context import ToolContext
+
+
+async def execute(
+    context: ToolContext,
+    values: List[str],
+) -> str:
+    """
+    리터럴 값이 들어 있을 수 있는 컬럼을 프로파일링 단계의 블룸 필터로 찾는다.
+    DB 조회 없이 메모리에서 판정하며, 결과는 "포함 가능" 이므로 search_column_values 로 확인한다.
+    """
+    values_limit = max(int(context.scaled(context.search_column_values_search_keywords_limit)), 1)
+    values = values[:values_limit]
+
+    result_parts: List[str] = ["<tool_result>"]
+    value_dictionary = get_value_dictionary()
+    if value_dictionary is None:
+        result_parts.append("<error>value dictionary is disabled</error>")
+        result_parts.append("</tool_result>")
+        return "\n".join(result_parts)
+
+    for value in values:
+        literal = "" if value is None else str(value)
+        columns = await value_dictionary.columns_for_value(literal)
+        result_parts.append(f'<value literal="{literal}" candidate_count="{len(columns)}">')
+        for schema, table, column in columns:
+            result_parts.append(
+                f'<column schema="{schema}" table="{table}" name="{column}"/>'
+            )
+        result_parts.append("</value>")
+
+    result_parts.append("</tool_result>")
+    return "\n".join(result_parts)
@@ -1,9 +1,9 @@
 import json
 from typing import Any, Dict, List, Optional, Tuple
 
-from app.core.sql_guard import SQLGuard
 from app.react.tools.context import ToolContext
-from app.react.tools.neo4j_utils import get_column_fk_relationships
+from app.react.tools.neo4j_utils import get_tables_column_fk_relationships
+from app.react.tools.value_sampler import ColumnSample, ColumnValueSampler
 
 
 def _split_table_identifier(name: str) -> Tuple[Optional[str], Optional[str]]:
@@ -36,28 +36,6 @@ def _build_schema_hints(table_names: List[str]) -> Dict[str, str]:
     return hints
 
 
-def _sanitize_identifier(identifier: Optional[str]) -> Optional[str]:
-    if not identifier:
-        return None
-    sanitized = SQLGuard.sanitize_identifier(str(identifier))
-    return sanitized or None
-
-
-def _quote_identifier(identifier: str) -> str:
-    parts = [part for part in identifier.split(".") if part]
-    if not parts:
-        return '""'
-    return ".".join(f'"{part}"' for part in parts)
-
-
-def _quote_table_identifier(table: str, schema: Optional[str]) -> str:
-    parts = []
-    if schema:
-        parts.extend(schema.split("."))
-    parts.append(table)
-    return ".".join(f'"{part}"' for part in parts if part)
-
-
 def _serialize_values(values: List[Any]) -> str:
     serializable: List[Any] = []
     for value in values:
@@ -70,83 +48,73 @@ def _serialize_values(values: List[Any]) -> str:
     return json.dumps(serializable, ensure_ascii=False)
 
 
-async def _fetch_table_columns(
+async def _fetch_tables_columns(
     conn,
-    table_name: Optional[str],
-    schema_hint: Optional[str],
-) -> Tuple[Optional[str], Dict[str, str]]:
-    table_param = str(table_name or "").strip()
-    if not table_param:
-        return schema_hint, {}
-
-    schema_param = str(schema_hint or "").strip()
-
-    if schema_param:
-        query = """
-        SELECT table_schema, column_name
-        FROM information_schema.columns
-        WHERE lower(table_name) = lower($1)
-          AND lower(table_schema) = lower($2)
-        ORDER BY ordinal_position
-        """
-        rows = await conn.fetch(query, table_param, schema_param)
-    else:
-        query = """
-        SELECT table_schema, column_name
-        FROM information_schema.columns
-        WHERE lower(table_name) = lower($1)
-        ORDER BY ordinal_position
-        """
-        rows = await conn.fetch(query, table_param)
-
-    if not rows:
-        return schema_hint, {}
-
-    column_map: Dict[str, str] = {}
+    table_requests: List[Tuple[str, Optional[str]]],
+) -> Dict[Tuple[str, str], Tuple[Optional[str], Dict[str, Tuple[str, str]]]]:
+    """
+    요청된 모든 테이블의 컬럼 목록을 information_schema 한 번 조회로 가져온다.
+
+    반환값은 (스키마 키, 테이블 키) 별 (확정된 스키마, {소문자 컬럼명: (실제 컬럼명, data_type)}) 이다.
+    """
+    table_params = sorted({
+        _normalize_lower(table_name)
+        for table_name, _ in table_requests
+        if _normalize_lower(table_name)
+    })
+    if not table_params:
+        return {}
+
+    query = """
+    SELECT table_schema, table_name, column_name, data_type
+    FROM information_schema.columns
+    WHERE lower(table_name) = ANY($1::text[])
+    ORDER BY table_schema, table_name, ordinal_position
+    """
+    rows = await conn.fetch(query, table_params)
+
+    rows_by_table: Dict[str, List[Any]] = {}
     for row in rows:
-        column_name = row["column_name"]
-        normalized_column = _normalize_lower(column_name)
-        if not column_name or not normalized_column:
-            continue
-        column_map[normalized_column] = column_name
+        rows_by_table.setdefault(_normalize_lower(row["table_name"]), []).append(row)
 
-    resolved_schema = schema_hint or rows[0]["table_schema"]
-    return resolved_schema, column_map
+    metadata: Dict[Tuple[str, str], Tuple[Optional[str], Dict[str, Tuple[str, str]]]] = {}
+    for table_name, schema_hint in table_requests:
+        normalized_table = _normalize_lower(table_name)
+        if not normalized_table:
+            continue
+        schema_key = _normalize_lower(schema_hint) or ""
+        table_rows = [
+            row
+            for row in rows_by_table.get(normalized_table, [])
+            if not schema_key or _normalize_lower(row["table_schema"]) == schema_key
+        ]
+        if not table_rows:
+            metadata[(schema_key, normalized_table)] = (schema_hint, {})
+            continue
 
+        column_map: Dict[str, Tuple[str, str]] = {}
+        for row in table_rows:
+            column_name = row["column_name"]
+            normalized_column = _normalize_lower(column_name)
+            if not column_name or not normalized_column:
+                continue
+            column_map[normalized_column] = (column_name, row["data_type"] or "")
 
-async def _fetch_column_values(
-    conn,
-    table_name: str,
-    column_name: str,
-    schema: Optional[str],
-    limit: int,
-) -> List[Any]:
-    sanitized_table = _sanitize_identifier(table_name)
-    sanitized_column = _sanitize_identifier(column_name)
-    sanitized_schema = _sanitize_identifier(schema) if schema else None
-
-    if not sanitized_table or not sanitized_column or limit <= 0:
-        return []
-
-    table_identifier = _quote_table_identifier(sanitized_table, sanitized_schema)
-    column_identifier = _quote_identifier(sanitized_column)
-
-    query = (
-        f"SELECT DISTINCT {column_identifier} AS value "
-        f"FROM {table_identifier} "
-        f"WHERE {column_identifier} IS NOT NULL "
-        f"ORDER BY {column_identifier} "
-        f"LIMIT {limit}"
-    )
-    rows = await conn.fetch(query)
-    return [row["value"] for row in rows if "value" in row]
+        resolved_schema = schema_hint or table_rows[0]["table_schema"]
+        metadata[(schema_key, normalized_table)] = (resolved_schema, column_map)
+    return metadata
 
 
 async def execute(
     context: ToolContext,
     table_names: List[str],
 ) -> str:
-    """Neo4j 에 저장된 테이블 스키마 정보를 조회한다."""
+    """
+    Neo4j 에 저장된 테이블 스키마 정보를 조회한다.
+
+    테이블/컬럼 수와 무관하게 Neo4j 2회, 대상 DB 2회 (+ 통계가 없는 테이블당 1회) 로 왕복 횟수를 제한한다.
+    샘플 값은 pg_stats 통계를 우선 사용하고, 값의 출처를 <values source="..."> 로 표시한다.
+    """
     get_table_schema_table_name_limit = max(int(context.scaled(context.get_table_schema_table_name_limit)), 1)
     table_names = table_names[:get_table_schema_table_name_limit]
 
@@ -158,14 +126,11 @@ async def execute(
         if name is not None
     ]
     schema_hints = _build_schema_hints(table_names)
-    db_metadata_cache: Dict[
-        Tuple[str, str],
-        Tuple[Optional[str], Dict[str, str]],
-    ] = {}
 
     query = """
     MATCH (t:Table)
     WHERE toLower(t.name) IN $normalized_table_names
+      AND ($db IS NULL OR t.db = $db)
     OPTIONAL MATCH (t)-[:HAS_COLUMN]->(c:Column)
     WITH t, c
     ORDER BY c.name
@@ -184,36 +149,74 @@ async def execute(
     result = await context.neo4j_session.run(
         query,
         normalized_table_names=normalized_table_names,
+        db=context.neo4j_db,
     )
     records = await result.data()
 
-    result_parts: List[str] = ["<tool_result>"]
+    def _schema_hint(record: Dict[str, Any]) -> Optional[str]:
+        normalized_table_name = _normalize_lower(record["table_name"])
+        schema_hint = record.get("table_schema", "") or schema_hints.get(normalized_table_name or "", "")
+        return schema_hint or None
 
-    for record in records:
-        table_name = record["table_name"]
-        table_schema = record.get("table_schema", "")
-        table_description = record.get("table_description", "")
-        columns = record["columns"]
+    # 대상 DB 컬럼 메타데이터와 컬럼 FK 정보는 모든 테이블에 대해 한 번씩만 조회한다.
+    db_metadata = await _fetch_tables_columns(
+        context.db_conn,
+        [(record["table_name"], _schema_hint(record)) for record in records],
+    )
+    column_fk_map = await get_tables_column_fk_relationships(
+        context.neo4j_session,
+        [record["table_name"] for record in records],
+        limit=column_relation_limit,
+        db=context.neo4j_db,
+    )
 
-        normalized_table_name = _normalize_lower(table_name)
-        schema_hint = table_schema or schema_hints.get(normalized_table_name or "", "")
-        schema_hint = schema_hint or None
-        metadata_key: Optional[Tuple[str, str]] = None
+    table_contexts: List[Tuple[Dict[str, Any], Optional[str], Dict[str, Tuple[str, str]]]] = []
+    for record in records:
+        normalized_table_name = _normalize_lower(record["table_name"])
+        schema_hint = _schema_hint(record)
         resolved_schema: Optional[str] = schema_hint
-        db_columns: Dict[str, str] = {}
+        db_columns: Dict[str, Tuple[str, str]] = {}
 
         if normalized_table_name:
             schema_key = _normalize_lower(schema_hint) or ""
-            metadata_key = (schema_key, normalized_table_name)
-            if metadata_key not in db_metadata_cache:
-                resolved_schema, db_columns = await _fetch_table_columns(
-                    context.db_conn,
-                    table_name,
-                    schema_hint,
-                )
-                db_metadata_cache[metadata_key] = (resolved_schema, db_columns)
-            else:
-                resolved_schema, db_columns = db_metadata_cache[metadata_key]
+            resolved_schema, db_columns = db_metadata.get(
+                (schema_key, normalized_table_name),
+                (schema_hint, {}),
+            )
+        table_contexts.append((record, resolved_schema, db_columns))
+
+    # 출력할 컬럼의 샘플 값은 모든 테이블에 대해 한 번에 수집한다.
+    value_samples: Dict[Tuple[Optional[str], str], Dict[str, ColumnSample]] = {}
+    sample_requests = [
+        (
+            resolved_schema,
+            record["table_name"],
+            list(dict.fromkeys(
+                db_columns[_normalize_lower(col["name"])]
+                for col in record["columns"]
+                if col["name"] and _normalize_lower(col["name"]) in db_columns
+            )),
+        )
+        for record, resolved_schema, db_columns in table_contexts
+        if db_columns
+    ]
+    if value_limit > 0 and sample_requests:
+        try:
+            value_samples = await ColumnValueSampler(context.db_conn).sample(
+                sample_requests,
+                value_limit,
+            )
+        except Exception:
+            value_samples = {}
+
+    result_parts: List[str] = ["<tool_result>"]
+
+    for record, resolved_schema, db_columns in table_contexts:
+        table_name = record["table_name"]
+        table_schema = record.get("table_schema", "")
+        table_description = record.get("table_description", "")
+        columns = record["columns"]
+        column_samples = value_samples.get((resolved_schema, table_name), {})
 
         result_parts.append("<table>")
         result_parts.append(f"<schema>{table_schema}</schema>")
@@ -263,12 +266,7 @@ async def execute(
             if col_description:
                 result_parts.append(f"<description>{col_description}</description>")
 
-            fk_relationships = await get_column_fk_relationships(
-                context.neo4j_session,
-                table_name,
-                col_name,
-                limit=column_relation_limit,
-            )
+            fk_relationships = column_fk_map.get((table_name, col_name), [])
             if fk_relationships:
                 fk_relationships = sorted(
                     fk_relationships,
@@ -301,26 +299,16 @@ async def execute(
                 result_parts.append("</foreign_keys>")
 
             normalized_column_name = _normalize_lower(col_name)
-            column_values: List[Any] = []
-            if (
-                value_limit > 0
-                and normalized_column_name
-                and normalized_column_name in db_columns
-            ):
-                actual_column_name = db_columns[normalized_column_name]
-                try:
-                    column_values = await _fetch_column_values(
-                        context.db_conn,
-                        table_name,
-                        actual_column_name,
-                        resolved_schema,
-                        value_limit,
-                    )
-                except Exception:
-                    column_values = []
-
-            if column_values:
-                result_parts.append(f"<values>{_serialize_values(column_values)}</values>")
+            column_sample: Optional[ColumnSample] = None
+            if normalized_column_name and normalized_column_name in db_columns:
+                actual_column_name, _ = db_columns[normalized_column_name]
+                column_sample = column_samples.get(actual_column_name)
+
+            if column_sample and column_sample.values:
+                result_parts.append(
+                    f'<values source="{column_sample.source}">'
+                    f"{_serialize_values(column_sample.values)}</values>"
+                )
             result_parts.append("</column>")
         result_parts.append("</columns>")
         result_parts.append("</table>")
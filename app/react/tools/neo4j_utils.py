@@ -1,7 +1,10 @@
-from typing import List, Dict, Any, Set
+from typing import List, Dict, Any, Optional, Set, Tuple
 
 from neo4j import AsyncSession
 
+from app.core.join_graph import get_join_graph_index
+from app.core.table_importance import table_importance_store
+
 
 RELATIONSHIP_RANKS = {
     "HAS_COLUMN → FK_TO → HAS_COLUMN": 100,
@@ -16,31 +19,12 @@ RELATIONSHIP_TYPE_MAP = {
 async def get_table_importance_scores(
     neo4j_session: AsyncSession,
 ) -> Dict[str, Dict[str, Any]]:
-    """Neo4j에서 모든 테이블의 중요도를 미리 계산한다."""
-    query = """
-    MATCH (t:Table)
-    OPTIONAL MATCH (t)-[r]-()
-    WITH t, count(r) AS total_relations
-    RETURN t.name AS table_name,
-           t.schema AS schema,
-           total_relations AS importance_score,
-           t.description AS description
-    ORDER BY importance_score DESC
     """
-
-    result = await neo4j_session.run(query)
-    records = await result.data()
-
-    importance_map: Dict[str, Dict[str, Any]] = {}
-    for record in records:
-        table_name = record["table_name"]
-        importance_map[table_name] = {
-            "schema": record.get("schema"),
-            "description": record.get("description"),
-            "importance_score": record.get("importance_score", 0),
-        }
-
-    return importance_map
+    모든 테이블의 중요도를 반환한다.
+    스키마 버전별로 한 번만 계산해 두고 이후 호출은 메모리에서 바로 조회한다.
+    그래프에는 쓰지 않는다 (노드 속성 저장은 인제스천/중요도 갱신 시점).
+    """
+    return await table_importance_store.get_scores(neo4j_session)
 
 
 async def get_table_fk_relationships(
@@ -69,22 +53,9 @@ async def get_table_fk_relationships(
     result = await neo4j_session.run(query, table_name=table_name, limit=limit)
     records = await result.data()
 
-    relationships: List[Dict] = []
-    for record in records:
-        rel_info: Dict = {
-            "related_table": record["related_table"],
-            "related_table_schema": record.get("related_table_schema"),
-            "relation_type": record["relation_type"],
-            "from_column": record.get("from_column"),
-            "to_column": record.get("to_column"),
-        }
-        if record.get("related_table_description"):
-            rel_info["related_table_description"] = record["related_table_description"]
-        if record.get("from_column_description"):
-            rel_info["from_column_description"] = record["from_column_description"]
-        if record.get("to_column_description"):
-            rel_info["to_column_description"] = record["to_column_description"]
-        relationships.append(rel_info)
+    relationships: List[Dict] = [
+        _fk_record_to_relationship(record) for record in records
+    ]
 
     if len(relationships) < limit:
         reverse_query = """
@@ -108,32 +79,11 @@ async def get_table_fk_relationships(
         )
         reverse_records = await reverse_result.data()
 
-        for record in reverse_records:
-            rel_info = {
-                "related_table": record["related_table"],
-                "related_table_schema": record.get("related_table_schema"),
-                "relation_type": record["relation_type"],
-                "from_column": record.get("from_column"),
-                "to_column": record.get("to_column"),
-            }
-            if record.get("related_table_description"):
-                rel_info["related_table_description"] = record["related_table_description"]
-            if record.get("from_column_description"):
-                rel_info["from_column_description"] = record["from_column_description"]
-            if record.get("to_column_description"):
-                rel_info["to_column_description"] = record["to_column_description"]
-            relationships.append(rel_info)
-
-    relationships.sort(
-        key=lambda r: (
-            r.get("related_table_schema") or "",
-            r.get("related_table") or "",
-            r.get("from_column") or "",
-            r.get("to_column") or "",
-            r.get("relation_type") or "",
+        relationships.extend(
+            _fk_record_to_relationship(record) for record in reverse_records
         )
-    )
-    return relationships
+
+    return _sort_fk_relationships(relationships)
 
 
 async def get_table_any_relationships(
@@ -183,69 +133,251 @@ async def get_table_any_relationships(
     return relationships
 
 
-async def get_table_relationship_details(
+def _fk_record_to_relationship(record: Dict[str, Any]) -> Dict:
+    """FK 조회 결과 레코드를 관계 정보 dict 로 변환한다."""
+    rel_info: Dict = {
+        "related_table": record["related_table"],
+        "related_table_schema": record.get("related_table_schema"),
+        "relation_type": record["relation_type"],
+        "from_column": record.get("from_column"),
+        "to_column": record.get("to_column"),
+    }
+    if record.get("related_table_description"):
+        rel_info["related_table_description"] = record["related_table_description"]
+    if record.get("from_column_description"):
+        rel_info["from_column_description"] = record["from_column_description"]
+    if record.get("to_column_description"):
+        rel_info["to_column_description"] = record["to_column_description"]
+    return rel_info
+
+
+def _sort_fk_relationships(relationships: List[Dict]) -> List[Dict]:
+    return sorted(
+        relationships,
+        key=lambda r: (
+            r.get("related_table_schema") or "",
+            r.get("related_table") or "",
+            r.get("from_column") or "",
+            r.get("to_column") or "",
+            r.get("relation_type") or "",
+        ),
+    )
+
+
+def _rank_additional_relationships(
+    fallback_candidates: List[Dict],
+    fk_related_tables: Set[str],
+    remaining_relationship_slots: int,
+) -> List[Dict[str, Any]]:
+    """FK 로 연결되지 않은 관계 후보를 경로 유형 점수로 정렬해 상위 항목만 남긴다."""
+    scored_candidates: List[Dict[str, Any]] = []
+    for candidate in fallback_candidates:
+        candidate_name = candidate.get("related_table")
+        relationship_paths = candidate.get("relationship_paths") or []
+        if (
+            not candidate_name
+            or candidate_name in fk_related_tables
+            or not relationship_paths
+        ):
+            continue
+
+        score = 0
+        relationship_type_labels: List[str] = []
+        seen_type_labels: Set[str] = set()
+        for path in relationship_paths:
+            score += RELATIONSHIP_RANKS.get(path, DEFAULT_RELATIONSHIP_SCORE)
+            type_label = RELATIONSHIP_TYPE_MAP.get(path)
+            if type_label and type_label not in seen_type_labels:
+                seen_type_labels.add(type_label)
+                relationship_type_labels.append(type_label)
+
+        scored_candidates.append(
+            {
+                "related_table": candidate_name,
+                "related_table_schema": candidate.get("related_table_schema"),
+                "related_table_description": candidate.get("related_table_description"),
+                "relationship_type": ", ".join(relationship_type_labels)
+                if relationship_type_labels
+                else None,
+                "score": score,
+            }
+        )
+
+    scored_candidates.sort(
+        key=lambda item: (-item["score"], item["related_table"])
+    )
+    return scored_candidates[:remaining_relationship_slots]
+
+
+async def get_tables_relationship_details(
     neo4j_session: AsyncSession,
-    table_name: str,
+    table_names: List[str],
     relation_limit: int,
-) -> Dict[str, List[Dict]]:
-    """특정 테이블과 연관된 FK 및 기타 관계 정보를 묶어서 반환한다."""
-    if relation_limit <= 0:
-        return {"fk_relationships": [], "additional_relationships": []}
+    db: Optional[str] = None,
+) -> Dict[str, Dict[str, List[Dict]]]:
+    """
+    여러 테이블의 FK 및 기타 관계 정보를 한 번의 쿼리로 조회한다.
+    조인 그래프가 활성화되어 있으면 스키마 버전별로 캐시된 메모리 그래프에서 바로 계산한다.
+    db 가 주어지면 그 스키마 그래프 파티션의 테이블만 본다.
+    테이블별 결과는 get_table_relationship_details 와 동일하다.
+    """
+    unique_table_names = list(dict.fromkeys(name for name in table_names if name))
+    if relation_limit <= 0 or not unique_table_names:
+        return {
+            name: {"fk_relationships": [], "additional_relationships": []}
+            for name in unique_table_names
+        }
 
-    fk_relationships = await get_table_fk_relationships(
-        neo4j_session,
-        table_name,
+    join_graph_index = get_join_graph_index()
+    if join_graph_index is not None:
+        join_graph = await join_graph_index.ensure_fresh(neo4j_session, db)
+        details: Dict[str, Dict[str, List[Dict]]] = {}
+        for table_name in unique_table_names:
+            forward, reverse = join_graph.fk_relationships(table_name, relation_limit)
+            any_relationships = []
+            if len(forward) + len(reverse) < relation_limit:
+                any_relationships = join_graph.any_relationships(table_name)
+            details[table_name] = _build_relationship_details(
+                forward, reverse, any_relationships, relation_limit
+            )
+        return details
+
+    query = """
+    UNWIND $table_names AS table_name
+    CALL {
+        WITH table_name
+        MATCH (t:Table {name: table_name})-[:HAS_COLUMN]->(c1:Column)-[:FK_TO]->(c2:Column)<-[:HAS_COLUMN]-(t2:Table)
+        WHERE $db IS NULL OR t.db = $db
+        WITH DISTINCT t2.name AS related_table,
+             t2.schema AS related_table_schema,
+             t2.description AS related_table_description,
+             'foreign_key' AS relation_type,
+             c1.name AS from_column,
+             c1.description AS from_column_description,
+             c2.name AS to_column,
+             c2.description AS to_column_description
+        ORDER BY related_table, from_column, to_column
+        LIMIT $limit
+        RETURN collect({
+            related_table: related_table,
+            related_table_schema: related_table_schema,
+            related_table_description: related_table_description,
+            relation_type: relation_type,
+            from_column: from_column,
+            from_column_description: from_column_description,
+            to_column: to_column,
+            to_column_description: to_column_description
+        }) AS forward_relationships
+    }
+    CALL {
+        WITH table_name
+        MATCH (t2:Table)-[:HAS_COLUMN]->(c2:Column)-[:FK_TO]->(c1:Column)<-[:HAS_COLUMN]-(t:Table {name: table_name})
+        WHERE $db IS NULL OR t.db = $db
+        WITH DISTINCT t2.name AS related_table,
+             t2.schema AS related_table_schema,
+             t2.description AS related_table_description,
+             'referenced_by' AS relation_type,
+             c1.name AS from_column,
+             c1.description AS from_column_description,
+             c2.name AS to_column,
+             c2.description AS to_column_description
+        ORDER BY related_table, from_column, to_column
+        LIMIT $limit
+        RETURN collect({
+            related_table: related_table,
+            related_table_schema: related_table_schema,
+            related_table_description: related_table_description,
+            relation_type: relation_type,
+            from_column: from_column,
+            from_column_description: from_column_description,
+            to_column: to_column,
+            to_column_description: to_column_description
+        }) AS reverse_relationships
+    }
+    WITH table_name,
+         forward_relationships,
+         reverse_relationships,
+         size(forward_relationships) + size(reverse_relationships) AS fk_count
+    CALL {
+        WITH table_name, fk_count
+        MATCH path = (t1:Table {name: table_name})-[*1..3]-(t2:Table)
+        WHERE fk_count < $limit AND t1 <> t2
+          AND ($db IS NULL OR (t1.db = $db AND t2.db = $db))
+        WITH t2,
+             collect(DISTINCT [rel IN relationships(path) | type(rel)]) AS relationship_paths
+        ORDER BY t2.name
+        LIMIT 100
+        RETURN collect({
+            related_table: t2.name,
+            related_table_schema: t2.schema,
+            related_table_description: COALESCE(t2.comment, t2.description, '설명 없음'),
+            relationship_paths: [path_types IN relationship_paths |
+                REDUCE(
+                    acc = '',
+                    rel IN path_types |
+                    CASE
+                        WHEN acc = '' THEN rel
+                        ELSE acc + ' → ' + rel
+                    END
+                )
+            ]
+        }) AS any_relationships
+    }
+    RETURN table_name, forward_relationships, reverse_relationships, any_relationships
+    """
+
+    result = await neo4j_session.run(
+        query,
+        table_names=unique_table_names,
         limit=relation_limit,
+        db=db,
     )
+    records = await result.data()
+
+    details: Dict[str, Dict[str, List[Dict]]] = {
+        name: {"fk_relationships": [], "additional_relationships": []}
+        for name in unique_table_names
+    }
+    for record in records:
+        details[record["table_name"]] = _build_relationship_details(
+            record.get("forward_relationships") or [],
+            record.get("reverse_relationships") or [],
+            record.get("any_relationships") or [],
+            relation_limit,
+        )
+
+    return details
+
+
+def _build_relationship_details(
+    forward_relationships: List[Dict[str, Any]],
+    reverse_relationships: List[Dict[str, Any]],
+    any_relationships: List[Dict[str, Any]],
+    relation_limit: int,
+) -> Dict[str, List[Dict]]:
+    """정방향/역방향 FK 와 기타 관계 후보를 relation_limit 에 맞춰 하나의 결과로 합친다."""
+    fk_relationships = [
+        _fk_record_to_relationship(item) for item in forward_relationships
+    ]
+    remaining_fk_slots = relation_limit - len(fk_relationships)
+    if remaining_fk_slots > 0:
+        fk_relationships.extend(
+            _fk_record_to_relationship(item)
+            for item in reverse_relationships[:remaining_fk_slots]
+        )
+    fk_relationships = _sort_fk_relationships(fk_relationships)
+
     fk_related_tables: Set[str] = {
         rel["related_table"] for rel in fk_relationships if rel.get("related_table")
     }
-
     remaining_relationship_slots = max(relation_limit - len(fk_relationships), 0)
     additional_relationships: List[Dict[str, Any]] = []
-
     if remaining_relationship_slots:
-        fallback_candidates = await get_table_any_relationships(
-            neo4j_session,
-            table_name,
-        )
-        scored_candidates: List[Dict[str, Any]] = []
-        for candidate in fallback_candidates:
-            candidate_name = candidate.get("related_table")
-            relationship_paths = candidate.get("relationship_paths") or []
-            if (
-                not candidate_name
-                or candidate_name in fk_related_tables
-                or not relationship_paths
-            ):
-                continue
-
-            score = 0
-            relationship_type_labels: List[str] = []
-            seen_type_labels: Set[str] = set()
-            for path in relationship_paths:
-                score += RELATIONSHIP_RANKS.get(path, DEFAULT_RELATIONSHIP_SCORE)
-                type_label = RELATIONSHIP_TYPE_MAP.get(path)
-                if type_label and type_label not in seen_type_labels:
-                    seen_type_labels.add(type_label)
-                    relationship_type_labels.append(type_label)
-
-            scored_candidates.append(
-                {
-                    "related_table": candidate_name,
-                    "related_table_schema": candidate.get("related_table_schema"),
-                    "related_table_description": candidate.get("related_table_description"),
-                    "relationship_type": ", ".join(relationship_type_labels)
-                    if relationship_type_labels
-                    else None,
-                    "score": score,
-                }
-            )
-
-        scored_candidates.sort(
-            key=lambda item: (-item["score"], item["related_table"])
+        additional_relationships = _rank_additional_relationships(
+            any_relationships,
+            fk_related_tables,
+            remaining_relationship_slots,
         )
-        additional_relationships = scored_candidates[:remaining_relationship_slots]
 
     return {
         "fk_relationships": fk_relationships,
@@ -253,6 +385,28 @@ async def get_table_relationship_details(
     }
 
 
+async def get_table_relationship_details(
+    neo4j_session: AsyncSession,
+    table_name: str,
+    relation_limit: int,
+    db: Optional[str] = None,
+) -> Dict[str, List[Dict]]:
+    """특정 테이블과 연관된 FK 및 기타 관계 정보를 묶어서 반환한다."""
+    if relation_limit <= 0:
+        return {"fk_relationships": [], "additional_relationships": []}
+
+    details = await get_tables_relationship_details(
+        neo4j_session,
+        [table_name],
+        relation_limit=relation_limit,
+        db=db,
+    )
+    return details.get(
+        table_name,
+        {"fk_relationships": [], "additional_relationships": []},
+    )
+
+
 async def get_column_fk_relationships(
     neo4j_session: AsyncSession,
     table_name: str,
@@ -280,21 +434,69 @@ async def get_column_fk_relationships(
     )
     records = await result.data()
 
-    fk_relationships: List[Dict] = []
-    for record in records:
-        fk_info: Dict = {
-            "referenced_table": record["referenced_table"],
-            "referenced_column": record["referenced_column"],
-        }
-        if record.get("referenced_table_schema"):
-            fk_info["referenced_table_schema"] = record["referenced_table_schema"]
-        if record.get("referenced_table_description"):
-            fk_info["referenced_table_description"] = record["referenced_table_description"]
-        if record.get("referenced_column_description"):
-            fk_info["referenced_column_description"] = record["referenced_column_description"]
-        if record.get("constraint_name"):
-            fk_info["constraint_name"] = record["constraint_name"]
-        fk_relationships.append(fk_info)
-
-    return fk_relationships
+    return [_column_fk_record_to_info(record) for record in records]
+
+
+async def get_tables_column_fk_relationships(
+    neo4j_session: AsyncSession,
+    table_names: List[str],
+    limit: int,
+    db: Optional[str] = None,
+) -> Dict[Tuple[str, str], List[Dict]]:
+    """
+    여러 테이블의 모든 컬럼 외래키 관계를 한 번의 쿼리로 조회한다.
+    (테이블명, 컬럼명) 별 결과는 get_column_fk_relationships 와 동일하다.
+    """
+    unique_table_names = list(dict.fromkeys(name for name in table_names if name))
+    if limit <= 0 or not unique_table_names:
+        return {}
+
+    query = """
+    UNWIND $table_names AS table_name
+    MATCH (t:Table {name: table_name})-[:HAS_COLUMN]->(c1:Column)-[fk:FK_TO]->(c2:Column)<-[:HAS_COLUMN]-(t2:Table)
+    WHERE $db IS NULL OR t.db = $db
+    WITH table_name, c1.name AS column_name, t2, c2, fk
+    ORDER BY t2.name, c2.name
+    WITH table_name, column_name, collect({
+        referenced_table: t2.name,
+        referenced_table_schema: t2.schema,
+        referenced_table_description: t2.description,
+        referenced_column: c2.name,
+        referenced_column_description: c2.description,
+        constraint_name: fk.constraint
+    })[..$limit] AS fk_records
+    RETURN table_name, column_name, fk_records
+    """
+
+    result = await neo4j_session.run(
+        query,
+        table_names=unique_table_names,
+        limit=limit,
+        db=db,
+    )
+    records = await result.data()
+
+    return {
+        (record["table_name"], record["column_name"]): [
+            _column_fk_record_to_info(item) for item in record.get("fk_records") or []
+        ]
+        for record in records
+    }
+
+
+def _column_fk_record_to_info(record: Dict[str, Any]) -> Dict:
+    """컬럼 FK 조회 결과 레코드를 외래키 정보 dict 로 변환한다."""
+    fk_info: Dict = {
+        "referenced_table": record["referenced_table"],
+        "referenced_column": record["referenced_column"],
+    }
+    if record.get("referenced_table_schema"):
+        fk_info["referenced_table_schema"] = record["referenced_table_schema"]
+    if record.get("referenced_table_description"):
+        fk_info["referenced_table_description"] = record["referenced_table_description"]
+    if record.get("referenced_column_description"):
+        fk_info["referenced_column_description"] = record["referenced_column_description"]
+    if record.get("constraint_name"):
+        fk_info["constraint_name"] = record["constraint_name"]
+    return fk_info
 
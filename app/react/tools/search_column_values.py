@@ -1,7 +1,8 @@
 import re
-from typing import List, Optional, Set, Tuple
+from typing import Any, Dict, List, Optional, Set, Tuple
 
 from app.core.sql_guard import SQLGuard
+from app.core.value_dictionary import get_value_dictionary
 from app.react.tools.context import ToolContext
 
 
@@ -84,37 +85,136 @@ def _row_sort_key(row) -> Tuple:
     )
 
 
-async def _fetch_rows_with_progressive_keyword(
-    context: ToolContext, query_sql: str, keyword: str
-) -> Tuple[str, List]:
-    """키워드를 뒤에서 제거하며 시도하고 실패 시 앞에서 제거하며 재시도한다."""
-    base_keyword = keyword or ""
-    tried_keywords: Set[str] = set()
-
-    suffix_keyword = base_keyword
+def _progressive_keyword_variants(keyword: str) -> List[str]:
+    """키워드를 뒤에서 줄인 후보, 이어서 앞에서 줄인 후보를 시도 순서대로 반환한다."""
+    variants: List[str] = []
+    suffix_keyword = keyword
     while True:
-        if suffix_keyword not in tried_keywords:
-            rows = await context.db_conn.fetch(query_sql, f"%{suffix_keyword}%")
-            tried_keywords.add(suffix_keyword)
-            if rows:
-                return suffix_keyword, rows
+        variants.append(suffix_keyword)
         if not suffix_keyword:
             break
         suffix_keyword = suffix_keyword[:-1]
 
-    prefix_keyword = base_keyword
+    prefix_keyword = keyword
     while prefix_keyword:
         prefix_keyword = prefix_keyword[1:]
-        if prefix_keyword in tried_keywords:
-            continue
-        rows = await context.db_conn.fetch(query_sql, f"%{prefix_keyword}%")
-        tried_keywords.add(prefix_keyword)
-        if rows:
-            return prefix_keyword, rows
-        if not prefix_keyword:
-            break
+        variants.append(prefix_keyword)
+
+    return list(dict.fromkeys(variants))
+
+
+_KEYWORD_INDEX_COLUMN = "__keyword_idx"
+_VARIANT_ORD_COLUMN = "__variant_ord"
+
+
+def _build_progressive_keyword_query(qualified_table: str, qualified_column: str, limit: int) -> str:
+    """
+    모든 키워드의 후보 패턴을 한 번에 평가하는 SQL.
+
+    키워드마다 후보를 시도 순서(step)대로 하나씩 재귀적으로 확인하고, 매칭 행이 있는
+    첫 후보에서 멈춘다 (이후 후보의 EXISTS 는 평가하지 않는다).
+    그 후보로 예시 행을 LATERAL 조회한다.
+    """
+    return f"""
+WITH RECURSIVE variants AS (
+    SELECT v.keyword_idx, v.pattern, v.ord,
+           row_number() OVER (PARTITION BY v.keyword_idx ORDER BY v.ord) AS step
+    FROM unnest($1::int[], $2::text[]) WITH ORDINALITY AS v(keyword_idx, pattern, ord)
+),
+attempts AS (
+    SELECT v.keyword_idx, v.pattern, v.ord, v.step,
+           EXISTS (
+               SELECT 1 FROM {qualified_table} WHERE {qualified_column}::text ILIKE v.pattern
+           ) AS hit
+    FROM variants v
+    WHERE v.step = 1
+    UNION ALL
+    SELECT v.keyword_idx, v.pattern, v.ord, v.step,
+           EXISTS (
+               SELECT 1 FROM {qualified_table} WHERE {qualified_column}::text ILIKE v.pattern
+           ) AS hit
+    FROM attempts a
+    JOIN variants v ON v.keyword_idx = a.keyword_idx AND v.step = a.step + 1
+    WHERE NOT a.hit
+),
+best AS (
+    SELECT keyword_idx, pattern, ord FROM attempts WHERE hit
+)
+SELECT best.keyword_idx AS "{_KEYWORD_INDEX_COLUMN}",
+       best.ord AS "{_VARIANT_ORD_COLUMN}",
+       matched.*
+FROM best
+CROSS JOIN LATERAL (
+    SELECT * FROM {qualified_table}
+    WHERE {qualified_column}::text ILIKE best.pattern
+    LIMIT {limit}
+) AS matched
+"""
+
+
+def _build_matched_values_query(qualified_table: str, qualified_column: str, limit: int) -> str:
+    """값 사전에서 찾은 키워드별 값 목록으로 키워드마다 예시 행을 한 번에 조회하는 SQL."""
+    return f"""
+WITH wanted AS (
+    SELECT w.keyword_idx, array_agg(w.value) AS matched_values
+    FROM unnest($1::int[], $2::text[]) AS w(keyword_idx, value)
+    GROUP BY w.keyword_idx
+)
+SELECT wanted.keyword_idx AS "{_KEYWORD_INDEX_COLUMN}",
+       matched.*
+FROM wanted
+CROSS JOIN LATERAL (
+    SELECT * FROM {qualified_table}
+    WHERE {qualified_column}::text = ANY(wanted.matched_values)
+    LIMIT {limit}
+) AS matched
+"""
+
+
+def _strip_helper_columns(row) -> Dict[str, Any]:
+    return {
+        key: value for key, value in row.items()
+        if key not in (_KEYWORD_INDEX_COLUMN, _VARIANT_ORD_COLUMN)
+    }
+
+
+async def _fetch_rows_with_progressive_keywords(
+    context: ToolContext,
+    qualified_table: str,
+    column: str,
+    keywords: List[str],
+    limit: int,
+) -> List[Tuple[str, List]]:
+    """
+    키워드를 뒤에서 제거하며 시도하고 실패 시 앞에서 제거하며 재시도한 결과를
+    모든 키워드에 대해 한 번의 조회로 구한다. 키워드 순서대로 (유효 키워드, 행) 을 반환한다.
+    """
+    if not keywords:
+        return []
+
+    keyword_indexes: List[int] = []
+    patterns: List[str] = []
+    variants: List[str] = []
+    for keyword_index, keyword in enumerate(keywords):
+        for variant in _progressive_keyword_variants(keyword or ""):
+            keyword_indexes.append(keyword_index)
+            patterns.append(f"%{variant}%")
+            variants.append(variant)
+
+    query_sql = _build_progressive_keyword_query(
+        qualified_table, _quote_identifier(column), limit
+    )
+    rows = await context.db_conn.fetch(query_sql, keyword_indexes, patterns)
 
-    return "", []
+    results: List[Tuple[str, List]] = [("", []) for _ in keywords]
+    for row in rows:
+        keyword_index = row[_KEYWORD_INDEX_COLUMN]
+        effective_keyword, keyword_rows = results[keyword_index]
+        if not keyword_rows:
+            effective_keyword = variants[row[_VARIANT_ORD_COLUMN] - 1]
+        keyword_rows.append(_strip_helper_columns(row))
+        results[keyword_index] = (effective_keyword, keyword_rows)
+    return results
 
 
 async def execute(
@@ -144,12 +244,43 @@ async def execute(
 
     qualified_table = _quote_table_identifier(sanitized_table, sanitized_schema)
 
-    def build_value_query(column: str) -> str:
-        qualified_column = _quote_identifier(column)
-        return (
-            f"SELECT * FROM {qualified_table} "
-            f"WHERE {qualified_column}::text ILIKE $1 LIMIT {value_limit}"
+    value_dictionary = get_value_dictionary()
+
+    async def fetch_keyword_rows(column: str, keywords: List[str]) -> List[Tuple[str, List]]:
+        """프로파일된 컬럼은 값 사전에서 매칭하고, 아니면 모든 키워드를 한 번의 SQL 로 매칭한다."""
+        column_index = None
+        if value_dictionary is not None:
+            column_index = await value_dictionary.get_column(sanitized_schema, sanitized_table, column)
+        if column_index is None:
+            if value_dictionary is not None:
+                value_dictionary.fallbacks += 1
+            return await _fetch_rows_with_progressive_keywords(
+                context, qualified_table, column, keywords, value_limit
+            )
+
+        value_dictionary.hits += 1
+        keyword_results: List[Tuple[str, List]] = [("", []) for _ in keywords]
+        keyword_indexes: List[int] = []
+        matched_values: List[str] = []
+        for keyword_index, keyword in enumerate(keywords):
+            effective_keyword, values = column_index.find_progressive(keyword)
+            if not values:
+                continue
+            keyword_results[keyword_index] = (effective_keyword, [])
+            keyword_indexes.extend([keyword_index] * len(values[:value_limit]))
+            matched_values.extend(values[:value_limit])
+        if not matched_values:
+            return keyword_results
+
+        # 키워드별로 찾은 값의 예시 행을 한 번의 조회로 가져온다
+        rows = await context.db_conn.fetch(
+            _build_matched_values_query(qualified_table, _quote_identifier(column), value_limit),
+            keyword_indexes,
+            matched_values,
         )
+        for row in rows:
+            keyword_results[row[_KEYWORD_INDEX_COLUMN]][1].append(_strip_helper_columns(row))
+        return keyword_results
 
     def open_rows_tag(
         *,
@@ -168,18 +299,18 @@ async def execute(
             attrs.append(f'fallback_from="{fallback_from}"')
         return f"<rows {' '.join(attrs)}>"
 
-    async def run_keyword_query(
-        column: str, normalized_keyword: str, fallback_from: Optional[str] = None
+    def append_keyword_rows(
+        column: str,
+        keyword: str,
+        effective_keyword: str,
+        query_rows: List,
+        fallback_from: Optional[str] = None,
     ) -> None:
-        query_sql = build_value_query(column)
-        effective_keyword, query_rows = await _fetch_rows_with_progressive_keyword(
-            context, query_sql, normalized_keyword
-        )
         query_rows = sorted(query_rows, key=_row_sort_key)
         result_parts.append(
             open_rows_tag(
                 row_type="query",
-                used_keyword=normalized_keyword,
+                used_keyword=keyword,
                 effective_keyword=effective_keyword,
                 resolved_column=column,
                 fallback_from=fallback_from,
@@ -201,6 +332,22 @@ async def execute(
             result_parts.append("</row>")
         result_parts.append("</rows>")
 
+    async def run_keyword_queries(
+        column: str, keywords: List[str], fallback_from: Optional[str] = None
+    ) -> None:
+        keyword_results = await fetch_keyword_rows(column, keywords)
+        for index, (keyword, (effective_keyword, query_rows)) in enumerate(
+            zip(keywords, keyword_results)
+        ):
+            # 대체 칼럼 표시는 기존처럼 처음 전환된 키워드에만 붙인다.
+            append_keyword_rows(
+                column,
+                keyword,
+                effective_keyword,
+                query_rows,
+                fallback_from=fallback_from if index == 0 else None,
+            )
+
     try:
         default_sql = f"SELECT * FROM {qualified_table} LIMIT {value_limit}"
         default_rows = await context.db_conn.fetch(default_sql)
@@ -226,46 +373,48 @@ async def execute(
         result_parts.append(f'<rows type="default"><error>{str(exc)}</error></rows>')
 
     active_column = sanitized_column
+    normalized_keywords = ["" if keyword is None else str(keyword) for keyword in search_keywords]
 
-    for keyword in search_keywords:
-        normalized_keyword = "" if keyword is None else str(keyword)
+    if normalized_keywords:
         try:
-            await run_keyword_query(active_column, normalized_keyword)
-            continue
+            await run_keyword_queries(active_column, normalized_keywords)
         except Exception as exc:
             hint_column = _extract_hint_column(exc, sanitized_table)
             fallback_column = None
             fallback_error_message: Optional[str] = None
+            resolved = False
 
             if hint_column and hint_column != active_column:
                 fallback_column = hint_column
                 try:
-                    await run_keyword_query(
+                    await run_keyword_queries(
                         fallback_column,
-                        normalized_keyword,
+                        normalized_keywords,
                         fallback_from=active_column if active_column else None,
                     )
                 except Exception as fallback_exc:
                     fallback_error_message = str(fallback_exc)
                 else:
                     active_column = fallback_column
-                    continue
-
-            error_lines = [str(exc)]
-            if fallback_column:
-                error_lines.append(f"[hint_column]={fallback_column}")
-            if fallback_error_message:
-                error_lines.append(f"[fallback_error]={fallback_error_message}")
-
-            result_parts.append(
-                open_rows_tag(
-                    row_type="query",
-                    used_keyword=normalized_keyword,
-                    resolved_column=active_column or sanitized_column or None,
-                )
-            )
-            result_parts.append(f"<error>{'\n'.join(error_lines)}</error>")
-            result_parts.append("</rows>")
+                    resolved = True
+
+            if not resolved:
+                error_lines = [str(exc)]
+                if fallback_column:
+                    error_lines.append(f"[hint_column]={fallback_column}")
+                if fallback_error_message:
+                    error_lines.append(f"[fallback_error]={fallback_error_message}")
+
+                for normalized_keyword in normalized_keywords:
+                    result_parts.append(
+                        open_rows_tag(
+                            row_type="query",
+                            used_keyword=normalized_keyword,
+                            resolved_column=active_column or sanitized_column or None,
+                        )
+                    )
+                    result_parts.append(f"<error>{'\n'.join(error_lines)}</error>")
+                    result_parts.append("</rows>")
 
     result_parts.append("</tool_result>")
     return "\n".join(result_parts)
@@ -1,11 +1,12 @@
-from typing import Any, Dict, List, Optional, Set
+from typing import Any, Dict, List, Optional, Set, Tuple
 
 from app.core.embedding import EmbeddingClient
 from app.core.graph_search import GraphSearcher, TableMatch
+from app.core.table_importance import TableKey
 from app.react.tools.context import ToolContext
 from app.react.tools.neo4j_utils import (
     get_table_importance_scores,
-    get_table_relationship_details,
+    get_tables_relationship_details,
 )
 
 
@@ -16,6 +17,8 @@ async def execute(
     """
     Neo4j 스키마 그래프에서 키워드와 유사한 테이블을 검색한다.
     결과는 prompt.xml 지시에 맞춰 XML 문자열로 반환한다.
+
+    키워드 수와 무관하게 벡터 검색 1회, 관계 조회 1회로 처리한다.
     """
     search_table_keyword_limit = max(int(context.scaled(context.search_table_keyword_limit)), 1)
     keywords = keywords[:search_table_keyword_limit]
@@ -26,20 +29,26 @@ async def execute(
 
     embedding_client = EmbeddingClient(context.openai_client)
     query_embeddings = await embedding_client.embed_batch(keywords)
-    searcher = GraphSearcher(context.neo4j_session)
+    searcher = GraphSearcher(context.neo4j_session, db=context.neo4j_db)
     importance_map = await get_table_importance_scores(context.neo4j_session)
     max_importance_score = max(
         (item.get("importance_score", 0) or 0) for item in importance_map.values()
     ) if importance_map else 0
 
-    result_parts: List[str] = ["<tool_result>"]
+    matches_per_keyword = await searcher.search_tables_batch(
+        query_embeddings,
+        k=table_fetch_limit,
+        query_texts=keywords,
+    )
+
     output_table_names: Set[str] = set()
 
     def _table_key(name: str, schema: Optional[str]) -> str:
         return f"{schema}.{name}" if schema else name
 
-    for keyword, embedding in zip(keywords, query_embeddings):
-        matches = await searcher.search_tables(embedding, k=table_fetch_limit)
+    # 키워드 순서대로 출력할 테이블을 먼저 확정한 뒤 관계 정보를 한 번에 조회한다.
+    keyword_outputs: List[Tuple[str, List[TableMatch]]] = []
+    for keyword, matches in zip(keywords, matches_per_keyword):
         filtered_matches = [
             match
             for match in matches
@@ -52,110 +61,131 @@ async def execute(
             max_importance_score,
         )
 
-        result_parts.append(f'<related_tables used_keyword="{keyword}">')
-
+        tables_to_output: List[TableMatch] = []
         for match in selected_matches:
             table_key = _table_key(match.name, match.schema)
             if table_key in output_table_names:
                 continue
+            tables_to_output.append(match)
+            output_table_names.add(table_key)
+        keyword_outputs.append((keyword, tables_to_output))
 
-            result_parts.append("<table>")
-            result_parts.append(f"<schema>{match.schema or ''}</schema>")
-            result_parts.append(f"<name>{match.name}</name>")
-            if match.description:
-                result_parts.append(f"<description>{match.description}</description>")
+    relationship_details_map = await get_tables_relationship_details(
+        context.neo4j_session,
+        [match.name for _, tables in keyword_outputs for match in tables],
+        relation_limit=relation_limit,
+        db=context.neo4j_db,
+    )
 
-            relationship_details = await get_table_relationship_details(
-                context.neo4j_session,
+    result_parts: List[str] = ["<tool_result>"]
+    for keyword, tables_to_output in keyword_outputs:
+        result_parts.append(f'<related_tables used_keyword="{keyword}">')
+        for match in tables_to_output:
+            relationship_details = relationship_details_map.get(
                 match.name,
-                relation_limit=relation_limit,
+                {"fk_relationships": [], "additional_relationships": []},
             )
+            result_parts.extend(_render_table(match, relationship_details))
+        result_parts.append("</related_tables>")
+
+    result_parts.append("</tool_result>")
+    return "\n".join(result_parts)
+
 
-            fk_relationships = relationship_details["fk_relationships"]
-            if fk_relationships:
-                fk_relationships = sorted(
-                    fk_relationships,
-                    key=lambda r: (
-                        r.get("related_table_schema") or "",
-                        r.get("related_table") or "",
-                        r.get("from_column") or "",
-                        r.get("to_column") or "",
-                        r.get("relation_type") or "",
-                    ),
+def _render_table(
+    match: TableMatch,
+    relationship_details: Dict[str, List[Dict]],
+) -> List[str]:
+    """테이블 하나와 관계 정보를 XML 조각으로 변환한다."""
+    result_parts: List[str] = ["<table>"]
+    result_parts.append(f"<schema>{match.schema or ''}</schema>")
+    result_parts.append(f"<name>{match.name}</name>")
+    if match.description:
+        result_parts.append(f"<description>{match.description}</description>")
+
+    fk_relationships = relationship_details["fk_relationships"]
+    if fk_relationships:
+        fk_relationships = sorted(
+            fk_relationships,
+            key=lambda r: (
+                r.get("related_table_schema") or "",
+                r.get("related_table") or "",
+                r.get("from_column") or "",
+                r.get("to_column") or "",
+                r.get("relation_type") or "",
+            ),
+        )
+        result_parts.append("<fk_relationships>")
+        for rel in fk_relationships:
+            result_parts.append("<fk_relationship>")
+            if "related_table_schema" in rel:
+                result_parts.append(
+                    f"<related_table_schema>{rel.get('related_table_schema') or ''}</related_table_schema>"
+                )
+            result_parts.append(f"<related_table>{rel['related_table']}</related_table>")
+            if rel.get("related_table_description"):
+                result_parts.append(
+                    f"<related_table_description>{rel['related_table_description']}</related_table_description>"
+                )
+            result_parts.append(f"<relation_type>{rel['relation_type']}</relation_type>")
+            if rel.get("from_column"):
+                result_parts.append(f"<from_column>{rel['from_column']}</from_column>")
+            if rel.get("from_column_description"):
+                result_parts.append(
+                    f"<from_column_description>{rel['from_column_description']}</from_column_description>"
                 )
-                result_parts.append("<fk_relationships>")
-                for rel in fk_relationships:
-                    result_parts.append("<fk_relationship>")
-                    if "related_table_schema" in rel:
-                        result_parts.append(
-                            f"<related_table_schema>{rel.get('related_table_schema') or ''}</related_table_schema>"
-                        )
-                    result_parts.append(f"<related_table>{rel['related_table']}</related_table>")
-                    if rel.get("related_table_description"):
-                        result_parts.append(
-                            f"<related_table_description>{rel['related_table_description']}</related_table_description>"
-                        )
-                    result_parts.append(f"<relation_type>{rel['relation_type']}</relation_type>")
-                    if rel.get("from_column"):
-                        result_parts.append(f"<from_column>{rel['from_column']}</from_column>")
-                    if rel.get("from_column_description"):
-                        result_parts.append(
-                            f"<from_column_description>{rel['from_column_description']}</from_column_description>"
-                        )
-                    if rel.get("to_column"):
-                        result_parts.append(f"<to_column>{rel['to_column']}</to_column>")
-                    if rel.get("to_column_description"):
-                        result_parts.append(
-                            f"<to_column_description>{rel['to_column_description']}</to_column_description>"
-                        )
-                    result_parts.append("</fk_relationship>")
-                result_parts.append("</fk_relationships>")
-
-            relationships_to_output = relationship_details["additional_relationships"]
-            if relationships_to_output:
-                relationships_to_output = sorted(
-                    relationships_to_output,
-                    key=lambda r: (
-                        r.get("related_table_schema") or "",
-                        r.get("related_table") or "",
-                    ),
+            if rel.get("to_column"):
+                result_parts.append(f"<to_column>{rel['to_column']}</to_column>")
+            if rel.get("to_column_description"):
+                result_parts.append(
+                    f"<to_column_description>{rel['to_column_description']}</to_column_description>"
                 )
-                result_parts.append("<relationships>")
-                for rel in relationships_to_output:
-                    result_parts.append("<relationship>")
-                    result_parts.append("<table>")
-                    result_parts.append(
-                        f"<schema>{rel.get('related_table_schema') or ''}</schema>"
-                    )
-                    result_parts.append(f"<name>{rel['related_table']}</name>")
-                    if rel.get("related_table_description"):
-                        result_parts.append(
-                            f"<description>{rel['related_table_description']}</description>"
-                        )
-                    if rel.get("relationship_type"):
-                        result_parts.append(
-                            f"<relationship_type>{rel['relationship_type']}</relationship_type>"
-                        )
-                    result_parts.append("</table>")
-                    result_parts.append("</relationship>")
-                result_parts.append("</relationships>")
+            result_parts.append("</fk_relationship>")
+        result_parts.append("</fk_relationships>")
 
+    relationships_to_output = relationship_details["additional_relationships"]
+    if relationships_to_output:
+        relationships_to_output = sorted(
+            relationships_to_output,
+            key=lambda r: (
+                r.get("related_table_schema") or "",
+                r.get("related_table") or "",
+            ),
+        )
+        result_parts.append("<relationships>")
+        for rel in relationships_to_output:
+            result_parts.append("<relationship>")
+            result_parts.append("<table>")
+            result_parts.append(
+                f"<schema>{rel.get('related_table_schema') or ''}</schema>"
+            )
+            result_parts.append(f"<name>{rel['related_table']}</name>")
+            if rel.get("related_table_description"):
+                result_parts.append(
+                    f"<description>{rel['related_table_description']}</description>"
+                )
+            if rel.get("relationship_type"):
+                result_parts.append(
+                    f"<relationship_type>{rel['relationship_type']}</relationship_type>"
+                )
             result_parts.append("</table>")
-            output_table_names.add(table_key)
-
-        result_parts.append("</related_tables>")
+            result_parts.append("</relationship>")
+        result_parts.append("</relationships>")
 
-    result_parts.append("</tool_result>")
-    return "\n".join(result_parts)
+    result_parts.append("</table>")
+    return result_parts
 
 
 def _select_table_matches(
     candidates: List[TableMatch],
     table_top_k: int,
-    importance_map: Dict[str, Dict[str, Any]],
+    importance_map: Dict[TableKey, Dict[str, Any]],
     max_importance_score: float,
 ) -> List[TableMatch]:
-    """table_top_k 절반은 유사도순, 나머지는 조화평균 점수 기반으로 선택한다."""
+    """
+    table_top_k 절반은 검색 순위(벡터+어휘 결합)순, 나머지는 코사인 유사도와
+    중요도의 조화평균 점수 기반으로 선택한다.
+    """
     if table_top_k <= 0 or not candidates:
         return []
 
@@ -189,7 +219,8 @@ def _select_table_matches(
     scored_candidates = []
     for candidate in remaining_candidates:
         importance_score = (
-            importance_map.get(candidate.name, {}).get("importance_score", 0) or 0
+            importance_map.get((candidate.db, candidate.schema, candidate.name), {}).get("importance_score", 0)
+            or 0
         )
         importance_norm = (
             importance_score / max_importance_score if max_importance_score else 0
@@ -0,0 +1,325 @@
+import logging
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.config import settings
+from app.core.sql_guard import SQLGuard
+
+logger = logging.getLogger(__name__)
+
+SOURCE_MOST_COMMON_VALUES = "pg_stats_mcv"
+SOURCE_HISTOGRAM = "pg_stats_histogram"
+SOURCE_TABLESAMPLE = "tablesample"
+SOURCE_SCAN = "scan"
+
+# DISTINCT/ORDER BY 가 불가능한 타입 (등호·정렬 연산자가 없음)
+NON_SORTABLE_DATA_TYPES = {
+    "json",
+    "xml",
+    "point",
+    "line",
+    "lseg",
+    "box",
+    "path",
+    "polygon",
+    "circle",
+}
+
+INTEGER_DATA_TYPES = {"smallint", "integer", "bigint"}
+FLOAT_DATA_TYPES = {"real", "double precision"}
+
+# 샘플 조회와 같은 대소문자 구분 이름으로 테이블을 찾는다 (인덱스·시퀀스 등은 제외).
+# 분할 테이블은 상속 통계만 가지므로 그 행을, 나머지는 테이블 자체 통계만 읽어 컬럼당 한 행이 되게 한다.
+COLUMN_STATS_QUERY = """
+SELECT req.ord,
+       s.most_common_vals::text::text[] AS most_common_vals,
+       s.histogram_bounds::text::text[] AS histogram_bounds,
+       c.reltuples
+FROM unnest($1::text[], $2::text[], $3::text[]) WITH ORDINALITY AS req(schemaname, tablename, attname, ord)
+LEFT JOIN pg_class c
+       ON c.oid = to_regclass(quote_ident(req.schemaname) || '.' || quote_ident(req.tablename))
+      AND c.relkind IN ('r', 'm', 'p', 'f')
+LEFT JOIN pg_namespace n ON n.oid = c.relnamespace
+LEFT JOIN pg_stats s
+       ON s.schemaname = n.nspname
+      AND s.tablename = c.relname
+      AND s.attname = req.attname
+      AND s.inherited = (c.relkind = 'p')
+"""
+
+
+@dataclass(slots=True)
+class ColumnSample:
+    """컬럼 샘플 값과 그 값을 얻은 경로"""
+
+    values: List[Any]
+    source: str
+
+
+def sanitize_identifier(identifier: Optional[str]) -> Optional[str]:
+    if not identifier:
+        return None
+    sanitized = SQLGuard.sanitize_identifier(str(identifier))
+    return sanitized or None
+
+
+def quote_identifier(identifier: str) -> str:
+    parts = [part for part in identifier.split(".") if part]
+    if not parts:
+        return '""'
+    return ".".join(f'"{part}"' for part in parts)
+
+
+def quote_table_identifier(table: str, schema: Optional[str]) -> str:
+    parts = []
+    if schema:
+        parts.extend(schema.split("."))
+    parts.append(table)
+    return ".".join(f'"{part}"' for part in parts if part)
+
+
+def _coerce_stat_value(value: Optional[str], data_type: str) -> Any:
+    """pg_stats 의 텍스트 값을 드라이버가 돌려주는 값과 같은 형태로 맞춘다."""
+    if value is None:
+        return None
+    normalized_type = (data_type or "").lower()
+    try:
+        if normalized_type in INTEGER_DATA_TYPES:
+            return int(value)
+        if normalized_type in FLOAT_DATA_TYPES:
+            return float(value)
+    except ValueError:
+        return value
+    if normalized_type == "boolean":
+        return value == "t"
+    return value
+
+
+def _parse_array_literal(literal: str) -> Any:
+    """PostgreSQL 배열의 텍스트 표현 ('{a,"b c",NULL}', 다차원 포함) 을 리스트로 되돌린다. 원소는 문자열로 둔다."""
+    stack: List[List[Any]] = []
+    result: Any = literal
+    index, length = 0, len(literal)
+    if literal.startswith("["):
+        # 하한이 1 이 아닌 배열의 차원 표기 ('[0:1]={a,b}')
+        index = literal.index("=") + 1
+    while index < length:
+        char = literal[index]
+        if char == "{":
+            stack.append([])
+            index += 1
+        elif char == "}":
+            finished = stack.pop()
+            if stack:
+                stack[-1].append(finished)
+            else:
+                result = finished
+            index += 1
+        elif char == ",":
+            index += 1
+        elif char == '"':
+            index += 1
+            chars = []
+            while literal[index] != '"':
+                if literal[index] == "\\":
+                    index += 1
+                chars.append(literal[index])
+                index += 1
+            stack[-1].append("".join(chars))
+            index += 1
+        else:
+            end = index
+            while literal[end] not in ",}":
+                end += 1
+            token = literal[index:end].strip()
+            stack[-1].append(None if token.upper() == "NULL" else token)
+            index = end
+    return result
+
+
+def _spread(values: List[Any], limit: int) -> List[Any]:
+    """정렬된 값 목록에서 전 구간을 고르게 대표하는 limit 개를 고른다."""
+    if len(values) <= limit:
+        return values
+    if limit == 1:
+        return [values[0]]
+    step = (len(values) - 1) / (limit - 1)
+    return [values[round(i * step)] for i in range(limit)]
+
+
+class ColumnValueSampler:
+    """
+    컬럼 샘플 값을 통계 우선으로 가져온다.
+
+    pg_stats 의 most_common_vals / histogram_bounds 를 한 번의 카탈로그 조회로 읽고,
+    통계가 없는 컬럼만 테이블당 한 번의 TABLESAMPLE (행 예산 제한) 조회로 채운다.
+    """
+
+    def __init__(self, conn, row_budget: Optional[int] = None):
+        self.conn = conn
+        self.row_budget = row_budget or settings.value_sample_row_budget
+
+    async def sample(
+        self,
+        tables: List[Tuple[Optional[str], str, List[Tuple[str, str]]]],
+        limit: int,
+    ) -> Dict[Tuple[Optional[str], str], Dict[str, ColumnSample]]:
+        """(스키마, 테이블, [(컬럼, data_type)]) 목록의 컬럼별 샘플 값을 반환한다."""
+        samples: Dict[Tuple[Optional[str], str], Dict[str, ColumnSample]] = {}
+        if limit <= 0:
+            return samples
+
+        requests: List[Tuple[Optional[str], str, str, str]] = []
+        for schema, table, columns in tables:
+            samples[(schema, table)] = {}
+            for column_name, data_type in columns:
+                if (data_type or "").lower() in NON_SORTABLE_DATA_TYPES:
+                    continue
+                requests.append((schema, table, column_name, data_type))
+        if not requests:
+            return samples
+
+        stats_rows = await self.conn.fetch(
+            COLUMN_STATS_QUERY,
+            [schema or "public" for schema, _, _, _ in requests],
+            [table for _, table, _, _ in requests],
+            [column for _, _, column, _ in requests],
+        )
+        stats_by_ord = {row["ord"]: row for row in stats_rows}
+
+        missing: Dict[Tuple[Optional[str], str], List[Tuple[str, str]]] = {}
+        reltuples: Dict[Tuple[Optional[str], str], Optional[float]] = {}
+        for ord_, (schema, table, column_name, data_type) in enumerate(requests, start=1):
+            row = stats_by_ord.get(ord_)
+            table_key = (schema, table)
+            reltuples[table_key] = row["reltuples"] if row else None
+            sample = self._sample_from_stats(row, data_type, limit) if row else None
+            if sample is not None:
+                samples[table_key][column_name] = sample
+            else:
+                missing.setdefault(table_key, []).append((column_name, data_type))
+
+        for (schema, table), columns in missing.items():
+            try:
+                samples[(schema, table)].update(
+                    await self._sample_table(schema, table, columns, limit, reltuples.get((schema, table)))
+                )
+            except Exception:
+                logger.warning("컬럼 값 샘플링 실패: %s.%s", schema, table, exc_info=True)
+        return samples
+
+    @staticmethod
+    def _sample_from_stats(row, data_type: str, limit: int) -> Optional[ColumnSample]:
+        if (data_type or "").upper() == "ARRAY":
+            return None
+        most_common_vals = [v for v in row["most_common_vals"] or [] if v is not None]
+        if most_common_vals:
+            return ColumnSample(
+                values=[_coerce_stat_value(v, data_type) for v in most_common_vals[:limit]],
+                source=SOURCE_MOST_COMMON_VALUES,
+            )
+        histogram_bounds = [v for v in row["histogram_bounds"] or [] if v is not None]
+        if histogram_bounds:
+            return ColumnSample(
+                values=[_coerce_stat_value(v, data_type) for v in _spread(histogram_bounds, limit)],
+                source=SOURCE_HISTOGRAM,
+            )
+        return None
+
+    async def _sample_table(
+        self,
+        schema: Optional[str],
+        table: str,
+        columns: List[Tuple[str, str]],
+        limit: int,
+        estimated_rows: Optional[float],
+    ) -> Dict[str, ColumnSample]:
+        """
+        통계가 없는 컬럼들을 행 예산 안에서 한 번의 SQL 로 샘플링한다.
+        묶은 SQL 이 실패하면 (컬럼 권한, 정렬 연산자가 없는 도메인/사용자 타입 등)
+        컬럼 묶음을 반씩 나눠 다시 조회해 나머지 컬럼의 값은 살린다.
+        재시도는 value_sample_fallback_max_queries 개의 SQL 까지만 하고, 남은 컬럼은 버린다.
+        """
+        sanitized_table = sanitize_identifier(table)
+        sanitized_schema = sanitize_identifier(schema) if schema else None
+        if not sanitized_table:
+            return {}
+        table_identifier = quote_table_identifier(sanitized_table, sanitized_schema)
+        sample_clause, source = self._sample_clause(estimated_rows)
+
+        sampled_columns: List[Tuple[str, str, bool]] = []
+        for column_name, data_type in columns:
+            sanitized_column = sanitize_identifier(column_name)
+            if not sanitized_column:
+                continue
+            is_array = (data_type or "").upper() == "ARRAY"
+            sampled_columns.append((column_name, quote_identifier(sanitized_column), is_array))
+        if not sampled_columns:
+            return {}
+
+        samples: Dict[str, ColumnSample] = {}
+        pending = [sampled_columns]
+        retries_left = settings.value_sample_fallback_max_queries
+        while pending:
+            group = pending.pop()
+            try:
+                samples.update(
+                    await self._sample_columns_batched(table_identifier, sample_clause, source, group, limit)
+                )
+            except Exception as exc:
+                if len(group) > 1 and retries_left >= 2:
+                    # 실패한 묶음을 반으로 나눠 다시 시도한다 (앞쪽 절반부터)
+                    middle = len(group) // 2
+                    pending.extend([group[middle:], group[:middle]])
+                    retries_left -= 2
+                else:
+                    logger.warning(
+                        "컬럼 값 샘플링 실패, 제외: %s (%s) - %s",
+                        table_identifier,
+                        ", ".join(name for name, _, _ in group),
+                        exc,
+                    )
+        return samples
+
+    def _sample_clause(self, estimated_rows: Optional[float]) -> Tuple[str, str]:
+        """reltuples 가 행 예산보다 크면 블록 단위 샘플링으로 읽는 양 자체를 줄인다."""
+        if estimated_rows and estimated_rows > self.row_budget:
+            percent = max(100.0 * self.row_budget / estimated_rows, 0.0001)
+            return f" TABLESAMPLE SYSTEM ({percent:.4f})", SOURCE_TABLESAMPLE
+        return "", SOURCE_SCAN
+
+    async def _sample_columns_batched(
+        self,
+        table_identifier: str,
+        sample_clause: str,
+        source: str,
+        columns: List[Tuple[str, str, bool]],
+        limit: int,
+    ) -> Dict[str, ColumnSample]:
+        # 배열 값은 차원이 달라 ARRAY(...) 로 묶을 수 없으므로 텍스트로 바꿔 묶고 돌려받은 뒤 다시 푼다.
+        select_items = [
+            f"ARRAY(SELECT DISTINCT {column_identifier}{'::text' if is_array else ''} "
+            f"FROM sample "
+            f"WHERE {column_identifier} IS NOT NULL "
+            f"ORDER BY 1 "
+            f"LIMIT {limit}) AS v{index}"
+            for index, (_, column_identifier, is_array) in enumerate(columns)
+        ]
+        query = (
+            f"WITH sample AS ("
+            f"SELECT {', '.join(dict.fromkeys(identifier for _, identifier, _ in columns))} "
+            f"FROM {table_identifier}{sample_clause} "
+            f"LIMIT {self.row_budget}"
+            f") "
+            f"SELECT {', '.join(select_items)}"
+        )
+        row = await self.conn.fetchrow(query)
+        if row is None:
+            return {}
+        samples: Dict[str, ColumnSample] = {}
+        for index, (column_name, _, is_array) in enumerate(columns):
+            values = list(row[f"v{index}"] or [])
+            if is_array:
+                values = [_parse_array_literal(value) for value in values]
+            samples[column_name] = ColumnSample(values=values, source=source)
+        return samples
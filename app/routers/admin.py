@@ -0,0 +1,40 @@
+"""Administration of queries running against the target database"""
+import secrets
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+
+from app.config import settings
+from app.core.query_governor import query_governor
+
+
+def require_admin_key(x_admin_key: Optional[str] = Header(default=None)):
+    """Admin endpoints require ADMIN_API_KEY in the X-Admin-Key header and are disabled without it"""
+    if not settings.admin_api_key:
+        raise HTTPException(status_code=403, detail="Admin API is disabled; set ADMIN_API_KEY to enable it")
+    if not secrets.compare_digest(x_admin_key or "", settings.admin_api_key):
+        raise HTTPException(status_code=403, detail="Invalid admin key")
+
+
+router = APIRouter(prefix="/admin", tags=["Admin"], dependencies=[Depends(require_admin_key)])
+
+
+@router.get("/queries")
+async def list_queries():
+    """Queries currently running on the target database, longest running first"""
+    queries = query_governor.list()
+    return {"count": len(queries), "queries": queries}
+
+
+@router.delete("/queries/{query_id}")
+async def kill_query(
+    query_id: str,
+    terminate: bool = Query(default=False, description="Terminate the backend session instead of cancelling the query"),
+):
+    """Cancel a running query (pg_cancel_backend) or end its session (pg_terminate_backend)"""
+    killed = await query_governor.kill(query_id, terminate=terminate)
+    if killed is None:
+        raise HTTPException(status_code=404, detail=f"Query not running: {query_id}")
+    if not killed:
+        raise HTTPException(status_code=503, detail="Cancel request could not be delivered; retry later")
+    return {"query_id": query_id, "cancelled": True, "terminated": terminate}
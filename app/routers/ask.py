@@ -1,15 +1,45 @@
 """Main /ask endpoint for natural language to SQL"""
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from pydantic import BaseModel, Field
-from typing import List, Dict, Any, Optional
+from contextlib import AsyncExitStack
+from functools import partial
+from typing import List, Dict, Any, Literal, Optional
 import time
 
-from app.deps import get_neo4j_session, get_db_connection, get_openai_client
+from app.config import settings
+from app.deps import get_neo4j_session, get_openai_client, neo4j_conn, target_db_pools
+from app.core.admission import (
+    ADMISSION_REJECT,
+    ADMISSION_SAMPLE,
+    AdmissionDecision,
+    AdmissionRejectedError,
+    get_admission_controller,
+)
+from app.core.db_registry import DEFAULT_DB_KEY, UnknownDatabaseError, get_target_database
+from app.core.db_scheduler import get_db_limiter
 from app.core.embedding import EmbeddingClient
 from app.core.graph_search import GraphSearcher, format_subschema_for_prompt
 from app.core.prompt import SQLChain
+from app.core.query_governor import ClientDisconnectedError, run_until_disconnected
+from app.core.result_encoding import (
+    ARROW_STREAM_MEDIA_TYPE,
+    RESULT_FORMAT_ARROW,
+    RESULT_FORMAT_ROWS,
+    ResultEncodingUnavailableError,
+    columnar_sample_rows,
+    encode_arrow_ipc,
+    ensure_arrow_available,
+    negotiate_result_format,
+)
+from app.core.result_session import (
+    ResultSessionConflictError,
+    ResultSessionExpiredError,
+    ResultSessionLimitError,
+    get_result_session_manager,
+)
 from app.core.sql_guard import SQLGuard, SQLValidationError
 from app.core.sql_exec import SQLExecutor, SQLExecutionError
+from app.core.value_dictionary import get_value_dictionary
 from app.core.viz import VizRecommender
 
 
@@ -19,10 +49,19 @@ router = APIRouter(prefix="/ask", tags=["Query"])
 class AskRequest(BaseModel):
     """Request model for /ask endpoint"""
     question: str = Field(..., description="Natural language question")
-    db_key: str = Field(default="default", description="Database identifier")
+    db_key: str = Field(default=DEFAULT_DB_KEY, description="Registered target database (TARGET_DATABASES)")
     visual_pref: Optional[List[str]] = Field(default=None, description="Preferred chart types")
     limit: Optional[int] = Field(default=1000, description="Row limit")
     include_explain: bool = Field(default=False, description="Include query execution plan")
+    result_format: Optional[Literal["rows", "columnar", "arrow"]] = Field(
+        default=None,
+        description="Result table encoding; defaults to the Accept header, then rows"
+    )
+    paginate: bool = Field(
+        default=False,
+        description="Return the first page of rows and a continuation token for the next (rows format only)"
+    )
+    page_size: Optional[int] = Field(default=None, description="Rows per page (defaults to SQL_ROW_LIMIT)")
 
 
 class ProvenanceInfo(BaseModel):
@@ -41,6 +80,7 @@ class PerformanceMetrics(BaseModel):
     llm_ms: float
     sql_ms: float
     total_ms: float
+    graph_search_stages: Optional[Dict[str, float]] = None
 
 
 class AskResponse(BaseModel):
@@ -51,13 +91,50 @@ class AskResponse(BaseModel):
     provenance: ProvenanceInfo
     perf: PerformanceMetrics
     warnings: Optional[List[str]] = None
+    admission: Optional[Dict[str, Any]] = None
+    continuation: Optional[Dict[str, Any]] = None
+
+
+class ResultPageResponse(BaseModel):
+    """Response model for a result page of a paginated /ask answer"""
+    table: Dict[str, Any]
+    continuation: Dict[str, Any]
+
+
+def _result_cache_headers(results: Dict[str, Any]) -> Dict[str, str]:
+    """X-Result-Cache / Age headers for results that went through the result cache"""
+    if "cached" not in results:
+        return {}
+    if not results["cached"]:
+        return {"X-Result-Cache": "MISS"}
+    return {"X-Result-Cache": "HIT", "Age": str(int(results["cache_age_seconds"] or 0))}
+
+
+async def _build_value_hints(question: str, subschema, db_key: str) -> str:
+    """Columns of the database whose profiled values may contain literals mentioned in the question"""
+    value_dictionary = get_value_dictionary()
+    if value_dictionary is None:
+        return ""
+    start = time.perf_counter()
+    hints = await value_dictionary.value_hints(
+        question,
+        max_columns=settings.value_hint_max_columns,
+        limit=settings.value_hint_limit,
+        db_key=db_key,
+    )
+    subschema.stage_timings["value_hint_ms"] = round((time.perf_counter() - start) * 1000, 2)
+    return "\n".join(
+        f"- '{literal}': " + ", ".join(f"{schema}.{table}.{column}" for schema, table, column in columns)
+        for literal, columns in hints
+    )
 
 
 @router.post("", response_model=AskResponse)
 async def ask_question(
     request: AskRequest,
+    http_request: Request,
+    response: Response,
     neo4j_session=Depends(get_neo4j_session),
-    db_conn=Depends(get_db_connection),
     openai_client=Depends(get_openai_client)
 ):
     """
@@ -69,6 +146,25 @@ async def ask_question(
     generated_sql: Optional[str] = None
     validated_sql: Optional[str] = None
 
+    try:
+        database = get_target_database(request.db_key)
+    except UnknownDatabaseError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+    result_format = negotiate_result_format(request.result_format, http_request.headers.get("accept"))
+    if result_format == RESULT_FORMAT_ARROW:
+        try:
+            ensure_arrow_available()
+        except ResultEncodingUnavailableError as e:
+            raise HTTPException(status_code=406, detail=str(e))
+
+    result_sessions = get_result_session_manager() if request.paginate else None
+    if request.paginate:
+        if result_sessions is None:
+            raise HTTPException(status_code=400, detail="Result pagination is disabled (IS_USE_RESULT_SESSIONS)")
+        if result_format != RESULT_FORMAT_ROWS:
+            raise HTTPException(status_code=400, detail="Paginated results are only returned as rows")
+
     try:
         # 1. Generate query embedding
         embed_start = time.time()
@@ -78,8 +174,12 @@ async def ask_question(
         
         # 2. Search Neo4j graph for relevant schema
         graph_start = time.time()
-        searcher = GraphSearcher(neo4j_session)
-        subschema = await searcher.build_subschema(query_embedding)
+        searcher = GraphSearcher(
+            neo4j_session,
+            session_factory=neo4j_conn.get_session,
+            db=database.neo4j_db,
+        )
+        subschema = await searcher.build_subschema(query_embedding, query_text=request.question)
         graph_search_ms = (time.time() - graph_start) * 1000
         
         if not subschema.tables:
@@ -92,6 +192,9 @@ async def ask_question(
         llm_start = time.time()
         schema_text = format_subschema_for_prompt(subschema)
         join_hints = "\n".join(subschema.join_hints) if subschema.join_hints else "No specific join hints."
+        value_hints = await _build_value_hints(request.question, subschema, database.key)
+        if value_hints:
+            join_hints = f"{join_hints}\n\nValue hints (literal -> columns that may contain it):\n{value_hints}"
         
         sql_chain = SQLChain()
         generated_sql = await sql_chain.generate_sql(
@@ -102,7 +205,8 @@ async def ask_question(
         llm_ms = (time.time() - llm_start) * 1000
         
         # 4. Validate SQL
-        sql_guard = SQLGuard()
+        # Paginated answers can be browsed up to SQL_MAX_ROWS rows instead of SQL_ROW_LIMIT
+        sql_guard = SQLGuard(max_limit=database.sql_max_rows if request.paginate else None)
         allowed_tables = [t.name for t in subschema.tables]
         
         try:
@@ -117,12 +221,69 @@ async def ask_question(
                 }
             )
         
-        # 5. Execute SQL
+        # 5. Admit and execute SQL
         sql_start = time.time()
-        executor = SQLExecutor()
+        executor = SQLExecutor(database=database)
+        admission_controller = get_admission_controller()
+        admission: Optional[AdmissionDecision] = None
+        continuation: Optional[Dict[str, Any]] = None
         
         try:
-            results = await executor.execute_query(db_conn, validated_sql)  # type: ignore[arg-type]
+            async with AsyncExitStack() as stack:
+                # Held only for admission and execution, not while the LLM writes the SQL
+                conn_scope = await stack.enter_async_context(AsyncExitStack())
+                db_conn = await conn_scope.enter_async_context(target_db_pools.get(database.key).acquire())
+                executed_sql = validated_sql
+                if admission_controller is not None:
+                    admission = await stack.enter_async_context(
+                        admission_controller.admitted(db_conn, validated_sql)
+                    )
+                    executed_sql = admission.sql
+                if result_sessions is not None:
+                    # The session keeps its own connection for the later pages, so give this
+                    # one back first (admission only needed it for EXPLAIN; its slot stays held)
+                    await conn_scope.aclose()
+                    session, results = await run_until_disconnected(
+                        http_request,
+                        result_sessions.open(
+                            partial(target_db_pools.get(database.key).acquire, scheduled=False),
+                            executed_sql,
+                            page_size=request.page_size,
+                            db_key=database.key,
+                            limiter=get_db_limiter(database.key),
+                            max_rows=database.sql_max_rows,
+                            timeout=database.sql_timeout_seconds,
+                        ),
+                    )
+                    continuation = result_sessions.continuation(session)
+                else:
+                    # A client that gives up should not leave its query running
+                    results = await run_until_disconnected(
+                        http_request,
+                        executor.execute_query(  # type: ignore[arg-type]
+                            db_conn,
+                            executed_sql,
+                            json_safe=True,
+                            columnar=result_format != RESULT_FORMAT_ROWS,
+                        ),
+                    )
+        except AdmissionRejectedError as e:
+            raise HTTPException(
+                status_code=422 if e.decision.action == ADMISSION_REJECT else 503,
+                detail={
+                    "message": str(e),
+                    "sql": validated_sql,
+                    "admission": e.decision.to_dict(),
+                }
+            )
+        except ClientDisconnectedError as e:
+            raise HTTPException(status_code=499, detail=str(e))
+        except ResultSessionLimitError as e:
+            raise HTTPException(
+                status_code=503,
+                detail={"message": str(e), "sql": validated_sql},
+                headers={"Retry-After": str(int(result_sessions.idle_timeout))},
+            )
         except SQLExecutionError as e:
             # Return the attempted SQL even on failure
             raise HTTPException(
@@ -134,12 +295,22 @@ async def ask_question(
             )
         
         sql_ms = (time.time() - sql_start) * 1000
+        if admission is not None and admission.action == ADMISSION_SAMPLE:
+            warnings.append(
+                f"Result is a preview over a {admission.sample_percent}% sample of each table "
+                f"because the full query is too expensive ({admission.reason})."
+            )
         
         # 6. Generate visualizations
         viz_recommender = VizRecommender()
+        if result_format == RESULT_FORMAT_ROWS:
+            chart_rows = results["rows"]
+        else:
+            # Chart inference only looks at the first rows (and whether there are more than 10)
+            chart_rows = columnar_sample_rows(results, 11)
         charts = viz_recommender.recommend_charts(
             columns=results["columns"],
-            rows=results["rows"]
+            rows=chart_rows
         )
         
         # Apply visual preferences if provided
@@ -167,19 +338,35 @@ async def ask_question(
             graph_search_ms=round(graph_search_ms, 2),
             llm_ms=round(llm_ms, 2),
             sql_ms=round(sql_ms, 2),
-            total_ms=round(total_ms, 2)
+            total_ms=round(total_ms, 2),
+            graph_search_stages=subschema.stage_timings or None
         )
         
-        # Format results for JSON
-        table_data = executor.format_results_for_json(results)
+        if result_format == RESULT_FORMAT_ARROW:
+            metadata = {
+                "sql": validated_sql,
+                "charts": charts,
+                "provenance": provenance.model_dump(),
+                "perf": perf.model_dump(),
+                "warnings": warnings or None,
+                "admission": admission.to_dict() if admission else None,
+            }
+            return Response(
+                content=encode_arrow_ipc(results, metadata),
+                media_type=ARROW_STREAM_MEDIA_TYPE,
+                headers=_result_cache_headers(results)
+            )
         
+        response.headers.update(_result_cache_headers(results))
         return AskResponse(
             sql=validated_sql,
-            table=table_data,
+            table=results,
             charts=charts,
             provenance=provenance,
             perf=perf,
-            warnings=warnings if warnings else None
+            warnings=warnings if warnings else None,
+            admission=admission.to_dict() if admission else None,
+            continuation=continuation
         )
         
     except HTTPException:
@@ -194,3 +381,42 @@ async def ask_question(
             }
         )
 
+
+
+@router.get("/results/{token}", response_model=ResultPageResponse)
+async def next_result_page(token: str, http_request: Request, page_size: Optional[int] = None):
+    """
+    Next page of a paginated /ask answer, read from the cursor held by its result session.
+    Each page's continuation token is only valid once; an idle session expires (410).
+    """
+    result_sessions = get_result_session_manager()
+    if result_sessions is None:
+        raise HTTPException(status_code=400, detail="Result pagination is disabled (IS_USE_RESULT_SESSIONS)")
+    try:
+        session, page = await run_until_disconnected(
+            http_request, result_sessions.next_page(token, page_size)
+        )
+    except ResultSessionExpiredError as e:
+        raise HTTPException(status_code=410, detail=str(e))
+    except ResultSessionConflictError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ClientDisconnectedError as e:
+        raise HTTPException(status_code=499, detail=str(e))
+    except SQLExecutionError as e:
+        raise HTTPException(status_code=500, detail=f"SQL execution failed: {str(e)}")
+    return ResultPageResponse(table=page, continuation=result_sessions.continuation(session))
+
+
+@router.delete("/results/{token}")
+async def close_result_session(token: str):
+    """Release a result session before it expires"""
+    result_sessions = get_result_session_manager()
+    if result_sessions is None:
+        raise HTTPException(status_code=400, detail="Result pagination is disabled (IS_USE_RESULT_SESSIONS)")
+    try:
+        closed = await result_sessions.close(token)
+    except ResultSessionExpiredError as e:
+        raise HTTPException(status_code=410, detail=str(e))
+    if not closed:
+        raise HTTPException(status_code=410, detail="Result session expired or closed")
+    return {"closed": True}
@@ -0,0 +1,69 @@
+"""Streaming export of query results"""
+from typing import Literal
+
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+
+from app.config import settings
+from app.core.sql_export import (
+    EXPORT_MEDIA_TYPES,
+    ExportUnavailableError,
+    bounded_stream,
+    get_exporter,
+)
+from app.core.db_registry import DEFAULT_DB_KEY, UnknownDatabaseError, get_target_database
+from app.core.sql_guard import SQLGuard, SQLValidationError
+from app.deps import target_db_pools
+
+
+router = APIRouter(prefix="/export", tags=["Export"])
+
+
+class ExportRequest(BaseModel):
+    """Request model for /export endpoint"""
+    sql: str = Field(..., description="SELECT statement to export")
+    format: Literal["csv", "parquet"] = Field(default="csv", description="Output format")
+    filename: str = Field(default="export", description="Download file name without extension")
+    db_key: str = Field(default=DEFAULT_DB_KEY, description="Registered target database to export from")
+
+
+@router.post("")
+async def export_query(request: ExportRequest):
+    """
+    Stream the full result of a validated SELECT as a file download.
+
+    Unlike /ask, no LIMIT is imposed; rows flow from PostgreSQL to the client
+    in chunks, and a slow client slows the database read instead of growing memory.
+    """
+    try:
+        database = get_target_database(request.db_key)
+    except UnknownDatabaseError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+    try:
+        validated_sql, _ = SQLGuard().validate(request.sql, enforce_limit=False)
+    except SQLValidationError as e:
+        raise HTTPException(status_code=400, detail=f"SQL validation failed: {str(e)}")
+
+    try:
+        exporter = get_exporter(request.format)
+    except ExportUnavailableError as e:
+        raise HTTPException(status_code=501, detail=str(e))
+
+    async def produce(sink):
+        # The connection is acquired here rather than through Depends: request
+        # dependencies are released before a streaming body is sent.
+        async with target_db_pools.get(database.key).acquire() as conn:
+            summary = await exporter.produce(conn, validated_sql, sink)
+        print(
+            f"✓ Export completed: {summary['format']} rows={summary['rows']} "
+            f"bytes={summary['bytes']} in {summary['elapsed_ms']}ms"
+        )
+
+    filename = "".join(ch for ch in request.filename if ch.isalnum() or ch in "-_") or "export"
+    return StreamingResponse(
+        bounded_stream(produce, settings.export_queue_max_chunks),
+        media_type=EXPORT_MEDIA_TYPES[request.format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{request.format}"'},
+    )
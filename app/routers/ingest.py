@@ -1,12 +1,16 @@
 """Schema ingestion endpoint"""
 from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
 
-from app.deps import get_neo4j_session, get_db_connection, get_openai_client
+from app.deps import get_neo4j_session, get_openai_client, target_db_pools
 from app.ingest.ddl_extract import SchemaExtractor
 from app.ingest.to_neo4j import Neo4jSchemaLoader
+from app.core.db_registry import DEFAULT_DB_KEY, TargetDatabase, UnknownDatabaseError, get_target_database
 from app.core.embedding import EmbeddingClient
+from app.core.schema_version import bump_schema_version
+from app.core.table_importance import table_importance_store
+from app.core.value_dictionary import get_value_dictionary
 
 
 router = APIRouter(prefix="/ingest", tags=["Ingestion"])
@@ -14,11 +18,23 @@ router = APIRouter(prefix="/ingest", tags=["Ingestion"])
 
 class IngestRequest(BaseModel):
     """Request to ingest schema"""
-    db_name: str = "postgres"
+    # Registered target database to extract from (TARGET_DATABASES)
+    db_key: str = DEFAULT_DB_KEY
+    # `db` property of the loaded nodes; defaults to the database's neo4j_db
+    db_name: Optional[str] = None
     schema: Optional[str] = None
     clear_existing: bool = False
 
 
+class ValueProfileRequest(BaseModel):
+    """Request to profile column values into the value dictionary"""
+    # Registered target database to profile (TARGET_DATABASES)
+    db_key: str = DEFAULT_DB_KEY
+    schema: Optional[str] = None
+    tables: Optional[List[str]] = None
+    max_distinct_values: Optional[int] = None
+
+
 class IngestResponse(BaseModel):
     """Response from ingestion"""
     message: str
@@ -61,6 +77,8 @@ async def run_ingestion(
         await loader.load_columns(columns, db_name)
         await loader.load_foreign_keys(foreign_keys, db_name)
         await loader.load_primary_keys(primary_keys, db_name)
+        await bump_schema_version(neo4j_session)
+        await table_importance_store.refresh(neo4j_session)
         
         print(f"✓ Ingestion completed: {len(tables)} tables, {len(columns)} columns, {len(foreign_keys)} FKs")
         
@@ -74,37 +92,45 @@ async def ingest_schema(
     request: IngestRequest,
     background_tasks: BackgroundTasks,
     neo4j_session=Depends(get_neo4j_session),
-    db_conn=Depends(get_db_connection),
     openai_client=Depends(get_openai_client)
 ):
     """
     Ingest database schema into Neo4j graph.
     This is a long-running operation and will run in the background.
     """
+    try:
+        database = get_target_database(request.db_key)
+    except UnknownDatabaseError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    db_name = request.db_name or database.neo4j_db or "postgres"
+    
     try:
         # Run synchronously for now (could be made async with task queue)
         embedding_client = EmbeddingClient(openai_client)
         loader = Neo4jSchemaLoader(neo4j_session, embedding_client)
-        extractor = SchemaExtractor(db_conn)
         
         # Setup Neo4j schema
         await loader.setup_constraints_and_indexes()
         
         # Clear existing if requested
         if request.clear_existing:
-            await loader.clear_schema(request.db_name)
+            await loader.clear_schema(db_name)
         
         # Extract schema metadata
-        tables = await extractor.extract_tables(request.schema)
-        columns = await extractor.extract_columns(request.schema)
-        foreign_keys = await extractor.extract_foreign_keys(request.schema)
-        primary_keys = await extractor.extract_primary_keys(request.schema)
+        async with target_db_pools.get(database.key).acquire() as db_conn:
+            extractor = SchemaExtractor(db_conn)
+            tables = await extractor.extract_tables(request.schema)
+            columns = await extractor.extract_columns(request.schema)
+            foreign_keys = await extractor.extract_foreign_keys(request.schema)
+            primary_keys = await extractor.extract_primary_keys(request.schema)
         
         # Load into Neo4j
-        await loader.load_tables(tables, request.db_name)
-        await loader.load_columns(columns, request.db_name)
-        await loader.load_foreign_keys(foreign_keys, request.db_name)
-        await loader.load_primary_keys(primary_keys, request.db_name)
+        await loader.load_tables(tables, db_name)
+        await loader.load_columns(columns, db_name)
+        await loader.load_foreign_keys(foreign_keys, db_name)
+        await loader.load_primary_keys(primary_keys, db_name)
+        await bump_schema_version(neo4j_session)
+        await table_importance_store.refresh(neo4j_session)
         
         return IngestResponse(
             message="Schema ingestion completed successfully",
@@ -117,3 +143,66 @@ async def ingest_schema(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Ingestion failed: {str(e)}")
 
+
+async def run_value_profiling(
+    database: TargetDatabase,
+    schema: str,
+    tables: Optional[List[str]],
+    max_distinct_values: Optional[int]
+):
+    """Background task that captures distinct column values into the value dictionary"""
+    value_dictionary = get_value_dictionary()
+    try:
+        # The request-scoped connection is released once the response is sent
+        async with target_db_pools.get(database.key).acquire() as conn:
+            job = await value_dictionary.profile_schema(
+                conn, schema, tables=tables, max_values=max_distinct_values, db_key=database.key
+            )
+        print(
+            f"✓ Value profiling completed: {job['columns_profiled']} columns "
+            f"({job['columns_incomplete']} incomplete, {job['columns_failed']} failed)"
+        )
+    except Exception as e:
+        value_dictionary.job = {"status": "failed", "error": str(e)}
+        print(f"✗ Value profiling failed: {str(e)}")
+
+
+@router.post("/value-dictionary")
+async def profile_values(
+    request: ValueProfileRequest,
+    background_tasks: BackgroundTasks
+):
+    """
+    Profile distinct values of text columns into the local value dictionary.
+    Runs in the background; progress is reported by GET /ingest/value-dictionary.
+    """
+    value_dictionary = get_value_dictionary()
+    if value_dictionary is None:
+        raise HTTPException(status_code=400, detail="Value dictionary is disabled")
+    if value_dictionary.job.get("status") in ("queued", "running"):
+        raise HTTPException(status_code=409, detail="Value profiling is already queued or running")
+    try:
+        database = get_target_database(request.db_key)
+    except UnknownDatabaseError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+    schema = request.schema or database.schema
+    value_dictionary.job = {"status": "queued", "db_key": database.key, "schema": schema}
+    background_tasks.add_task(
+        run_value_profiling, database, schema, request.tables, request.max_distinct_values
+    )
+    return {
+        "message": "Value profiling started",
+        "status": "queued",
+        "db_key": database.key,
+        "schema": schema,
+    }
+
+
+@router.get("/value-dictionary")
+async def value_dictionary_status():
+    """Value dictionary profiling state and lookup counters"""
+    value_dictionary = get_value_dictionary()
+    if value_dictionary is None:
+        return {"enabled": False}
+    return {"enabled": True, **value_dictionary.stats()}
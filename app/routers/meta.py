@@ -1,8 +1,9 @@
 """Metadata endpoints for schema exploration"""
 from fastapi import APIRouter, Depends, Query
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 
+from app.core.db_registry import list_target_databases
 from app.deps import get_neo4j_session
 
 
@@ -26,6 +27,12 @@ class ColumnInfo(BaseModel):
     description: str
 
 
+@router.get("/databases")
+async def list_databases() -> List[Dict[str, Any]]:
+    """Registered target databases, usable as AskRequest.db_key"""
+    return [database.describe() for database in list_target_databases()]
+
+
 @router.get("/tables", response_model=List[TableInfo])
 async def list_tables(
     search: Optional[str] = Query(None, description="Search term for table names/descriptions"),
@@ -1,15 +1,25 @@
 from __future__ import annotations
 
 import json
+from contextlib import AsyncExitStack
 from pathlib import Path
 from typing import Any, Dict, List, Literal, Optional
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 
 from app.config import settings
 from app.deps import get_db_connection, get_neo4j_session, get_openai_client
+from app.core.admission import (
+    ADMISSION_SAMPLE,
+    AdmissionDecision,
+    AdmissionRejectedError,
+    get_admission_controller,
+)
+from app.core.db_registry import get_target_database
+from app.core.db_scheduler import PRIORITY_INTERACTIVE, priority_scope
+from app.core.query_governor import ClientDisconnectedError, iterate_until_disconnected, run_until_disconnected
 from app.core.sql_exec import SQLExecutor, SQLExecutionError
 from app.core.sql_guard import SQLGuard, SQLValidationError
 from app.react.agent import AgentOutcome, ReactAgent, ReactStep
@@ -49,9 +59,14 @@ class ReactStepModel(BaseModel):
 
 class ExecutionResultModel(BaseModel):
     columns: List[str]
-    rows: List[List[Any]]
+    rows: Optional[List[List[Any]]] = None
     row_count: int
     execution_time_ms: float
+    format: Literal["rows", "columnar"] = "rows"
+    column_types: Optional[List[str]] = None
+    values: Optional[List[List[Any]]] = None
+    cached: Optional[bool] = None
+    cache_age_seconds: Optional[float] = None
 
 
 class ReactResponse(BaseModel):
@@ -59,6 +74,7 @@ class ReactResponse(BaseModel):
     final_sql: Optional[str] = None
     validated_sql: Optional[str] = None
     execution_result: Optional[ExecutionResultModel] = None
+    admission: Optional[Dict[str, Any]] = None
     steps: List[ReactStepModel] = Field(default_factory=list)
     collected_metadata: str
     partial_sql: str
@@ -88,6 +104,9 @@ class ReactRequest(BaseModel):
     prefer_language: str = Field(
         default="ko", description="사용자 선호 언어 코드(ko, en, ja, zh 등). 기본값: ko"
     )
+    result_format: Literal["rows", "columnar"] = Field(
+        default="rows", description="실행 결과 인코딩 (rows: 행 배열, columnar: 컬럼별 타입 배열)"
+    )
 
 
 def _step_to_model(step: ReactStep) -> ReactStepModel:
@@ -145,6 +164,7 @@ def _ensure_state_from_request(request: ReactRequest) -> ReactSessionState:
 @router.post("", response_class=StreamingResponse)
 async def run_react(
     request: ReactRequest,
+    http_request: Request,
     neo4j_session=Depends(get_neo4j_session),
     db_conn=Depends(get_db_connection),
     openai_client=Depends(get_openai_client),
@@ -155,6 +175,8 @@ async def run_react(
         neo4j_session=neo4j_session,
         db_conn=db_conn,
         openai_client=openai_client,
+        # /react runs against the default database; search only its schema graph partition
+        neo4j_db=get_target_database().neo4j_db,
         max_sql_seconds=state.max_sql_seconds,
     )
 
@@ -165,11 +187,15 @@ async def run_react(
     async def event_iterator():
         nonlocal warnings
         try:
-            async for event in agent.stream(
-                state=state,
-                tool_context=tool_context,
-                max_iterations=request.max_iterations,
-                user_response=request.user_response,
+            # Tool queries and the final query are cancelled as soon as the client goes away
+            async for event in iterate_until_disconnected(
+                http_request,
+                agent.stream(
+                    state=state,
+                    tool_context=tool_context,
+                    max_iterations=request.max_iterations,
+                    user_response=request.user_response,
+                ),
             ):
                 event_type = event["type"]
 
@@ -281,17 +307,40 @@ async def run_react(
                         return
 
                     execution_result = None
+                    admission: Optional[AdmissionDecision] = None
                     # 마지막 호출 제출이 아닐 때만 SQL 실행
                     if request.execute_final_sql and not outcome.was_last_call_submission:
                         executor = SQLExecutor()
+                        admission_controller = get_admission_controller()
                         try:
-                            raw_result = await executor.execute_query(
-                                db_conn, 
-                                validated_sql,
-                                timeout=float(request.max_sql_seconds),
-                            )
-                            formatted = executor.format_results_for_json(raw_result)
-                            execution_result = ExecutionResultModel(**formatted)
+                            async with AsyncExitStack() as stack:
+                                # 최종 실행은 사용자가 기다리는 결과이므로 에이전트 탐색 쿼리보다 먼저 처리
+                                stack.enter_context(priority_scope(PRIORITY_INTERACTIVE))
+                                executed_sql = validated_sql
+                                if admission_controller is not None:
+                                    admission = await stack.enter_async_context(
+                                        admission_controller.admitted(db_conn, validated_sql)
+                                    )
+                                    executed_sql = admission.sql
+                                raw_result = await run_until_disconnected(
+                                    http_request,
+                                    executor.execute_query(
+                                        db_conn,
+                                        executed_sql,
+                                        timeout=float(request.max_sql_seconds),
+                                        json_safe=True,
+                                        columnar=request.result_format == "columnar",
+                                    ),
+                                )
+                            execution_result = ExecutionResultModel(**raw_result)
+                            if admission is not None and admission.action == ADMISSION_SAMPLE:
+                                warnings.append(
+                                    f"실행 비용이 커서 각 테이블의 {admission.sample_percent}% 표본으로 실행한 미리보기 결과입니다. "
+                                    f"({admission.reason})"
+                                )
+                        except AdmissionRejectedError as exc:
+                            admission = exc.decision
+                            warnings.append(f"SQL execution skipped: {exc}")
                         except SQLExecutionError as exc:
                             warnings.append(f"SQL execution failed: {exc}")
 
@@ -300,6 +349,7 @@ async def run_react(
                         final_sql=final_sql,
                         validated_sql=validated_sql,
                         execution_result=execution_result,
+                        admission=admission.to_dict() if admission else None,
                         steps=steps,
                         collected_metadata=state.metadata.to_xml(),
                         partial_sql=state.partial_sql,
@@ -321,6 +371,8 @@ async def run_react(
                     payload = {"event": "error", "message": message}
                     yield json.dumps(payload, ensure_ascii=False) + "\n"
                     return
+        except ClientDisconnectedError:
+            return
         except Exception as exc:
             payload = {"event": "error", "message": str(exc)}
             yield json.dumps(payload, ensure_ascii=False) + "\n"
@@ -4,6 +4,8 @@ from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
 
 from app.deps import get_neo4j_session
+from app.core.schema_version import bump_schema_version
+from app.core.table_importance import table_importance_store
 
 
 router = APIRouter(prefix="/schema-edit", tags=["Schema Editing"])
@@ -71,6 +73,7 @@ async def update_table_description(
     if not records:
         raise HTTPException(status_code=404, detail="Table not found")
     
+    await bump_schema_version(neo4j_session)
     return {"message": "Table description updated", "data": records[0]}
 
 
@@ -100,6 +103,7 @@ async def update_column_description(
     if not records:
         raise HTTPException(status_code=404, detail="Column not found")
     
+    await bump_schema_version(neo4j_session)
     return {"message": "Column description updated", "data": records[0]}
 
 
@@ -185,6 +189,7 @@ async def add_relationship(
     )
     
     await create_result.data()
+    await bump_schema_version(neo4j_session)
     
     return RelationshipResponse(
         from_table=request.from_table,
@@ -244,6 +249,8 @@ async def remove_relationship(
     records = await result.data()
     
     deleted_count = records[0]["deleted_count"] if records else 0
+    if deleted_count:
+        await bump_schema_version(neo4j_session)
     
     return {"message": f"Removed {deleted_count} relationship(s)"}
 
@@ -285,3 +292,27 @@ async def list_user_added_relationships(
             for r in records
         ]
     }
+
+
+@router.post("/importance/refresh")
+async def refresh_table_importance(
+    neo4j_session=Depends(get_neo4j_session)
+):
+    """Recompute table importance scores (degree and FK PageRank) and store them on the Table nodes"""
+    scores = await table_importance_store.refresh(neo4j_session)
+    top_tables = sorted(scores.items(), key=lambda item: item[1]["importance_score"], reverse=True)[:10]
+    return {
+        "message": f"Refreshed importance for {len(scores)} table(s)",
+        "metric": table_importance_store.metric,
+        "top_tables": [
+            {
+                "db": info["db"],
+                "table_name": info["table_name"],
+                "schema": info["schema"],
+                "importance_score": info["importance_score"],
+                "degree": info["degree"],
+                "fk_pagerank": info["fk_pagerank"],
+            }
+            for _, info in top_tables
+        ],
+    }
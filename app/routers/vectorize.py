@@ -5,6 +5,7 @@ from pydantic import BaseModel
 
 from app.deps import get_neo4j_session, get_openai_client
 from app.core.embedding import EmbeddingClient
+from app.core.schema_version import bump_schema_version
 from app.ingest.to_neo4j import Neo4jSchemaLoader
 
 
@@ -139,6 +140,9 @@ async def vectorize_graph(
                 await rc.consume()
             total_columns = len(cols)
 
+        if total_tables or total_columns:
+            await bump_schema_version(neo4j_session)
+
         return VectorizeResponse(
             message="Vectorization completed",
             status="success",
@@ -0,0 +1,140 @@
+# python -m pytest app/tests/cores/test_admission.py -v
+
+"""EXPLAIN 예상 비용 기반 실행 허가(admission control) 테스트"""
+
+import pytest
+
+from app.core.admission import (
+    ADMISSION_ADMIT,
+    ADMISSION_QUEUE,
+    ADMISSION_REJECT,
+    ADMISSION_SAMPLE,
+    AdmissionController,
+    AdmissionRejectedError,
+    sample_sql,
+)
+
+
+def plan(cost, rows, child_rows=None, node_type="Aggregate", child_type="Nested Loop"):
+    node = {"Node Type": node_type, "Total Cost": cost, "Plan Rows": rows}
+    if child_rows is not None:
+        node["Plans"] = [{"Node Type": child_type, "Total Cost": cost, "Plan Rows": child_rows}]
+    return [{"Plan": node}]
+
+
+class PlanConnection:
+    """EXPLAIN 결과를 SQL 에 포함된 문자열로 고르는 연결"""
+
+    def __init__(self, plans):
+        self.plans = plans
+        self.explained = []
+
+    async def fetchval(self, sql):
+        assert sql.startswith("EXPLAIN (FORMAT JSON)")
+        self.explained.append(sql)
+        for marker, payload in self.plans.items():
+            if marker in sql:
+                return payload
+        raise AssertionError(f"unexpected EXPLAIN: {sql}")
+
+
+def controller(**overrides):
+    options = dict(
+        queue_cost=1_000,
+        sample_cost=10_000,
+        reject_cost=1_000_000,
+        max_rows=100_000,
+        sample_percent=1.0,
+        heavy_concurrency=1,
+        queue_timeout=0.05,
+        plan_timeout=1.0,
+        dbms="postgresql",
+    )
+    options.update(overrides)
+    return AdmissionController(**options)
+
+
+def test_sample_sql_adds_tablesample_to_base_tables_only():
+    sampled = sample_sql("WITH r AS (SELECT * FROM orders) SELECT * FROM r JOIN users u ON true LIMIT 10", 2)
+    assert "orders TABLESAMPLE SYSTEM (2)" in sampled
+    assert "users AS u TABLESAMPLE SYSTEM (2)" in sampled
+    assert "r TABLESAMPLE" not in sampled
+
+
+@pytest.mark.asyncio
+async def test_decisions_follow_cost_thresholds():
+    conn = PlanConnection({
+        "cheap": plan(10, 5),
+        "medium": plan(5_000, 100),
+        "huge": plan(5_000_000, 1000),
+    })
+    admission = controller()
+
+    assert (await admission.decide(conn, "SELECT * FROM cheap")).action == ADMISSION_ADMIT
+    assert (await admission.decide(conn, "SELECT * FROM medium")).action == ADMISSION_QUEUE
+    rejected = await admission.decide(conn, "SELECT * FROM huge")
+    assert rejected.action == ADMISSION_REJECT
+    assert rejected.estimated_cost == 5_000_000
+    assert admission.stats()["decisions"] == {"admit": 1, "queue": 1, "sample": 0, "reject": 1}
+
+
+@pytest.mark.asyncio
+async def test_cartesian_join_is_downgraded_to_sample():
+    conn = PlanConnection({
+        "TABLESAMPLE": plan(900, 10, child_rows=50_000),
+        "big_a": plan(20_000, 10, child_rows=10_000_000),
+    })
+    admission = controller()
+
+    async with admission.admitted(conn, "SELECT * FROM big_a, big_b") as decision:
+        assert decision.action == ADMISSION_SAMPLE
+        assert decision.estimated_rows == 10_000_000
+        assert "TABLESAMPLE SYSTEM (1.0)" in decision.sql
+        assert decision.to_dict()["executed_sql"] == decision.sql
+
+
+@pytest.mark.asyncio
+async def test_limit_over_large_scan_is_admitted():
+    # LIMIT 은 하위 노드를 끝까지 읽지 않으므로 하위 노드의 예상 행 수로 샘플링하지 않는다
+    conn = PlanConnection({
+        "events": plan(40, 10, child_rows=50_000_000, node_type="Limit", child_type="Index Scan"),
+    })
+    admission = controller()
+
+    decision = await admission.decide(conn, "SELECT * FROM events ORDER BY id LIMIT 10")
+    assert decision.action == ADMISSION_ADMIT
+    assert decision.estimated_rows == 10
+    assert decision.sql == "SELECT * FROM events ORDER BY id LIMIT 10"
+
+
+@pytest.mark.asyncio
+async def test_reject_raises_and_plan_failure_admits():
+    class BrokenConnection:
+        async def fetchval(self, sql):
+            raise RuntimeError("syntax error")
+
+    admission = controller()
+    with pytest.raises(AdmissionRejectedError) as exc_info:
+        async with admission.admitted(PlanConnection({"x": plan(5_000_000, 1)}), "SELECT * FROM x"):
+            pass
+    assert exc_info.value.decision.action == ADMISSION_REJECT
+
+    async with admission.admitted(BrokenConnection(), "SELECT * FROM x") as decision:
+        assert decision.action == ADMISSION_ADMIT
+        assert decision.reason.startswith("plan unavailable")
+
+
+@pytest.mark.asyncio
+async def test_queued_queries_share_heavy_slots():
+    conn = PlanConnection({"medium": plan(5_000, 100)})
+    admission = controller(heavy_concurrency=1, queue_timeout=0.05)
+
+    async with admission.admitted(conn, "SELECT * FROM medium") as first:
+        assert first.action == ADMISSION_QUEUE
+        with pytest.raises(AdmissionRejectedError, match="queued"):
+            async with admission.admitted(conn, "SELECT * FROM medium"):
+                pass
+
+    async with admission.admitted(conn, "SELECT * FROM medium") as again:
+        assert again.queued_ms is not None
+    assert admission.stats()["queue_timeouts"] == 1
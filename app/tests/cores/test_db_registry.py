@@ -0,0 +1,91 @@
+# python -m pytest app/tests/cores/test_db_registry.py -v
+
+"""다중 대상 DB 레지스트리 및 DB 별 스키마 검색 분할 테스트"""
+
+import numpy as np
+import pytest
+
+from app.config import settings
+from app.core.db_registry import DEFAULT_DB_KEY, build_target_databases
+from app.core.lexical_index import LexicalIndex
+from app.core.vector_index import VectorPartition, _db_order
+from app.tests.fakes import FakeResult
+
+
+def test_extra_databases_inherit_the_default_database():
+    databases = build_target_databases({
+        "sales": {"name": "sales_dw", "sql_max_rows": 10},
+        "hr": {"neo4j_db": "people"},
+    })
+
+    default, sales, hr = databases[DEFAULT_DB_KEY], databases["sales"], databases["hr"]
+    assert default.name == settings.target_db_name
+    assert sales.name == "sales_dw"
+    assert sales.sql_max_rows == 10
+    # 지정하지 않은 항목은 기본 DB 설정을 따르고, Neo4j db 는 키 이름이 기본값
+    assert sales.host == default.host
+    assert sales.sql_timeout_seconds == default.sql_timeout_seconds
+    assert sales.neo4j_db == "sales"
+    assert hr.neo4j_db == "people"
+    assert "password" not in sales.describe()
+
+
+def test_unknown_database_settings_are_rejected():
+    with pytest.raises(ValueError, match="pool_size"):
+        build_target_databases({"sales": {"pool_size": 3}})
+
+
+def test_vector_partition_scores_only_rows_of_the_requested_db():
+    metadata = sorted(
+        [
+            {"name": "orders", "db": "sales"},
+            {"name": "employees", "db": "hr"},
+            {"name": "invoices", "db": "sales"},
+            {"name": "legacy", "db": None},
+        ],
+        key=_db_order,
+    )
+    vectors = {
+        "orders": [1.0, 0.0],
+        "employees": [1.0, 0.1],
+        "invoices": [0.0, 1.0],
+        "legacy": [1.0, 0.0],
+    }
+    partition = VectorPartition(
+        matrix=np.asarray([vectors[m["name"]] for m in metadata], dtype=np.float32),
+        metadata=metadata,
+    )
+
+    names = [metadata[row]["name"] for row, _ in sorted(
+        partition.top_k([1.0, 0.0], k=5, db="sales"), key=lambda pair: -pair[1]
+    )]
+    assert names == ["orders", "invoices"]
+    assert len(partition.top_k([1.0, 0.0], k=5)) == 4
+    assert partition.top_k([1.0, 0.0], k=5, db="unknown") == []
+
+
+@pytest.mark.asyncio
+async def test_lexical_index_searches_each_database_separately(monkeypatch):
+    tables = [
+        {"name": "orders", "schema": "public", "db": "sales", "description": "주문 내역"},
+        {"name": "order_reviews", "schema": "public", "db": "hr", "description": "평가 주문"},
+    ]
+    columns = [
+        {"name": "order_id", "table_name": "orders", "db": "sales", "description": ""},
+    ]
+
+    class FakeSession:
+        async def run(self, query, **params):
+            return FakeResult(columns if "HAS_COLUMN" in query else tables)
+
+    async def current_version(session):
+        return "v1"
+
+    monkeypatch.setattr("app.core.lexical_index.schema_version_tracker.current", current_version)
+    index = LexicalIndex()
+    assert await index.ensure_fresh(FakeSession())
+
+    assert len(index.query_tables("주문", k=5)) == 2
+    assert [r["name"] for r in index.query_tables("주문", k=5, db="hr")] == ["order_reviews"]
+    assert index.query_columns("order", k=5, db="hr") == []
+    assert index.query_tables("주문", k=5, db="unknown") == []
@@ -0,0 +1,138 @@
+# python -m pytest app/tests/cores/test_db_scheduler.py -v
+
+"""대상 DB 동시 실행 제한 및 우선순위 큐 테스트"""
+
+import asyncio
+
+import pytest
+
+from app.core.db_scheduler import (
+    PRIORITY_AGENT,
+    PRIORITY_BACKGROUND,
+    PRIORITY_INTERACTIVE,
+    PriorityLimiter,
+    ScheduledConnection,
+    SchedulerTimeoutError,
+    priority_scope,
+    route_priority,
+)
+
+
+def limiter(max_concurrent=1, background_max_concurrent=1, queue_timeout=1.0):
+    return PriorityLimiter(
+        name="test",
+        max_concurrent=max_concurrent,
+        background_max_concurrent=background_max_concurrent,
+        queue_timeout=queue_timeout,
+    )
+
+
+@pytest.mark.asyncio
+async def test_waiters_are_served_by_priority_then_arrival():
+    db = limiter(max_concurrent=1)
+    order = []
+
+    async def run(name, priority):
+        async with db.slot(priority):
+            order.append(name)
+
+    async with db.slot(PRIORITY_AGENT):
+        tasks = [
+            asyncio.create_task(run("background", PRIORITY_BACKGROUND)),
+            asyncio.create_task(run("agent-1", PRIORITY_AGENT)),
+            asyncio.create_task(run("interactive", PRIORITY_INTERACTIVE)),
+            asyncio.create_task(run("agent-2", PRIORITY_AGENT)),
+        ]
+        await asyncio.sleep(0)
+        assert db.stats()["queued"] == 4
+    await asyncio.gather(*tasks)
+
+    assert order == ["interactive", "agent-1", "agent-2", "background"]
+    assert db.stats()["priorities"]["interactive"]["acquired"] == 1
+
+
+@pytest.mark.asyncio
+async def test_background_cannot_take_every_slot():
+    db = limiter(max_concurrent=3, background_max_concurrent=1)
+
+    async with db.slot(PRIORITY_BACKGROUND):
+        second_background = asyncio.create_task(db.acquire(PRIORITY_BACKGROUND))
+        await asyncio.sleep(0)
+        assert not second_background.done()
+
+        # 백그라운드가 기다리는 중에도 대화형 쿼리는 남은 슬롯을 바로 사용
+        await asyncio.wait_for(db.acquire(PRIORITY_INTERACTIVE), timeout=0.1)
+        db.release(PRIORITY_INTERACTIVE)
+    await second_background
+    db.release(PRIORITY_BACKGROUND)
+    assert db.running == 0
+
+
+@pytest.mark.asyncio
+async def test_queue_timeout_and_abandoned_waiters():
+    db = limiter(max_concurrent=1, queue_timeout=0.02)
+
+    async with db.slot(PRIORITY_INTERACTIVE):
+        with pytest.raises(SchedulerTimeoutError):
+            await db.acquire(PRIORITY_AGENT)
+        cancelled = asyncio.create_task(db.acquire(PRIORITY_AGENT))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await cancelled
+
+    assert db.running == 0
+    assert db.stats()["queued"] == 0
+    assert db.stats()["priorities"]["agent"]["timeouts"] == 1
+
+
+class FakeTransaction:
+    def __init__(self, conn):
+        self.conn = conn
+
+    async def __aenter__(self):
+        self.conn.log.append("begin")
+        return self
+
+    async def __aexit__(self, *exc):
+        self.conn.log.append("end")
+        return False
+
+
+class FakeConnection:
+    def __init__(self):
+        self.log = []
+
+    def transaction(self, readonly=False):
+        return FakeTransaction(self)
+
+    async def fetchval(self, query):
+        self.log.append(query)
+        return 1
+
+    def get_server_pid(self):
+        return 7
+
+
+@pytest.mark.asyncio
+async def test_scheduled_connection_holds_one_slot_per_transaction():
+    db = limiter(max_concurrent=1, queue_timeout=0.05)
+    conn = ScheduledConnection(FakeConnection(), db)
+
+    with priority_scope(PRIORITY_INTERACTIVE):
+        assert await conn.fetchval("SELECT 1") == 1
+        async with conn.transaction(readonly=True):
+            assert db.running == 1
+            # 트랜잭션 안의 문장은 같은 슬롯을 재사용 (교착 없음)
+            assert await conn.fetchval("SELECT 2") == 1
+    assert conn.get_server_pid() == 7
+    assert db.running == 0
+    assert db.stats()["priorities"]["interactive"]["acquired"] == 2
+    assert conn.raw_connection.log == ["SELECT 1", "begin", "SELECT 2", "end"]
+
+
+def test_route_priorities():
+    assert route_priority("/ask") == PRIORITY_INTERACTIVE
+    assert route_priority("/ingest/value-dictionary") == PRIORITY_BACKGROUND
+    assert route_priority("/react") == PRIORITY_AGENT
+    assert route_priority("/asking") == PRIORITY_AGENT
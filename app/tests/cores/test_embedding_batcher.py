@@ -0,0 +1,63 @@
+# python -m pytest app/tests/cores/test_embedding_batcher.py -v
+
+"""EmbeddingBatcher 마이크로 배칭 테스트"""
+
+import asyncio
+
+import pytest
+
+from app.core.embedding import EmbeddingBatcher
+
+
+class RecordingEmbedFn:
+    def __init__(self, fail: bool = False):
+        self.calls = []
+        self.fail = fail
+
+    async def __call__(self, texts):
+        self.calls.append(list(texts))
+        if self.fail:
+            raise RuntimeError("upstream failed")
+        return [[float(len(text))] for text in texts]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_share_one_batch():
+    """윈도우 내 동시 요청은 하나의 업스트림 호출로 묶여야 한다"""
+    embed_fn = RecordingEmbedFn()
+    batcher = EmbeddingBatcher(embed_fn, window_ms=5, max_items=100, max_tokens=10000)
+
+    results = await asyncio.gather(
+        batcher.submit(["a"]),
+        batcher.submit(["bb", "ccc"]),
+        batcher.submit(["dddd"]),
+    )
+
+    assert results == [[[1.0]], [[2.0], [3.0]], [[4.0]]]
+    assert embed_fn.calls == [["a", "bb", "ccc", "dddd"]]
+    assert batcher.stats()["batches"] == 1
+
+
+@pytest.mark.asyncio
+async def test_item_cap_splits_batches():
+    """항목 수 상한을 넘으면 즉시 별도 배치로 전송해야 한다"""
+    embed_fn = RecordingEmbedFn()
+    batcher = EmbeddingBatcher(embed_fn, window_ms=50, max_items=2, max_tokens=10000)
+
+    await asyncio.gather(*(batcher.submit([text]) for text in ["a", "b", "c"]))
+
+    assert embed_fn.calls == [["a", "b"], ["c"]]
+
+
+@pytest.mark.asyncio
+async def test_upstream_error_is_propagated_to_every_waiter():
+    embed_fn = RecordingEmbedFn(fail=True)
+    batcher = EmbeddingBatcher(embed_fn, window_ms=1, max_items=10, max_tokens=10000)
+
+    results = await asyncio.gather(
+        batcher.submit(["a"]),
+        batcher.submit(["b"]),
+        return_exceptions=True,
+    )
+
+    assert all(isinstance(result, RuntimeError) for result in results)
@@ -0,0 +1,74 @@
+# python -m pytest app/tests/cores/test_embedding_cache.py -v
+
+"""EmbeddingClient 캐시 동작 테스트"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.embedding import EmbeddingClient
+from app.core.embedding_cache import EmbeddingCache
+
+
+class FakeEmbeddingsAPI:
+    def __init__(self):
+        self.calls = []
+
+    async def create(self, model, input, encoding_format):
+        self.calls.append(list(input))
+        return SimpleNamespace(
+            data=[SimpleNamespace(embedding=[float(len(text)), 1.0]) for text in input]
+        )
+
+
+def _make_client(cache):
+    api = FakeEmbeddingsAPI()
+    client = EmbeddingClient(SimpleNamespace(embeddings=api))
+    client.cache = cache
+    return client, api
+
+
+@pytest.mark.asyncio
+async def test_embed_batch_dedupes_and_sends_only_misses(tmp_path):
+    """동일 텍스트는 한 번만, 캐시 미스만 업스트림으로 보내야 한다"""
+    cache = EmbeddingCache(path=str(tmp_path / "emb.db"), max_memory_items=10)
+    client, api = _make_client(cache)
+
+    first = await client.embed_batch(["a", "bb", "a"])
+    assert first == [[1.0, 1.0], [2.0, 1.0], [1.0, 1.0]]
+    assert api.calls == [["a", "bb"]]
+
+    second = await client.embed_batch(["bb", "ccc"])
+    assert second == [[2.0, 1.0], [3.0, 1.0]]
+    assert api.calls[-1] == ["ccc"]
+
+    stats = cache.stats()
+    assert stats["memory_hits"] == 1
+    assert stats["misses"] == 3
+
+
+@pytest.mark.asyncio
+async def test_disk_tier_survives_new_cache_instance(tmp_path):
+    """메모리 캐시가 비어 있어도 디스크 저장소에서 조회되어야 한다"""
+    path = str(tmp_path / "emb.db")
+    client, _ = _make_client(EmbeddingCache(path=path, max_memory_items=10))
+    await client.embed_text("hello")
+
+    cache = EmbeddingCache(path=path, max_memory_items=10)
+    client, api = _make_client(cache)
+    assert await client.embed_text("hello") == [5.0, 1.0]
+    assert api.calls == []
+    assert cache.stats()["disk_hits"] == 1
+
+
+def test_memory_tier_is_bounded(tmp_path):
+    cache = EmbeddingCache(path=str(tmp_path / "emb.db"), max_memory_items=2)
+    for key in ["k1", "k2", "k3"]:
+        cache._remember(key, [0.0])
+    assert list(cache._memory.keys()) == ["k2", "k3"]
+
+
+def test_cache_key_depends_on_model_and_dimension():
+    key = EmbeddingCache.make_key("m1", 1536, "text")
+    assert key != EmbeddingCache.make_key("m2", 1536, "text")
+    assert key != EmbeddingCache.make_key("m1", 3072, "text")
@@ -0,0 +1,149 @@
+# python -m pytest app/tests/cores/test_graph_search.py -v
+
+"""GraphSearcher.build_subschema 테스트"""
+
+import asyncio
+
+import pytest
+
+from app.config import settings
+from app.core.graph_search import GraphSearcher
+from app.core.join_graph import JoinGraph
+from app.tests.fakes import FakeResult
+
+
+class FakeSession:
+    def __init__(self, log, in_flight):
+        self.log = log
+        self.in_flight = in_flight
+        self.closed = False
+
+    async def run(self, query, **params):
+        if "table_vec_index" in query:
+            self.log.append("tables")
+            self.in_flight["now"] += 1
+            self.in_flight["max"] = max(self.in_flight["max"], self.in_flight["now"])
+            await asyncio.sleep(0.01)
+            self.in_flight["now"] -= 1
+            return FakeResult([
+                {"name": "orders", "schema": "public", "db": "postgres", "description": "", "score": 0.9}
+            ])
+        if "column_vec_index" in query:
+            self.log.append("columns")
+            self.in_flight["now"] += 1
+            self.in_flight["max"] = max(self.in_flight["max"], self.in_flight["now"])
+            await asyncio.sleep(0.01)
+            self.in_flight["now"] -= 1
+            return FakeResult([
+                {"name": "name", "table_name": "customers", "dtype": "text",
+                 "description": "", "nullable": True, "score": 0.8}
+            ])
+        self.log.append("context")
+        assert sorted(params["tables"]) == ["customers", "orders"]
+        return FakeResult([{
+            "table_columns": [
+                {"table_name": "orders", "columns": [{"name": "customer_id", "dtype": "int"}]},
+            ],
+            "fk_details": [
+                {"from_table": "orders", "from_column": "customer_id",
+                 "to_table": "customers", "to_column": "id", "constraint_name": "fk"},
+            ],
+        }])
+
+    async def close(self):
+        self.closed = True
+
+
+@pytest.fixture(autouse=True)
+def disable_join_graph(monkeypatch):
+    """기본 테스트는 조인 그래프 없이 Cypher 경로를 검증한다"""
+    monkeypatch.setattr(settings, "is_use_join_graph", False)
+
+
+@pytest.mark.asyncio
+async def test_build_subschema_runs_vector_searches_concurrently():
+    log, in_flight = [], {"now": 0, "max": 0}
+    opened = []
+
+    async def session_factory():
+        session = FakeSession(log, in_flight)
+        opened.append(session)
+        return session
+
+    searcher = GraphSearcher(FakeSession(log, in_flight), session_factory=session_factory)
+    subschema = await searcher.build_subschema([0.1, 0.2])
+
+    assert in_flight["max"] == 2
+    assert len(opened) == 2 and all(session.closed for session in opened)
+    assert log.count("context") == 1
+    assert subschema.tables[0].columns == [{"name": "customer_id", "dtype": "int"}]
+    assert subschema.join_hints == ["JOIN customers ON orders.customer_id = customers.id"]
+    assert {
+        "table_vector_search_ms",
+        "column_vector_search_ms",
+        "vector_search_ms",
+        "table_context_ms",
+    } <= set(subschema.stage_timings)
+
+
+@pytest.mark.asyncio
+async def test_build_subschema_is_sequential_without_session_factory():
+    log, in_flight = [], {"now": 0, "max": 0}
+    searcher = GraphSearcher(FakeSession(log, in_flight))
+
+    await searcher.build_subschema([0.1, 0.2])
+
+    assert in_flight["max"] == 1
+    assert log == ["tables", "columns", "context"]
+
+
+class FakeJoinGraphIndex:
+    def __init__(self, graph):
+        self.graph = graph
+
+    async def ensure_fresh(self, session, db=None):
+        return self.graph
+
+
+class ColumnsOnlySession(FakeSession):
+    async def run(self, query, **params):
+        if "fk_details" in query or "FK_TO" in query:
+            raise AssertionError("FK 정보는 조인 그래프에서 가져와야 한다")
+        if "vec_index" in query:
+            return await super().run(query, **params)
+        self.log.append("columns_only")
+        return FakeResult([
+            {"table_name": "orders", "columns": [{"name": "customer_id", "dtype": "int"}]},
+        ])
+
+
+@pytest.mark.asyncio
+async def test_build_subschema_uses_join_graph_for_joins():
+    graph = JoinGraph(
+        tables=[
+            {"id": "o", "name": "orders", "schema": "public"},
+            {"id": "c", "name": "customers", "schema": "public"},
+        ],
+        column_fks=[
+            {"id": "fk1", "from_id": "o", "from_column": "customer_id",
+             "to_id": "c", "to_column": "id", "constraint_name": "orders_customer_fk"},
+        ],
+        table_relationships=[],
+        max_hops=3,
+    )
+    log, in_flight = [], {"now": 0, "max": 0}
+    searcher = GraphSearcher(
+        ColumnsOnlySession(log, in_flight),
+        join_graph_index=FakeJoinGraphIndex(graph),
+    )
+
+    subschema = await searcher.build_subschema([0.1, 0.2])
+
+    assert log == ["tables", "columns", "columns_only"]
+    assert subschema.join_hints == ["JOIN customers ON orders.customer_id = customers.id"]
+    assert subschema.fk_relationships == [{
+        "from_table": "orders", "from_column": "customer_id",
+        "to_table": "customers", "to_column": "id",
+        "constraint_name": "orders_customer_fk",
+    }]
+    assert "join_planning_ms" in subschema.stage_timings
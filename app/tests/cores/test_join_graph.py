@@ -0,0 +1,97 @@
+# python -m pytest app/tests/cores/test_join_graph.py -v
+
+"""JoinGraph 조인 경로 및 관계 조회 테스트"""
+
+from app.core.join_graph import COLUMN_FK_PATH, JoinGraph
+
+
+def _table(table_id, schema="public"):
+    return {"id": table_id, "name": table_id, "schema": schema,
+            "description": f"{table_id} 설명", "display_description": f"{table_id} 설명"}
+
+
+def _fk(fk_id, from_id, from_column, to_id, to_column, constraint_name=None):
+    return {"id": fk_id, "from_id": from_id, "from_column": from_column,
+            "to_id": to_id, "to_column": to_column, "constraint_name": constraint_name}
+
+
+def _rel(rel_id, from_id, to_id, **props):
+    return {"id": rel_id, "type": "FK_TO_TABLE", "from_id": from_id, "to_id": to_id,
+            "from_column": props.get("from_column"), "to_column": props.get("to_column")}
+
+
+def _make_graph(max_hops=3):
+    # customers <- orders -> products, order_items -> orders, order_items -> products
+    tables = [_table(name) for name in ["customers", "orders", "order_items", "products", "regions"]]
+    column_fks = [
+        _fk("f1", "orders", "customer_id", "customers", "id", "orders_customer_fk"),
+        _fk("f2", "order_items", "order_id", "orders", "id", "items_order_fk"),
+        _fk("f3", "order_items", "product_id", "products", "id", "items_product_fk"),
+        _fk("f4", "order_items", "region_code", "regions", "code", "items_region_fk"),
+        _fk("f5", "order_items", "region_country", "regions", "country", "items_region_fk"),
+    ]
+    relationships = [
+        _rel("r1", "orders", "customers"),
+        _rel("r2", "order_items", "orders"),
+        _rel("r3", "order_items", "products"),
+        _rel("r4", "order_items", "regions"),
+    ]
+    return JoinGraph(tables, column_fks, relationships, max_hops)
+
+
+def test_shortest_path_respects_max_hops():
+    graph = _make_graph(max_hops=2)
+    path = graph.shortest_path("customers", "order_items")
+    assert [(e.from_table, e.to_table) for e in path] == [
+        ("orders", "customers"), ("order_items", "orders")
+    ]
+    assert graph.shortest_path("customers", "products") is None
+    assert len(_make_graph().shortest_path("customers", "products")) == 3
+
+
+def test_plan_joins_adds_bridge_tables_and_composite_conditions():
+    graph = _make_graph()
+    plan = graph.plan_joins(["customers", "products", "regions"])
+
+    assert plan.bridge_tables == ["order_items", "orders"]
+    assert plan.unconnected_tables == []
+    assert len(plan.edges) == 4
+    assert plan.join_hints() == [
+        "JOIN orders ON orders.customer_id = customers.id",
+        "JOIN order_items ON order_items.order_id = orders.id",
+        "JOIN products ON order_items.product_id = products.id",
+        "JOIN regions ON order_items.region_code = regions.code"
+        " AND order_items.region_country = regions.country",
+    ]
+
+
+def test_plan_joins_reports_unconnected_tables():
+    graph = _make_graph()
+    graph_plan = graph.plan_joins(["orders", "customers", "unknown"])
+    assert graph_plan.unconnected_tables == ["unknown"]
+    assert graph_plan.join_hints() == ["JOIN customers ON orders.customer_id = customers.id"]
+
+
+def test_user_added_relationship_becomes_join_edge():
+    tables = [_table("a"), _table("b")]
+    graph = JoinGraph(tables, [], [_rel("r1", "a", "b", from_column="b_ref", to_column="id")], 3)
+    assert graph.fk_details_between(["a", "b"]) == [{
+        "from_table": "a", "from_column": "b_ref",
+        "to_table": "b", "to_column": "id", "constraint_name": None,
+    }]
+
+
+def test_relationship_outputs_match_graph_traversal_shape():
+    graph = _make_graph()
+    forward, reverse = graph.fk_relationships("orders", limit=5)
+    assert [(r["related_table"], r["from_column"], r["to_column"]) for r in forward] == [
+        ("customers", "customer_id", "id")
+    ]
+    assert [(r["related_table"], r["relation_type"], r["from_column"], r["to_column"]) for r in reverse] == [
+        ("order_items", "referenced_by", "id", "order_id")
+    ]
+
+    related = {r["related_table"]: r["relationship_paths"] for r in graph.any_relationships("orders")}
+    assert related["customers"] == ["FK_TO_TABLE", COLUMN_FK_PATH]
+    assert related["products"] == ["FK_TO_TABLE → FK_TO_TABLE"]
+    assert "orders" not in related
@@ -0,0 +1,94 @@
+# python -m pytest app/tests/cores/test_lexical_index.py -v
+
+"""어휘(n-gram) 인덱스 및 RRF 결합 테스트"""
+
+import pytest
+
+from app.core.graph_search import GraphSearcher
+from app.core.lexical_index import InvertedIndex, LexicalIndex, reciprocal_rank_fusion
+from app.tests.fakes import FakeResult
+
+
+TABLES = [
+    {"name": "t02", "schema": "public", "db": "postgres", "description": "정산 원장"},
+    {"name": "customer_orders", "schema": "public", "db": "postgres", "description": "고객 주문 내역"},
+    {"name": "products", "schema": "public", "db": "postgres", "description": "상품 마스터"},
+]
+
+
+def test_exact_identifier_ranks_first():
+    index = InvertedIndex(TABLES)
+    results = index.search("T02 데이터 보여줘", k=3)
+    assert results[0][0]["name"] == "t02"
+
+
+def test_korean_fragment_matches_description():
+    index = InvertedIndex(TABLES)
+    results = index.search("고객별 주문 건수", k=1)
+    assert results[0][0]["name"] == "customer_orders"
+
+
+def test_snake_case_parts_are_searchable():
+    index = InvertedIndex(TABLES)
+    assert index.search("orders", k=1)[0][0]["name"] == "customer_orders"
+
+
+def test_reciprocal_rank_fusion_prefers_items_in_both_lists():
+    vector = [{"name": "a"}, {"name": "b"}, {"name": "c"}]
+    lexical = [{"name": "c"}, {"name": "d"}]
+    fused = reciprocal_rank_fusion([vector, lexical], key=lambda r: r["name"], k=3, rrf_k=60)
+    assert [r["name"] for r in fused] == ["c", "a", "b"]
+    assert all(0 < r["fused_score"] <= 1 for r in fused)
+
+
+class VectorOnlySession:
+    async def run(self, query, **params):
+        assert "table_vec_index" in query
+        return FakeResult([
+            {"name": "products", "schema": "public", "db": "postgres", "description": "상품 마스터", "score": 0.9},
+            {"name": "customer_orders", "schema": "public", "db": "postgres", "description": "", "score": 0.8},
+        ])
+
+
+class ReadyLexicalIndex(LexicalIndex):
+    def __init__(self):
+        super().__init__()
+        self.tables = InvertedIndex(TABLES)
+        self.columns = InvertedIndex([])
+
+    async def ensure_fresh(self, session):
+        return True
+
+
+@pytest.mark.asyncio
+async def test_search_tables_fuses_lexical_matches():
+    searcher = GraphSearcher(VectorOnlySession(), lexical_index=ReadyLexicalIndex())
+
+    vector_only = await searcher.search_tables([0.1], k=2)
+    assert [t.name for t in vector_only] == ["products", "customer_orders"]
+
+    fused = await searcher.search_tables([0.1], k=2, query_text="T02 정산")
+    assert "t02" in [t.name for t in fused]
+    # score 는 코사인 유사도 그대로, 결합 순위 점수는 fused_score 로 따로 노출
+    scores = {t.name: (t.score, t.fused_score) for t in fused}
+    assert scores["t02"][0] == 0.0
+    assert all(0 < fused_score <= 1 for _, fused_score in scores.values())
+    if "products" in scores:
+        assert scores["products"][0] == 0.9
+
+
+@pytest.mark.asyncio
+async def test_search_tables_batch_decides_fusion_per_text():
+    class BatchVectorSession:
+        async def run(self, query, **params):
+            return FakeResult([
+                {"idx": idx, "name": "products", "schema": "public", "db": "postgres",
+                 "description": "상품 마스터", "score": 0.9}
+                for idx in range(len(params["embeddings"]))
+            ])
+
+    searcher = GraphSearcher(BatchVectorSession(), lexical_index=ReadyLexicalIndex())
+    first, second = await searcher.search_tables_batch([[0.1], [0.2]], k=2, query_texts=["", "T02 정산"])
+
+    assert [(t.name, t.fused_score) for t in first] == [("products", None)]
+    assert "t02" in [t.name for t in second]
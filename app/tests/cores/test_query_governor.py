@@ -0,0 +1,152 @@
+# python -m pytest app/tests/cores/test_query_governor.py -v
+
+"""서버측 타임아웃, 실행 중 쿼리 추적 및 취소 테스트"""
+
+import asyncio
+from contextlib import asynccontextmanager
+
+import pytest
+from fastapi import HTTPException
+
+from app.config import settings
+from app.core import sql_exec as sql_exec_module
+from app.core.query_governor import (
+    ClientDisconnectedError,
+    QueryGovernor,
+    query_scope,
+    run_until_disconnected,
+)
+from app.core.sql_exec import SQLExecutor
+from app.routers.admin import require_admin_key
+from app.tests.fakes import AdminConnection, FakeConnection, connection_source
+
+
+class BlockingConnection(FakeConnection):
+    """prepare 가 release 될 때까지 멈추는 연결 (실행 중인 쿼리 흉내)"""
+
+    def __init__(self, count):
+        super().__init__(count)
+        self.running = asyncio.Event()
+        self.release = asyncio.Event()
+
+    async def prepare(self, sql, timeout=None):
+        self.running.set()
+        await self.release.wait()
+        return await super().prepare(sql, timeout)
+
+
+@pytest.fixture
+def governor(monkeypatch):
+    admin = AdminConnection()
+    governor = QueryGovernor(connection_source=connection_source(admin))
+    governor.admin = admin
+    monkeypatch.setattr(sql_exec_module, "query_governor", governor)
+    return governor
+
+
+@pytest.mark.asyncio
+async def test_query_is_tracked_with_server_side_timeouts(governor):
+    conn = BlockingConnection(2)
+    with query_scope("POST /ask", request_id="req-1"):
+        task = asyncio.create_task(SQLExecutor().execute_query(conn, "SELECT id, name FROM items", timeout=7))
+    await conn.running.wait()
+
+    [running] = governor.list()
+    assert running["backend_pid"] == 4242
+    assert running["request"] == "POST /ask" and running["request_id"] == "req-1"
+    assert conn.settings[0][0] == "7000"
+
+    conn.release.set()
+    result = await task
+    assert result["row_count"] == 2
+    assert governor.list() == []
+    assert governor.admin.calls == []
+
+
+@pytest.mark.asyncio
+async def test_cancelled_query_cancels_its_backend(governor):
+    conn = BlockingConnection(2)
+    task = asyncio.create_task(SQLExecutor().execute_query(conn, "SELECT id, name FROM items"))
+    await conn.running.wait()
+
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    assert governor.admin.calls == [("SELECT pg_cancel_backend($1)", (4242,))]
+    assert governor.stats()["cancelled"] == 1
+    assert governor.list() == []
+
+
+@pytest.mark.asyncio
+async def test_kill_cancels_running_query(governor):
+    conn = BlockingConnection(1)
+    task = asyncio.create_task(SQLExecutor().execute_query(conn, "SELECT id, name FROM items"))
+    await conn.running.wait()
+
+    assert await governor.kill("unknown") is None
+    [running] = governor.list()
+    assert await governor.kill(running["query_id"], terminate=True) is True
+    assert governor.admin.calls == [("SELECT pg_terminate_backend($1)", (4242,))]
+    assert governor.list()[0]["state"] == "cancelling"
+
+    conn.release.set()
+    await task
+
+
+@pytest.mark.asyncio
+async def test_kill_skips_query_that_ended_while_connecting(governor):
+    conn = BlockingConnection(1)
+    task = asyncio.create_task(SQLExecutor().execute_query(conn, "SELECT id, name FROM items"))
+    await conn.running.wait()
+    [running] = governor.list()
+
+    @asynccontextmanager
+    async def finishing_source():
+        # 취소용 커넥션을 얻는 사이 쿼리가 끝나고 커넥션(pid)이 풀로 돌아간다
+        conn.release.set()
+        await task
+        yield governor.admin
+
+    governor.connection_source = finishing_source
+    assert await governor.kill(running["query_id"]) is None
+    assert governor.admin.calls == []
+
+
+def test_admin_api_is_disabled_without_a_key(monkeypatch):
+    monkeypatch.setattr(settings, "admin_api_key", "")
+    with pytest.raises(HTTPException) as disabled:
+        require_admin_key(x_admin_key="")
+    assert disabled.value.status_code == 403
+
+    monkeypatch.setattr(settings, "admin_api_key", "s3cret")
+    with pytest.raises(HTTPException):
+        require_admin_key(x_admin_key="wrong")
+    require_admin_key(x_admin_key="s3cret")
+
+class DisconnectingRequest:
+    def __init__(self):
+        self.disconnected = False
+
+    async def is_disconnected(self):
+        return self.disconnected
+
+
+@pytest.mark.asyncio
+async def test_client_disconnect_cancels_work():
+    request = DisconnectingRequest()
+    cancelled = asyncio.Event()
+
+    async def slow_query():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    assert await run_until_disconnected(request, asyncio.sleep(0, result="ok"), poll_interval=0.01) == "ok"
+
+    request.disconnected = True
+    with pytest.raises(ClientDisconnectedError):
+        await run_until_disconnected(request, slow_query(), poll_interval=0.01)
+    assert cancelled.is_set()
@@ -0,0 +1,90 @@
+# python -m pytest app/tests/cores/test_result_cache.py -v
+
+"""정규화 SQL + 테이블 데이터 버전 기반 결과 캐시 테스트"""
+
+import pytest
+
+from app.config import settings
+from app.core import result_cache as result_cache_module
+from app.core.result_cache import ResultCache, analyze_sql
+from app.core.sql_exec import SQLExecutor
+from app.tests.fakes import FakeConnection
+
+
+def test_equivalent_sql_shares_canonical_form():
+    first, tables, volatile = analyze_sql("select id from Public.Users  where id = 1")
+    second, _, _ = analyze_sql("SELECT id FROM public.users WHERE id = 1")
+    assert first == second
+    assert tables == ['"public"."users"']
+    assert not volatile
+
+    _, tables, _ = analyze_sql('WITH recent AS (SELECT * FROM "Orders") SELECT * FROM recent')
+    assert tables == ['"Orders"']
+
+
+@pytest.mark.parametrize("sql", [
+    "SELECT * FROM orders WHERE created_at > now() - interval '1 day'",
+    "SELECT CURRENT_DATE",
+    "SELECT id FROM orders ORDER BY random() LIMIT 5",
+    "SELECT clock_timestamp()",
+    "SELECT nextval('order_seq')",
+    "SELECT * FROM orders WHERE created_at > 'today'::date",
+])
+def test_time_and_random_functions_are_volatile(sql):
+    assert analyze_sql(sql)[2]
+
+
+def test_lru_is_bounded_in_bytes_and_checks_versions():
+    cache = ResultCache(max_bytes=4000, ttl_seconds=60, compress=True)
+    result = {"columns": ["id"], "rows": [[i] for i in range(50)], "row_count": 50}
+
+    cache.put(("a",), ("1:10:0:0",), result)
+    cached, age = cache.get(("a",), ("1:10:0:0",))
+    assert cached == result and cached is not result and age >= 0
+
+    assert cache.get(("a",), ("1:11:0:0",)) is None
+    assert cache.stats()["invalidations"] == 1
+
+    for i in range(100):
+        cache.put((f"k{i}",), None, result)
+    assert cache.bytes <= 4000
+    assert cache.stats()["evictions"] > 0
+
+
+class VersionedConnection(FakeConnection):
+    def __init__(self, count):
+        super().__init__(count)
+        self.version = 1
+        self.prepared = 0
+
+    async def fetch(self, query, *args):
+        return [{"ord": 1, "relfilenode": 10, "n_tup_ins": self.version, "n_tup_upd": 0, "n_tup_del": 0}]
+
+    async def prepare(self, sql, timeout=None):
+        self.prepared += 1
+        return await super().prepare(sql, timeout)
+
+
+@pytest.mark.asyncio
+async def test_executor_serves_cached_result_until_table_changes(monkeypatch):
+    monkeypatch.setattr(settings, "is_use_result_cache", True)
+    monkeypatch.setattr(result_cache_module, "_result_cache", None)
+    conn = VersionedConnection(3)
+    executor = SQLExecutor()
+
+    first = await executor.execute_query(conn, "SELECT id, name FROM items")
+    second = await executor.execute_query(conn, "select id, name from ITEMS")
+    assert first["cached"] is False
+    assert second["cached"] is True and second["rows"] == first["rows"]
+    assert conn.prepared == 1
+
+    conn.version = 2
+    third = await executor.execute_query(conn, "SELECT id, name FROM items")
+    assert third["cached"] is False
+    assert conn.prepared == 2
+
+    # 실행할 때마다 결과가 달라지는 쿼리는 캐시하지 않는다
+    for _ in range(2):
+        volatile = await executor.execute_query(conn, "SELECT id, now() FROM items")
+        assert "cached" not in volatile
+    assert conn.prepared == 4
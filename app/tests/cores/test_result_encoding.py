@@ -0,0 +1,72 @@
+# python -m pytest app/tests/cores/test_result_encoding.py -v
+
+"""컬럼형 결과 인코딩 테스트"""
+
+import datetime
+import decimal
+import json
+import uuid
+
+import pytest
+
+from app.core.result_encoding import (
+    ARROW_METADATA_KEY,
+    ARROW_STREAM_MEDIA_TYPE,
+    ColumnarResultBuilder,
+    columnar_sample_rows,
+    encode_arrow_ipc,
+    ensure_arrow_available,
+    negotiate_result_format,
+)
+
+
+def test_builder_converts_by_column_type():
+    builder = ColumnarResultBuilder(
+        ["id", "amount", "day", "key", "note"],
+        ["int4", "numeric", "date", "uuid", "tsvector"],
+    )
+    key = uuid.UUID(int=1)
+    builder.add_batch([
+        [1, decimal.Decimal("10.50"), datetime.date(2024, 1, 2), key, "'a'"],
+        [2, None, None, None, None],
+    ])
+    builder.add_batch([[3, decimal.Decimal("0.1"), datetime.date(2024, 1, 3), key, "'b'"]])
+
+    table = builder.to_dict(row_count=3, execution_time_ms=1.5)
+    assert table["column_types"] == ["int", "decimal", "date", "uuid", "string"]
+    assert table["values"][0] == [1, 2, 3]
+    assert table["values"][1] == ["10.50", None, "0.1"]
+    assert table["values"][2] == ["2024-01-02", None, "2024-01-03"]
+    assert table["values"][3][0] == str(key)
+    assert columnar_sample_rows(table, 2) == [
+        [1, "10.50", "2024-01-02", str(key), "'a'"],
+        [2, None, None, None, None],
+    ]
+
+
+def test_negotiation_prefers_flag_then_accept_header():
+    assert negotiate_result_format("rows", ARROW_STREAM_MEDIA_TYPE) == "rows"
+    assert negotiate_result_format(None, f"{ARROW_STREAM_MEDIA_TYPE}, application/json") == "arrow"
+    assert negotiate_result_format(None, "application/vnd.text2sql.columnar+json") == "columnar"
+    assert negotiate_result_format(None, "application/json") == "rows"
+
+
+def test_arrow_ipc_round_trip():
+    pa = pytest.importorskip("pyarrow")
+    ensure_arrow_available()
+
+    builder = ColumnarResultBuilder(["id", "amount", "paid"], ["int8", "numeric", "bool"])
+    builder.add_batch([[1, decimal.Decimal("10.50"), True], [2, None, False]])
+    table = builder.to_dict(row_count=2, execution_time_ms=1.5)
+
+    payload = encode_arrow_ipc(table, {"sql": "SELECT 1"})
+
+    decoded = pa.ipc.open_stream(payload).read_all()
+    assert decoded.schema.field("id").type == pa.int64()
+    # decimal 은 정밀도를 지키기 위해 문자열로, 원래 타입은 필드 메타데이터에
+    assert decoded.schema.field("amount").type == pa.string()
+    assert decoded.schema.field("amount").metadata == {b"logical_type": b"decimal"}
+    assert decoded.schema.field("paid").type == pa.bool_()
+    assert decoded.to_pydict() == {"id": [1, 2], "amount": ["10.50", None], "paid": [True, False]}
+    metadata = json.loads(decoded.schema.metadata[ARROW_METADATA_KEY])
+    assert metadata == {"sql": "SELECT 1", "row_count": 2, "execution_time_ms": 1.5}
@@ -0,0 +1,152 @@
+# python -m pytest app/tests/cores/test_result_session.py -v
+
+"""서버측 커서 기반 결과 세션(페이지 이어받기) 테스트"""
+
+import asyncio
+
+import pytest
+
+from app.core import result_session as result_session_module
+from app.core.query_governor import QueryGovernor
+from app.core.result_session import (
+    ResultSessionConflictError,
+    ResultSessionExpiredError,
+    ResultSessionLimitError,
+    ResultSessionManager,
+)
+from app.tests.fakes import AdminConnection, FakeConnection, FakePool, connection_source
+
+
+def pool_of(count):
+    return FakePool(FakeConnection(count))
+
+
+def ids(page):
+    return [row[0] for row in page["rows"]]
+
+
+def manager(**overrides):
+    options = dict(max_open=2, idle_timeout=60.0, max_page_size=100)
+    options.update(overrides)
+    return ResultSessionManager(**options)
+
+
+@pytest.mark.asyncio
+async def test_pages_continue_where_the_previous_page_stopped():
+    pool = pool_of(5)
+    sessions = manager()
+
+    session, first = await sessions.open(pool.acquire, "SELECT id FROM t", page_size=2)
+    assert ids(first) == [0, 1]
+    assert first["columns"] == ["id", "name"]
+    continuation = sessions.continuation(session)
+    assert continuation["has_more"] and continuation["token"].endswith(".2")
+    # 다음 페이지 존재 여부를 알기 위해 한 행만 더 읽는다
+    assert pool.conn.fetch_sizes == [3]
+
+    session, second = await sessions.next_page(continuation["token"], page_size=2)
+    assert ids(second) == [2, 3]
+    assert second["offset"] == 2
+
+    session, last = await sessions.next_page(sessions.continuation(session)["token"], page_size=2)
+    assert ids(last) == [4]
+    assert sessions.continuation(session) == {
+        "token": None,
+        "next_offset": 5,
+        "has_more": False,
+        "truncated": False,
+        "expires_in_seconds": None,
+    }
+    # 마지막 페이지 후 트랜잭션 종료 및 커넥션 반환
+    assert pool.in_use == 0
+    assert pool.conn.log[-2:] == ["rollback", "released"]
+    assert sessions.stats()["open"] == 0
+
+
+@pytest.mark.asyncio
+async def test_single_page_result_closes_immediately_and_max_rows_truncates():
+    sessions = manager()
+    pool = pool_of(2)
+    session, page = await sessions.open(pool.acquire, "SELECT id FROM t", page_size=10)
+    assert page["row_count"] == 2
+    assert not session.has_more
+    assert pool.in_use == 0
+
+    pool = pool_of(10)
+    session, page = await sessions.open(pool.acquire, "SELECT id FROM t", page_size=3, max_rows=4)
+    session, page = await sessions.next_page(session.token, page_size=3)
+    assert ids(page) == [3]
+    assert session.truncated and not session.has_more
+
+
+@pytest.mark.asyncio
+async def test_stale_expired_and_excess_sessions():
+    sessions = manager(max_open=1)
+    pool = pool_of(10)
+    session, _ = await sessions.open(pool.acquire, "SELECT id FROM t", page_size=2)
+    stale = session.token
+
+    with pytest.raises(ResultSessionLimitError):
+        await sessions.open(pool_of(10).acquire, "SELECT id FROM t")
+
+    await sessions.next_page(stale, page_size=2)
+    # 커서는 앞으로만 이동하므로 이미 읽은 페이지의 토큰은 거부
+    with pytest.raises(ResultSessionConflictError):
+        await sessions.next_page(stale)
+
+    assert await sessions.close(session.token)
+    with pytest.raises(ResultSessionExpiredError):
+        await sessions.next_page(session.token)
+    with pytest.raises(ResultSessionExpiredError):
+        await sessions.next_page("not-a-token")
+    assert pool.in_use == 0
+
+
+@pytest.mark.asyncio
+async def test_idle_sessions_are_reaped():
+    sessions = manager(idle_timeout=0.02)
+    pool = pool_of(10)
+    session, _ = await sessions.open(pool.acquire, "SELECT id FROM t", page_size=2)
+
+    await asyncio.sleep(0.1)
+
+    assert pool.in_use == 0
+    assert sessions.stats()["reaped"] == 1
+    with pytest.raises(ResultSessionExpiredError):
+        await sessions.next_page(session.token)
+
+
+@pytest.mark.asyncio
+async def test_open_sessions_are_listed_and_killed_through_the_governor(monkeypatch):
+    admin = AdminConnection()
+    governor = QueryGovernor(connection_source=connection_source(admin))
+    monkeypatch.setattr(result_session_module, "query_governor", governor)
+    sessions = manager()
+    pool = pool_of(10)
+    session, _ = await sessions.open(pool.acquire, "SELECT id FROM t", page_size=2)
+
+    [running] = governor.list()
+    assert running["backend_pid"] == 4242 and running["sql"] == "SELECT id FROM t"
+
+    # 페이지 사이에 쉬고 있는 세션도 kill 하면 닫혀 커넥션이 반환된다
+    assert await governor.kill(running["query_id"]) is True
+    assert admin.calls == [("SELECT pg_cancel_backend($1)", (4242,))]
+    assert governor.list() == []
+    assert pool.in_use == 0
+    with pytest.raises(ResultSessionExpiredError):
+        await sessions.next_page(session.token)
+
+
+@pytest.mark.asyncio
+async def test_close_waits_for_the_page_being_read():
+    sessions = manager()
+    pool = pool_of(10)
+    session, _ = await sessions.open(pool.acquire, "SELECT id FROM t", page_size=2)
+
+    async with session.lock:
+        closing = asyncio.create_task(sessions.close(session.token))
+        await asyncio.sleep(0.01)
+        # 페이지를 읽는 동안 커서를 닫지 않는다
+        assert not closing.done() and pool.in_use == 1
+    assert await closing
+    assert pool.in_use == 0
@@ -0,0 +1,115 @@
+# python -m pytest app/tests/cores/test_single_flight.py -v
+
+"""동일 SQL 동시 실행 합치기(single-flight) 테스트"""
+
+import asyncio
+
+import pytest
+
+from app.config import settings
+from app.core import sql_exec as sql_exec_module
+from app.core.sql_exec import SingleFlight, SQLExecutionError, SQLExecutor
+from app.tests.fakes import FakeConnection
+
+
+class GatedConnection(FakeConnection):
+    """prepare 가 gate 가 열릴 때까지 멈추는 연결"""
+
+    def __init__(self, count):
+        super().__init__(count)
+        self.gate = asyncio.Event()
+        self.prepared = 0
+        self.cancelled = False
+
+    async def prepare(self, sql, timeout=None):
+        self.prepared += 1
+        try:
+            await self.gate.wait()
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        return await super().prepare(sql, timeout)
+
+
+@pytest.fixture
+def fresh_single_flight(monkeypatch):
+    monkeypatch.setattr(settings, "is_use_single_flight", True)
+    monkeypatch.setattr(settings, "is_use_result_cache", False)
+    flight = SingleFlight()
+    monkeypatch.setattr(sql_exec_module, "single_flight", flight)
+    return flight
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_queries_run_once(fresh_single_flight):
+    leader = GatedConnection(3)
+    joiners = [GatedConnection(0), GatedConnection(0)]
+    executor = SQLExecutor()
+
+    tasks = [
+        asyncio.create_task(executor.execute_query(leader, "SELECT id, name FROM items")),
+        asyncio.create_task(executor.execute_query(joiners[0], "select id, name from ITEMS")),
+        asyncio.create_task(executor.execute_query(joiners[1], "SELECT id,  name FROM items")),
+    ]
+    await asyncio.sleep(0)
+    leader.gate.set()
+    results = await asyncio.gather(*tasks)
+
+    # 첫 요청의 커넥션에서만 실행하고 추가 커넥션을 쓰지 않는다
+    assert leader.prepared == 1
+    assert [conn.prepared for conn in joiners] == [0, 0]
+    assert all(result["rows"] == results[0]["rows"] for result in results)
+    assert len({id(result) for result in results}) == 3
+    assert fresh_single_flight.stats() == {"in_flight": 0, "leaders": 1, "joined": 2, "abandoned": 0}
+
+
+@pytest.mark.asyncio
+async def test_queries_with_different_timeouts_do_not_share_a_flight(fresh_single_flight):
+    first, second = GatedConnection(1), GatedConnection(1)
+    executor = SQLExecutor()
+
+    tasks = [
+        asyncio.create_task(executor.execute_query(first, "SELECT id, name FROM items", timeout=5)),
+        asyncio.create_task(executor.execute_query(second, "SELECT id, name FROM items", timeout=30)),
+    ]
+    await asyncio.sleep(0)
+    first.gate.set()
+    second.gate.set()
+    await asyncio.gather(*tasks)
+
+    assert (first.prepared, second.prepared) == (1, 1)
+    assert fresh_single_flight.stats()["joined"] == 0
+
+
+@pytest.mark.asyncio
+async def test_leaving_leader_keeps_its_connection_until_the_shared_query_ends(fresh_single_flight):
+    leader = GatedConnection(2)
+    executor = SQLExecutor()
+
+    first = asyncio.create_task(executor.execute_query(leader, "SELECT id, name FROM items"))
+    second = asyncio.create_task(executor.execute_query(GatedConnection(0), "SELECT id, name FROM items"))
+    await asyncio.sleep(0)
+    first.cancel()
+    await asyncio.sleep(0.01)
+    # 다른 요청이 기다리는 동안 쿼리는 첫 요청의 커넥션에서 계속 실행된다
+    assert not first.done()
+
+    leader.gate.set()
+    result = await second
+    assert result["row_count"] == 2
+    assert not leader.cancelled
+    with pytest.raises(asyncio.CancelledError):
+        await first
+
+
+@pytest.mark.asyncio
+async def test_query_is_cancelled_when_all_waiters_leave(fresh_single_flight):
+    leader = GatedConnection(2)
+
+    with pytest.raises(SQLExecutionError, match="timeout"):
+        await SQLExecutor().execute_query(leader, "SELECT id, name FROM items", timeout=0.05)
+
+    # 첫 요청은 쿼리 취소가 끝난 뒤에 반환한다
+    assert leader.cancelled
+    assert fresh_single_flight.stats()["abandoned"] == 1
+    assert fresh_single_flight.stats()["in_flight"] == 0
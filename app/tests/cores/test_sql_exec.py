@@ -0,0 +1,63 @@
+# python -m pytest app/tests/cores/test_sql_exec.py -v
+
+"""SQLExecutor 커서 스트리밍 테스트"""
+
+import pytest
+
+from app.core.sql_exec import (
+    TRUNCATED_MAX_BYTES,
+    TRUNCATED_MAX_ROWS,
+    SQLExecutionError,
+    SQLExecutor,
+)
+from app.tests.fakes import FakeConnection
+
+
+@pytest.mark.asyncio
+async def test_stream_yields_batches_in_read_only_transaction():
+    conn = FakeConnection(25)
+    stream = SQLExecutor().stream_query(conn, "SELECT 1", batch_size=10, max_rows=100)
+
+    batches = [batch async for batch in stream]
+
+    assert [len(batch) for batch in batches] == [10, 10, 5]
+    assert stream.columns == ["id", "name"]
+    assert stream.row_count == 25 and stream.truncated is None
+    assert conn.readonly is True and conn.closed is True
+
+
+@pytest.mark.asyncio
+async def test_stream_stops_at_row_and_byte_caps():
+    conn = FakeConnection(1000)
+    stream = SQLExecutor().stream_query(conn, "SELECT 1", batch_size=10, max_rows=15)
+    rows = [row async for batch in stream for row in batch]
+    assert len(rows) == 15 and stream.truncated == TRUNCATED_MAX_ROWS
+    # 행 상한 이후로는 필요한 만큼만 요청한다
+    assert conn.fetch_sizes == [10, 6]
+
+    stream = SQLExecutor().stream_query(FakeConnection(1000), "SELECT 1", batch_size=10, max_bytes=100)
+    rows = [row async for batch in stream for row in batch]
+    assert stream.truncated == TRUNCATED_MAX_BYTES
+    assert 0 < len(rows) < 10
+
+
+@pytest.mark.asyncio
+async def test_execute_query_fails_fast_over_row_limit():
+    executor = SQLExecutor()
+    executor.max_rows = 5
+    with pytest.raises(SQLExecutionError, match="too many rows"):
+        await executor.execute_query(FakeConnection(1000), "SELECT 1")
+
+    results = await executor.execute_query(FakeConnection(5), "SELECT 1", json_safe=True)
+    assert results["columns"] == ["id", "name"]
+    assert results["row_count"] == 5
+    assert results["rows"][0] == [0, "row-0"]
+
+
+@pytest.mark.asyncio
+async def test_execute_query_columnar():
+    results = await SQLExecutor().execute_query(FakeConnection(3), "SELECT 1", columnar=True)
+    assert results["format"] == "columnar"
+    assert results["column_types"] == ["int", "string"]
+    assert results["values"] == [[0, 1, 2], ["row-0", "row-1", "row-2"]]
+    assert results["row_count"] == 3
@@ -0,0 +1,79 @@
+# python -m pytest app/tests/cores/test_sql_export.py -v
+
+"""COPY TO STDOUT 기반 스트리밍 내보내기 테스트"""
+
+import asyncio
+
+import pytest
+
+from app.core.sql_export import CSVExporter, bounded_stream
+from app.core.sql_guard import SQLGuard
+
+
+class FakeTransaction:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class FakeConnection:
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.query = None
+        self.sent = 0
+
+    def transaction(self, readonly=False):
+        assert readonly
+        return FakeTransaction()
+
+    async def execute(self, query, *args):
+        return "SELECT 1"
+
+    async def copy_from_query(self, query, *, output, format, header, timeout):
+        self.query = query
+        for chunk in self.chunks:
+            await output(chunk)
+            self.sent += 1
+        return f"COPY {len(self.chunks)}"
+
+
+@pytest.mark.asyncio
+async def test_csv_export_streams_copy_output():
+    conn = FakeConnection([b"id\n", b"1\n", b"2\n"])
+    summaries = []
+
+    async def produce(sink):
+        summaries.append(await CSVExporter(timeout=5).produce(conn, "SELECT id FROM t;", sink))
+
+    chunks = [chunk async for chunk in bounded_stream(produce, max_chunks=2)]
+
+    assert b"".join(chunks) == b"id\n1\n2\n"
+    assert conn.query == "SELECT id FROM t"
+    assert summaries[0]["bytes"] == 7 and summaries[0]["rows"] == 3
+
+
+@pytest.mark.asyncio
+async def test_bounded_stream_applies_backpressure_and_cancels_on_close():
+    conn = FakeConnection([b"x" * 10] * 100)
+
+    async def produce(sink):
+        await CSVExporter(timeout=5).produce(conn, "SELECT 1", sink)
+
+    stream = bounded_stream(produce, max_chunks=4)
+    first = await stream.__anext__()
+    await asyncio.sleep(0.01)
+    # 소비자가 멈추면 생산자도 큐 크기만큼만 앞서 나간다
+    assert first == b"x" * 10
+    assert conn.sent <= 6
+    await stream.aclose()
+    assert conn.sent < 100
+
+
+def test_export_validation_keeps_user_limit():
+    guard = SQLGuard()
+    sql, _ = guard.validate("SELECT id FROM users", enforce_limit=False)
+    assert "LIMIT" not in sql.upper()
+    sql, _ = guard.validate("SELECT id FROM users")
+    assert "LIMIT" in sql.upper()
@@ -0,0 +1,56 @@
+# python -m pytest app/tests/cores/test_subschema_cache.py -v
+
+"""의미 기반 서브스키마 캐시 테스트"""
+
+import time
+
+from app.core.graph_search import SubSchema, TableMatch
+from app.core.subschema_cache import SubSchemaCache
+
+
+def _subschema(name="orders"):
+    return SubSchema(
+        tables=[TableMatch(name=name, schema="public", db="postgres", description="", score=0.9)],
+        columns=[],
+        fk_relationships=[],
+        join_hints=[],
+    )
+
+
+def test_similar_embedding_hits_and_returns_copy():
+    cache = SubSchemaCache(max_items=10, ttl_seconds=60, similarity_threshold=0.95)
+    cache.put([1.0, 0.0], (10, 10), "v1", _subschema())
+
+    hit = cache.get([0.99, 0.05], (10, 10), "v1")
+    assert hit.tables[0].name == "orders"
+    hit.tables[0].name = "mutated"
+    assert cache.get([1.0, 0.0], (10, 10), "v1").tables[0].name == "orders"
+
+    assert cache.get([0.0, 1.0], (10, 10), "v1") is None
+    assert cache.get([1.0, 0.0], (5, 5), "v1") is None
+    assert cache.stats()["hits"] == 2
+    assert cache.stats()["misses"] == 2
+
+
+def test_schema_version_change_invalidates():
+    cache = SubSchemaCache(max_items=10, ttl_seconds=60, similarity_threshold=0.95)
+    cache.put([1.0, 0.0], (10, 10), "v1", _subschema())
+    assert cache.get([1.0, 0.0], (10, 10), "v2") is None
+    assert cache.stats()["invalidations"] == 1
+    assert cache.stats()["items"] == 0
+
+
+def test_lru_and_ttl_eviction(monkeypatch):
+    cache = SubSchemaCache(max_items=2, ttl_seconds=60, similarity_threshold=0.99)
+    cache.put([1.0, 0.0, 0.0], (10, 10), "v1", _subschema("a"))
+    cache.put([0.0, 1.0, 0.0], (10, 10), "v1", _subschema("b"))
+    cache.get([1.0, 0.0, 0.0], (10, 10), "v1")
+    cache.put([0.0, 0.0, 1.0], (10, 10), "v1", _subschema("c"))
+
+    assert cache.get([0.0, 1.0, 0.0], (10, 10), "v1") is None
+    assert cache.stats()["evictions"] == 1
+
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now + 120)
+    assert cache.get([1.0, 0.0, 0.0], (10, 10), "v1") is None
+    assert cache.stats()["expirations"] == 2
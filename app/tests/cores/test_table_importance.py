@@ -0,0 +1,84 @@
+# python -m pytest app/tests/cores/test_table_importance.py -v
+
+"""테이블 중요도 사전 계산 테스트"""
+
+import pytest
+
+from app.core import table_importance
+from app.core.table_importance import TableImportanceStore, compute_fk_pagerank
+from app.tests.fakes import FakeResult
+
+
+def test_pagerank_favors_referenced_tables():
+    ranks = compute_fk_pagerank(
+        ["orders", "customers", "items", "logs"],
+        [("orders", "customers"), ("items", "orders"), ("items", "customers")],
+    )
+    assert abs(sum(ranks.values()) - 1.0) < 1e-6
+    assert ranks["customers"] > ranks["orders"] > ranks["items"]
+    assert ranks["items"] == pytest.approx(ranks["logs"])
+
+
+class FakeSession:
+    def __init__(self):
+        self.queries = []
+        self.written = None
+
+    async def run(self, query, **params):
+        self.queries.append(query)
+        if "count(r) AS degree" in query:
+            return FakeResult([
+                {"id": "1", "db": "postgres", "table_name": "orders", "schema": "public", "description": "주문", "degree": 4},
+                {"id": "2", "db": "postgres", "table_name": "customers", "schema": "public", "description": "고객", "degree": 2},
+                {"id": "3", "db": "sales", "table_name": "orders", "schema": "public", "description": "영업 주문", "degree": 1},
+            ])
+        if "FK_TO_TABLE" in query:
+            return FakeResult([{"from_id": "1", "to_id": "2"}])
+        if "UNWIND $rows" in query:
+            self.written = params["rows"]
+            return FakeResult([])
+        raise AssertionError(f"unexpected query: {query}")
+
+
+@pytest.mark.asyncio
+async def test_scores_are_computed_once_per_schema_version(monkeypatch):
+    versions = iter(["v1", "v1", "v2"])
+
+    async def fake_current(session):
+        return next(versions)
+
+    monkeypatch.setattr(table_importance.schema_version_tracker, "current", fake_current)
+    store = TableImportanceStore(metric="degree")
+    session = FakeSession()
+
+    scores = await store.get_scores(session)
+    orders, customers = ("postgres", "public", "orders"), ("postgres", "public", "customers")
+    assert scores[orders]["importance_score"] == 4
+    assert scores[customers]["fk_pagerank"] > scores[orders]["fk_pagerank"]
+    # 같은 이름의 테이블도 DB / 스키마별로 따로 점수를 가진다
+    assert scores[("sales", "public", "orders")]["importance_score"] == 1
+    # 검색 경로에서는 그래프에 쓰지 않는다
+    assert session.written is None
+
+    await store.get_scores(session)
+    assert len(session.queries) == 2
+
+    await store.get_scores(session)
+    assert len(session.queries) == 4
+
+
+@pytest.mark.asyncio
+async def test_refresh_persists_scores_on_table_nodes(monkeypatch):
+    async def fake_current(session):
+        return "v1"
+
+    monkeypatch.setattr(table_importance.schema_version_tracker, "current", fake_current)
+    store = TableImportanceStore(metric="degree")
+    session = FakeSession()
+
+    await store.refresh(session)
+
+    assert {row["id"] for row in session.written} == {"1", "2", "3"}
+    # 같은 버전에서는 다시 계산하지 않음
+    await store.get_scores(session)
+    assert len(session.queries) == 3
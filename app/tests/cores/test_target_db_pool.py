@@ -0,0 +1,61 @@
+# python -m pytest app/tests/cores/test_target_db_pool.py -v
+
+"""대상 DB 커넥션 풀의 세션 설정 테스트"""
+
+import pytest
+
+from app import deps
+from app.config import settings
+
+
+class ResettingConnection:
+    """서버처럼 시작 패킷의 설정을 세션 기본값으로 두고, RESET ALL 시 그 값으로 되돌리는 연결"""
+
+    def __init__(self, server_settings):
+        self.defaults = dict(server_settings)
+        self.session = dict(server_settings)
+
+    async def fetchval(self, query, *args):
+        if query.startswith("SHOW "):
+            return self.session.get(query[len("SHOW "):], "")
+        return 1
+
+    async def execute(self, query, *args):
+        if query == "RESET ALL":
+            self.session = dict(self.defaults)
+
+
+class ResettingPool:
+    """release 때마다 asyncpg 처럼 RESET ALL 을 실행하는 풀"""
+
+    def __init__(self, **kwargs):
+        self.kwargs = kwargs
+        self.conn = ResettingConnection(kwargs.get("server_settings") or {})
+        self.opened = 0
+
+    async def acquire(self, timeout=None):
+        self.opened += 1
+        return self.conn
+
+    async def release(self, conn):
+        await conn.execute("RESET ALL")
+
+    async def close(self):
+        pass
+
+
+@pytest.mark.asyncio
+async def test_read_only_and_search_path_survive_release(monkeypatch):
+    async def create_pool(**kwargs):
+        return ResettingPool(**kwargs)
+
+    monkeypatch.setattr(deps.asyncpg, "create_pool", create_pool)
+    monkeypatch.setattr(settings, "target_db_pool_warmup", False)
+    pool = deps.TargetDBPool()
+
+    for _ in range(2):
+        async with pool.acquire(scheduled=False) as conn:
+            assert await conn.fetchval("SHOW default_transaction_read_only") == "on"
+            assert await conn.fetchval("SHOW search_path") == settings.target_db_schema
+    assert pool.pool.opened == 2
+    assert "init" not in pool.pool.kwargs
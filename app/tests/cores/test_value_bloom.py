@@ -0,0 +1,27 @@
+# python -m pytest app/tests/cores/test_value_bloom.py -v
+
+"""컬럼 값 블룸 필터 테스트"""
+
+from app.core.value_bloom import BloomFilter, extract_literals, normalize_value
+
+
+def test_bloom_filter_has_no_false_negatives_and_round_trips():
+    bloom = BloomFilter.for_capacity(1000, 0.001)
+    values = [f"PRD-{i:05d}" for i in range(1000)]
+    for value in values:
+        bloom.add(value)
+
+    restored = BloomFilter.from_bytes(bloom.to_bytes())
+    assert all(value in restored for value in values)
+    # 정규화 덕분에 대소문자·전각 문자 차이는 같은 값으로 본다
+    assert "ｐｒｄ-00001" in restored
+    false_positives = sum(f"OTHER-{i}" in restored for i in range(10000))
+    assert false_positives < 50
+
+
+def test_extract_literals_prefers_quoted_and_longer_spans():
+    literals = extract_literals("Sales of 'New York' stores in Q3")
+    assert literals[0] == "New York"
+    assert literals.index("New York stores") < literals.index("stores")
+    assert "Q3" in literals
+    assert normalize_value("  Seoul   City ") == "seoul city"
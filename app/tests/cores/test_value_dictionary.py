@@ -0,0 +1,178 @@
+# python -m pytest app/tests/cores/test_value_dictionary.py -v
+
+"""컬럼 값 사전 프로파일링 및 점진 키워드 매칭 테스트"""
+
+import os
+import sqlite3
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.value_dictionary import ColumnValueIndex, ValueDictionary
+from app.react.tools import find_value_columns, search_column_values
+
+
+def _index(values):
+    return ColumnValueIndex(
+        values=[value for value, _ in values],
+        frequencies=[frequency for _, frequency in values],
+        complete=True,
+        profiled_at=0.0,
+    )
+
+
+def test_find_is_case_insensitive_and_frequency_ordered():
+    index = _index([("Seoul Station", 3), ("seoul city hall", 10), ("Busan", 5)])
+    assert [index.values[i] for i in index.find("SEOUL")] == ["seoul city hall", "Seoul Station"]
+    assert index.find("Daegu") == []
+
+
+def test_find_progressive_trims_like_database_search():
+    index = _index([("강남구", 5), ("서초구", 2)])
+    # 뒤에서 줄인 "강남" 으로도 없고, 앞에서 줄인 "남구청" 은 없으며 "남구" 에서 매칭된다
+    assert index.find_progressive("남구청") == ("남구", ["강남구"])
+    assert index.find_progressive("xyz") == ("", ["강남구", "서초구"])
+
+
+
+def test_find_treats_like_wildcards_like_the_database():
+    index = _index([("A_1", 4), ("AB1", 3), ("50% off", 2), ("500 off", 1)])
+    # DB 의 ILIKE '%키워드%' 와 같이 _ 와 % 는 와일드카드, 역슬래시는 이스케이프
+    assert [index.values[i] for i in index.find("a_1")] == ["A_1", "AB1"]
+    assert [index.values[i] for i in index.find("a\\_1")] == ["A_1"]
+    assert [index.values[i] for i in index.find("50%off")] == ["50% off", "500 off"]
+    assert [index.values[i] for i in index.find("50\\%")] == ["50% off"]
+
+
+class FakeTransaction:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class FakeConnection:
+    def __init__(self):
+        self.queries = []
+
+    def transaction(self):
+        return FakeTransaction()
+
+    async def cursor(self, query, prefetch=None):
+        self.queries.append((query, ()))
+        for value in ("Gangnam", "Seocho"):
+            yield {"value": value}
+
+    async def fetch(self, query, *args):
+        self.queries.append((query, args))
+        if "ANY(wanted.matched_values)" in query:
+            keyword_indexes, values = args
+            return [
+                {"__keyword_idx": keyword_index, "id": 1, "district": value}
+                for keyword_index, value in zip(keyword_indexes, values)
+            ]
+        if "GROUP BY" in query:
+            return [{"value": "Gangnam", "frequency": 7}, {"value": "Seocho", "frequency": 3}]
+        if "ILIKE" in query:
+            raise AssertionError("값 사전이 있으면 ILIKE 스캔을 하지 않아야 한다")
+        return []
+
+
+@pytest.mark.asyncio
+async def test_search_column_values_uses_profiled_dictionary(tmp_path, monkeypatch):
+    dictionary = ValueDictionary(str(tmp_path / "values.db"), max_memory_columns=4, max_age_seconds=3600)
+    conn = FakeConnection()
+    assert await dictionary.profile_column(conn, "public", "stores", "district", max_values=10)
+
+    monkeypatch.setattr(search_column_values, "get_value_dictionary", lambda: dictionary)
+    context = SimpleNamespace(
+        db_conn=conn,
+        search_column_values_search_keywords_limit=10,
+        value_limit=5,
+        scaled=lambda value: value,
+    )
+    conn.queries.clear()
+    xml = await search_column_values.execute(
+        context, "stores", "district", ["gangnam-gu", "seocho", "busan"], schema="public"
+    )
+
+    assert 'effective_keyword="gangnam"' in xml
+    assert "<district>Gangnam</district>" in xml
+    assert "<district>Seocho</district>" in xml
+    assert "__keyword_idx" not in xml
+    # 기본 행 조회와 모든 키워드의 예시 행 조회 한 번
+    assert len(conn.queries) == 2
+    assert dictionary.stats()["hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_truncated_profile_falls_back_to_database(tmp_path):
+    dictionary = ValueDictionary(str(tmp_path / "values.db"), max_memory_columns=4, max_age_seconds=3600)
+    complete = await dictionary.profile_column(FakeConnection(), "public", "stores", "district", max_values=1)
+    assert complete is False
+    assert await dictionary.get_column("public", "stores", "district") is None
+    assert os.path.exists(dictionary.path)
+
+
+@pytest.mark.asyncio
+async def test_bloom_lookup_finds_columns_for_literal(tmp_path, monkeypatch):
+    dictionary = ValueDictionary(str(tmp_path / "values.db"), max_memory_columns=4, max_age_seconds=3600)
+    conn = FakeConnection()
+    await dictionary.profile_column(conn, "public", "stores", "district", max_values=10)
+    # 고유값이 사전 한도를 넘는 컬럼도 전체 값을 스트리밍해 블룸 필터를 만든다
+    await dictionary.profile_column(conn, "public", "branches", "region", max_values=1)
+
+    assert await dictionary.columns_for_value(" gangnam ") == [
+        ("public", "stores", "district"),
+        ("public", "branches", "region"),
+    ]
+    assert await dictionary.columns_for_value("Busan") == []
+
+    hints = await dictionary.value_hints("Seocho branch sales", max_columns=3, limit=5)
+    assert hints == [("Seocho", [("public", "stores", "district"), ("public", "branches", "region")])]
+
+    monkeypatch.setattr(find_value_columns, "get_value_dictionary", lambda: dictionary)
+    context = SimpleNamespace(search_column_values_search_keywords_limit=10, scaled=lambda value: value)
+    xml = await find_value_columns.execute(context, ["Gangnam"])
+    assert '<column schema="public" table="branches" name="region"/>' in xml
+
+
+@pytest.mark.asyncio
+async def test_profiles_are_kept_per_database(tmp_path):
+    dictionary = ValueDictionary(str(tmp_path / "values.db"), max_memory_columns=4, max_age_seconds=3600)
+    await dictionary.profile_column(FakeConnection(), "public", "stores", "district", max_values=10, db_key="sales")
+
+    # 같은 스키마/테이블/컬럼 이름이라도 다른 대상 DB 의 프로파일은 쓰지 않는다
+    assert await dictionary.get_column("public", "stores", "district") is None
+    assert await dictionary.columns_for_value("Gangnam") == []
+    assert (await dictionary.get_column("public", "stores", "district", db_key="sales")).values == ["Gangnam", "Seocho"]
+    assert await dictionary.columns_for_value("Gangnam", db_key="sales") == [("public", "stores", "district")]
+    hints = await dictionary.value_hints("Seocho sales", max_columns=3, limit=5, db_key="sales")
+    assert hints == [("Seocho", [("public", "stores", "district")])]
+
+
+@pytest.mark.asyncio
+async def test_profiles_without_database_are_dropped(tmp_path):
+    path = str(tmp_path / "values.db")
+    legacy = sqlite3.connect(path)
+    legacy.executescript(
+        """
+        CREATE TABLE profiled_columns (
+            id INTEGER PRIMARY KEY,
+            schema_name TEXT NOT NULL,
+            table_name TEXT NOT NULL,
+            column_name TEXT NOT NULL,
+            complete INTEGER NOT NULL,
+            profiled_at REAL NOT NULL,
+            UNIQUE (schema_name, table_name, column_name)
+        );
+        INSERT INTO profiled_columns VALUES (1, 'public', 'stores', 'district', 1, 0);
+        """
+    )
+    legacy.close()
+
+    dictionary = ValueDictionary(path, max_memory_columns=4, max_age_seconds=3600)
+    assert await dictionary.get_column("public", "stores", "district") is None
+    assert await dictionary.profile_column(FakeConnection(), "public", "stores", "district", max_values=10)
+    assert (await dictionary.get_column("public", "stores", "district")).values == ["Gangnam", "Seocho"]
@@ -0,0 +1,126 @@
+# python -m pytest app/tests/cores/test_vector_index.py -v
+
+"""InProcessVectorIndex 테스트"""
+
+import asyncio
+import os
+
+import pytest
+
+from app.config import settings
+from app.core.schema_version import schema_version_tracker
+from app.core.vector_index import (
+    COLUMN_VECTORS_QUERY,
+    TABLE_VECTORS_QUERY,
+    InProcessVectorIndex,
+)
+from app.tests.fakes import FakeResult
+
+
+class FakeSession:
+    def __init__(self, tables, columns, version=1):
+        self.tables = tables
+        self.columns = columns
+        self.version = version
+        self.vector_loads = 0
+
+    async def run(self, query, **params):
+        if query == TABLE_VECTORS_QUERY:
+            self.vector_loads += 1
+            return FakeResult(self.tables)
+        if query == COLUMN_VECTORS_QUERY:
+            return FakeResult(self.columns)
+        return FakeResult([{"version": self.version}])
+
+
+@pytest.fixture(autouse=True)
+def small_dimension(monkeypatch):
+    monkeypatch.setattr(settings, "embedding_dimension", 3)
+    monkeypatch.setattr(settings, "schema_version_check_interval_seconds", 0)
+    schema_version_tracker.invalidate()
+
+
+def _table(name, vector):
+    return {"name": name, "schema": "public", "db": "postgres", "description": "", "vector": vector}
+
+
+def _column(name, table_name, vector):
+    return {
+        "name": name,
+        "table_name": table_name,
+        "table_schema": "public",
+        "db": "postgres",
+        "dtype": "text",
+        "description": "",
+        "nullable": True,
+        "vector": vector,
+    }
+
+
+@pytest.mark.asyncio
+async def test_query_tables_returns_top_k_by_cosine(tmp_path):
+    session = FakeSession(
+        tables=[
+            _table("orders", [1.0, 0.0, 0.0]),
+            _table("customers", [0.0, 1.0, 0.0]),
+            _table("items", [0.7, 0.7, 0.0]),
+        ],
+        columns=[_column("id", "orders", [0.0, 0.0, 2.0])],
+    )
+    index = InProcessVectorIndex(snapshot_dir=str(tmp_path))
+
+    assert await index.ensure_fresh(session)
+    records = index.query_tables([1.0, 0.1, 0.0], k=2)
+
+    assert [r["name"] for r in records] == ["orders", "items"]
+    assert 0.0 <= records[1]["score"] <= records[0]["score"] <= 1.0
+
+    columns = index.query_columns([0.0, 0.0, 1.0], k=5)
+    assert columns[0]["name"] == "id"
+    assert columns[0]["score"] == pytest.approx(1.0)
+
+
+@pytest.mark.asyncio
+async def test_snapshot_is_memory_mapped_by_new_instance(tmp_path):
+    session = FakeSession(tables=[_table("orders", [1.0, 0.0, 0.0])], columns=[])
+    await InProcessVectorIndex(snapshot_dir=str(tmp_path)).ensure_fresh(session)
+
+    index = InProcessVectorIndex(snapshot_dir=str(tmp_path))
+    assert await index.ensure_fresh(session)
+
+    assert session.vector_loads == 1
+    assert index.query_tables([1.0, 0.0, 0.0], k=1)[0]["name"] == "orders"
+
+
+@pytest.mark.asyncio
+async def test_index_reloads_when_schema_version_changes(tmp_path):
+    session = FakeSession(tables=[_table("orders", [1.0, 0.0, 0.0])], columns=[])
+    index = InProcessVectorIndex(snapshot_dir=str(tmp_path))
+    await index.ensure_fresh(session)
+
+    session.version = 2
+    session.tables = [_table("orders", [1.0, 0.0, 0.0]), _table("refunds", [0.9, 0.1, 0.0])]
+    await index.ensure_fresh(session)
+
+    assert session.vector_loads == 2
+    assert len(index.query_tables([1.0, 0.0, 0.0], k=5)) == 2
+
+
+@pytest.mark.asyncio
+async def test_concurrent_snapshot_writers_publish_consistent_files(tmp_path):
+    writers = []
+    for count in range(1, 7):
+        index = InProcessVectorIndex(snapshot_dir=str(tmp_path))
+        session = FakeSession(
+            tables=[_table(f"t{i}", [1.0, float(i), 0.0]) for i in range(count)],
+            columns=[_column("id", "t0", [0.0, 0.0, 1.0])] * count,
+        )
+        writers.append(index.ensure_fresh(session))
+    await asyncio.gather(*writers)
+
+    # 어떤 작성자가 마지막이든 meta.json 은 자신이 쓴 배열만 가리킨다
+    reader = InProcessVectorIndex(snapshot_dir=str(tmp_path))
+    assert reader._load_snapshot(reader._read_meta()["version"])
+    assert reader.tables.matrix.shape[0] == len(reader.tables.metadata)
+    assert reader.columns.matrix.shape[0] == len(reader.columns.metadata)
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".tmp")]
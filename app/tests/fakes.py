@@ -0,0 +1,133 @@
+"""여러 테스트가 함께 쓰는 asyncpg / Neo4j 가짜 객체"""
+
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+
+
+class FakeRecord(dict):
+    pass
+
+
+class FakeTransaction:
+    """async with 와 start() / rollback() 양쪽으로 쓰이는 트랜잭션"""
+
+    def __init__(self, conn, readonly):
+        self.conn = conn
+        conn.readonly = readonly
+
+    async def __aenter__(self):
+        self.conn.log.append("begin")
+        return self
+
+    async def __aexit__(self, *exc):
+        self.conn.log.append("end")
+        self.conn.closed = True
+        return False
+
+    async def start(self):
+        self.conn.log.append("begin")
+
+    async def rollback(self):
+        self.conn.log.append("rollback")
+        self.conn.closed = True
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+        self.position = 0
+
+    async def fetch(self, n, timeout=None):
+        self.conn.fetch_sizes.append(n)
+        records = self.conn.records[self.position:self.position + n]
+        self.position += len(records)
+        return records
+
+
+class FakeStatement:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def get_attributes(self):
+        return [
+            SimpleNamespace(name="id", type=SimpleNamespace(name="int4")),
+            SimpleNamespace(name="name", type=SimpleNamespace(name="text")),
+        ]
+
+    async def cursor(self):
+        return FakeCursor(self.conn)
+
+
+class FakeConnection:
+    """(id, name) 행 count 개를 서버측 커서로 돌려주는 연결"""
+
+    def __init__(self, count):
+        self.records = [FakeRecord(id=i, name=f"row-{i}") for i in range(count)]
+        self.fetch_sizes = []
+        self.readonly = None
+        self.closed = False
+        self.settings = []
+        self.log = []
+
+    def transaction(self, readonly=False):
+        return FakeTransaction(self, readonly)
+
+    def get_server_pid(self):
+        return 4242
+
+    async def execute(self, query, *args):
+        self.settings.append(args)
+        return "SELECT 1"
+
+    async def prepare(self, sql, timeout=None):
+        return FakeStatement(self)
+
+
+class AdminConnection:
+    """pg_cancel_backend / pg_terminate_backend 호출을 기록하는 연결"""
+
+    def __init__(self):
+        self.calls = []
+
+    async def fetchval(self, query, *args, timeout=None):
+        self.calls.append((query, args))
+        return True
+
+
+def connection_source(conn):
+    """항상 같은 연결을 내주는 pool.acquire 대용"""
+    @asynccontextmanager
+    async def acquire():
+        yield conn
+    return acquire
+
+
+class FakePool:
+    def __init__(self, conn):
+        self.conn = conn
+        self.in_use = 0
+
+    @asynccontextmanager
+    async def acquire(self):
+        self.in_use += 1
+        try:
+            yield self.conn
+        finally:
+            self.in_use -= 1
+            self.conn.log.append("released")
+
+
+class FakeResult:
+    """Neo4j 세션 run() 의 결과"""
+
+    def __init__(self, records):
+        self.records = records
+
+    async def data(self):
+        return [dict(record) for record in self.records]
+
+    async def single(self):
+        return self.records[0] if self.records else None
+
+    async def consume(self):
+        return None
@@ -0,0 +1,81 @@
+# python -m pytest app/tests/ingest/test_to_neo4j.py -v
+
+"""스키마 그래프 적재의 DB 구분 테스트"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from app.ingest.to_neo4j import Neo4jSchemaLoader
+from app.tests.fakes import FakeResult
+
+
+class RecordingSession:
+    def __init__(self):
+        self.runs = []
+
+    async def run(self, query, **params):
+        self.runs.append((query, params))
+        result = FakeResult([])
+        result.consume = self._summary
+        return result
+
+    @staticmethod
+    async def _summary():
+        return SimpleNamespace(counters=SimpleNamespace(nodes_deleted=0))
+
+
+class FakeEmbeddingClient:
+    def format_column_text(self, **kwargs):
+        return kwargs["column_name"]
+
+    async def embed_batch(self, texts):
+        return [[0.0] for _ in texts]
+
+
+@pytest.mark.asyncio
+async def test_columns_are_keyed_by_database():
+    session = RecordingSession()
+    loader = Neo4jSchemaLoader(session, FakeEmbeddingClient())
+
+    for db_name in ("sales", "billing"):
+        await loader.load_columns(
+            [{"schema": "public", "table_name": "Orders", "name": "ID", "dtype": "integer"}],
+            db_name=db_name,
+        )
+        await loader.load_primary_keys(
+            [{"schema": "public", "table_name": "Orders", "column_name": "ID", "constraint_name": "orders_pk"}],
+            db_name=db_name,
+        )
+        await loader.load_foreign_keys(
+            [{
+                "from_schema": "public", "from_table": "Items", "from_column": "order_id",
+                "to_schema": "public", "to_table": "Orders", "to_column": "ID",
+                "constraint_name": "items_order_fk",
+            }],
+            db_name=db_name,
+        )
+
+    column_runs = [params for query, params in session.runs if "MERGE (c:Column" in query]
+    assert [(params["fqn"], params["db"]) for params in column_runs] == [
+        ("sales.public.orders.id", "sales"),
+        ("billing.public.orders.id", "billing"),
+    ]
+    pk_runs = [params for query, params in session.runs if "is_primary_key" in query]
+    assert [params["fqn"] for params in pk_runs] == ["sales.public.orders.id", "billing.public.orders.id"]
+    fk_runs = [params for query, params in session.runs if "FK_TO]" in query]
+    assert [(params["from_fqn"], params["to_fqn"]) for params in fk_runs] == [
+        ("sales.public.items.order_id", "sales.public.orders.id"),
+        ("billing.public.items.order_id", "billing.public.orders.id"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_clear_schema_only_touches_one_database():
+    session = RecordingSession()
+    await Neo4jSchemaLoader(session, FakeEmbeddingClient()).clear_schema("sales")
+
+    [(query, params)] = session.runs
+    assert params == {"db": "sales"}
+    assert "n.db IS NULL" not in query
+    assert "MATCH (c:Column {db: $db})" in query
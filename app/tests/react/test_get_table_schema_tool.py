@@ -0,0 +1,202 @@
+# python -m pytest app/tests/react/test_get_table_schema_tool.py -v
+
+"""get_table_schema 툴 배치 조회 테스트"""
+
+import re
+from types import SimpleNamespace
+
+import pytest
+
+from app.config import settings
+from app.react.tools import get_table_schema
+from app.react.tools.value_sampler import ColumnValueSampler
+from app.tests.fakes import FakeResult
+
+
+class FakeNeo4jSession:
+    def __init__(self):
+        self.queries = []
+
+    async def run(self, query, **params):
+        self.queries.append(query)
+        if "UNWIND $table_names" in query:
+            assert params["table_names"] == ["orders"]
+            return FakeResult([{
+                "table_name": "orders",
+                "column_name": "customer_id",
+                "fk_records": [{
+                    "referenced_table": "customers",
+                    "referenced_table_schema": "public",
+                    "referenced_column": "id",
+                    "constraint_name": "orders_customer_fk",
+                }],
+            }])
+        return FakeResult([{
+            "table_name": "orders",
+            "table_schema": "public",
+            "table_description": "주문",
+            "columns": [
+                {"name": "customer_id", "dtype": "integer", "nullable": False, "description": "고객"},
+                {"name": "id", "dtype": "integer", "nullable": False, "is_primary_key": True},
+                {"name": "payload", "dtype": "json", "nullable": True},
+            ],
+        }])
+
+
+class FakeConnection:
+    def __init__(self):
+        self.statements = []
+
+    async def fetch(self, query, *args):
+        self.statements.append(query)
+        if "pg_stats" in query:
+            schemas, tables, columns = args
+            assert columns == ["customer_id", "id"]
+            return [
+                {"ord": 1, "most_common_vals": ["10", "11"], "histogram_bounds": None, "reltuples": 5_000_000.0},
+                {"ord": 2, "most_common_vals": None, "histogram_bounds": None, "reltuples": 5_000_000.0},
+            ]
+        assert args == (["orders"],)
+        return [
+            {"table_schema": "public", "table_name": "orders", "column_name": "id", "data_type": "integer"},
+            {"table_schema": "public", "table_name": "orders", "column_name": "customer_id", "data_type": "integer"},
+            {"table_schema": "public", "table_name": "orders", "column_name": "payload", "data_type": "json"},
+        ]
+
+    async def fetchrow(self, query, *args):
+        self.statements.append(query)
+        assert '"payload"' not in query and '"customer_id"' not in query
+        assert "TABLESAMPLE SYSTEM" in query
+        return {"v0": [1, 2, 3]}
+
+
+@pytest.mark.asyncio
+async def test_get_table_schema_uses_bounded_round_trips():
+    session, conn = FakeNeo4jSession(), FakeConnection()
+    context = SimpleNamespace(
+        neo4j_session=session,
+        db_conn=conn,
+        neo4j_db=None,
+        get_table_schema_table_name_limit=10,
+        column_relation_limit=10,
+        value_limit=10,
+        scaled=lambda value: value,
+    )
+
+    xml = await get_table_schema.execute(context, ["public.orders"])
+
+    assert len(session.queries) == 2
+    assert len(conn.statements) == 3
+    assert xml.split("\n") == [
+        "<tool_result>",
+        "<table>",
+        "<schema>public</schema>",
+        "<name>orders</name>",
+        "<description>주문</description>",
+        "<columns>",
+        "<column>",
+        "<fqn>public.orders.id</fqn>",
+        "<name>id</name>",
+        "<dtype>integer</dtype>",
+        "<nullable>false</nullable>",
+        "<is_primary_key>true</is_primary_key>",
+        '<values source="tablesample">[1, 2, 3]</values>',
+        "</column>",
+        "<column>",
+        "<fqn>public.orders.customer_id</fqn>",
+        "<name>customer_id</name>",
+        "<dtype>integer</dtype>",
+        "<nullable>false</nullable>",
+        "<description>고객</description>",
+        "<foreign_keys>",
+        "<foreign_key>",
+        "<referenced_table_schema>public</referenced_table_schema>",
+        "<referenced_table>customers</referenced_table>",
+        "<referenced_column>id</referenced_column>",
+        "<constraint_name>orders_customer_fk</constraint_name>",
+        "</foreign_key>",
+        "</foreign_keys>",
+        '<values source="pg_stats_mcv">[10, 11]</values>',
+        "</column>",
+        "<column>",
+        "<fqn>public.orders.payload</fqn>",
+        "<name>payload</name>",
+        "<dtype>json</dtype>",
+        "<nullable>true</nullable>",
+        "</column>",
+        "</columns>",
+        "</table>",
+        "</tool_result>",
+    ]
+
+
+class StatsOnlyConnection:
+    async def fetch(self, query, *args):
+        return [{
+            "ord": 1,
+            "most_common_vals": None,
+            "histogram_bounds": [str(v) for v in range(0, 101, 10)],
+            "reltuples": 100.0,
+        }]
+
+    async def fetchrow(self, query, *args):
+        raise AssertionError("통계가 있으면 테이블을 읽지 않아야 한다")
+
+
+@pytest.mark.asyncio
+async def test_value_sampler_spreads_histogram_bounds():
+    sampler = ColumnValueSampler(StatsOnlyConnection())
+    samples = await sampler.sample([("public", "orders", [("amount", "integer")])], limit=3)
+    sample = samples[("public", "orders")]["amount"]
+    assert sample.source == "pg_stats_histogram"
+    assert sample.values == [0, 50, 100]
+
+
+class BrokenColumnConnection:
+    """묶은 조회에 broken 컬럼이 하나라도 들어가면 실패하는 연결"""
+
+    def __init__(self, broken=("secret",)):
+        self.broken = broken
+        self.batched_queries = []
+
+    async def fetch(self, query, *args):
+        assert "pg_stats" in query
+        return []
+
+    async def fetchrow(self, query, *args):
+        self.batched_queries.append(query)
+        columns = re.findall(r'ARRAY\(SELECT DISTINCT "(\w+)"', query)
+        if any(column in self.broken for column in columns):
+            raise PermissionError("permission denied for column")
+        values = {"country": ["KR", "US"], "tags": ['{a,"b c"}', "{{1,NULL},{3,4}}"]}
+        return {f"v{index}": values.get(column, []) for index, column in enumerate(columns)}
+
+
+@pytest.mark.asyncio
+async def test_value_sampler_bisects_failed_batch():
+    conn = BrokenColumnConnection()
+    samples = await ColumnValueSampler(conn).sample(
+        [("public", "users", [("country", "text"), ("secret", "text"), ("tags", "ARRAY")])],
+        limit=5,
+    )
+
+    users = samples[("public", "users")]
+    assert users["country"].values == ["KR", "US"]
+    # 배열 컬럼도 텍스트로 묶어 조회한 뒤 원래 모양의 리스트로 되돌린다
+    assert '"tags"::text' in conn.batched_queries[0]
+    assert users["tags"].values == [["a", "b c"], [["1", None], ["3", "4"]]]
+    assert "secret" not in users
+    # 전체 -> [country] / [secret, tags] -> [secret] / [tags]
+    assert len(conn.batched_queries) == 5
+
+
+@pytest.mark.asyncio
+async def test_value_sampler_fallback_is_bounded(monkeypatch):
+    monkeypatch.setattr(settings, "value_sample_fallback_max_queries", 4)
+    columns = [(f"c{index}", "text") for index in range(16)]
+    conn = BrokenColumnConnection(broken=[name for name, _ in columns])
+
+    samples = await ColumnValueSampler(conn).sample([("public", "wide", columns)], limit=5)
+
+    assert samples[("public", "wide")] == {}
+    assert len(conn.batched_queries) == 1 + 4
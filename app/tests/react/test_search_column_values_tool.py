@@ -0,0 +1,94 @@
+# python -m pytest app/tests/react/test_search_column_values_tool.py -v
+
+"""search_column_values 툴 단일 조회 점진 키워드 매칭 테스트"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from app.config import settings
+from app.react.tools import search_column_values
+from app.react.tools.search_column_values import _progressive_keyword_variants
+
+
+class UndefinedColumnError(Exception):
+    hint = 'Perhaps you meant to reference the column "stores.district_name".'
+
+
+class FakeConnection:
+    """키워드별 첫 매칭 후보 / LATERAL 조회를 메모리의 행으로 흉내 낸다."""
+
+    def __init__(self, rows, column):
+        self.rows = rows
+        self.column = column
+        self.queries = []
+
+    async def fetch(self, query, *args):
+        self.queries.append(query)
+        if "unnest($1::int[], $2::text[])" not in query:
+            return self.rows[:5]
+        if f'"{self.column}"::text' not in query:
+            raise UndefinedColumnError('column "district" does not exist')
+
+        keyword_indexes, patterns = args
+        best = {}
+        for ord_, (keyword_index, pattern) in enumerate(zip(keyword_indexes, patterns), start=1):
+            needle = pattern.strip("%").lower()
+            if keyword_index in best:
+                continue
+            if any(needle in row[self.column].lower() for row in self.rows):
+                best[keyword_index] = (ord_, needle)
+
+        result = []
+        for keyword_index, (ord_, needle) in sorted(best.items()):
+            for row in [row for row in self.rows if needle in row[self.column].lower()][:5]:
+                result.append({"__keyword_idx": keyword_index, "__variant_ord": ord_, **row})
+        return result
+
+
+def _context(conn):
+    return SimpleNamespace(
+        db_conn=conn,
+        search_column_values_search_keywords_limit=10,
+        value_limit=5,
+        scaled=lambda value: value,
+    )
+
+
+@pytest.fixture(autouse=True)
+def disable_value_dictionary(monkeypatch):
+    monkeypatch.setattr(settings, "is_use_value_dictionary", False)
+
+
+def test_variants_follow_suffix_then_prefix_order():
+    assert _progressive_keyword_variants("abc") == ["abc", "ab", "a", "", "bc", "c"]
+    assert _progressive_keyword_variants("") == [""]
+
+
+@pytest.mark.asyncio
+async def test_all_keywords_are_matched_in_one_query():
+    conn = FakeConnection(
+        [{"id": 1, "district": "Gangnam"}, {"id": 2, "district": "Seocho"}],
+        column="district",
+    )
+    xml = await search_column_values.execute(
+        _context(conn), "stores", "district", ["gangnam-gu", "seochoxx"], schema="public"
+    )
+
+    keyword_queries = [q for q in conn.queries if "unnest" in q]
+    assert len(keyword_queries) == 1
+    assert 'used_keyword="gangnam-gu" effective_keyword="gangnam"' in xml
+    assert 'used_keyword="seochoxx" effective_keyword="seocho"' in xml
+    assert "__keyword_idx" not in xml and "__variant_ord" not in xml
+
+
+@pytest.mark.asyncio
+async def test_hint_column_fallback_applies_to_all_keywords():
+    conn = FakeConnection([{"id": 1, "district_name": "Gangnam"}], column="district_name")
+    xml = await search_column_values.execute(
+        _context(conn), "stores", "district", ["gangnam", "gang"], schema="public"
+    )
+
+    assert xml.count('resolved_column="district_name"') == 2
+    assert xml.count('fallback_from="district"') == 1
+    assert "<error>" not in xml
@@ -0,0 +1,158 @@
+# python -m pytest app/tests/react/test_search_tables_tool.py -v
+
+"""search_tables 툴 배치 조회 테스트"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from app.config import settings
+from app.core.embedding import EmbeddingClient
+from app.core.table_importance import table_importance_store
+from app.react.tools import neo4j_utils, search_tables
+from app.tests.fakes import FakeResult
+
+
+class FakeSession:
+    def __init__(self):
+        self.queries = []
+
+    async def run(self, query, **params):
+        self.queries.append(query)
+        # 대상 DB 의 스키마 그래프 파티션만 검색한다
+        assert params["db"] == "postgres"
+        if "table_vec_index" in query:
+            assert len(params["embeddings"]) == 2
+            return FakeResult([
+                {"idx": 0, "name": "orders", "schema": "public", "db": "postgres", "description": "주문", "score": 0.9},
+                {"idx": 1, "name": "orders", "schema": "public", "db": "postgres", "description": "주문", "score": 0.8},
+                {"idx": 1, "name": "customers", "schema": "public", "db": "postgres", "description": "고객", "score": 0.7},
+            ])
+        if "UNWIND $table_names" in query:
+            assert params["table_names"] == ["orders", "customers"]
+            return FakeResult([
+                {
+                    "table_name": "orders",
+                    "forward_relationships": [
+                        {
+                            "related_table": "customers",
+                            "related_table_schema": "public",
+                            "relation_type": "foreign_key",
+                            "from_column": "customer_id",
+                            "to_column": "id",
+                        }
+                    ],
+                    "reverse_relationships": [],
+                    "any_relationships": [],
+                },
+                {
+                    "table_name": "customers",
+                    "forward_relationships": [],
+                    "reverse_relationships": [],
+                    "any_relationships": [
+                        {
+                            "related_table": "reviews",
+                            "related_table_schema": "public",
+                            "related_table_description": "리뷰",
+                            "relationship_paths": ["FK_TO_TABLE"],
+                        }
+                    ],
+                },
+            ])
+        raise AssertionError(f"unexpected query: {query}")
+
+
+@pytest.mark.asyncio
+async def test_search_tables_uses_bounded_round_trips(monkeypatch):
+    """키워드 수와 무관하게 Neo4j 호출 횟수가 고정되어야 한다"""
+
+    async def fake_embed_batch(self, texts):
+        return [[0.1, 0.2] for _ in texts]
+
+    monkeypatch.setattr(EmbeddingClient, "embed_batch", fake_embed_batch)
+    monkeypatch.setattr(settings, "is_use_join_graph", False)
+    monkeypatch.setattr(settings, "is_use_lexical_search", False)
+
+    async def fake_get_scores(session):
+        return {
+            ("postgres", "public", "orders"): {"schema": "public", "importance_score": 5},
+            ("postgres", "public", "customers"): {"schema": "public", "importance_score": 3},
+        }
+
+    monkeypatch.setattr(table_importance_store, "get_scores", fake_get_scores)
+    session = FakeSession()
+    context = SimpleNamespace(
+        neo4j_session=session,
+        openai_client=None,
+        neo4j_db="postgres",
+        search_table_keyword_limit=10,
+        table_top_k=2,
+        table_relation_limit=5,
+        scaled=lambda value: value,
+    )
+
+    xml = await search_tables.execute(context, ["주문", "고객"])
+
+    assert len(session.queries) == 2
+    assert xml.split("\n") == [
+        "<tool_result>",
+        '<related_tables used_keyword="주문">',
+        "<table>",
+        "<schema>public</schema>",
+        "<name>orders</name>",
+        "<description>주문</description>",
+        "<fk_relationships>",
+        "<fk_relationship>",
+        "<related_table_schema>public</related_table_schema>",
+        "<related_table>customers</related_table>",
+        "<relation_type>foreign_key</relation_type>",
+        "<from_column>customer_id</from_column>",
+        "<to_column>id</to_column>",
+        "</fk_relationship>",
+        "</fk_relationships>",
+        "</table>",
+        "</related_tables>",
+        '<related_tables used_keyword="고객">',
+        "<table>",
+        "<schema>public</schema>",
+        "<name>customers</name>",
+        "<description>고객</description>",
+        "<relationships>",
+        "<relationship>",
+        "<table>",
+        "<schema>public</schema>",
+        "<name>reviews</name>",
+        "<description>리뷰</description>",
+        "</table>",
+        "</relationship>",
+        "</relationships>",
+        "</table>",
+        "</related_tables>",
+        "</tool_result>",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_relationship_details_use_the_database_join_graph(monkeypatch):
+    class FakeJoinGraph:
+        def fk_relationships(self, table_name, limit):
+            return [], []
+
+        def any_relationships(self, table_name):
+            return []
+
+    class FakeJoinGraphIndex:
+        def __init__(self):
+            self.dbs = []
+
+        async def ensure_fresh(self, session, db=None):
+            self.dbs.append(db)
+            return FakeJoinGraph()
+
+    index = FakeJoinGraphIndex()
+    monkeypatch.setattr(neo4j_utils, "get_join_graph_index", lambda: index)
+
+    details = await neo4j_utils.get_tables_relationship_details(None, ["orders"], relation_limit=5, db="sales")
+
+    assert index.dbs == ["sales"]
+    assert details == {"orders": {"fk_relationships": [], "additional_relationships": []}}
@@ -16,20 +16,72 @@ const api = axios.create({
   }
 })
 
+export type ResultFormat = 'rows' | 'columnar'
+
+// rows: 행 배열, columnar: 컬럼별 타입 배열 (values[컬럼][행])
+export interface ResultTableData {
+  format?: ResultFormat
+  columns: string[]
+  rows?: any[][] | null
+  column_types?: string[] | null
+  values?: any[][] | null
+  row_count: number
+  execution_time_ms: number
+  cached?: boolean | null
+  cache_age_seconds?: number | null
+}
+
+// columnar 결과는 행으로 펼치지 않고 컬럼 배열에서 바로 읽는다
+export function resultRowCount(data: ResultTableData): number {
+  if (data.values) return data.values[0]?.length ?? 0
+  return data.rows?.length ?? 0
+}
+
+export function resultCellAt(data: ResultTableData, rowIndex: number, columnIndex: number): any {
+  if (data.values) return data.values[columnIndex]?.[rowIndex]
+  return data.rows?.[rowIndex]?.[columnIndex]
+}
+
+// 실행 전 EXPLAIN 예상 비용 기반 실행 허가 결과
+export interface AdmissionDecision {
+  action: 'admit' | 'queue' | 'sample' | 'reject'
+  estimated_cost?: number | null
+  estimated_rows?: number | null
+  reason?: string | null
+  sample_percent?: number | null
+  sampled_cost?: number | null
+  executed_sql?: string | null
+  plan_ms: number
+  queued_ms?: number | null
+}
+
 export interface AskRequest {
   question: string
+  db_key?: string
   limit?: number
   visual_pref?: string[]
+  result_format?: ResultFormat
+  paginate?: boolean
+  page_size?: number
+}
+
+// 페이지 단위 결과 조회 (paginate=true): token 으로 다음 페이지 요청, 유휴 시 만료 (410)
+export interface ResultContinuation {
+  token?: string | null
+  next_offset: number
+  has_more: boolean
+  truncated: boolean
+  expires_in_seconds?: number | null
+}
+
+export interface ResultPage {
+  table: ResultTableData & { offset: number }
+  continuation: ResultContinuation
 }
 
 export interface AskResponse {
   sql: string
-  table: {
-    columns: string[]
-    rows: any[][]
-    row_count: number
-    execution_time_ms: number
-  }
+  table: ResultTableData
   charts: Chart[]
   provenance: {
     tables: string[]
@@ -45,6 +97,9 @@ export interface AskResponse {
     sql_ms: number
     total_ms: number
   }
+  warnings?: string[] | null
+  admission?: AdmissionDecision | null
+  continuation?: ResultContinuation | null
 }
 
 export interface Chart {
@@ -101,18 +156,14 @@ export interface ReactStepModel {
   llm_output: string
 }
 
-export interface ReactExecutionResult {
-  columns: string[]
-  rows: any[][]
-  row_count: number
-  execution_time_ms: number
-}
+export type ReactExecutionResult = ResultTableData
 
 export interface ReactResponseModel {
   status: 'completed' | 'needs_user_input'
   final_sql?: string | null
   validated_sql?: string | null
   execution_result?: ReactExecutionResult | null
+  admission?: AdmissionDecision | null
   steps: ReactStepModel[]
   collected_metadata: string
   partial_sql: string
@@ -132,6 +183,7 @@ export interface ReactRequest {
   user_response?: string | null
   max_sql_seconds?: number
   prefer_language?: string
+  result_format?: ResultFormat
 }
 
 export type ReactStreamEvent =
@@ -162,6 +214,19 @@ export const apiService = {
     return data
   },
 
+  // 페이지 결과의 다음 페이지
+  async getResultPage(token: string, pageSize?: number): Promise<ResultPage> {
+    const { data } = await api.get(`/ask/results/${token}`, {
+      params: { page_size: pageSize }
+    })
+    return data
+  },
+
+  // 결과 세션 조기 종료
+  async closeResultSession(token: string): Promise<void> {
+    await api.delete(`/ask/results/${token}`)
+  },
+
   // 테이블 목록
   async getTables(search?: string, schema?: string, limit: number = 50): Promise<TableInfo[]> {
     const { data } = await api.get('/meta/tables', {
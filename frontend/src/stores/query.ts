@@ -19,7 +19,7 @@ export const useQueryStore = defineStore('query', () => {
     currentQuestion.value = question
 
     try {
-      const response = await apiService.ask({ question, limit })
+      const response = await apiService.ask({ question, limit, result_format: 'columnar' })
       currentResponse.value = response
       
       // 히스토리에 추가
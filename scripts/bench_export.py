@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Throughput benchmark for the streaming /export endpoint.
+Run against a live API server; the default query needs no tables.
+
+    uv run python scripts/bench_export.py --rows 5000000 --format csv
+    uv run python scripts/bench_export.py --rows 1000000 --read-delay 0.01   # slow client
+    uv run python scripts/bench_export.py --rows 1000000 --format parquet    # server needs `uv sync --extra arrow`
+"""
+import argparse
+import asyncio
+import time
+
+import httpx
+
+
+DEFAULT_SQL = (
+    "SELECT g AS id, md5(g::text) AS payload, now() - g * interval '1 second' AS created_at "
+    "FROM generate_series(1, {rows}) AS g"
+)
+
+
+async def run_once(client: httpx.AsyncClient, api_url: str, sql: str, export_format: str, read_delay: float):
+    start = time.perf_counter()
+    first_byte_ms = None
+    total_bytes = 0
+    newlines = 0
+    async with client.stream(
+        "POST", f"{api_url}/export", json={"sql": sql, "format": export_format}
+    ) as response:
+        response.raise_for_status()
+        async for chunk in response.aiter_raw():
+            if first_byte_ms is None:
+                first_byte_ms = (time.perf_counter() - start) * 1000
+            total_bytes += len(chunk)
+            if export_format == "csv":
+                newlines += chunk.count(b"\n")
+            if read_delay:
+                # Simulates a slow consumer; the server should pause its COPY instead of buffering
+                await asyncio.sleep(read_delay)
+    elapsed = time.perf_counter() - start
+    return {
+        "seconds": elapsed,
+        "first_byte_ms": first_byte_ms or 0.0,
+        "bytes": total_bytes,
+        "rows": newlines - 1 if export_format == "csv" else None,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--api-url", default="http://localhost:8000")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--sql", default=None, help="Query to export (defaults to generate_series)")
+    parser.add_argument("--format", choices=["csv", "parquet"], default="csv")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--read-delay", type=float, default=0.0, help="Seconds to sleep per received chunk")
+    args = parser.parse_args()
+
+    sql = args.sql or DEFAULT_SQL.format(rows=args.rows)
+    async with httpx.AsyncClient(timeout=None) as client:
+        for run in range(1, args.runs + 1):
+            result = await run_once(client, args.api_url, sql, args.format, args.read_delay)
+            mb = result["bytes"] / (1024 * 1024)
+            rows = result["rows"]
+            rows_text = f", {rows / result['seconds']:,.0f} rows/s" if rows else ""
+            print(
+                f"run {run}: {mb:,.1f} MiB in {result['seconds']:.2f}s "
+                f"({mb / result['seconds']:,.1f} MiB/s{rows_text}), "
+                f"first byte {result['first_byte_ms']:.0f}ms"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())